@@ -5,27 +5,23 @@ Usage:
     python start-tunnel-headless.py [--timeout 30] [--check-only]
 
 Returns exit code 0 on success, 1 on failure.
-Reads SSH password from vibeproxy-config.json.
+
+The tunnel itself is owned by the VibeProxy tunnel daemon (started in the
+background if it is not running yet), so the tunnel keeps reconnecting after
+this script exits. Reads settings, including SSHPassword, from
+vibeproxy-config.json.
 """
 
 import argparse
-import json
+import asyncio
 import socket
-import subprocess
 import sys
-import time
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def load_config() -> dict:
-    """Load VibeProxy config."""
-    config_path = Path(__file__).parent.parent / "vibeproxy-config.json"
-    if not config_path.exists():
-        print(f"ERROR: Config not found: {config_path}", file=sys.stderr)
-        sys.exit(1)
-
-    with open(config_path, encoding="utf-8") as f:
-        return json.load(f)
+from vibeproxy_manager.config import ConfigManager  # noqa: E402
+from vibeproxy_manager.daemon import DaemonClient  # noqa: E402
 
 
 def is_port_open(port: int, timeout: float = 1.0) -> bool:
@@ -38,120 +34,35 @@ def is_port_open(port: int, timeout: float = 1.0) -> bool:
         return False
 
 
-def find_plink() -> str | None:
-    """Find PuTTY plink executable."""
-    import shutil
-
-    plink = shutil.which("plink")
-    if plink:
-        return plink
-
-    paths = [
-        Path("C:/Program Files/PuTTY/plink.exe"),
-        Path("C:/Program Files (x86)/PuTTY/plink.exe"),
-    ]
-    for p in paths:
-        if p.exists():
-            return str(p)
-    return None
+def check_tunnel(client: DaemonClient, port: int) -> bool:
+    """Report tunnel state: the daemon's if one runs, else a port probe."""
+    status = asyncio.run(client.status())
+    if status is not None:
+        print(f"{status['message']} (daemon pid {status['daemon_pid']})")
+        return status["up"]
+    if is_port_open(port):
+        print(f"Tunnel is running on port {port} (not managed by the daemon)")
+        return True
+    print(f"Tunnel is NOT running on port {port}")
+    return False
 
 
-def start_tunnel(config: dict, timeout: int = 30) -> bool:
-    """Start SSH tunnel and wait for it to be ready.
+def start_tunnel(client: DaemonClient, port: int, timeout: int = 30) -> bool:
+    """Have the daemon bring the tunnel up and wait for it.
 
     Returns True if tunnel is up and accepting connections.
     """
-    port = config.get("LocalPort", 8317)
-    remote_port = config.get("RemotePort", 8317)
-    mac_user = config.get("MacUser", "")
-    mac_ip = config.get("MacIP", "")
-    password = config.get("SSHPassword", "")
-
-    if not mac_user or not mac_ip:
-        print("ERROR: MacUser and MacIP must be set in config", file=sys.stderr)
-        return False
-
-    if not password:
-        print(
-            "ERROR: SSHPassword must be set in config for headless mode",
-            file=sys.stderr,
-        )
-        return False
-
-    # Check if already running
-    if is_port_open(port):
+    if is_port_open(port) and asyncio.run(client.status()) is None:
         print(f"Tunnel already running on port {port}")
         return True
 
-    # Find plink
-    plink = find_plink()
-    if not plink:
-        print(
-            "ERROR: PuTTY plink not found. Install PuTTY for headless SSH.",
-            file=sys.stderr,
-        )
-        return False
-
-    # Build plink command
-    ssh_target = f"{mac_user}@{mac_ip}"
-    local_forward = f"{port}:localhost:{remote_port}"
-
-    cmd = [
-        plink,
-        "-ssh",
-        "-batch",  # Non-interactive
-        "-hostkey",
-        "SHA256:5XgC3h/+waae885A5/IORHon1HPf3QLQXbF84V+mj0Y",
-        "-L",
-        local_forward,
-        "-pw",
-        password,
-        ssh_target,
-        "-N",  # No command, just forward
-    ]
-
-    print(f"Starting tunnel: localhost:{port} -> {mac_ip}:{remote_port}")
-
-    # Start process in background (hidden window)
-    startupinfo = subprocess.STARTUPINFO()
-    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-    startupinfo.wShowWindow = subprocess.SW_HIDE
-
-    try:
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            startupinfo=startupinfo,
-            creationflags=subprocess.CREATE_NO_WINDOW,
-        )
-    except Exception as e:
-        print(f"ERROR: Failed to start tunnel: {e}", file=sys.stderr)
-        return False
-
-    # Wait for tunnel to be ready
-    print(f"Waiting for tunnel (timeout: {timeout}s)...", end="", flush=True)
-    start_time = time.time()
-
-    while time.time() - start_time < timeout:
-        # Check if process died
-        if process.poll() is not None:
-            _, stderr = process.communicate()
-            error = stderr.decode().strip() if stderr else "Unknown error"
-            print(f"\nERROR: Tunnel process died: {error}", file=sys.stderr)
-            return False
-
-        # Check if port is open
-        if is_port_open(port):
-            print(f" ready! (PID: {process.pid})")
-            return True
-
-        print(".", end="", flush=True)
-        time.sleep(1)
-
-    print(f"\nERROR: Timeout waiting for tunnel", file=sys.stderr)
-    process.terminate()
-    return False
+    print(f"Starting tunnel via daemon (timeout: {timeout}s)...", flush=True)
+    success, message = asyncio.run(client.start_tunnel(timeout=timeout))
+    if success:
+        print(message)
+    else:
+        print(f"ERROR: {message}", file=sys.stderr)
+    return success
 
 
 def main():
@@ -166,18 +77,17 @@ def main():
     )
     args = parser.parse_args()
 
-    config = load_config()
-    port = config.get("LocalPort", 8317)
+    config_manager = ConfigManager()
+    if not config_manager.config_path.exists():
+        print(f"ERROR: Config not found: {config_manager.config_path}", file=sys.stderr)
+        sys.exit(1)
+    port = config_manager.load().local_port
+    client = DaemonClient.from_config(config_manager)
 
     if args.check_only:
-        if is_port_open(port):
-            print(f"Tunnel is running on port {port}")
-            sys.exit(0)
-        else:
-            print(f"Tunnel is NOT running on port {port}")
-            sys.exit(1)
-
-    success = start_tunnel(config, args.timeout)
+        sys.exit(0 if check_tunnel(client, port) else 1)
+
+    success = start_tunnel(client, port, args.timeout)
     sys.exit(0 if success else 1)
 
 
@@ -13,6 +13,7 @@ This script provides:
 
 import sys
 import time
+import asyncio
 import argparse
 import logging
 from datetime import datetime
@@ -23,6 +24,11 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from vibeproxy_manager.tunnel import TunnelManager
 from vibeproxy_manager.config import ConfigManager
+from vibeproxy_manager.supervisor import TunnelSupervisor
+from vibeproxy_manager.pool import TunnelPool
+from vibeproxy_manager.quality import TunnelProber
+from vibeproxy_manager.netwatch import NetworkWatcher
+from vibeproxy_manager.tuning import best, network_key
 
 
 def setup_logging(verbose=False, very_verbose=False, log_file=None):
@@ -79,13 +85,124 @@ def print_config(tunnel: TunnelManager, verbose=False):
     print()
 
 
+def run_supervised(tunnel: TunnelManager) -> int:
+    """Keep the tunnel up with the event-driven supervisor (--monitor)."""
+    icons = {"up": "🟢", "down": "🔴", "retry": "🟡", "gave_up": "❌", "quality": "📶", "network": "📡"}
+
+    def on_event(kind: str, message: str) -> None:
+        current_time = time.strftime('%H:%M:%S')
+        print(f"   {icons.get(kind, '•')} [{current_time}] {message}")
+
+    async def supervise() -> bool:
+        prober = TunnelProber(
+            tunnel.port, on_change=lambda state, detail: on_event("quality", f"Quality {state}: {detail}")
+        )
+        network = NetworkWatcher()
+        supervisor = TunnelSupervisor(tunnel, on_event=on_event, prober=prober, network=network)
+        prober.start()
+        network.start()
+        try:
+            return await supervisor.run()
+        finally:
+            await prober.stop()
+            await network.stop()
+            if supervisor.outages:
+                mttr = supervisor.mttr
+                summary = f"{mttr:.1f}s" if mttr is not None else "n/a"
+                print(f"\n   Outages: {len(supervisor.outages)}, MTTR: {summary}")
+            if tunnel.owns_process:
+                await tunnel.astop()
+
+    print("🚀 Starting supervised tunnel (reconnects as soon as ssh exits)...\n")
+    print("   Keep this window open while using VibeProxy")
+    print("   Press Ctrl+C to disconnect\n")
+    try:
+        return 0 if asyncio.run(supervise()) else 1
+    except KeyboardInterrupt:
+        print("\n\n👋 Disconnecting...")
+        return 0
+
+
+def run_pool(size: int) -> int:
+    """Run N supervised tunnels behind a local balancer on the tunnel port (--pool)."""
+
+    async def serve() -> int:
+        pool = TunnelPool(size=size)
+        success, message = await pool.start()
+        print(f"   {message}")
+        if not success:
+            return 1
+        print("\n   Keep this window open while using VibeProxy")
+        print("   Press Ctrl+C to disconnect\n")
+        try:
+            while True:
+                await asyncio.sleep(30)
+                current_time = time.strftime('%H:%M:%S')
+                for member in pool.summary()["members"]:
+                    icon = "🟢" if member["healthy"] else "🔴"
+                    print(
+                        f"   {icon} [{current_time}] port {member['port']}: "
+                        f"{member['active']} active, {member['total']} total, "
+                        f"{member['failures']} failed"
+                    )
+        finally:
+            await pool.close()
+
+    print(f"🚀 Starting tunnel pool ({size} tunnels)...\n")
+    try:
+        return asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n\n👋 Disconnecting...")
+        return 0
+
+
+def bench_reconnect(tunnel: TunnelManager, rounds: int = 3) -> int:
+    """Compare reconnect time over a kept SSH master vs. a full handshake."""
+    if not tunnel.uses_control_master:
+        print("❌ ControlMaster is only used on macOS/Linux with SSHControlMaster enabled")
+        return 1
+
+    print(f"⏱  Measuring reconnect time ({rounds} rounds each)...\n")
+    timings = tunnel.measure_reconnect(rounds=rounds)
+    for mode, label in (("multiplexed", "Over kept SSH master"), ("full", "Full SSH handshake")):
+        values = timings[mode]
+        if values:
+            print(f"   {label:22}: median {sorted(values)[len(values) // 2] * 1000:.0f} ms "
+                  f"({', '.join(f'{v * 1000:.0f}' for v in values)} ms)")
+        else:
+            print(f"   {label:22}: all attempts failed")
+    return 0
+
+
+def tune_ssh(tunnel: TunnelManager) -> int:
+    """Benchmark SSH cipher/compression profiles and keep the best for this network."""
+    print("⏱  Benchmarking SSH profiles through a scratch tunnel...\n")
+    results = asyncio.run(tunnel.atune_ssh())
+    for result in results:
+        if result.ok:
+            print(f"   {result.profile:22}: {result.latency * 1000:6.1f} ms median, "
+                  f"{result.throughput / 1024:8.1f} KiB/s, burst {result.workload:.2f}s")
+        else:
+            print(f"   {result.profile:22}: failed ({result.error})")
+
+    winner = best(results)
+    if winner is None:
+        print("\n❌ No profile could connect")
+        return 1
+    print(f"\n✅ Using '{winner.profile}' on {network_key()} from now on")
+    return 0
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description='VibeProxy SSH Tunnel - Intelligent Auto-Connect')
     parser.add_argument('-v', '--verbose', action='store_true', help='Show detailed connection information')
     parser.add_argument('-vv', '--very-verbose', action='store_true', help='Show extensive debugging information')
     parser.add_argument('--log-file', help='Log output to specified file')
-    parser.add_argument('--monitor', action='store_true', help='Enable real-time activity monitoring')
+    parser.add_argument('--monitor', action='store_true', help='Supervise the tunnel: reconnect with backoff as soon as ssh exits')
+    parser.add_argument('--pool', type=int, metavar='N', help='Run N parallel tunnels behind a local balancer (default: TunnelPoolSize)')
+    parser.add_argument('--bench-reconnect', action='store_true', help='Measure reconnect time with and without the SSH ControlMaster, then exit')
+    parser.add_argument('--tune-ssh', action='store_true', help='Benchmark SSH cipher/compression profiles, save the fastest for this network, then exit')
     parser.add_argument('--kill-port', action='store_true', help='Kill any process using the tunnel port before connecting')
     
     args = parser.parse_args()
@@ -116,6 +233,19 @@ def main():
     # Show config
     print_config(tunnel, verbose=args.verbose or args.very_verbose)
 
+    if args.bench_reconnect:
+        return bench_reconnect(tunnel)
+
+    if args.tune_ssh:
+        return tune_ssh(tunnel)
+
+    pool_size = args.pool or tunnel.config_manager.load().tunnel_pool_size
+    if pool_size > 1:
+        return run_pool(pool_size)
+
+    if args.monitor:
+        return run_supervised(tunnel)
+
     # Check if already running
     if tunnel.is_running():
         print("✅ Tunnel is already running!")
@@ -146,16 +276,19 @@ def main():
             while True:
                 time.sleep(30)  # Check every 30 seconds instead of 60
                 
-                if args.monitor or args.verbose:
+                # One probe per cycle; the result is reused below
+                running = tunnel.is_running()
+
+                if args.verbose:
                     current_time = time.strftime('%H:%M:%S')
-                    if tunnel.is_running():
+                    if running:
                         print(f"   🟢 [{current_time}] Tunnel ACTIVE - Port {tunnel.port} accessible")
                         logging.info(f"Tunnel active at {current_time}")
                     else:
                         print(f"   🔴 [{current_time}] Tunnel INACTIVE - Port {tunnel.port} not responding")
                         logging.warning(f"Tunnel inactive at {current_time}")
                 
-                if not tunnel.is_running():
+                if not running:
                     print("\n⚠️  Tunnel connection lost!")
                     print("   Attempting to reconnect...\n")
                     logging.warning("Tunnel connection lost, attempting to reconnect...")
@@ -0,0 +1,98 @@
+"""Shared fixtures."""
+
+import socket
+import sys
+import textwrap
+
+import pytest
+
+from vibeproxy_manager import tunnel as tunnel_module
+from vibeproxy_manager.config import ConfigManager
+from vibeproxy_manager.tunnel import TunnelManager
+
+
+def free_port() -> int:
+    """Return a currently unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def serve_models(reader, writer) -> None:
+    """asyncio.start_server handler standing in for VibeProxy's GET /v1/models."""
+    while (await reader.readline()).strip():
+        pass
+    body = b'{"object": "list", "data": [{"id": "m1"}, {"id": "m2"}]}'
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body)
+    )
+    await writer.drain()
+    writer.close()
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    """An 'ssh' that listens on the -L port and answers HTTP with that port.
+
+    Host "fail" exits at once like a refused connection and host "gone" like
+    an unreachable one; host "drop" exits shortly after opening the port the
+    first time it runs.
+    """
+    script = tmp_path / "ssh"
+    dropped = tmp_path / "dropped"
+    script.write_text(
+        textwrap.dedent(
+            f"""\
+            #!{sys.executable}
+            import os, socket, sys, threading, time
+            args = sys.argv[1:]
+            if any("fail" in a for a in args):
+                sys.stderr.write("ssh: connect to host fail port 22: Connection refused\\n")
+                sys.exit(255)
+            if any("gone" in a for a in args):
+                sys.stderr.write("ssh: connect to host gone port 22: No route to host\\n")
+                sys.exit(255)
+            port = int(args[args.index("-L") + 1].split(":")[0])
+            s = socket.socket()
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind(("127.0.0.1", port))
+            s.listen()
+
+            def serve():
+                # Answer every HTTP request with the forward's local port
+                while True:
+                    conn, _ = s.accept()
+                    data = b""
+                    while b"\\r\\n\\r\\n" not in data:
+                        chunk = conn.recv(4096)
+                        if not chunk:
+                            break
+                        data += chunk
+                    body = str(port).encode()
+                    conn.sendall(b"HTTP/1.1 200 OK\\r\\nContent-Length: %d\\r\\n\\r\\n%s" % (len(body), body))
+                    conn.close()
+
+            threading.Thread(target=serve, daemon=True).start()
+            if any("drop" in a for a in args) and not os.path.exists({str(dropped)!r}):
+                open({str(dropped)!r}, "w").close()
+                time.sleep(0.3)
+                sys.stderr.write("client_loop: send disconnect: Broken pipe\\n")
+                sys.exit(255)
+            while True:
+                time.sleep(1)
+            """
+        )
+    )
+    script.chmod(0o755)
+    monkeypatch.setattr(tunnel_module, "find_ssh", lambda: str(script))
+    return script
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """TunnelManager with an isolated config and a free local port."""
+    tm = TunnelManager(ConfigManager(base_path=tmp_path))
+    tm._config.local_port = free_port()
+    tm._config.ssh_password = ""
+    return tm
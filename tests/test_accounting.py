@@ -0,0 +1,55 @@
+"""Tests for rolling per-client/per-model traffic accounting."""
+
+from vibeproxy_manager.accounting import RollingCounter, TrafficAccounting
+
+
+def test_rolling_counter_expires_old_buckets():
+    """Test that totals only cover the window and recycled slots reset."""
+    counter = RollingCounter(slots=10)
+    counter.add(1000.2, 1, 100, 1000)
+    counter.add(1000.9, 1, 50, 500)
+    counter.add(1005.0, 1, 10, 10)
+
+    assert counter.totals(1005.5, window=10) == [3, 160, 1510]
+    assert counter.totals(1005.5, window=3) == [1, 10, 10]
+    # Tick 1010 reuses tick 1000's slot
+    counter.add(1010.0, 1, 1, 1)
+    assert counter.totals(1010.0, window=10) == [2, 11, 11]
+
+
+def test_summary_groups_by_client_and_model():
+    """Test per-client, per-model and pair totals, busiest first."""
+    accounting = TrafficAccounting(window=60)
+    accounting.record("a0", "gpt-5", 2_000, 50_000, now=100)
+    accounting.record("a0", "claude", 1_000, 5_000, now=110)
+    accounting.record("droid", "gpt-5", 500, 400_000, now=120)
+    accounting.record("tui", "claude", 100, 100, now=10)  # Outside the window
+
+    summary = accounting.summary(now=130)
+    assert [c["client"] for c in summary["by_client"]] == ["droid", "a0"]
+    assert summary["by_client"][1]["requests"] == 2
+    assert summary["by_client"][1]["bytes_down"] == 55_000
+    assert [m["model"] for m in summary["by_model"]] == ["gpt-5", "claude"]
+    assert summary["by_model"][0]["bytes_up"] == 2_500
+    assert [(p["client"], p["model"]) for p in summary["pairs"]][0] == ("droid", "gpt-5")
+    assert accounting.summary(window=15, now=130)["by_client"][0]["client"] == "droid"
+
+
+def test_pair_cap_folds_into_other():
+    """Test that unbounded model names cannot grow memory without limit."""
+    accounting = TrafficAccounting(window=60, max_pairs=2)
+    for i in range(5):
+        accounting.record("script", f"model-{i}", 1, 1, now=100)
+    assert {p.model for p in accounting.pairs(now=100)} == {"model-0", "model-1", "other"}
+    assert sum(p.requests for p in accounting.pairs(now=100)) == 5
+
+
+def test_pair_cap_also_bounds_clients():
+    """Test that distinct clients past the cap share one overflow pair."""
+    accounting = TrafficAccounting(window=60, max_pairs=2)
+    for i in range(50):
+        accounting.record(f"client-{i}", "gpt", 1, 1, now=100)
+    pairs = accounting.pairs(now=100)
+    assert len(pairs) == 3
+    assert ("other", "other") in {(p.client, p.model) for p in pairs}
+    assert sum(p.requests for p in pairs) == 50
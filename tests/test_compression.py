@@ -0,0 +1,73 @@
+"""Tests for streaming response decompression."""
+
+import gzip
+import zlib
+
+import pytest
+
+from vibeproxy_manager.compression import DecodeError, StreamDecoder, accept_encoding_header
+
+
+def test_accept_encoding_always_offers_gzip():
+    """Test that gzip is always negotiable without optional packages."""
+    assert "gzip" in accept_encoding_header()
+
+
+def test_gzip_decodes_incrementally():
+    """Test that gzip chunks decode as they arrive and savings are tracked."""
+    payload = b'data: {"choices": [{"delta": {"content": "hi"}}]}\n\n' * 200
+    compressed = gzip.compress(payload)
+
+    decoder = StreamDecoder("gzip")
+    first = decoder.decode(compressed[: len(compressed) // 2])
+    rest = decoder.decode(compressed[len(compressed) // 2 :]) + decoder.flush()
+
+    assert first  # Data is available before the whole body arrives
+    assert first + rest == payload
+    assert decoder.wire_bytes == len(compressed)
+    assert decoder.saved_bytes == len(payload) - len(compressed)
+
+
+def test_identity_passthrough():
+    """Test that uncompressed bodies pass through untouched."""
+    decoder = StreamDecoder(None)
+    assert decoder.decode(b"abc") == b"abc"
+    assert not decoder.compressed
+    assert decoder.saved_bytes == 0
+
+
+def test_unknown_encoding_rejected():
+    """Test that unsupported encodings raise instead of corrupting output."""
+    with pytest.raises(ValueError):
+        StreamDecoder("compress")
+
+
+@pytest.mark.parametrize("wbits", [zlib.MAX_WBITS, -zlib.MAX_WBITS], ids=["zlib", "raw"])
+def test_deflate_accepts_wrapped_and_raw(wbits):
+    """Test both deflate forms servers send, fed a byte at a time at first."""
+    payload = b'{"data": [{"id": "model"}]}' * 50
+    compressor = zlib.compressobj(wbits=wbits)
+    compressed = compressor.compress(payload) + compressor.flush()
+
+    decoder = StreamDecoder("deflate")
+    decoded = decoder.decode(compressed[:1]) + decoder.decode(compressed[1:]) + decoder.flush()
+    assert decoded == payload
+
+
+def test_corrupt_body_raises_decode_error():
+    """Test that corrupt input surfaces as DecodeError, not a raw zlib.error."""
+    decoder = StreamDecoder("gzip")
+    with pytest.raises(DecodeError):
+        decoder.decode(b"\x1f\x8b\x08\x00garbage-that-is-not-deflate")
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_truncated_body_raises_decode_error(encoding):
+    """Test that a body cut short is reported at flush(), where zlib stays silent."""
+    payload = b'{"data": [{"id": "model"}]}' * 50
+    compressed = gzip.compress(payload) if encoding == "gzip" else zlib.compress(payload)
+
+    decoder = StreamDecoder(encoding)
+    decoder.decode(compressed[: len(compressed) // 2])
+    with pytest.raises(DecodeError, match="Truncated"):
+        decoder.flush()
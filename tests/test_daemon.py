@@ -0,0 +1,193 @@
+"""Tests for the headless tunnel daemon and its control API."""
+
+import asyncio
+import sys
+
+import pytest
+
+from vibeproxy_manager.daemon import DaemonClient, TunnelDaemon
+from vibeproxy_manager.supervisor import Backoff
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a POSIX script")
+
+
+def make_daemon(manager, **kwargs) -> TunnelDaemon:
+    """Daemon on a free control port that owns the test tunnel."""
+    daemon = TunnelDaemon(
+        manager.config_manager, port=0, tunnel=manager, probe_quality=False, **kwargs
+    )
+    daemon.supervisor.backoff = Backoff(initial=0.01, jitter=0.0)
+    return daemon
+
+
+@posix_only
+def test_client_starts_reports_and_stops_tunnel(fake_ssh, manager):
+    """Test start, authoritative status, metrics and stop over the control API."""
+
+    async def scenario():
+        daemon = make_daemon(manager)
+        await daemon.start()
+        client = DaemonClient(port=daemon.port)
+        try:
+            idle = await client.status()
+            started = await client.start_tunnel(timeout=10, spawn=False)
+            again = await client.start_tunnel(timeout=10, spawn=False)
+            up = await client.status()
+            text = await client.metrics()
+            stopped = await client.stop_tunnel()
+            down = await client.status()
+        finally:
+            await daemon.close()
+        return idle, started, again, up, text, stopped, down
+
+    idle, started, again, up, text, stopped, down = asyncio.run(scenario())
+    assert idle["supervising"] is False
+    assert started[0] is True, started
+    assert again == (True, f"Tunnel already running on port {manager.port}")
+    assert up["up"] is True and up["supervising"] is True
+    assert up["ssh_pid"] is not None
+    assert up["last_event"]["kind"] == "up"
+    assert "vibeproxy_" in text
+    assert stopped == (True, "Tunnel stopped")
+    assert down["up"] is False and down["supervising"] is False
+
+
+@posix_only
+def test_start_reports_supervisor_giving_up(fake_ssh, manager):
+    """Test that a refused connection ends /start with the supervisor's reason."""
+    manager._config.mac_ip = "fail"
+
+    async def scenario():
+        daemon = make_daemon(manager)
+        daemon.supervisor.max_attempts = 2
+        await daemon.start()
+        try:
+            return await DaemonClient(port=daemon.port).start_tunnel(timeout=10, spawn=False)
+        finally:
+            await daemon.close()
+
+    success, message = asyncio.run(scenario())
+    assert success is False
+    assert "after 2 attempts" in message
+
+
+def test_client_without_daemon_and_shutdown(manager):
+    """Test that clients see a missing daemon as None/False, and /shutdown exits."""
+
+    async def scenario():
+        daemon = make_daemon(manager)
+        await daemon.start()
+        client = DaemonClient(port=daemon.port)
+        serving = asyncio.ensure_future(daemon.serve_forever())
+        shutdown = await client.shutdown()
+        await asyncio.wait_for(serving, 5)
+        return shutdown, await client.status(), await client.stop_tunnel()
+
+    shutdown, status, stop = asyncio.run(scenario())
+    assert shutdown == (True, "Daemon shutting down")
+    assert status is None
+    assert stop[0] is False and "not running" in stop[1]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets are POSIX only")
+def test_unix_socket_transport(manager, tmp_path):
+    """Test the control API over a Unix socket."""
+    path = str(tmp_path / "daemon.sock")
+
+    async def scenario():
+        daemon = make_daemon(manager, socket_path=path)
+        await daemon.start()
+        try:
+            return await DaemonClient(socket_path=path).status()
+        finally:
+            await daemon.close()
+
+    status = asyncio.run(scenario())
+    assert status["port"] == manager.port
+    assert status["supervising"] is False
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix sockets are POSIX only")
+def test_second_daemon_keeps_live_socket(manager, tmp_path):
+    """Test that a live daemon's socket is kept and a stale one is replaced."""
+    path = tmp_path / "daemon.sock"
+
+    async def scenario():
+        first = make_daemon(manager, socket_path=str(path))
+        await first.start()
+        try:
+            with pytest.raises(OSError, match="Another tunnel daemon"):
+                await make_daemon(manager, socket_path=str(path)).start()
+            alive = await DaemonClient(socket_path=str(path)).status()
+        finally:
+            await first.close()
+        # A socket file nobody listens on is stale and gets replaced
+        path.write_bytes(b"")
+        second = make_daemon(manager, socket_path=str(path))
+        await second.start()
+        try:
+            return alive, await DaemonClient(socket_path=str(path)).status()
+        finally:
+            await second.close()
+
+    alive, replaced = asyncio.run(scenario())
+    assert alive["supervising"] is False
+    assert replaced["supervising"] is False
+
+
+def test_client_treats_non_json_reply_as_no_daemon(manager):
+    """Test that another service on the control port is not mistaken for the daemon."""
+
+    async def handler(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello")
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handler, "127.0.0.1", 0)
+        client = DaemonClient(port=server.sockets[0].getsockname()[1])
+        try:
+            return await client.status(), await client.stop_tunnel()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    status, stop = asyncio.run(scenario())
+    assert status is None
+    assert stop[0] is False and "not running" in stop[1]
+
+
+def test_cached_status_is_kept_fresh_by_the_watcher(manager):
+    """Test that readers get the daemon status without a round trip of their own."""
+
+    async def scenario():
+        daemon = make_daemon(manager)
+        await daemon.start()
+        client = DaemonClient(port=daemon.port)
+        before = client.cached_status()
+        client.start_watch(interval=0.05)
+        try:
+            for _ in range(100):
+                if client.cached_status() is not None:
+                    break
+                await asyncio.sleep(0.01)
+            sent = []
+            original = client.request
+
+            async def counting_request(*args, **kwargs):
+                sent.append(args)
+                return await original(*args, **kwargs)
+
+            client.request = counting_request
+            reads = [client.cached_status() for _ in range(50)]
+        finally:
+            await client.stop_watch()
+            await daemon.close()
+        return before, reads, sent, client
+
+    before, reads, sent, client = asyncio.run(scenario())
+    assert before is None
+    assert all(read is not None and read["supervising"] is False for read in reads)
+    assert len(sent) <= 1  # At most the watcher's own refresh, however many reads
+    assert client.cached_status(max_age=0) is None
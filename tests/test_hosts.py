@@ -0,0 +1,82 @@
+"""Tests for the known-host index and neighbor-seeded discovery."""
+
+import asyncio
+import sys
+
+import pytest
+
+from vibeproxy_manager import hosts, scanner
+
+from .conftest import serve_models
+
+PROC_ARP = """\
+IP address       HW type     Flags       HW address            Mask     Device
+192.168.1.1      0x1         0x2         a4:91:b1:00:00:01     *        wlan0
+192.168.1.23     0x1         0x2         3C:22:FB:AA:BB:CC     *        wlan0
+192.168.1.99     0x1         0x0         00:00:00:00:00:00     *        wlan0
+"""
+
+ARP_A = """\
+? (192.168.1.1) at a4:91:b1:0:0:1 on en0 ifscope [ethernet]
+  Interface: 192.168.1.50 --- 0x4
+  192.168.1.23          3c-22-fb-aa-bb-cc     dynamic
+"""
+
+
+def test_neighbor_table_parsing():
+    """Test /proc/net/arp and `arp -a` formats normalize to the same map."""
+    expected = {"192.168.1.1": "a4:91:b1:00:00:01", "192.168.1.23": "3c:22:fb:aa:bb:cc"}
+    assert hosts._parse_proc_arp(PROC_ARP) == expected
+    assert hosts._parse_arp_output(ARP_A) == expected
+
+
+def test_index_persists_and_orders_candidates(tmp_path):
+    """Test that a moved Mac (same MAC, new IP) is the first candidate."""
+    path = tmp_path / "known-hosts.json"
+    index = hosts.HostIndex(path)
+    index.record("192.168.1.10", mac_address="3C-22-FB-AA-BB-CC", hostname="studio.local")
+    index.record("10.0.0.5")
+
+    reloaded = hosts.HostIndex(path)
+    assert [h.ip for h in reloaded.ranked()] == ["10.0.0.5", "192.168.1.10"]
+
+    neighbors = {"192.168.1.1": "a4:91:b1:00:00:01", "192.168.1.23": "3c:22:fb:aa:bb:cc"}
+    assert reloaded.candidates(neighbors) == [
+        "192.168.1.23",
+        "10.0.0.5",
+        "192.168.1.10",
+        "192.168.1.1",
+    ]
+    assert reloaded.is_known("192.168.1.23", "3c:22:fb:aa:bb:cc")
+    assert not reloaded.is_known("192.168.1.1", "a4:91:b1:00:00:01")
+
+    # Seeing the Mac at its new address replaces the old entry
+    reloaded.record("192.168.1.23", mac_address="3c:22:fb:aa:bb:cc")
+    assert set(reloaded.hosts) == {"10.0.0.5", "192.168.1.23"}
+    assert reloaded.hosts["192.168.1.23"].hostname == "studio.local"
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="needs the whole 127/8 on loopback")
+def test_discovery_probes_seeded_candidates_without_sweeping(manager, monkeypatch):
+    """Test that a Mac found via the ARP table resolves with no subnet sweep."""
+    manager._config.mdns_discovery = False
+    manager.known_hosts.record("192.0.2.10", mac_address="3c:22:fb:aa:bb:cc")
+    monkeypatch.setattr(
+        hosts, "read_neighbors", lambda: {"127.0.0.7": "3c:22:fb:aa:bb:cc"}
+    )
+
+    def no_sweep():
+        raise AssertionError("full sweep should not be needed")
+
+    monkeypatch.setattr(manager, "_scan_networks", no_sweep)
+
+    async def scenario():
+        server = await asyncio.start_server(serve_models, "127.0.0.7", scanner.VIBEPROXY_PORT)
+        try:
+            return await manager.adiscover_mac()
+        finally:
+            server.close()
+
+    ip, label = asyncio.run(scenario())
+    assert ip == "127.0.0.7"
+    assert label == "VibeProxy Host (8317), 2 models"
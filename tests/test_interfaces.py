@@ -0,0 +1,119 @@
+"""Tests for local interface enumeration."""
+
+import socket
+import struct
+import sys
+
+import pytest
+
+from vibeproxy_manager import interfaces
+from vibeproxy_manager.interfaces import (
+    LocalInterface,
+    parse_address_dump,
+    parse_default_route,
+    parse_ifconfig,
+    parse_route_get,
+    parse_windows_addresses,
+)
+
+PROC_NET_ROUTE = """\
+Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT
+wlan0\t00000000\t0101A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0
+eth0\t00000000\t0100000A\t0003\t0\t0\t100\t00000000\t0\t0\t0
+eth0\t0000000A\t00000000\t0001\t0\t0\t100\t0000FFFF\t0\t0\t0
+"""
+
+IFCONFIG_BSD = """\
+lo0: flags=8049<UP,LOOPBACK,RUNNING,MULTICAST> mtu 16384
+\tinet 127.0.0.1 netmask 0xff000000
+en0: flags=8863<UP,BROADCAST,SMART,RUNNING,SIMPLEX,MULTICAST> mtu 1500
+\tinet6 fe80::1c2b:3a4d:5e6f:7081%en0 prefixlen 64 secured scopeid 0x6
+\tinet 192.168.1.23 netmask 0xffffff00 broadcast 192.168.1.255
+"""
+
+IFCONFIG_NET_TOOLS = """\
+eth0      Link encap:Ethernet  HWaddr 00:16:3e:00:00:01
+          inet addr:10.20.30.40  Bcast:10.20.31.255  Mask:255.255.254.0
+"""
+
+
+def rtattr(attr_type: int, value: bytes) -> bytes:
+    """One padded route attribute."""
+    length = 4 + len(value)
+    return struct.pack("=HH", length, attr_type) + value + b"\0" * (-length % 4)
+
+
+def netlink_message(msg_type: int, payload: bytes) -> bytes:
+    """One netlink message."""
+    return struct.pack("=IHHII", 16 + len(payload), msg_type, 2, 1, 0) + payload
+
+
+def test_parse_address_dump():
+    """Test that addresses, prefixes and labels come out of an RTM_GETADDR reply."""
+    lan = (
+        struct.pack("=BBBBI", socket.AF_INET, 22, 0, 0, 2)
+        + rtattr(1, socket.inet_aton("10.1.2.3"))
+        + rtattr(3, b"eth0\0")
+    )
+    # Point-to-point: IFA_ADDRESS is the peer, IFA_LOCAL the local end
+    vpn = (
+        struct.pack("=BBBBI", socket.AF_INET, 32, 0, 0, 5)
+        + rtattr(1, socket.inet_aton("10.8.0.1"))
+        + rtattr(2, socket.inet_aton("10.8.0.2"))
+    )
+    data = netlink_message(20, lan) + netlink_message(20, vpn)
+    assert parse_address_dump(data) == (
+        [(2, "eth0", "10.1.2.3", 22), (5, "", "10.8.0.2", 32)],
+        False,
+    )
+    assert parse_address_dump(netlink_message(3, b"\0" * 4)) == ([], True)
+
+
+def test_parse_default_route_picks_lowest_metric():
+    """Test default route selection from /proc/net/route."""
+    assert parse_default_route(PROC_NET_ROUTE) == "eth0"
+    assert parse_default_route(PROC_NET_ROUTE.splitlines()[0]) is None
+
+
+def test_parse_ifconfig_and_route_get():
+    """Test both ifconfig dialects and the macOS default route lookup."""
+    assert parse_ifconfig(IFCONFIG_BSD) == [("lo0", "127.0.0.1", 8), ("en0", "192.168.1.23", 24)]
+    assert parse_ifconfig(IFCONFIG_NET_TOOLS) == [("eth0", "10.20.30.40", 23)]
+    assert parse_route_get("   route to: default\n  interface: en0\n") == "en0"
+    assert parse_route_get("route: writing to routing socket: not in table") is None
+
+
+def test_parse_windows_addresses():
+    """Test the PowerShell listing, including the default-route marker."""
+    text = "192.168.0.17|24|Wi-Fi\r\n127.0.0.1|8|Loopback Pseudo-Interface 1\r\ndefault|Wi-Fi\r\n"
+    assert parse_windows_addresses(text) == [
+        LocalInterface(name="Wi-Fi", address="192.168.0.17", prefix=24, default=True),
+        LocalInterface(name="Loopback Pseudo-Interface 1", address="127.0.0.1", prefix=8),
+    ]
+
+
+def test_relevant_interfaces():
+    """Test that loopback, link-local, host routes and container bridges are skipped."""
+    assert LocalInterface(name="en0", address="192.168.1.2", prefix=24).relevant
+    assert LocalInterface(name="utun3", address="100.64.0.7", prefix=10).relevant
+    assert not LocalInterface(name="lo", address="127.0.0.1", prefix=8).relevant
+    assert not LocalInterface(name="en5", address="169.254.3.4", prefix=16).relevant
+    assert not LocalInterface(name="tailscale0", address="100.64.0.7", prefix=32).relevant
+    assert not LocalInterface(name="docker0", address="172.17.0.1", prefix=16).relevant
+
+
+def test_falls_back_to_host_name_with_guessed_prefix(monkeypatch):
+    """Test the last resort when the OS listing is unavailable."""
+    monkeypatch.setattr(interfaces, "_netlink_interfaces", lambda: None)
+    monkeypatch.setattr(interfaces, "_ifconfig_interfaces", lambda: None)
+    monkeypatch.setattr(interfaces, "_windows_interfaces", lambda: None)
+    monkeypatch.setattr(interfaces, "_hostname_addresses", lambda: ["10.0.0.5"])
+    guessed = LocalInterface(name="", address="10.0.0.5", prefix=24)
+    assert interfaces.local_interfaces() == [guessed]
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="needs rtnetlink")
+def test_netlink_lists_loopback():
+    """Test a real RTM_GETADDR dump (loopback is always there)."""
+    found = interfaces.local_interfaces()
+    assert LocalInterface(name="lo", address="127.0.0.1", prefix=8) in found
@@ -0,0 +1,121 @@
+"""Tests for the traffic journal and replay."""
+
+import asyncio
+import gzip
+import json
+import threading
+
+from vibeproxy_manager.journal import (
+    JOURNAL_DROPPED,
+    REDACTED,
+    TrafficJournal,
+    read_journal,
+    redact_body,
+)
+from vibeproxy_manager.replay import StandInServer, replay, summarize
+
+
+def _record(journal, ts, model="gpt-5"):
+    journal.record(
+        method="POST",
+        path="/v1/chat/completions",
+        model=model,
+        client="pytest",
+        request_headers={"Authorization": "Bearer secret", "Content-Type": "application/json"},
+        request_body=json.dumps({"model": model, "api_key": "sk-abc", "max_tokens": 5}).encode(),
+        status=200,
+        response_headers={"content-type": "application/json"},
+        response_body=b'{"choices": []}',
+        started_at=ts,
+        ttfb=0.01,
+        duration=0.02,
+    )
+
+
+def test_redact_body_keeps_non_secret_fields():
+    """Test that secrets are redacted but token counts are kept."""
+    body = json.loads(redact_body(b'{"api_key": "x", "max_tokens": 5, "password": "p"}'))
+    assert body == {"api_key": REDACTED, "max_tokens": 5, "password": REDACTED}
+
+
+def test_journal_rotates_and_reads_back(tmp_path):
+    """Test that the journal rotates files and reads entries in order."""
+    journal = TrafficJournal(tmp_path, max_bytes=200, max_files=3)
+    for i in range(5):
+        _record(journal, 1000.0 + i)
+    journal.close()
+
+    assert len(list(tmp_path.glob("traffic-*.jsonl.gz"))) == 3
+    entries = list(read_journal(tmp_path))
+    assert [e["ts"] for e in entries] == sorted(e["ts"] for e in entries)
+    assert entries[0]["request_headers"]["Authorization"] == REDACTED
+    assert json.loads(entries[0]["request_body"])["api_key"] == REDACTED
+
+
+def test_journal_survives_bad_entries_and_bounds_its_queue(tmp_path):
+    """Test that a failed write is skipped and a full queue drops instead of growing."""
+    errors_before = JOURNAL_DROPPED.get("error")
+    full_before = JOURNAL_DROPPED.get("queue_full")
+    release = threading.Event()
+    journal = TrafficJournal(tmp_path, max_queue=1, flush_interval=0.05)
+    build_entry = journal._build_entry
+
+    def slow_build(raw):
+        release.wait(5)
+        if raw["model"] == "bad":
+            raw["ttfb"] = object()  # Not JSON serialisable
+        return build_entry(raw)
+
+    journal._build_entry = slow_build
+    _record(journal, 1000.0, model="bad")
+    for i in range(1, 4):
+        _record(journal, 1000.0 + i)
+    release.set()
+    journal.close()
+
+    dropped = JOURNAL_DROPPED.get("queue_full") - full_before
+    assert dropped >= 2
+    assert JOURNAL_DROPPED.get("error") - errors_before == 1
+    entries = list(read_journal(tmp_path))
+    # The writer kept going after the bad entry
+    assert len(entries) == 3 - dropped
+    assert all(e["model"] == "gpt-5" for e in entries)
+
+
+def test_journal_flushes_on_a_timer_not_per_line(tmp_path, monkeypatch):
+    """Test that the gzip stream is not sync-flushed after every entry."""
+    flushes = []
+    real_flush = gzip.GzipFile.flush
+    monkeypatch.setattr(
+        gzip.GzipFile, "flush", lambda self, *a: flushes.append(1) or real_flush(self, *a)
+    )
+    journal = TrafficJournal(tmp_path, flush_interval=0.2)
+    for i in range(20):
+        _record(journal, 1000.0 + i)
+    journal.close()
+    assert len(flushes) <= 2
+    assert len(list(read_journal(tmp_path))) == 20
+
+
+def test_replay_against_stand_in(tmp_path):
+    """Test that journaled traffic replays against a stand-in upstream."""
+    journal = TrafficJournal(tmp_path)
+    _record(journal, 1000.0)
+    _record(journal, 1000.1, model="claude-haiku-4-5")
+    journal.close()
+    entries = list(read_journal(tmp_path))
+
+    async def scenario():
+        stand_in = StandInServer(entries)
+        await stand_in.start()
+        try:
+            return await replay(entries, stand_in.url, speed=10.0)
+        finally:
+            await stand_in.close()
+
+    results = asyncio.run(scenario())
+    assert [r.status for r in results] == [200, 200]
+    assert all(r.ttfb is not None and r.duration >= 0.02 for r in results)
+    summary = summarize(results)
+    assert summary["gpt-5"]["requests"] == 1
+    assert summary["claude-haiku-4-5"]["errors"] == 0
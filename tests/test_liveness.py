@@ -0,0 +1,71 @@
+"""Tests for the cached tunnel liveness snapshot."""
+
+import asyncio
+import sys
+
+import pytest
+
+
+def test_get_probes_only_when_unknown_or_stale(manager, monkeypatch):
+    """Test that readers get the cached snapshot without new probes."""
+    probes = []
+
+    async def fake_port_open(timeout=1.0):
+        probes.append(timeout)
+        return True
+
+    monkeypatch.setattr(manager, "_aport_open", fake_port_open)
+
+    async def scenario():
+        first = await manager.liveness.get()
+        for _ in range(100):
+            await manager.liveness.get()
+        manager.liveness.update(False, "stop")
+        cached = await manager.liveness.get(max_age=60)
+        return first, cached
+
+    first, cached = asyncio.run(scenario())
+    assert first.up and first.source == "probe"
+    assert len(probes) == 1
+    assert not cached.up and cached.source == "stop"
+    assert manager.liveness.status() == (False, f"Not connected (port {manager.port})")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a POSIX script")
+def test_watcher_reports_process_exit(fake_ssh, manager):
+    """Test that the snapshot flips as soon as the ssh child dies."""
+    changes = []
+    manager.liveness.interval = 30
+    manager.liveness.add_listener(lambda snapshot: changes.append((snapshot.up, snapshot.source)))
+
+    async def scenario():
+        success, message = await manager.astart(ready_timeout=5)
+        assert success, message
+        manager.liveness.start()
+        await asyncio.sleep(0.1)
+        manager._async_process.kill()
+        for _ in range(50):
+            if not manager.liveness.is_up:
+                break
+            await asyncio.sleep(0.02)
+        await manager.liveness.stop()
+        await manager.astop()
+
+    asyncio.run(scenario())
+    assert changes[-2:] == [(True, "start"), (False, "exit")]
+
+
+def test_process_alive_tracks_the_tunnel_child(manager):
+    """Test the public pid/process_alive accessors the watcher and daemon use."""
+    import subprocess
+
+    assert manager.pid is None and manager.process_alive() is None
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import sys; sys.stdin.read()"], stdin=subprocess.PIPE
+    )
+    manager._tunnel_process = process
+    manager._tunnel_pid = process.pid
+    assert manager.pid == process.pid
+    assert manager.process_alive() is True
+    process.communicate(b"")
+    assert manager.process_alive() is False
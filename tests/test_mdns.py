@@ -0,0 +1,92 @@
+"""Tests for mDNS/DNS-SD discovery against a loopback responder."""
+
+import asyncio
+import functools
+import socket
+import struct
+import time
+
+from vibeproxy_manager import hosts, mdns
+
+
+def _udp_port() -> int:
+    """Return a currently unused local UDP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _advertiser() -> mdns.Advertiser:
+    return mdns.Advertiser(
+        "Studio Mac", 8317, ["127.0.0.8"], host="studio.local", properties={"user": "danielba"}
+    )
+
+
+def test_compressed_names_are_followed():
+    """Test that name pointers (as mDNSResponder sends them) decode."""
+    owner = mdns._encode_name("_ssh._tcp.local.")
+    ptr_rdata = b"\x03Mac\xc0\x0c"  # "Mac" + pointer to the owner name at offset 12
+    srv_rdata = struct.pack("!HHH", 0, 0, 22) + b"\x03mac\x05local\x00"
+    packet = struct.pack("!HHHHHH", 0, 0x8400, 0, 1, 0, 1)
+    packet += owner + struct.pack("!HHIH", mdns.TYPE_PTR, 1, 4500, len(ptr_rdata)) + ptr_rdata
+    # SRV owner is "Mac" + the pointer, i.e. the PTR target
+    packet += b"\x03Mac\xc0\x0c"
+    packet += struct.pack("!HHIH", mdns.TYPE_SRV, 0x8001, 120, len(srv_rdata)) + srv_rdata
+
+    _, _, _, records, _ = mdns.parse_message(packet)
+    assert [(r.type, r.name) for r in records] == [
+        (mdns.TYPE_PTR, "_ssh._tcp.local."),
+        (mdns.TYPE_SRV, "Mac._ssh._tcp.local."),
+    ]
+    assert records[0].target == "Mac._ssh._tcp.local."
+    assert (records[1].target, records[1].port) == ("mac.local.", 22)
+
+    services = mdns.assemble(records, [mdns.SSH_SERVICE], {"Mac._ssh._tcp.local.": "10.0.0.4"})
+    assert [(s.name, s.port, s.addresses) for s in services] == [("Mac", 22, ["10.0.0.4"])]
+
+
+def test_browse_resolves_loopback_responder_in_one_round_trip():
+    """Test PTR/SRV/TXT/A resolution against an advertiser on loopback."""
+    port = _udp_port()
+
+    async def scenario():
+        transport = await mdns.advertise(_advertiser(), bind=("127.0.0.1", port))
+        try:
+            started = time.perf_counter()
+            services = await mdns.browse(timeout=2.0, destination=("127.0.0.1", port))
+            return services, time.perf_counter() - started
+        finally:
+            transport.close()
+
+    services, elapsed = asyncio.run(scenario())
+    assert len(services) == 1
+    service = services[0]
+    assert service.name == "Studio Mac"
+    assert service.type == mdns.VIBEPROXY_SERVICE
+    assert (service.host, service.port) == ("studio.local.", 8317)
+    assert service.addresses == ["127.0.0.8"]
+    assert service.properties == {"user": "danielba"}
+    # Returned on the first answer rather than waiting out the timeout
+    assert elapsed < 0.5
+
+
+def test_discovery_prefers_mdns_over_scanning(manager, monkeypatch):
+    """Test that an advertised VibeProxy host is used without any probing."""
+    port = _udp_port()
+    loopback_browse = functools.partial(mdns.browse, destination=("127.0.0.1", port))
+    monkeypatch.setattr(mdns, "browse", loopback_browse)
+    monkeypatch.setattr(hosts, "read_neighbors", lambda: {})
+
+    def no_sweep():
+        raise AssertionError("full sweep should not be needed")
+
+    monkeypatch.setattr(manager, "_scan_networks", no_sweep)
+
+    async def scenario():
+        transport = await mdns.advertise(_advertiser(), bind=("127.0.0.1", port))
+        try:
+            return await manager.adiscover_mac()
+        finally:
+            transport.close()
+
+    assert asyncio.run(scenario()) == ("127.0.0.8", "VibeProxy via mDNS (Studio Mac)")
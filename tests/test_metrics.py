@@ -0,0 +1,74 @@
+"""Tests for the Prometheus metrics registry."""
+
+from vibeproxy_manager.metrics import MetricsRegistry, percentile
+
+
+def test_counter_renders_labels():
+    """Test that counters render one sample per label set."""
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Demo.", ("model",))
+    requests.inc("gpt-5")
+    requests.inc("gpt-5", amount=2)
+
+    text = registry.render()
+    assert "# TYPE demo_requests_total counter" in text
+    assert 'demo_requests_total{model="gpt-5"} 3' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that histogram buckets accumulate and include +Inf."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo.", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+
+    text = registry.render()
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_count 3" in text
+    assert latency.count() == 3
+
+
+def test_gauge_function_is_evaluated_on_render():
+    """Test that callback gauges are computed at scrape time."""
+    registry = MetricsRegistry()
+    ratio = registry.gauge("demo_ratio", "Demo.")
+    ratio.set_function(lambda: 0.25)
+    assert "demo_ratio 0.25" in registry.render()
+
+
+def test_render_merges_another_process():
+    """Test that counters add up, gauges follow their merge mode and new families pass through."""
+    local, remote = MetricsRegistry(), MetricsRegistry()
+    for registry in (local, remote):
+        registry.counter("demo_retries_total", "Demo.", ("operation",))
+        registry.gauge("demo_up", "Demo.", merge="remote")
+        registry.gauge("demo_depth", "Demo.")
+    local.get("demo_retries_total").inc("upstream")
+    local.get("demo_retries_total").inc("tunnel")
+    remote.get("demo_retries_total").inc("tunnel", amount=2)
+    local.get("demo_up").set(0)
+    remote.get("demo_up").set(1)
+    local.get("demo_depth").set(2)
+    remote.get("demo_depth").set(3)
+    remote.histogram("demo_seconds", "Demo.", buckets=(1.0,)).observe(0.5)
+
+    text = local.render(remote.render())
+    assert 'demo_retries_total{operation="upstream"} 1' in text
+    assert 'demo_retries_total{operation="tunnel"} 3' in text
+    assert "demo_up 1" in text and "demo_up 0" not in text
+    assert "demo_depth 5" in text
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{le="+Inf"} 1' in text
+    assert text.count("# TYPE demo_retries_total") == 1
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 21)]
+    assert percentile(values, 0.5) == 10.0
+    assert percentile(values, 0.95) == 19.0
+    assert percentile(values, 1.0) == 20.0
+    assert percentile([3.0], 0.95) == 3.0
+    assert percentile([], 0.5) == 0.0
@@ -0,0 +1,116 @@
+"""Tests for network change notification."""
+
+import asyncio
+import errno
+import socket
+import struct
+import time
+
+from vibeproxy_manager import netwatch
+from vibeproxy_manager.netwatch import NetworkWatcher, parse_netlink
+
+
+def netlink_message(msg_type: int, payload: bytes = b"") -> bytes:
+    """One padded netlink message."""
+    length = 16 + len(payload)
+    message = struct.pack("=IHHII", length, msg_type, 0, 0, 0) + payload
+    return message + b"\0" * (-length % 4)
+
+
+def rtmsg(table: int) -> bytes:
+    """struct rtmsg for an IPv4 route in ``table`` (plus an odd-sized tail)."""
+    return bytes([2, 24, 0, 0, table, 3, 0, 1]) + b"\0\0\0\0\0"
+
+
+def test_parse_netlink():
+    """Test address/route events are named and local-table echoes are skipped."""
+    data = (
+        netlink_message(16, b"\0" * 16)  # RTM_NEWLINK: not an event we report
+        + netlink_message(netwatch.RTM_NEWADDR, b"\0" * 8)
+        + netlink_message(netwatch.RTM_NEWROUTE, rtmsg(255))
+        + netlink_message(netwatch.RTM_DELROUTE, rtmsg(254))
+    )
+    assert parse_netlink(data) == {"address added", "route removed"}
+    assert parse_netlink(netlink_message(netwatch.RTM_NEWROUTE, rtmsg(255))) == set()
+    assert parse_netlink(b"\x03\0") == set()
+
+
+def test_poll_fallback_reports_changed_networks(monkeypatch):
+    """Test that polling notices a changed network and notifies the callback."""
+    networks = [("192.168.1.0/24",)]
+    monkeypatch.setattr(netwatch, "network_signature", lambda: networks[-1])
+    seen = []
+
+    async def scenario():
+        watcher = NetworkWatcher(interval=0.02, use_netlink=False, on_change=seen.append)
+        watcher.start()
+        await asyncio.sleep(0.1)
+        assert watcher.mode == "poll"
+        waiter = asyncio.ensure_future(watcher.wait_for_change())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        networks.append(("10.0.0.0/16",))
+        change = await asyncio.wait_for(waiter, 5)
+        await watcher.stop()
+        return change, watcher
+
+    change, watcher = asyncio.run(scenario())
+    assert change.source == "poll"
+    assert change.reason == "networks changed (192.168.1.0/24 -> 10.0.0.0/16)"
+    assert seen == [change]
+    assert watcher.last_change == change
+    assert watcher.mode == "stopped"
+
+
+def test_wake_from_sleep_is_a_change(monkeypatch):
+    """Test that the wall clock outrunning the monotonic clock counts as resume."""
+    real_time = time.time
+    readings = []
+
+    def jumping_time():
+        # Every reading after the watcher's first is five minutes later than it really is
+        readings.append(None)
+        return real_time() + (300 if len(readings) > 1 else 0)
+
+    monkeypatch.setattr(netwatch.time, "time", jumping_time)
+
+    async def scenario():
+        watcher = NetworkWatcher(interval=0.02, use_netlink=False)
+        waiter = asyncio.ensure_future(watcher.wait_for_change())
+        watcher.start()
+        change = await asyncio.wait_for(waiter, 5)
+        await watcher.stop()
+        return change
+
+    change = asyncio.run(scenario())
+    assert change.source == "clock"
+    assert change.reason.startswith("resumed after 30")
+
+
+def test_netlink_overrun_is_a_change_and_errors_fall_back_to_polling(monkeypatch):
+    """Test that ENOBUFS is reported as a change and a failing socket switches to polling."""
+    monkeypatch.setattr(netwatch, "network_signature", lambda: ("192.168.1.0/24",))
+    failures = [OSError(errno.ENOBUFS, "No buffer space"), OSError(errno.EBADF, "Bad fd")]
+
+    async def failing_recv(sock, size):
+        raise failures.pop(0)
+
+    async def scenario():
+        monkeypatch.setattr(asyncio.get_running_loop(), "sock_recv", failing_recv)
+        left, right = socket.socketpair()
+        watcher = NetworkWatcher(interval=0.02, debounce=0.05)
+        monkeypatch.setattr(watcher, "_open_netlink", lambda: left)
+        waiter = asyncio.ensure_future(watcher.wait_for_change())
+        watcher.start()
+        change = await asyncio.wait_for(waiter, 5)
+        await asyncio.sleep(0.05)
+        mode = watcher.mode
+        await watcher.stop()
+        right.close()
+        return change, mode, left.fileno()
+
+    change, mode, fileno = asyncio.run(scenario())
+    assert change.source == "netlink"
+    assert change.reason == "events lost (netlink overrun)"
+    assert mode == "poll"
+    assert fileno == -1  # The failed socket was closed
@@ -0,0 +1,54 @@
+"""Tests for the parallel tunnel pool."""
+
+import asyncio
+import sys
+
+import pytest
+
+from vibeproxy_manager.config import ConfigManager
+from vibeproxy_manager.pool import TunnelPool
+
+from .conftest import free_port
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a POSIX script")
+
+
+async def _get(port: int) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /v1/models HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response.split(b"\r\n\r\n", 1)[1]
+
+
+def test_pool_spreads_load_and_fails_over(fake_ssh, tmp_path):
+    """Test least-connections spreading and failover when a member dies."""
+
+    async def scenario():
+        pool = TunnelPool(
+            ConfigManager(base_path=tmp_path),
+            size=2,
+            listen_port=free_port(),
+            base_port=free_port(),
+            health_interval=60,
+        )
+        success, message = await pool.start(ready_timeout=5)
+        assert success, message
+        try:
+            spread = [await _get(pool.port) for _ in range(4)]
+
+            # Kill one member without the pool noticing via health checks
+            victim = pool.members[0]
+            victim.supervisor.stop()
+            await victim.tunnel.astop()
+            after = [await _get(pool.port) for _ in range(3)]
+            return pool.members, spread, after
+        finally:
+            await pool.close()
+
+    members, spread, after = asyncio.run(scenario())
+    ports = [str(m.tunnel.port).encode() for m in members]
+    assert sorted(spread) == sorted(ports * 2)
+    assert after == [ports[1]] * 3
+    assert members[0].failures >= 1 and not members[0].healthy
@@ -0,0 +1,93 @@
+"""Tests for procfs port-owner lookup."""
+
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from vibeproxy_manager import ports
+from vibeproxy_manager.ports import PortOwner, parse_listening_inodes
+
+linux_only = pytest.mark.skipif(sys.platform != "linux", reason="needs /proc/net/tcp")
+
+PROC_NET_TCP = """\
+  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode
+   0: 0100007F:207D 00000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 4242 1 0 100 0 0 10 0
+   1: 0100007F:207D 0100007F:C350 01 00000000:00000000 00:00000000 00000000  1000        0 4343 1 0 20 4 30 10 -1
+   2: 00000000:0016 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 17 1 0 100 0 0 10 0
+"""
+
+
+def test_parse_listening_inodes():
+    """Test that only LISTEN rows on the port are returned."""
+    assert parse_listening_inodes(PROC_NET_TCP, 8317) == {4242}
+    assert parse_listening_inodes(PROC_NET_TCP, 22) == {17}
+    assert parse_listening_inodes(PROC_NET_TCP, 8318) == set()
+
+
+def test_owner_is_ssh():
+    """Test SSH client detection by process name."""
+    assert PortOwner(pid=1, name="ssh").is_ssh
+    assert PortOwner(pid=1, name="plink.exe").is_ssh
+    assert not PortOwner(pid=1, name="python3").is_ssh
+
+
+@linux_only
+def test_finds_listener_and_terminates_it(tmp_path):
+    """Test that a listening child process is found and killed by PID."""
+    listener = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import socket, time; s = socket.socket(); s.bind(('127.0.0.1', 0)); s.listen();"
+            "print(s.getsockname()[1], flush=True); time.sleep(30)",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        port = int(listener.stdout.readline())
+        started = time.perf_counter()
+        owners = ports.port_owners(port)
+        elapsed = time.perf_counter() - started
+        assert [owner.pid for owner in owners] == [listener.pid]
+        assert owners[0].name.startswith("python")
+        assert "socket" in owners[0].cmdline
+        assert elapsed < 1.0
+
+        assert ports.terminate(owners) == owners
+        assert listener.wait(5) is not None
+        assert ports.port_owners(port) == []
+    finally:
+        listener.kill()
+
+
+@linux_only
+def test_never_terminates_own_process():
+    """Test that our own listener is reported but never signalled."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        s.listen()
+        owners = ports.port_owners(s.getsockname()[1])
+    assert len(owners) == 1
+    assert ports.terminate(owners) == []
+
+
+@linux_only
+def test_stop_kills_only_the_ssh_owner(fake_ssh, manager):
+    """Test that stop() without a tracked PID kills the ssh holding the port."""
+    ssh = subprocess.Popen(
+        [str(fake_ssh), "-N", "-L", f"{manager.port}:localhost:8317", "user@host"]
+    )
+    try:
+        for _ in range(50):
+            if manager.is_running():
+                break
+            time.sleep(0.1)
+        success, message = manager.stop()
+        assert (success, message) == (True, "Tunnel stopped")
+        assert ssh.wait(5) is not None
+    finally:
+        ssh.kill()
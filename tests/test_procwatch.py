@@ -0,0 +1,127 @@
+"""Tests for instant tunnel process exit detection."""
+
+import asyncio
+import subprocess
+import sys
+import time
+
+import pytest
+
+from vibeproxy_manager import procwatch
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a POSIX script")
+linux_only = pytest.mark.skipif(sys.platform != "linux", reason="needs pidfd and procfs")
+
+SLEEPER = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+@linux_only
+def test_wait_for_exit_wakes_immediately():
+    """Test that a pidfd wait returns right after the process dies, with its status."""
+    child = subprocess.Popen(SLEEPER)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(procwatch.wait_for_exit(child.pid, child))
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        child.terminate()
+        killed = time.monotonic()
+        result = await asyncio.wait_for(waiter, 5)
+        return result, time.monotonic() - killed
+
+    try:
+        (returncode, detected_by), latency = asyncio.run(scenario())
+    finally:
+        child.kill()
+    assert (returncode, detected_by) == (-15, "pidfd")
+    assert latency < 0.5
+
+
+@linux_only
+def test_wait_for_exit_of_foreign_pid():
+    """Test a PID we hold no process object for (status unknown, still instant)."""
+    child = subprocess.Popen(SLEEPER)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(procwatch.wait_for_exit(child.pid))
+        await asyncio.sleep(0.1)
+        child.kill()
+        return await asyncio.wait_for(waiter, 5)
+
+    try:
+        assert asyncio.run(scenario()) == (None, "pidfd")
+    finally:
+        child.kill()
+        child.wait()
+
+
+@posix_only
+def test_exit_listener_gets_status_and_stderr(fake_ssh, manager):
+    """Test that a crashing ssh child is pushed to listeners with its stderr tail."""
+    manager._config.mac_ip = "drop"
+    exits = []
+    manager.add_exit_listener(exits.append)
+
+    async def scenario():
+        assert (await manager.astart())[0]
+        manager.watch_exit()
+        for _ in range(100):
+            if exits:
+                break
+            await asyncio.sleep(0.05)
+        await manager.stop_exit_watch()
+
+    asyncio.run(scenario())
+    assert len(exits) == 1
+    assert exits[0].returncode == 255
+    assert exits[0].detected_by == "child"
+    assert "Broken pipe" in exits[0].stderr_tail
+    assert manager.last_exit == exits[0]
+    assert not manager.liveness.is_up
+
+
+@posix_only
+def test_deliberate_stop_is_not_an_exit_event(fake_ssh, manager):
+    """Test that astop() does not notify exit listeners."""
+    exits = []
+    manager.add_exit_listener(exits.append)
+
+    async def scenario():
+        assert (await manager.astart())[0]
+        manager.watch_exit()
+        await asyncio.sleep(0.05)
+        await manager.astop()
+        await asyncio.sleep(0.05)
+        await manager.stop_exit_watch()
+
+    asyncio.run(scenario())
+    assert exits == []
+    assert manager.last_exit is None
+
+
+@linux_only
+def test_adopts_external_ssh_and_sees_it_exit(fake_ssh, manager):
+    """Test that an ssh started elsewhere is adopted from the port and watched."""
+    ssh = subprocess.Popen(
+        [str(fake_ssh), "-N", "-L", f"{manager.port}:localhost:8317", "user@host"]
+    )
+
+    async def scenario():
+        for _ in range(50):
+            if await manager.ais_running():
+                break
+            await asyncio.sleep(0.1)
+        waiter = asyncio.ensure_future(manager.await_process_exit())
+        await asyncio.sleep(0.2)
+        assert manager._tunnel_pid == ssh.pid
+        ssh.kill()
+        return await asyncio.wait_for(waiter, 5)
+
+    try:
+        process_exit = asyncio.run(scenario())
+    finally:
+        ssh.kill()
+        ssh.wait()
+    assert process_exit.pid == ssh.pid
+    assert process_exit.detected_by == "pidfd"
+    assert manager._tunnel_pid is None
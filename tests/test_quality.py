@@ -0,0 +1,58 @@
+"""Tests for tunnel quality probing."""
+
+import asyncio
+
+from vibeproxy_manager.quality import QualityThresholds, TunnelProber
+
+
+async def _serve(delay: float, port: int = 0, body: bytes = b"{}"):
+    """Minimal HTTP server answering every request after ``delay`` seconds."""
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        await asyncio.sleep(delay)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", port)
+
+
+def test_prober_states_follow_thresholds():
+    """Test healthy -> degraded -> down as RTT grows and probes get lost."""
+    thresholds = QualityThresholds(degraded_rtt=0.1, probe_timeout=0.3, recent=2)
+
+    async def scenario():
+        fast = await _serve(0.0, body=b"x" * 50000)
+        port = fast.sockets[0].getsockname()[1]
+        changes = []
+        prober = TunnelProber(
+            port, thresholds=thresholds, on_change=lambda state, _: changes.append(state)
+        )
+
+        sample = await prober.probe(measure_throughput=True)
+        assert sample.rtt is not None and sample.throughput > 0
+        await prober.probe()
+        healthy = prober.state
+        fast.close()
+        await fast.wait_closed()
+
+        slow = await _serve(0.15, port=port)
+        await prober.probe()
+        await prober.probe()
+        degraded = prober.state
+        slow.close()
+        await slow.wait_closed()
+
+        down_waiter = asyncio.ensure_future(prober.wait_for_state("down"))
+        await prober.probe()
+        await prober.probe()
+        await asyncio.wait_for(down_waiter, 1)
+        return healthy, degraded, prober, changes
+
+    healthy, degraded, prober, changes = asyncio.run(scenario())
+    assert (healthy, degraded, prober.state) == ("healthy", "degraded", "down")
+    assert changes == ["healthy", "degraded", "down"]
+    assert prober.loss_rate == 1.0
+    assert prober.summary()["samples"] == 6
+    assert prober.throughput is not None
@@ -0,0 +1,84 @@
+"""Tests for happy-eyeballs racing across candidate hosts."""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from vibeproxy_manager import race, scanner
+from vibeproxy_manager.config import ConfigManager
+
+from .conftest import free_port
+
+
+def test_race_staggers_and_cancels_losers():
+    """Test that a slow first candidate loses to a fast later one."""
+    started, cancelled = {}, []
+
+    async def attempt(host):
+        started[host] = time.perf_counter()
+        try:
+            await asyncio.sleep({"slow": 5.0, "dead": 0.01, "fast": 0.05}[host])
+        except asyncio.CancelledError:
+            cancelled.append(host)
+            raise
+        return host != "dead"
+
+    async def scenario():
+        begin = time.perf_counter()
+        result = await race.race(["slow", "dead", "fast"], attempt, stagger=0.1)
+        return result, time.perf_counter() - begin, begin
+
+    result, elapsed, begin = asyncio.run(scenario())
+    assert result == ("fast", True)
+    assert cancelled == ["slow"]
+    # "dead" waits out the stagger; "fast" starts as soon as "dead" fails
+    assert started["dead"] - begin == pytest.approx(0.1, abs=0.05)
+    assert started["fast"] - started["dead"] < 0.05
+    assert elapsed < 0.5
+
+
+def test_race_returns_none_when_all_fail():
+    """Test that exceptions and falsy results count as failures."""
+
+    async def attempt(host):
+        if host == "a":
+            raise OSError("unreachable")
+        return False
+
+    assert asyncio.run(race.race(["a", "b"], attempt, stagger=0.01)) is None
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="needs the whole 127/8 on loopback")
+def test_tunnel_races_hosts_and_remembers_winner(manager, monkeypatch):
+    """Test that the reachable endpoint wins and is saved as MacIP."""
+    ssh_port = free_port()
+    monkeypatch.setattr(scanner, "SSH_PORT", ssh_port)
+    manager._config.mac_ip = "127.0.0.2"  # Accepts but never greets: a hung path
+    manager._config.mac_hosts = ["127.0.0.3"]
+
+    async def greet(reader, writer):
+        writer.write(b"SSH-2.0-OpenSSH_9.8\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def hang(reader, writer):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        servers = [
+            await asyncio.start_server(hang, "127.0.0.2", ssh_port),
+            await asyncio.start_server(greet, "127.0.0.3", ssh_port),
+        ]
+        try:
+            return await manager.arace_hosts(authenticate=False, stagger=0.1, timeout=2.0)
+        finally:
+            for server in servers:
+                server.close()
+
+    assert asyncio.run(scenario()) == "127.0.0.3"
+    saved = ConfigManager(base_path=manager.config_manager.base_path).load()
+    assert saved.mac_ip == "127.0.0.3"
+    assert saved.mac_hosts == ["127.0.0.3", "127.0.0.2"]
+    assert manager.candidate_hosts == ["127.0.0.3", "127.0.0.2"]
@@ -0,0 +1,258 @@
+"""Tests for the local relay in front of the tunnel."""
+
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+
+from vibeproxy_manager import metrics
+from vibeproxy_manager.metrics import MetricsRegistry
+from vibeproxy_manager.relay import RelayServer, UsageScanner, classify_client
+
+from .conftest import serve_models
+
+
+async def _fake_upstream(reader, writer):
+    """Minimal VibeProxy stand-in returning a completion with usage."""
+    await reader.readuntil(b"\r\n\r\n")
+    body = json.dumps(
+        {
+            "choices": [{"message": {"content": "OK"}}],
+            "usage": {"prompt_tokens": 7, "completion_tokens": 2},
+        }
+    ).encode()
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body)
+    )
+    await writer.drain()
+    writer.close()
+
+
+async def _gzip_upstream(reader, writer):
+    """Stand-in that compresses its response when asked to."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    body = json.dumps({"data": [{"id": f"model-{i}"} for i in range(200)]}).encode()
+    encoding = b""
+    if b"gzip" in head.lower():
+        body = gzip.compress(body)
+        encoding = b"Content-Encoding: gzip\r\n"
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n%s"
+        b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (encoding, len(body), body)
+    )
+    await writer.drain()
+    writer.close()
+
+
+async def _garbage_upstream(reader, writer):
+    """Stand-in that answers with something that is not HTTP."""
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(b"NOT-HTTP\r\n\r\n")
+    await writer.drain()
+    writer.close()
+
+
+async def _truncated_upstream(reader, writer):
+    """Stand-in that promises a body and hangs up halfway through it."""
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        b"Content-Length: 1000\r\n\r\n" + b"x" * 100
+    )
+    await writer.drain()
+    writer.close()
+
+
+async def _unknown_encoding_upstream(reader, writer):
+    """Stand-in that compresses with an encoding the relay cannot decode."""
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+        b"Content-Encoding: gzip, compress\r\nContent-Length: 4\r\nConnection: close\r\n\r\nxxxx"
+    )
+    await writer.drain()
+    writer.close()
+
+
+async def _corrupt_gzip_upstream(reader, writer):
+    """Stand-in whose gzip body is corrupt after the first bytes."""
+    await reader.readuntil(b"\r\n\r\n")
+    body = gzip.compress(b"{}")[:10] + b"not deflate data at all" * 4
+    writer.write(
+        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Encoding: gzip\r\n"
+        b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body)
+    )
+    await writer.drain()
+    writer.close()
+
+
+async def _through_relay(handler, path: str, client_label: str):
+    """Send one GET through a relay to ``handler``; returns (response or error, loop errors)."""
+    loop_errors = []
+    asyncio.get_running_loop().set_exception_handler(lambda _, context: loop_errors.append(context))
+    upstream = await asyncio.start_server(handler, "127.0.0.1", 0)
+    upstream_port = upstream.sockets[0].getsockname()[1]
+    relay = RelayServer(f"http://127.0.0.1:{upstream_port}", port=0)
+    await relay.start()
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{relay.port}",
+            headers={"X-VibeProxy-Client": client_label},
+        ) as client:
+            try:
+                result = await client.get(path)
+            except httpx.HTTPError as e:
+                result = e
+        await asyncio.sleep(0.05)
+    finally:
+        await relay.close()
+        upstream.close()
+        await upstream.wait_closed()
+    return result, loop_errors
+
+
+def test_classify_client():
+    """Test client labels from explicit header and User-Agent."""
+    assert classify_client({"x-vibeproxy-client": "TUI"}) == "tui"
+    assert classify_client({"x-vibeproxy-client": "made-up-client-42"}) == "other"
+    assert classify_client({"user-agent": "curl/8.0"}) == "script"
+    assert classify_client({"user-agent": "mystery"}) == "other"
+
+
+def test_usage_scanner_streaming():
+    """Test that SSE usage is found across chunk boundaries."""
+    scanner = UsageScanner(streaming=True)
+    scanner.feed(b'data: {"choices": []}\n\ndata: {"usage": {"prompt_to')
+    scanner.feed(b'kens": 5, "completion_tokens": 9}}\n\ndata: [DONE]\n\n')
+    assert scanner.finish() == (5, 9)
+
+
+def test_relay_records_metrics():
+    """Test a request through the relay updates counters and serves /metrics."""
+
+    async def scenario():
+        upstream = await asyncio.start_server(_fake_upstream, "127.0.0.1", 0)
+        upstream_port = upstream.sockets[0].getsockname()[1]
+        relay = RelayServer(f"http://127.0.0.1:{upstream_port}", port=0)
+        await relay.start()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{relay.port}") as client:
+                response = await client.post(
+                    "/v1/chat/completions",
+                    json={"model": "relay-test-model", "messages": []},
+                    headers={"X-VibeProxy-Client": "script"},
+                )
+                scrape = await client.get("/metrics")
+                traffic = await client.get("/traffic", params={"window": 60})
+            return response, scrape, traffic
+        finally:
+            await relay.close()
+            upstream.close()
+            await upstream.wait_closed()
+
+    response, scrape, traffic = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.json()["usage"]["completion_tokens"] == 2
+    assert metrics.REQUESTS.get("relay-test-model", "script", "200") == 1
+    assert metrics.TOKENS.get("relay-test-model", "script", "in") == 7
+    assert metrics.TOKENS.get("relay-test-model", "script", "out") == 2
+    assert 'vibeproxy_tunnel_up 1' in scrape.text
+    assert metrics.TRAFFIC_BYTES.get("relay-test-model", "script", "down") > 0
+    summary = traffic.json()
+    assert summary["window_seconds"] == 60
+    [pair] = summary["pairs"]
+    assert (pair["client"], pair["model"], pair["requests"]) == ("script", "relay-test-model", 1)
+    assert pair["bytes_up"] > 0 and pair["bytes_down"] > 0
+
+
+def test_relay_decompresses_and_reports_savings():
+    """Test that compressed upstream bodies reach the client decoded."""
+
+    async def scenario():
+        upstream = await asyncio.start_server(_gzip_upstream, "127.0.0.1", 0)
+        upstream_port = upstream.sockets[0].getsockname()[1]
+        relay = RelayServer(f"http://127.0.0.1:{upstream_port}", port=0)
+        await relay.start()
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{relay.port}",
+                headers={"Accept-Encoding": "identity"},
+            ) as client:
+                return await client.get("/v1/models")
+        finally:
+            await relay.close()
+            upstream.close()
+            await upstream.wait_closed()
+
+    saved_before = metrics.COMPRESSION_SAVED_BYTES.get("none")
+    response = asyncio.run(scenario())
+    assert "content-encoding" not in response.headers
+    assert len(response.json()["data"]) == 200
+    assert metrics.COMPRESSION_SAVED_BYTES.get("none") > saved_before
+
+
+def test_scrape_covers_model_cache_and_daemon_tunnel_series():
+    """Test that one relay scrape shows its cache hits and the daemon's tunnel retries."""
+    # The daemon is another process with its own registry
+    daemon = MetricsRegistry()
+    daemon.counter("vibeproxy_retries_total", "Retries.", ("operation",)).inc("tunnel_connect")
+    daemon.gauge("vibeproxy_tunnel_up", "Up.", merge="remote").set(1)
+
+    async def daemon_metrics():
+        return daemon.render()
+
+    async def scenario():
+        upstream = await asyncio.start_server(serve_models, "127.0.0.1", 0)
+        upstream_port = upstream.sockets[0].getsockname()[1]
+        relay = RelayServer(f"http://127.0.0.1:{upstream_port}", port=0)
+        relay.metrics_source = daemon_metrics
+        await relay.start()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{relay.port}") as client:
+                first = await client.get("/v1/models")
+                upstream.close()  # The second answer can only come from the cache
+                second = await client.get("/v1/models")
+                scrape = await client.get("/metrics")
+            return first, second, scrape
+        finally:
+            await relay.close()
+            await upstream.wait_closed()
+
+    hits_before = metrics.MODEL_CACHE_REQUESTS.get("hit")
+    first, second, scrape = asyncio.run(scenario())
+    assert first.json() == second.json()
+    assert metrics.MODEL_CACHE_REQUESTS.get("hit") == hits_before + 1
+    # Summed with this process's own count (other tests ran connects here)
+    retries = int(metrics.RETRIES.get("tunnel_connect")) + 1
+    assert f'vibeproxy_retries_total{{operation="tunnel_connect"}} {retries}' in scrape.text
+    hits = metrics.MODEL_CACHE_REQUESTS.get("hit")
+    ratio = hits / (hits + metrics.MODEL_CACHE_REQUESTS.get("miss"))
+    assert f"vibeproxy_model_cache_hit_ratio {ratio!r}" in scrape.text
+    assert "vibeproxy_model_cache_hit_ratio 0\n" not in scrape.text
+
+
+@pytest.mark.parametrize(
+    "handler, expected",
+    [
+        (_garbage_upstream, "502"),
+        (_unknown_encoding_upstream, "502"),
+        (_truncated_upstream, "aborted"),
+        (_corrupt_gzip_upstream, "aborted"),
+    ],
+)
+def test_upstream_failures_are_answered_and_counted(handler, expected):
+    """Test failures before the head (502) and after it (cut-off stream), counted either way."""
+    before = metrics.REQUESTS.get("none", "other", expected)
+    result, loop_errors = asyncio.run(_through_relay(handler, "/v1/models", handler.__name__))
+    if expected == "502":
+        assert result.status_code == 502
+        assert result.json()["error"]["type"] == "relay_error"
+    else:
+        # The 200 head was already sent, so the client sees an incomplete body
+        assert isinstance(result, httpx.HTTPError)
+    assert loop_errors == []
+    # Unknown client names are all counted as "other"
+    assert metrics.REQUESTS.get("none", "other", expected) == before + 1
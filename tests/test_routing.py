@@ -0,0 +1,124 @@
+"""Tests for model alias routing."""
+
+import asyncio
+import json
+
+import httpx
+
+from vibeproxy_manager.config import ConfigManager
+from vibeproxy_manager.models import A0Config
+from vibeproxy_manager.relay import RelayServer
+from vibeproxy_manager.routing import AliasRouter
+
+from .conftest import serve_models
+
+
+def test_resolve_passes_unknown_models_through():
+    """Test alias lookup with a fixed mapping."""
+    router = AliasRouter(aliases={"vp-default": "gpt-5.2"})
+    assert router.resolve("vp-default") == "gpt-5.2"
+    assert router.resolve("claude-opus-4-5") == "claude-opus-4-5"
+
+
+def test_router_picks_up_config_changes(tmp_path):
+    """Test that alias edits from another ConfigManager are seen live."""
+    router = AliasRouter(ConfigManager(base_path=tmp_path), reload_interval=0)
+    assert router.resolve("vp-default").startswith("claude-sonnet")
+
+    other = ConfigManager(base_path=tmp_path)
+    other.set_model_alias("vp-default", "gpt-5.2-codex")
+    assert router.resolve("vp-default") == "gpt-5.2-codex"
+
+
+def test_switch_via_aliases_avoids_settings_rewrite(tmp_path):
+    """Test that an alias-based A0 is switched by remapping, not copying."""
+    manager = ConfigManager(base_path=tmp_path)
+    manager.a0_settings_path = tmp_path / "settings.json"
+    settings = {"chat_model_name": "vp-default", "util_model_name": "vp-utility"}
+    manager.a0_settings_path.write_text(json.dumps(settings), encoding="utf-8")
+
+    preset = A0Config(name="Opus", path="", model="claude-opus-4-5", util_model="gpt-5-mini")
+    switched, _ = manager.switch_a0_model_via_aliases(preset)
+
+    assert switched
+    assert manager.get_model_aliases() == {
+        "vp-default": "claude-opus-4-5",
+        "vp-utility": "gpt-5-mini",
+    }
+    assert json.loads(manager.a0_settings_path.read_text(encoding="utf-8")) == settings
+
+
+def test_relay_rewrites_alias_and_remaps_live():
+    """Test that the relay rewrites aliases and /aliases remaps without restart."""
+    seen = []
+
+    async def upstream_handler(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        if head.startswith(b"GET /v1/models"):
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 11\r\n\r\n{\"data\": []}")
+            writer.close()
+            return
+        length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        seen.append(json.loads(await reader.readexactly(length))["model"])
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}")
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        upstream = await asyncio.start_server(upstream_handler, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{upstream.sockets[0].getsockname()[1]}"
+        relay = RelayServer(url, port=0, router=AliasRouter(aliases={"vp-default": "model-a"}))
+        await relay.start()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{relay.port}") as client:
+                body = {"model": "vp-default", "messages": []}
+                await client.post("/v1/chat/completions", json=body)
+                await client.post("/aliases", json={"vp-default": "model-b"})
+                await client.post("/v1/chat/completions", json=body)
+        finally:
+            await relay.close()
+            upstream.close()
+            await upstream.wait_closed()
+
+    asyncio.run(scenario())
+    assert seen == ["model-a", "model-b"]
+
+
+def test_alias_cannot_shadow_an_upstream_model():
+    """Test that /aliases refuses keys the upstream already serves as models."""
+
+    async def scenario():
+        upstream = await asyncio.start_server(serve_models, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{upstream.sockets[0].getsockname()[1]}"
+        router = AliasRouter(aliases={"vp-default": "m1"})
+        relay = RelayServer(url, port=0, router=router)
+        await relay.start()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{relay.port}") as client:
+                rejected = await client.post("/aliases", json={"m2": "m1", "vp-fast": "m1"})
+                accepted = await client.post("/aliases", json={"vp-default": "m2"})
+        finally:
+            await relay.close()
+            upstream.close()
+            await upstream.wait_closed()
+        return rejected, accepted, router.aliases
+
+    rejected, accepted, aliases = asyncio.run(scenario())
+    assert rejected.status_code == 409
+    assert "m2" in rejected.json()["error"]["message"]
+    assert accepted.status_code == 200
+    assert aliases == {"vp-default": "m2"}
+
+
+def test_saving_an_alias_keeps_edits_from_another_process(tmp_path):
+    """Test that a persisted alias is merged into the file, not a stale copy."""
+    router = AliasRouter(ConfigManager(base_path=tmp_path), reload_interval=60)
+    tui = ConfigManager(base_path=tmp_path)
+    tui.set_model_alias("vp-utility", "gpt-5-mini")
+
+    router.set_alias("vp-default", "gpt-5.2")
+
+    saved = ConfigManager(base_path=tmp_path).get_model_aliases()
+    assert saved["vp-utility"] == "gpt-5-mini"
+    assert saved["vp-default"] == "gpt-5.2"
+    assert router.resolve("vp-utility") == "gpt-5-mini"
@@ -0,0 +1,118 @@
+"""Tests for the asyncio network scanner."""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from vibeproxy_manager import scanner
+from vibeproxy_manager.interfaces import LocalInterface
+
+from .conftest import free_port, serve_models
+
+
+def test_expand_hosts_dedupes_and_skips_network_broadcast():
+    """Test CIDR expansion across overlapping networks."""
+    hosts = scanner.expand_hosts(["10.0.0.0/30", "10.0.0.0/29", "10.0.1.7/32"])
+    assert hosts == [f"10.0.0.{i}" for i in range(1, 7)] + ["10.0.1.7"]
+
+
+
+def test_expand_hosts_shares_the_limit_between_networks():
+    """Test that a large network cannot crowd a small one out of the scan."""
+    hosts = scanner.expand_hosts(["10.0.0.0/16", "192.168.1.0/29"], limit=10)
+    assert len(hosts) == 10
+    assert [h for h in hosts if h.startswith("192.168.1.")] == [
+        f"192.168.1.{i}" for i in range(1, 6)
+    ]
+
+
+def test_local_networks_use_real_prefixes():
+    """Test prefixes are honoured, wide ones narrowed, and irrelevant interfaces skipped."""
+    found = [
+        LocalInterface(name="wlan0", address="192.168.8.20", prefix=22, default=True),
+        LocalInterface(name="eth1", address="10.40.7.9", prefix=16),
+        LocalInterface(name="docker0", address="172.17.0.1", prefix=16),
+        LocalInterface(name="lo", address="127.0.0.1", prefix=8),
+        LocalInterface(name="wlan0:1", address="192.168.9.1", prefix=22),
+    ]
+    networks = [str(n) for n in scanner.local_networks(found)]
+    assert networks == ["192.168.8.0/22", "10.40.0.0/20"]
+    assert scanner.primary_interface(found).address == "192.168.8.20"
+    assert scanner.primary_interface(found[3:4]) is None
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="needs the whole 127/8 on loopback")
+def test_scan_streams_hits_concurrently():
+    """Test that a /28 is swept at once and hits are reported as they arrive."""
+    ssh_port, proxy_port = free_port(), free_port()
+    progress = []
+
+    async def scenario():
+        servers = [
+            await asyncio.start_server(lambda r, w: w.close(), "127.0.0.5", ssh_port),
+            await asyncio.start_server(lambda r, w: w.close(), "127.0.0.9", ssh_port),
+            await asyncio.start_server(lambda r, w: w.close(), "127.0.0.9", proxy_port),
+        ]
+        started = time.perf_counter()
+        results = await scanner.scan(
+            ["127.0.0.0/28"],
+            ports=(proxy_port, ssh_port),
+            progress_callback=lambda done, total, result: progress.append((done, total, result)),
+        )
+        elapsed = time.perf_counter() - started
+        for server in servers:
+            server.close()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(scenario())
+    assert [(r.ip, r.ports) for r in results] == [
+        ("127.0.0.5", [ssh_port]),
+        ("127.0.0.9", [proxy_port, ssh_port]),
+    ]
+    assert elapsed < 1.0
+    assert [p[0] for p in progress] == list(range(1, 15))
+    assert {p[2].ip for p in progress if p[2] is not None} == {"127.0.0.5", "127.0.0.9"}
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="needs the whole 127/8 on loopback")
+def test_fingerprint_ranks_vibeproxy_mac_above_other_ssh_hosts(monkeypatch):
+    """Test that the host answering /v1/models wins over plain SSH boxes."""
+    ssh_port, proxy_port = free_port(), free_port()
+    monkeypatch.setattr(scanner, "SSH_PORT", ssh_port)
+    monkeypatch.setattr(scanner, "VIBEPROXY_PORT", proxy_port)
+
+    def banner(text):
+        async def handler(reader, writer):
+            writer.write(text.encode() + b"\r\n")
+            await writer.drain()
+            writer.close()
+
+        return handler
+
+    async def scenario():
+        servers = [
+            await asyncio.start_server(
+                banner("SSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.6"), "127.0.0.2", ssh_port
+            ),
+            await asyncio.start_server(banner("SSH-2.0-OpenSSH_9.8"), "127.0.0.3", ssh_port),
+            await asyncio.start_server(banner("SSH-2.0-OpenSSH_9.8"), "127.0.0.4", ssh_port),
+            await asyncio.start_server(serve_models, "127.0.0.4", proxy_port),
+        ]
+        results = await scanner.scan(
+            hosts=["127.0.0.2", "127.0.0.3", "127.0.0.4"], ports=(proxy_port, ssh_port)
+        )
+        started = time.perf_counter()
+        ranked = await scanner.fingerprint(results)
+        elapsed = time.perf_counter() - started
+        for server in servers:
+            server.close()
+        return ranked, elapsed
+
+    ranked, elapsed = asyncio.run(scenario())
+    assert [f.ip for f in ranked] == ["127.0.0.4", "127.0.0.3", "127.0.0.2"]
+    assert ranked[0].models == 2
+    assert ranked[0].ssh_banner == "SSH-2.0-OpenSSH_9.8"
+    assert ranked[2].score < 0
+    assert elapsed < 1.0
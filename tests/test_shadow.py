@@ -0,0 +1,91 @@
+"""Tests for shadow traffic mirroring."""
+
+import asyncio
+import json
+
+import httpx
+
+from vibeproxy_manager.relay import RelayServer
+from vibeproxy_manager.shadow import ShadowMirror
+
+
+def test_should_mirror_filters_requests():
+    """Test that only sampled chat requests for the primary model are mirrored."""
+    mirror = ShadowMirror("http://unused", "candidate", sample_rate=1.0, primary_model="primary")
+    assert mirror.should_mirror("POST", "/v1/chat/completions", "primary")
+    assert not mirror.should_mirror("GET", "/v1/models", "primary")
+    assert not mirror.should_mirror("POST", "/v1/chat/completions", "other")
+    assert not ShadowMirror("http://unused", "c", sample_rate=0.0).should_mirror(
+        "POST", "/v1/chat/completions", "primary"
+    )
+
+
+def test_relay_mirrors_to_candidate():
+    """Test that the candidate sees a copy and both sides are recorded."""
+    seen_models = []
+
+    async def upstream_handler(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        request = json.loads(await reader.readexactly(length))
+        seen_models.append(request["model"])
+        body = json.dumps(
+            {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 4}}
+        ).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: %d\r\nConnection: close\r\n\r\n%s" % (len(body), body)
+        )
+        await writer.drain()
+        writer.close()
+
+    async def scenario():
+        upstream = await asyncio.start_server(upstream_handler, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{upstream.sockets[0].getsockname()[1]}"
+        mirror = ShadowMirror(url, "candidate-model", sample_rate=1.0)
+        relay = RelayServer(url, port=0, shadow=mirror)
+        await relay.start()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{relay.port}") as client:
+                response = await client.post(
+                    "/v1/chat/completions", json={"model": "primary-model", "messages": []}
+                )
+                await mirror.drain()
+                summary = (await client.get("/shadow")).json()
+            return response, summary
+        finally:
+            await relay.close()
+            upstream.close()
+            await upstream.wait_closed()
+
+    response, summary = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert seen_models == ["primary-model", "candidate-model"]
+    assert summary["primary"]["requests"] == 1
+    assert summary["shadow"]["requests"] == 1
+    assert summary["shadow"]["errors"] == 0
+    assert summary["shadow"]["tokens_out"] == 4
+
+
+def test_dropped_copy_leaves_primary_unrecorded():
+    """Test that a primary whose copy was dropped does not skew the comparison."""
+
+    async def scenario():
+        mirror = ShadowMirror("http://127.0.0.1:9", "candidate", sample_rate=1.0, max_in_flight=0)
+        relay = RelayServer("http://127.0.0.1:9", port=0, shadow=mirror)
+
+        async def refused(request):
+            raise httpx.ConnectError("refused")
+
+        relay._open_upstream = refused
+        await relay.start()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{relay.port}") as client:
+                await client.post("/v1/chat/completions", json={"model": "primary", "messages": []})
+        finally:
+            await relay.close()
+        return mirror
+
+    mirror = asyncio.run(scenario())
+    assert mirror.dropped == 1
+    assert mirror.primary.requests == 0
@@ -0,0 +1,181 @@
+"""Tests for the event-driven tunnel supervisor."""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from vibeproxy_manager.netwatch import NetworkWatcher
+from vibeproxy_manager.supervisor import Backoff, Outage, TunnelSupervisor
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a POSIX script")
+
+
+def test_backoff_grows_and_caps():
+    """Test exponential growth, the cap, jitter bounds and reset."""
+    backoff = Backoff(initial=1.0, maximum=5.0, factor=2.0, jitter=0.0)
+    assert [backoff.next_delay() for _ in range(5)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+    backoff.reset()
+    assert backoff.next_delay() == 1.0
+
+    jittered = Backoff(initial=4.0, jitter=0.5)
+    for _ in range(20):
+        jittered.reset()
+        assert 2.0 <= jittered.next_delay() <= 4.0
+
+
+@posix_only
+def test_reconnects_on_exit_and_records_mttr(fake_ssh, manager):
+    """Test that an ssh exit is noticed without polling and the outage is timed."""
+    manager._config.mac_ip = "drop"
+    events = []
+
+    async def scenario():
+        supervisor = TunnelSupervisor(
+            manager,
+            backoff=Backoff(initial=0.01, jitter=0.0),
+            poll_interval=60,
+        )
+
+        def on_event(kind, message):
+            events.append((kind, message))
+            if kind == "up" and supervisor.outages:
+                supervisor.stop()
+
+        supervisor.on_event = on_event
+        result = await asyncio.wait_for(supervisor.run(), 10)
+        await manager.astop()
+        return supervisor, result
+
+    supervisor, result = asyncio.run(scenario())
+    assert result is True
+    assert [kind for kind, _ in events][:2] == ["up", "down"]
+    assert len(supervisor.outages) == 1
+    outage = supervisor.outages[0]
+    assert "Broken pipe" in outage.reason
+    assert outage.attempts >= 1
+    # Detected on exit, not after a 60s poll
+    assert supervisor.mttr is not None and supervisor.mttr < 5
+
+
+@posix_only
+def test_gives_up_after_max_attempts(fake_ssh, manager):
+    """Test that max_attempts bounds reconnection."""
+    manager._config.mac_ip = "fail"
+    supervisor = TunnelSupervisor(
+        manager, backoff=Backoff(initial=0.01, jitter=0.0), max_attempts=2, discover_after=99
+    )
+    assert asyncio.run(supervisor.run()) is False
+
+
+def test_discover_after_counts_only_unreachable_failures(manager, monkeypatch):
+    """Test that failures of another kind do not count toward discover_after."""
+    messages = [
+        "ssh: connect to host x port 22: Connection refused",
+        "ssh: connect to host x port 22: Connection refused",
+        "ssh: connect to host x port 22: No route to host",
+        "ssh: connect to host x port 22: No route to host",
+        "ssh: connect to host x port 22: No route to host",
+    ]
+    scans = []
+
+    async def fake_astart():
+        return False, messages.pop(0)
+
+    async def fake_discover():
+        scans.append(len(messages))
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(manager, "astart", fake_astart)
+    monkeypatch.setattr(manager, "adiscover_mac", fake_discover)
+
+    async def scenario():
+        supervisor = TunnelSupervisor(
+            manager, backoff=Backoff(initial=0.01, jitter=0.0), max_attempts=5, discover_after=2
+        )
+        outage = Outage(started=time.monotonic(), reason="test")
+        await supervisor._reconnect(outage)
+
+    asyncio.run(scenario())
+    # Started after the 4th attempt (the 2nd unreachable one), not after the 2nd
+    assert scans == [1]
+
+
+@posix_only
+def test_discovery_overlaps_retries_and_cuts_over(fake_ssh, manager, monkeypatch):
+    """Test that a Mac found mid-backoff is adopted without waiting out the delay."""
+    manager._config.mac_ip = "gone"
+    events = []
+
+    async def fake_discover():
+        await asyncio.sleep(0.1)
+        return "127.0.0.1", "VibeProxy"
+
+    monkeypatch.setattr(manager, "adiscover_mac", fake_discover)
+
+    async def scenario():
+        # A 30s backoff would time the test out unless discovery wakes the retry
+        supervisor = TunnelSupervisor(
+            manager,
+            backoff=Backoff(initial=30.0, jitter=0.0),
+            on_event=lambda kind, message: events.append((kind, message)),
+        )
+        outage = Outage(started=time.monotonic(), reason="test")
+        recovered = await asyncio.wait_for(supervisor._reconnect(outage), 10)
+        await manager.astop()
+        return recovered, outage
+
+    recovered, outage = asyncio.run(scenario())
+    assert recovered is True
+    assert outage.new_ip == "127.0.0.1"
+    assert outage.cut_over is not None and outage.cut_over < 5
+    assert outage.attempts == 2
+    assert any("cutting over" in message for _, message in events)
+
+
+@posix_only
+def test_network_change_revalidates_and_replaces_dead_tunnel(fake_ssh, manager, monkeypatch):
+    """Test that a survived change only logs, and a dead tunnel reconnects with discovery."""
+    events = []
+    discoveries = []
+
+    def fake_discover():
+        discoveries.append(time.monotonic())
+        return asyncio.sleep(0.1)
+
+    monkeypatch.setattr(manager, "adiscover_mac", fake_discover)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        watcher = NetworkWatcher()
+        supervisor = TunnelSupervisor(
+            manager, backoff=Backoff(initial=0.01, jitter=0.0), network=watcher
+        )
+
+        async def dead() -> bool:
+            return False
+
+        def on_event(kind, message):
+            events.append((kind, message))
+            if kind == "up" and supervisor.outages:
+                supervisor.stop()
+            elif kind == "up":
+                loop.call_later(0.2, watcher._report, "address added", "netlink")
+            elif kind == "network":
+                # The tunnel answered; pretend the next change kills it
+                supervisor._revalidate = dead
+                loop.call_later(0.2, watcher._report, "route removed", "netlink")
+
+        supervisor.on_event = on_event
+        result = await asyncio.wait_for(supervisor.run(), 10)
+        await manager.astop()
+        return supervisor, result
+
+    supervisor, result = asyncio.run(scenario())
+    assert result is True
+    assert [kind for kind, _ in events] == ["up", "network", "down", "up"]
+    assert "tunnel still up" in events[1][1]
+    assert supervisor.outages[0].reason.startswith("network changed (route removed)")
+    # Discovery starts with the outage, not after a failed attempt
+    assert len(discoveries) == 1
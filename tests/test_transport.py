@@ -0,0 +1,150 @@
+"""Tests for the in-process SSH transport against a local sshd stand-in."""
+
+import asyncio
+
+import pytest
+
+asyncssh = pytest.importorskip("asyncssh")
+
+from vibeproxy_manager.transport import SSHTransport  # noqa: E402
+
+
+class _StandInServer(asyncssh.SSHServer):
+    """Password-authenticated server that allows direct-tcpip forwards."""
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    def validate_password(self, username, password):
+        return username == "mac" and password == "secret"
+
+    def connection_requested(self, dest_host, dest_port, orig_host, orig_port):
+        return True
+
+
+async def _echo(reader, writer):
+    while data := await reader.read(1024):
+        writer.write(data.upper())
+        await writer.drain()
+    writer.close()
+
+
+async def _round_trip(port: int, payload: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(payload)
+    await writer.drain()
+    writer.write_eof()
+    data = await reader.read()
+    writer.close()
+    return data
+
+
+def test_channels_and_in_process_reconnect():
+    """Test per-channel counters and re-establishing the link without a process."""
+
+    async def scenario():
+        echo = await asyncio.start_server(_echo, "127.0.0.1", 0)
+        sshd = await asyncssh.create_server(
+            _StandInServer,
+            "127.0.0.1",
+            0,
+            server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+        )
+        transport = SSHTransport(
+            host="127.0.0.1",
+            username="mac",
+            password="secret",
+            ssh_port=sshd.sockets[0].getsockname()[1],
+            local_port=0,
+            remote_host="127.0.0.1",
+            remote_port=echo.sockets[0].getsockname()[1],
+        )
+        try:
+            success, message = await transport.start()
+            assert success, message
+
+            replies = await asyncio.gather(
+                *(_round_trip(transport.port, b"hello %d" % i) for i in range(3))
+            )
+            assert sorted(replies) == [b"HELLO 0", b"HELLO 1", b"HELLO 2"]
+            await asyncio.sleep(0.05)
+
+            ok, _ = await transport.reconnect()
+            assert ok and transport.connects == 2
+            assert await _round_trip(transport.port, b"again") == b"AGAIN"
+            await asyncio.sleep(0.05)
+            return transport.summary(), list(transport.closed_channels)
+        finally:
+            await transport.close()
+            sshd.close()
+            echo.close()
+
+    summary, channels = asyncio.run(scenario())
+    assert summary["closed_channels"] == 4
+    assert summary["channel_errors"] == 0
+    assert summary["bytes_up"] == summary["bytes_down"] == 3 * 7 + 5
+    assert all(c.first_byte_seconds is not None and c.open_seconds > 0 for c in channels)
+
+
+def test_bad_password_reports_failure():
+    """Test that auth failure is returned, not raised."""
+
+    async def scenario():
+        sshd = await asyncssh.create_server(
+            _StandInServer,
+            "127.0.0.1",
+            0,
+            server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+        )
+        transport = SSHTransport(
+            host="127.0.0.1",
+            username="mac",
+            password="wrong",
+            ssh_port=sshd.sockets[0].getsockname()[1],
+            local_port=0,
+        )
+        try:
+            return await transport.start()
+        finally:
+            await transport.close()
+            sshd.close()
+
+    success, message = asyncio.run(scenario())
+    assert not success
+    assert "SSH connect failed" in message
+
+
+def test_listen_failure_closes_the_connection():
+    """Test that a start() that cannot bind leaves no connection or reconnect task behind."""
+
+    async def scenario():
+        sshd = await asyncssh.create_server(
+            _StandInServer,
+            "127.0.0.1",
+            0,
+            server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+        )
+        taken = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        transport = SSHTransport(
+            host="127.0.0.1",
+            username="mac",
+            password="secret",
+            ssh_port=sshd.sockets[0].getsockname()[1],
+            local_port=taken.sockets[0].getsockname()[1],
+        )
+        try:
+            result = await transport.start()
+            return result, transport.is_connected, transport._watch_task
+        finally:
+            await transport.close()
+            taken.close()
+            sshd.close()
+
+    (success, message), connected, watch_task = asyncio.run(scenario())
+    assert not success
+    assert "Cannot listen" in message
+    assert not connected
+    assert watch_task is None
@@ -0,0 +1,52 @@
+"""Tests for the SSH profile benchmark."""
+
+import asyncio
+import sys
+
+import pytest
+
+from vibeproxy_manager import tuning
+from vibeproxy_manager.config import ConfigManager
+
+
+def test_profile_options_reach_the_ssh_command(manager, monkeypatch):
+    """Test that the saved profile for this network is used by start()."""
+    monkeypatch.setattr(tuning, "network_key", lambda: "192.168.1.0/24")
+    assert manager.ssh_profile.name == tuning.DEFAULT_PROFILE
+
+    manager._config.ssh_profiles = {"192.168.1.0/24": "chacha20+zlib"}
+    cmd = manager._tunnel_command("ssh", foreground=True)
+    assert cmd[cmd.index("-c") + 1] == "chacha20-poly1305@openssh.com"
+    assert "Compression=yes" in cmd
+    assert cmd.index("Compression=yes") < cmd.index("-L")
+
+    # Another network keeps the default options
+    monkeypatch.setattr(tuning, "network_key", lambda: "10.0.0.0/24")
+    assert "-c" not in manager._tunnel_command("ssh", foreground=True)
+
+
+def test_best_prefers_fastest_workload():
+    """Test winner selection and that failed profiles never win."""
+    results = [
+        tuning.ProfileResult(profile="a", latency=0.02, workload=1.0),
+        tuning.ProfileResult(profile="b", error="Connection refused"),
+        tuning.ProfileResult(profile="c", latency=0.05, workload=0.6),
+    ]
+    assert tuning.best(results).profile == "c"
+    assert tuning.best(results[1:2]) is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a POSIX script")
+def test_tune_measures_each_profile_and_saves_winner(fake_ssh, manager, monkeypatch):
+    """Test the benchmark end to end through scratch tunnels."""
+    monkeypatch.setattr(tuning, "network_key", lambda: "192.168.1.0/24")
+    profiles = [tuning.PROFILES["default"], tuning.PROFILES["aes128-gcm+zlib"]]
+
+    results = asyncio.run(manager.atune_ssh(profiles, requests=3))
+
+    assert [r.profile for r in results] == ["default", "aes128-gcm+zlib"]
+    assert all(r.ok and r.latency > 0 and r.throughput > 0 for r in results)
+    saved = ConfigManager(base_path=manager.config_manager.base_path).load()
+    assert saved.ssh_profiles["192.168.1.0/24"] == tuning.best(results).profile
+    # The live tunnel port was never touched
+    assert not asyncio.run(manager.ais_running())
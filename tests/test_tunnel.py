@@ -0,0 +1,255 @@
+"""Tests for TunnelManager's async API."""
+
+import asyncio
+import sys
+
+import pytest
+
+from vibeproxy_manager import metrics
+from vibeproxy_manager import tunnel as tunnel_module
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake ssh is a POSIX script")
+
+
+def test_astart_and_astop(fake_ssh, manager):
+    """Test that astart waits for the port and astop terminates the child."""
+
+    async def scenario():
+        started = await manager.astart(ready_timeout=5)
+        running = await manager.ais_running()
+        stopped = await manager.astop()
+        after = await manager.ais_running()
+        return started, running, stopped, after
+
+    started, running, stopped, after = asyncio.run(scenario())
+    assert started[0], started[1]
+    assert running
+    assert stopped == (True, "Tunnel stopped")
+    assert not after
+
+
+def test_astart_and_astop_flip_tunnel_up_gauge(fake_ssh, manager):
+    """Test that the vibeproxy_tunnel_up gauge follows astart and astop."""
+    metrics.TUNNEL_UP.set(0)
+
+    async def scenario():
+        started = await manager.astart(ready_timeout=5)
+        up = metrics.TUNNEL_UP.get()
+        await manager.astop()
+        return started, up, metrics.TUNNEL_UP.get()
+
+    started, up, down = asyncio.run(scenario())
+    assert started[0], started[1]
+    assert up == 1
+    assert down == 0
+
+
+def test_astart_reports_ssh_error(fake_ssh, manager):
+    """Test that an ssh exit is reported immediately with its stderr."""
+    manager._config.mac_ip = "fail"
+    success, message = asyncio.run(manager.astart(ready_timeout=5))
+    assert not success
+    assert "Connection refused" in message
+    assert manager.classify_ssh_error(message)[0] == "SSH_DOWN"
+
+
+def test_ais_running_false_when_port_closed(manager):
+    """Test the non-blocking port probe on a closed port."""
+    assert asyncio.run(manager.ais_running()) is False
+
+
+def test_control_master_reuses_connection(manager, monkeypatch, tmp_path):
+    """Test that start() adds a forward over the master and stop() keeps the master."""
+    assert not manager.uses_control_master  # Opt-in
+    manager._config.ssh_control_master = True
+    calls = []
+    state = {"master": False, "forward": False}
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        code = 0
+        if "-O" in cmd:
+            op = cmd[cmd.index("-O") + 1]
+            if op == "check":
+                code = 0 if state["master"] else 255
+            elif op in ("forward", "cancel"):
+                state["forward"] = op == "forward"
+            elif op == "exit":
+                state["master"] = state["forward"] = False
+        elif "ControlMaster=yes" in cmd:
+            state["master"] = True
+        return tunnel_module.subprocess.CompletedProcess(cmd, code, "", "")
+
+    monkeypatch.setattr(tunnel_module, "find_ssh", lambda: "ssh")
+    monkeypatch.setattr(tunnel_module.subprocess, "run", fake_run)
+    monkeypatch.setattr(manager, "_run_ssh", fake_run)
+    monkeypatch.setattr(tunnel_module.Path, "home", lambda: tmp_path)
+    monkeypatch.setattr(type(manager), "is_running", lambda self: state["forward"])
+    (tmp_path / ".ssh").mkdir()
+    manager.control_path.touch()
+
+    assert manager.start() == (True, f"Tunnel started on port {manager.port}")
+    assert manager.stop() == (True, "Tunnel stopped (SSH master kept for fast reconnect)")
+    assert state["master"]
+
+    calls.clear()
+    success, message = manager.start()
+    assert success and "reused SSH master" in message
+    assert not any("ControlMaster=yes" in cmd for cmd in calls)
+    assert ["-O", "forward"] == calls[-1][3:5]
+
+
+def test_connect_with_retry_overlaps_discovery(manager, monkeypatch):
+    """Test that discovery runs during the retry wait and its IP is adopted at once."""
+    import time
+
+    manager._config.mac_ip = "gone"
+    tried = []
+
+    def fake_start():
+        tried.append(manager.mac_ip)
+        if manager.mac_ip == "gone":
+            return False, "ssh: connect to host gone port 22: No route to host"
+        return True, "Tunnel started"
+
+    def fake_discover(cancel=None):
+        time.sleep(0.2)
+        return "newhost", "VibeProxy"
+
+    monkeypatch.setattr(manager, "start", fake_start)
+    monkeypatch.setattr(manager, "try_discover_mac", fake_discover)
+    monkeypatch.setattr(manager, "remember_host", lambda: None)
+
+    started = time.monotonic()
+    assert manager.connect_with_retry(max_attempts=3) == (True, "Tunnel started")
+    # Cut over as soon as discovery returned, not after a 2s retry sleep
+    assert time.monotonic() - started < 1.5
+    assert tried == ["gone", "newhost"]
+    assert manager.mac_ip == "newhost"
+
+
+def test_connect_with_retry_cancels_discovery_on_success(manager, monkeypatch):
+    """Test that a scan still running when a retry succeeds is stopped, not leaked."""
+    import threading
+    import time
+
+    manager._config.mac_ip = "gone"
+    attempts = []
+    scan = {}
+
+    def fake_start():
+        attempts.append(manager.mac_ip)
+        if len(attempts) == 1:
+            return False, "ssh: connect to host gone port 22: No route to host"
+        return True, "Tunnel started"
+
+    def fake_discover(cancel=None):
+        scan["cancel"] = cancel
+        scan["cancelled"] = cancel.wait(5)
+        return None
+
+    monkeypatch.setattr(manager, "start", fake_start)
+    monkeypatch.setattr(manager, "try_discover_mac", fake_discover)
+    monkeypatch.setattr(manager, "remember_host", lambda: None)
+
+    started = time.monotonic()
+    assert manager.connect_with_retry(max_attempts=3) == (True, "Tunnel started")
+    assert time.monotonic() - started < 4
+    assert isinstance(scan["cancel"], threading.Event)
+    # connect_with_retry returned only after the scan saw the cancel and ended
+    assert scan["cancelled"] is True
+    assert attempts == ["gone", "gone"]
+
+
+def test_discover_until_cancel(manager, monkeypatch):
+    """Test that try_discover_mac(cancel) abandons a running discovery."""
+    import threading
+
+    async def endless_discovery():
+        await asyncio.sleep(60)
+
+    cancel = threading.Event()
+    monkeypatch.setattr(manager, "adiscover_mac", endless_discovery)
+    threading.Timer(0.2, cancel.set).start()
+    assert manager.try_discover_mac(cancel) is None
+
+
+def test_connect_with_retry_abandons_attempt_when_mac_moves(manager, monkeypatch):
+    """Test that a scan finding a new IP kills the attempt still connecting to the old one."""
+    import time
+
+    manager._config.mac_ip = "gone"
+    tried = []
+
+    def fake_start():
+        tried.append(manager.mac_ip)
+        if manager.mac_ip != "gone":
+            return True, "Tunnel started"
+        if len(tried) == 1:
+            # start()'s own message when ssh hangs: must also trigger discovery
+            return False, "SSH connection timeout"
+        result = manager._run_ssh([sys.executable, "-c", "import time; time.sleep(30)"])
+        return False, f"SSH failed: exit {result.returncode}"
+
+    def fake_discover(cancel=None):
+        time.sleep(2.5)  # Outlasts the 2s retry wait, so it ends during attempt 2
+        return "newhost", "VibeProxy"
+
+    monkeypatch.setattr(manager, "start", fake_start)
+    monkeypatch.setattr(manager, "try_discover_mac", fake_discover)
+    monkeypatch.setattr(manager, "remember_host", lambda: None)
+
+    started = time.monotonic()
+    assert manager.connect_with_retry(max_attempts=3) == (True, "Tunnel started")
+    assert time.monotonic() - started < 6
+    assert tried == ["gone", "gone", "newhost"]
+
+
+def test_connect_with_retry_races_hosts_once(manager, monkeypatch):
+    """Test that the host race result is kept for the whole outage."""
+    manager._config.mac_hosts = ["other-host"]
+    races = []
+    monkeypatch.setattr(manager, "race_hosts", lambda: races.append(1))
+    monkeypatch.setattr(manager, "start", lambda: (False, "something odd"))
+    monkeypatch.setattr(tunnel_module.time, "sleep", lambda seconds: None)
+
+    assert manager.connect_with_retry(max_attempts=3)[0] is False
+    assert races == [1]
+
+
+def test_exit_stderr_read_survives_a_grandchild_holding_the_pipe(manager):
+    """Test that a pipe kept open by a grandchild neither stalls the loop nor loses output."""
+    import subprocess
+    import time
+
+    script = (
+        "import subprocess, sys; "
+        "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(3)']); "
+        "sys.stderr.write('boom'); sys.stderr.flush()"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", script], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    manager._tunnel_process = process
+    manager._tunnel_pid = process.pid
+
+    async def scenario():
+        gaps = []
+
+        async def ticker():
+            last = time.monotonic()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        ticking = asyncio.ensure_future(ticker())
+        process_exit = await manager.await_process_exit()
+        await asyncio.sleep(0.05)  # Let the ticker record the gap a stall would leave
+        ticking.cancel()
+        return process_exit, max(gaps)
+
+    process_exit, longest_stall = asyncio.run(scenario())
+    assert process_exit.stderr_tail == "boom"
+    assert longest_stall < 0.5  # The loop kept running while the pipe stayed open
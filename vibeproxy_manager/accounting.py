@@ -0,0 +1,173 @@
+"""Per-client and per-model traffic accounting for the relay.
+
+The Prometheus counters in ``metrics`` only ever grow, so they cannot answer
+"who is saturating the tunnel right now". This module keeps a rolling window
+for each (client, model) pair. The window is one small ring of per-second
+buckets stored in ``array`` objects, under 10 KB per pair for five minutes, so
+each request costs a few index operations and no allocations. Totals for any
+window up to the ring length are summed on demand, and the same summary backs
+the relay's ``GET /traffic`` endpoint, the TUI's traffic screen and JSON
+exports.
+"""
+
+import threading
+import time
+from array import array
+from typing import Optional
+
+from pydantic import BaseModel
+
+# Channels kept per (client, model) pair
+REQUESTS, BYTES_UP, BYTES_DOWN = range(3)
+CHANNELS = 3
+
+
+class RollingCounter:
+    """Ring of per-interval buckets holding several channels each."""
+
+    __slots__ = ("slots", "resolution", "values", "ticks")
+
+    def __init__(self, slots: int = 300, resolution: float = 1.0):
+        """Initialize an empty ring.
+
+        Args:
+            slots: Number of buckets (window length = slots * resolution)
+            resolution: Seconds per bucket
+        """
+        self.slots = slots
+        self.resolution = resolution
+        self.values = array("d", bytes(8 * slots * CHANNELS))
+        # Tick (time // resolution) each slot currently holds; -1 = never used
+        self.ticks = array("q", [-1]) * slots
+
+    def add(self, now: float, *amounts: float) -> None:
+        """Add one amount per channel to the bucket for ``now``."""
+        tick = int(now // self.resolution)
+        slot = tick % self.slots
+        base = slot * CHANNELS
+        if self.ticks[slot] != tick:
+            # Bucket last held an older interval: recycle it
+            self.ticks[slot] = tick
+            for channel in range(CHANNELS):
+                self.values[base + channel] = 0.0
+        for channel, amount in enumerate(amounts):
+            self.values[base + channel] += amount
+
+    def totals(self, now: float, window: float) -> list[float]:
+        """Per-channel sums over the last ``window`` seconds (capped at the ring)."""
+        current = int(now // self.resolution)
+        oldest = current - min(self.slots, max(1, int(window / self.resolution))) + 1
+        sums = [0.0] * CHANNELS
+        for slot, tick in enumerate(self.ticks):
+            if oldest <= tick <= current:
+                base = slot * CHANNELS
+                for channel in range(CHANNELS):
+                    sums[channel] += self.values[base + channel]
+        return sums
+
+
+class TrafficUsage(BaseModel):
+    """Traffic of one client, model or (client, model) pair over a window."""
+
+    client: str = "*"
+    model: str = "*"
+    requests: int = 0
+    bytes_up: int = 0  # Request bodies sent toward VibeProxy
+    bytes_down: int = 0  # Response bytes received over the tunnel
+
+    @property
+    def bytes_total(self) -> int:
+        """Bytes in both directions."""
+        return self.bytes_up + self.bytes_down
+
+
+class TrafficAccounting:
+    """Rolling byte and request accounting keyed by (client, model)."""
+
+    def __init__(self, window: float = 300.0, resolution: float = 1.0, max_pairs: int = 256):
+        """Initialize.
+
+        Args:
+            window: Longest window that can be queried, in seconds
+            resolution: Bucket width in seconds
+            max_pairs: Cap on tracked pairs (extra pairs fold into ("other", "other"))
+        """
+        self.slots = max(1, int(window / resolution))
+        self.resolution = resolution
+        self.max_pairs = max_pairs
+        self._counters: dict[tuple[str, str], RollingCounter] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def window(self) -> float:
+        """Longest queryable window in seconds."""
+        return self.slots * self.resolution
+
+    def record(
+        self,
+        client: str,
+        model: str,
+        bytes_up: int,
+        bytes_down: int,
+        now: Optional[float] = None,
+    ) -> None:
+        """Account one finished request."""
+        now = time.time() if now is None else now
+        key = (client, model)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                if len(self._counters) >= self.max_pairs:
+                    # Fold both sides: distinct clients must not grow memory either
+                    key = ("other", "other")
+                counter = self._counters.setdefault(
+                    key, RollingCounter(self.slots, self.resolution)
+                )
+            counter.add(now, 1, bytes_up, bytes_down)
+
+    def pairs(
+        self, window: Optional[float] = None, now: Optional[float] = None
+    ) -> list[TrafficUsage]:
+        """Usage per (client, model) pair with traffic in the window, busiest first."""
+        now = time.time() if now is None else now
+        window = window or self.window
+        with self._lock:
+            items = list(self._counters.items())
+        usage = []
+        for (client, model), counter in items:
+            requests, bytes_up, bytes_down = counter.totals(now, window)
+            if requests:
+                usage.append(
+                    TrafficUsage(
+                        client=client,
+                        model=model,
+                        requests=int(requests),
+                        bytes_up=int(bytes_up),
+                        bytes_down=int(bytes_down),
+                    )
+                )
+        return sorted(usage, key=lambda u: u.bytes_total, reverse=True)
+
+    @staticmethod
+    def _group(pairs: list[TrafficUsage], field: str) -> list[TrafficUsage]:
+        """Fold pair usage into per-client or per-model totals."""
+        groups: dict[str, TrafficUsage] = {}
+        for pair in pairs:
+            name = getattr(pair, field)
+            group = groups.setdefault(name, TrafficUsage(**{field: name}))
+            group.requests += pair.requests
+            group.bytes_up += pair.bytes_up
+            group.bytes_down += pair.bytes_down
+        return sorted(groups.values(), key=lambda u: u.bytes_total, reverse=True)
+
+    def summary(self, window: Optional[float] = None, now: Optional[float] = None) -> dict:
+        """JSON-ready summary: totals by client, by model and by pair."""
+        window = min(window or self.window, self.window)
+        pairs = self.pairs(window, now)
+        return {
+            "window_seconds": window,
+            "generated_at": time.time() if now is None else now,
+            "by_client": [u.model_dump() for u in self._group(pairs, "client")],
+            "by_model": [u.model_dump() for u in self._group(pairs, "model")],
+            "pairs": [u.model_dump() for u in pairs],
+        }
@@ -4,6 +4,7 @@ import httpx
 import time
 from typing import Optional, Any
 
+from . import metrics
 from .models import Model, ChatMessage, ChatResponse
 
 
@@ -30,7 +31,11 @@ class VibeProxyClient:
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
                 timeout=httpx.Timeout(30.0, connect=5.0),
-                headers={"Content-Type": "application/json"},
+                headers={
+                    "Content-Type": "application/json",
+                    # Lets the local relay attribute traffic to the TUI
+                    "X-VibeProxy-Client": "tui",
+                },
             )
         return self._client
 
@@ -61,7 +66,9 @@ class VibeProxyClient:
 
         # Return cached data if still valid
         if not force_refresh and cache_age < cache["cache_seconds"] and cache["models"]:
+            metrics.MODEL_CACHE_REQUESTS.inc("hit")
             return cache["models"]
+        metrics.MODEL_CACHE_REQUESTS.inc("miss")
 
         try:
             client = await self._get_client()
@@ -7,7 +7,10 @@ from textual.binding import Binding
 
 from .config import ConfigManager
 from .api import VibeProxyClient
+from .daemon import DaemonClient
 from .docker import DockerManager
+from .netwatch import NetworkWatcher
+from .quality import TunnelProber
 from .tunnel import TunnelManager
 
 
@@ -34,6 +37,10 @@ class VibeProxyApp(App):
         self.api = VibeProxyClient()
         self.docker = DockerManager()
         self.tunnel = TunnelManager(self.config_manager)
+        self.prober = TunnelProber(self.tunnel.port)
+        self.network = NetworkWatcher(on_change=self._on_network_change)
+        # Background daemon that owns the tunnel once started from the menu
+        self.daemon = DaemonClient.from_config(self.config_manager)
 
         # Load config
         self.config = self.config_manager.load()
@@ -41,8 +48,35 @@ class VibeProxyApp(App):
     def on_mount(self) -> None:
         """Called when the app is mounted."""
         from .screens.main_menu import MainMenuScreen
+        self.tunnel.add_exit_listener(self._on_tunnel_exit)
+        self.tunnel.liveness.start()
+        self.prober.start()
+        self.network.start()
+        self.daemon.start_watch()
         self.push_screen(MainMenuScreen())
 
+    def _on_tunnel_exit(self, process_exit) -> None:
+        """Tell the user the moment the tunnel process dies."""
+        self.notify(process_exit.message, title="SSH Tunnel Down", severity="error", timeout=8)
+
+    def _on_network_change(self, change) -> None:
+        """Re-check the tunnel now rather than at the next poll."""
+        self.run_worker(self._revalidate_tunnel(change), group="netwatch", exclusive=True)
+
+    async def _revalidate_tunnel(self, change) -> None:
+        """Probe through the tunnel after a network change and warn if it died."""
+        if not self.tunnel.liveness.is_up:
+            return
+        sample = await self.prober.probe()
+        await self.tunnel.ais_running()
+        if sample.rtt is None:
+            self.notify(
+                f"Network changed ({change.reason}) and the tunnel stopped answering",
+                title="SSH Tunnel",
+                severity="warning",
+                timeout=8,
+            )
+
     def action_back(self) -> None:
         """Go back to previous screen."""
         if len(self.screen_stack) > 1:
@@ -63,6 +97,7 @@ class VibeProxyApp(App):
             "ConfigMenuScreen": "Enter to apply config | Configs from configs/",
             "ChatScreen": "Enter to send | Ctrl+C to exit chat",
             "StatusScreen": "Shows tunnel, docker, API status",
+            "TrafficScreen": "W Change window | E Export JSON | R Refresh",
         }
         
         hint = context_hints.get(current_screen, "")
@@ -72,4 +107,8 @@ class VibeProxyApp(App):
 
     async def on_unmount(self) -> None:
         """Cleanup when app closes."""
+        await self.prober.stop()
+        await self.network.stop()
+        await self.daemon.stop_watch()
+        await self.tunnel.liveness.stop()
         await self.api.close()
@@ -0,0 +1,171 @@
+"""Response compression negotiation and streaming decoders for the relay.
+
+The relay asks VibeProxy for compressed responses so fewer bytes cross the
+SSH forward, then decodes chunk by chunk before passing data on, so the
+first token reaches the client as soon as its compressed bytes arrive.
+gzip/deflate use the stdlib; br and zstd are used when the optional
+``brotli`` / ``zstandard`` packages are installed. Deflate is accepted both
+zlib-wrapped (as the RFC says) and raw (as some servers send it).
+"""
+
+import time
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+# What each decompressor raises on corrupt or truncated input
+_DECODE_ERRORS: tuple[type[Exception], ...] = (zlib.error,)
+if brotli is not None:
+    _DECODE_ERRORS += (brotli.error,)
+if zstandard is not None:
+    _DECODE_ERRORS += (zstandard.ZstdError,)
+
+
+class DecodeError(ValueError):
+    """A compressed body turned out to be corrupt or truncated."""
+
+
+def available_encodings() -> list[str]:
+    """Encodings we can decode, most effective first."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.extend(["gzip", "deflate"])
+    return encodings
+
+
+def accept_encoding_header() -> str:
+    """Accept-Encoding value advertising every encoding we can decode."""
+    return ", ".join(available_encodings())
+
+
+class _DeflateDecoder:
+    """Deflate decoder that tells the zlib-wrapped form from raw deflate."""
+
+    def __init__(self):
+        """Wait for the first two bytes before picking the format."""
+        self._decoder = None
+        self._head = b""
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Decode one chunk."""
+        if self._decoder is None:
+            self._head += chunk
+            if len(self._head) < 2:
+                return b""
+            # A zlib header: compression method 8, header checksum divisible by 31
+            cmf, flg = self._head[0], self._head[1]
+            wrapped = cmf & 0x0F == 8 and ((cmf << 8) | flg) % 31 == 0
+            self._decoder = zlib.decompressobj(zlib.MAX_WBITS if wrapped else -zlib.MAX_WBITS)
+            chunk, self._head = self._head, b""
+        return self._decoder.decompress(chunk)
+
+    def flush(self) -> bytes:
+        """Return buffered data."""
+        if self._decoder is None:
+            if self._head:
+                raise zlib.error("deflate stream too short")
+            return b""
+        return self._decoder.flush()
+
+    @property
+    def eof(self) -> bool:
+        """Whether the end of the deflate stream was reached."""
+        return self._decoder is not None and self._decoder.eof
+
+
+class StreamDecoder:
+    """Incremental decoder for one response body.
+
+    Tracks bytes on the wire, decoded bytes, and the CPU time spent
+    decoding so the cost of compression can be weighed against its savings.
+    """
+
+    def __init__(self, encoding: Optional[str]):
+        """Initialize for a Content-Encoding value (None/identity = passthrough)."""
+        self.encoding = (encoding or "identity").strip().lower()
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        self.decode_seconds = 0.0
+        self._decoder = self._create_decoder(self.encoding)
+
+    @staticmethod
+    def _create_decoder(encoding: str):
+        """Build the underlying decompressor (None for identity)."""
+        if encoding in ("gzip", "x-gzip"):
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if encoding == "deflate":
+            return _DeflateDecoder()
+        if encoding == "br" and brotli is not None:
+            return brotli.Decompressor()
+        if encoding == "zstd" and zstandard is not None:
+            return zstandard.ZstdDecompressor().decompressobj()
+        if encoding == "identity":
+            return None
+        raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the body is actually compressed."""
+        return self._decoder is not None
+
+    def decode(self, chunk: bytes) -> bytes:
+        """Decode one raw chunk from the wire (DecodeError if it is corrupt)."""
+        self.wire_bytes += len(chunk)
+        if self._decoder is None:
+            self.decoded_bytes += len(chunk)
+            return chunk
+
+        started = time.perf_counter()
+        try:
+            if self.encoding == "br":
+                data = self._decoder.process(chunk)
+            else:
+                data = self._decoder.decompress(chunk)
+        except _DECODE_ERRORS as e:
+            raise DecodeError(f"Corrupt {self.encoding} body: {e}") from e
+        self.decode_seconds += time.perf_counter() - started
+        self.decoded_bytes += len(data)
+        return data
+
+    def flush(self) -> bytes:
+        """Return any data buffered inside the decoder.
+
+        Raises DecodeError if the compressed stream stopped before its end:
+        zlib's flush() returns what it has without complaining.
+        """
+        if self._decoder is None:
+            return b""
+        started = time.perf_counter()
+        try:
+            data = self._decoder.flush() if hasattr(self._decoder, "flush") else b""
+        except _DECODE_ERRORS as e:
+            raise DecodeError(f"Truncated {self.encoding} body: {e}") from e
+        self.decode_seconds += time.perf_counter() - started
+        self.decoded_bytes += len(data)
+        # An empty body has no stream to finish
+        if self.wire_bytes and not self._finished():
+            raise DecodeError(f"Truncated {self.encoding} body: stream ended early")
+        return data
+
+    def _finished(self) -> bool:
+        """Whether the decoder saw the end of the compressed stream."""
+        if self.encoding == "br":
+            return self._decoder.is_finished()
+        return getattr(self._decoder, "eof", True)
+
+    @property
+    def saved_bytes(self) -> int:
+        """Bytes the tunnel did not have to carry thanks to compression."""
+        return max(0, self.decoded_bytes - self.wire_bytes)
@@ -8,18 +8,49 @@ import re
 
 from .models import A0Config
 
+# Stable model IDs that presets can point at; the relay maps them to real models
+DEFAULT_MODEL_ALIASES = {
+    "vp-default": "claude-sonnet-4-5-20250929",
+    "vp-utility": "claude-haiku-4-5-20251001",
+}
+
+
+def _settings_model(data: dict, role: str = "chat") -> str:
+    """Extract the model for a role (chat/util) from A0 settings in any known layout."""
+    if role in data and isinstance(data[role], dict) and "model" in data[role]:
+        return data[role]["model"]
+    return data.get(f"{role}_model_name") or data.get(f"{role}_model") or ""
+
 
 class VibeProxyConfig(BaseModel):
     """Main configuration for VibeProxy Manager."""
 
     mac_user: str = "danielba"
     mac_ip: str = "192.168.50.70"
+    mac_hosts: list[str] = Field(default_factory=list)
     local_port: int = 8317
     remote_port: int = 8317
+    relay_port: int = 8318
+    daemon_port: int = 8319
+    daemon_socket: str = ""
+    tunnel_pool_size: int = 1
+    ssh_control_master: bool = False  # Opt-in: stop() then leaves the master running
+    ssh_profiles: dict[str, str] = Field(default_factory=dict)
+    scan_networks: list[str] = Field(default_factory=list)
+    mdns_discovery: bool = True
+    relay_compression: bool = True
+    journal_enabled: bool = False
+    shadow_model: str = ""
+    shadow_primary_model: str = ""
+    shadow_sample_rate: float = 0.0
+    journal_dir: str = "journal"
     ssh_password: str = ""
     favorites: list[str] = Field(default_factory=list)
     disabled_models: list[str] = Field(default_factory=list)
     max_tokens: int = 500
+    model_aliases: dict[str, str] = Field(
+        default_factory=lambda: dict(DEFAULT_MODEL_ALIASES)
+    )
 
 
 class ConfigManager:
@@ -52,12 +83,62 @@ class ConfigManager:
                         "MacUser", data.get("mac_user", config.mac_user)
                     ),
                     "mac_ip": data.get("MacIP", data.get("mac_ip", config.mac_ip)),
+                    "mac_hosts": data.get("MacHosts", data.get("mac_hosts", [])),
                     "local_port": data.get(
                         "LocalPort", data.get("local_port", config.local_port)
                     ),
                     "remote_port": data.get(
                         "RemotePort", data.get("remote_port", config.remote_port)
                     ),
+                    "relay_port": data.get(
+                        "RelayPort", data.get("relay_port", config.relay_port)
+                    ),
+                    "daemon_port": data.get(
+                        "DaemonPort", data.get("daemon_port", config.daemon_port)
+                    ),
+                    "daemon_socket": data.get(
+                        "DaemonSocket", data.get("daemon_socket", config.daemon_socket)
+                    ),
+                    "tunnel_pool_size": data.get(
+                        "TunnelPoolSize",
+                        data.get("tunnel_pool_size", config.tunnel_pool_size),
+                    ),
+                    "ssh_control_master": data.get(
+                        "SSHControlMaster",
+                        data.get("ssh_control_master", config.ssh_control_master),
+                    ),
+                    "ssh_profiles": data.get(
+                        "SSHProfiles", data.get("ssh_profiles", {})
+                    ),
+                    "scan_networks": data.get(
+                        "ScanNetworks", data.get("scan_networks", [])
+                    ),
+                    "mdns_discovery": data.get(
+                        "MDNSDiscovery",
+                        data.get("mdns_discovery", config.mdns_discovery),
+                    ),
+                    "relay_compression": data.get(
+                        "RelayCompression",
+                        data.get("relay_compression", config.relay_compression),
+                    ),
+                    "journal_enabled": data.get(
+                        "JournalEnabled",
+                        data.get("journal_enabled", config.journal_enabled),
+                    ),
+                    "journal_dir": data.get(
+                        "JournalDir", data.get("journal_dir", config.journal_dir)
+                    ),
+                    "shadow_model": data.get(
+                        "ShadowModel", data.get("shadow_model", config.shadow_model)
+                    ),
+                    "shadow_primary_model": data.get(
+                        "ShadowPrimaryModel",
+                        data.get("shadow_primary_model", config.shadow_primary_model),
+                    ),
+                    "shadow_sample_rate": data.get(
+                        "ShadowSampleRate",
+                        data.get("shadow_sample_rate", config.shadow_sample_rate),
+                    ),
                     "ssh_password": data.get(
                         "SSHPassword", data.get("ssh_password", config.ssh_password)
                     ),
@@ -68,6 +149,9 @@ class ConfigManager:
                     "max_tokens": data.get(
                         "MaxTokens", data.get("max_tokens", config.max_tokens)
                     ),
+                    "model_aliases": data.get(
+                        "ModelAliases", data.get("model_aliases", config.model_aliases)
+                    ),
                 }
                 config = VibeProxyConfig(**mapped)
             except (json.JSONDecodeError, Exception):
@@ -76,6 +160,11 @@ class ConfigManager:
         self._config = config
         return config
 
+    def reload(self) -> VibeProxyConfig:
+        """Drop the cached config and read it from disk again."""
+        self._config = None
+        return self.load()
+
     def save(self, config: Optional[VibeProxyConfig] = None) -> None:
         """Save configuration to file."""
         if config is None:
@@ -85,12 +174,28 @@ class ConfigManager:
         data = {
             "MacUser": config.mac_user,
             "MacIP": config.mac_ip,
+            "MacHosts": config.mac_hosts,
             "LocalPort": config.local_port,
             "RemotePort": config.remote_port,
+            "RelayPort": config.relay_port,
+            "DaemonPort": config.daemon_port,
+            "DaemonSocket": config.daemon_socket,
+            "TunnelPoolSize": config.tunnel_pool_size,
+            "SSHControlMaster": config.ssh_control_master,
+            "SSHProfiles": config.ssh_profiles,
+            "ScanNetworks": config.scan_networks,
+            "MDNSDiscovery": config.mdns_discovery,
+            "RelayCompression": config.relay_compression,
+            "JournalEnabled": config.journal_enabled,
+            "JournalDir": config.journal_dir,
+            "ShadowModel": config.shadow_model,
+            "ShadowPrimaryModel": config.shadow_primary_model,
+            "ShadowSampleRate": config.shadow_sample_rate,
             "SSHPassword": config.ssh_password,
             "Favorites": config.favorites,
             "DisabledModels": config.disabled_models,
             "MaxTokens": config.max_tokens,
+            "ModelAliases": config.model_aliases,
         }
 
         self.config_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
@@ -107,11 +212,7 @@ class ConfigManager:
             try:
                 data = json.loads(path.read_text(encoding="utf-8"))
                 # Extract model from settings
-                model = ""
-                if "chat" in data and "model" in data["chat"]:
-                    model = data["chat"]["model"]
-                elif "chat_model" in data:
-                    model = data["chat_model"]
+                model = _settings_model(data, "chat")
 
                 # Parse name from filename (a0-gpt-5.2-codex.json -> GPT-5.2 Codex)
                 name = path.stem.replace("a0-", "").replace("-", " ").title()
@@ -121,6 +222,7 @@ class ConfigManager:
                         name=name,
                         path=str(path),
                         model=model,
+                        util_model=_settings_model(data, "util"),
                         description=f"Uses {model}" if model else "",
                     )
                 )
@@ -136,16 +238,12 @@ class ConfigManager:
 
         try:
             data = json.loads(self.a0_settings_path.read_text(encoding="utf-8"))
-            model = ""
-            if "chat" in data and "model" in data["chat"]:
-                model = data["chat"]["model"]
-            elif "chat_model" in data:
-                model = data["chat_model"]
 
             return A0Config(
                 name="Current",
                 path=str(self.a0_settings_path),
-                model=model,
+                model=_settings_model(data, "chat"),
+                util_model=_settings_model(data, "util"),
             )
         except Exception:
             return None
@@ -189,6 +287,50 @@ class ConfigManager:
         except Exception:
             return False
 
+    # Routing aliases (zero-restart model switching via the relay)
+    def get_model_aliases(self) -> dict[str, str]:
+        """Get alias -> concrete model mapping."""
+        return dict(self.load().model_aliases)
+
+    def set_model_alias(self, alias: str, model_id: str) -> None:
+        """Point an alias at a concrete model (picked up live by the relay).
+
+        Re-reads the file first: the relay and the TUI both write aliases, and
+        saving a stale copy would undo the other process's edits.
+        """
+        config = self.reload()
+        config.model_aliases[alias] = model_id
+        self.save(config)
+
+    def a0_uses_aliases(self) -> bool:
+        """Check if the active A0 settings route through a model alias."""
+        current = self.get_current_a0_config()
+        return bool(current and current.model in self.load().model_aliases)
+
+    def switch_a0_model_via_aliases(self, config: A0Config) -> tuple[bool, str]:
+        """Switch A0 models by remapping aliases instead of rewriting settings.
+
+        Only possible when A0 already points at alias IDs; the running relay
+        resolves aliases per request, so no container restart is needed.
+
+        Returns:
+            tuple[bool, str]: (switched, message). False means fall back to
+            apply_a0_config + restart.
+        """
+        current = self.get_current_a0_config()
+        aliases = self.load().model_aliases
+        if not current or current.model not in aliases or not config.model:
+            return False, "A0 is not using model aliases"
+        if config.model in aliases:
+            return False, "Preset itself uses aliases"
+
+        self.set_model_alias(current.model, config.model)
+        message = f"{current.model} → {config.model}"
+        if current.util_model in aliases and config.util_model and config.util_model not in aliases:
+            self.set_model_alias(current.util_model, config.util_model)
+            message += f", {current.util_model} → {config.util_model}"
+        return True, message
+
     def create_config_for_model(self, model_id: str) -> Optional[Path]:
         """Create a new A0 config preset for a specific model."""
         # Template for new config
@@ -0,0 +1,586 @@
+"""Headless tunnel daemon with a local control API.
+
+Until now the TUI started ``ssh-tunnel-intelligent.py`` in a separate
+PowerShell window. After that it knew only the window's PID and had to guess
+tunnel health from port probes. With the daemon, a single long-running
+process owns the tunnel. ``TunnelSupervisor`` keeps the tunnel up and
+``TunnelProber`` measures it, and ``NetworkWatcher`` has the tunnel
+re-validated the moment the network changes. The daemon answers small JSON requests on a
+localhost port, or on a Unix socket on POSIX. The TUI and the scripts are
+thin clients that ask the daemon for state, which is immediate and accurate.
+
+Endpoints:
+    GET  /status    Tunnel, supervisor and quality state
+    POST /start     Start supervising; waits until the tunnel is up
+    POST /stop      Stop supervising and close the tunnel
+    GET  /events    Recent supervisor events
+    GET  /metrics   Prometheus text exposition
+    POST /shutdown  Stop the tunnel and exit
+
+Usage:
+    vibeproxy-daemon run                      # serve in the foreground
+    vibeproxy-daemon start|stop|status|metrics|shutdown
+"""
+
+import argparse
+import asyncio
+import errno
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from . import metrics
+from .config import ConfigManager
+from .netwatch import NetworkWatcher
+from .quality import TunnelProber
+from .relay import RelayRequest, read_request
+from .supervisor import TunnelSupervisor
+from .tunnel import TunnelManager
+
+# How long POST /start waits for the tunnel by default, in seconds
+DEFAULT_START_TIMEOUT = 30.0
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+
+class TunnelDaemon:
+    """Own the tunnel and serve the control API."""
+
+    def __init__(
+        self,
+        config_manager: Optional[ConfigManager] = None,
+        host: str = "127.0.0.1",
+        port: Optional[int] = None,
+        socket_path: Optional[str] = None,
+        tunnel: Optional[TunnelManager] = None,
+        probe_quality: bool = True,
+        watch_network: bool = True,
+    ):
+        """Initialize.
+
+        Args:
+            config_manager: Config source (default: vibeproxy-config.json)
+            host: Control API listen address (TCP)
+            port: Control API port (default: DaemonPort; 0 picks a free one)
+            socket_path: Serve on this Unix socket instead of TCP (POSIX only)
+            tunnel: Tunnel to own (default: a TunnelManager on the same config)
+            probe_quality: Run the quality prober (restarts tunnels that stop
+                passing traffic even though ssh is still running)
+            watch_network: Re-validate the tunnel on network changes and wake
+                from sleep
+        """
+        self.config_manager = config_manager or ConfigManager()
+        config = self.config_manager.load()
+        self.host = host
+        self.port = config.daemon_port if port is None else port
+        self.socket_path = socket_path
+        self.tunnel = tunnel or TunnelManager(self.config_manager)
+        self.prober = TunnelProber(self.tunnel.port) if probe_quality else None
+        self.network = NetworkWatcher() if watch_network else None
+        self.supervisor = TunnelSupervisor(
+            self.tunnel, prober=self.prober, network=self.network, on_event=self._on_event
+        )
+        self.events: deque[dict] = deque(maxlen=100)
+        self.started_at = time.time()
+        self._task: Optional[asyncio.Task] = None
+        self._up = asyncio.Event()
+        self._shutdown = asyncio.Event()
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def supervising(self) -> bool:
+        """Whether the supervisor is currently running."""
+        return self._task is not None and not self._task.done()
+
+    def _on_event(self, kind: str, message: str) -> None:
+        """Keep supervisor events and track up/down for waiting clients."""
+        self.events.append({"at": time.time(), "kind": kind, "message": message})
+        if kind == "up":
+            self._up.set()
+        elif kind == "down":
+            self._up.clear()
+
+    def status(self) -> dict:
+        """JSON-ready snapshot of everything the daemon knows (never probes)."""
+        snapshot = self.tunnel.liveness.snapshot
+        outage = self.supervisor.current_outage
+        last_exit = self.tunnel.last_exit
+        network_change = self.network.last_change if self.network is not None else None
+        return {
+            "daemon_pid": os.getpid(),
+            "uptime": time.time() - self.started_at,
+            "supervising": self.supervising,
+            "up": snapshot.up,
+            "message": snapshot.message,
+            "port": self.tunnel.port,
+            "mac": f"{self.tunnel.mac_user}@{self.tunnel.mac_ip}",
+            "ssh_pid": self.tunnel.pid,
+            "quality": self.prober.state if self.prober is not None else "unknown",
+            "quality_detail": self.prober.describe() if self.prober is not None else "",
+            "outages": len(self.supervisor.outages),
+            "mttr": self.supervisor.mttr,
+            "down_for": time.monotonic() - outage.started if outage is not None else None,
+            "last_error": self.tunnel.last_error,
+            "last_exit": last_exit.model_dump() if last_exit is not None else None,
+            "network_watch": self.network.mode if self.network is not None else "off",
+            "last_network_change": (
+                network_change.model_dump() if network_change is not None else None
+            ),
+            "last_event": self.events[-1] if self.events else None,
+        }
+
+    async def _supervise(self) -> bool:
+        """Run the supervisor (with prober and network watch) until stopped or it gives up."""
+        if self.prober is not None:
+            self.prober.start()
+        if self.network is not None:
+            self.network.start()
+        try:
+            return await self.supervisor.run()
+        finally:
+            self._up.clear()
+            if self.prober is not None:
+                await self.prober.stop()
+            if self.network is not None:
+                await self.network.stop()
+
+    async def start_tunnel(self, timeout: float = DEFAULT_START_TIMEOUT) -> tuple[bool, str]:
+        """Start supervising and wait until the tunnel is up.
+
+        Returns (success, message). A timeout leaves the supervisor retrying
+        in the background.
+        """
+        if not self.supervising:
+            self._up.clear()
+            self._task = asyncio.get_running_loop().create_task(self._supervise())
+        elif self._up.is_set():
+            return True, f"Tunnel already running on port {self.tunnel.port}"
+
+        up_waiter = asyncio.ensure_future(self._up.wait())
+        try:
+            await asyncio.wait(
+                {up_waiter, self._task}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            up_waiter.cancel()
+        if self._up.is_set():
+            return True, f"Tunnel up on port {self.tunnel.port}"
+        if self._task.done():
+            last = self.events[-1]["message"] if self.events else "supervisor stopped"
+            return False, f"Tunnel failed to start: {last}"
+        return False, f"Tunnel not up after {timeout:.0f}s (still retrying)"
+
+    async def stop_tunnel(self) -> tuple[bool, str]:
+        """Stop supervising and close the tunnel."""
+        if self.supervising:
+            self.supervisor.stop()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        return await self.tunnel.astop()
+
+    async def _dispatch(self, request: RelayRequest) -> tuple[int, object]:
+        """Handle one control request; returns (status, JSON body or text)."""
+        path = request.target.split("?")[0].rstrip("/") or "/"
+        route = (request.method, path)
+        if route == ("GET", "/status"):
+            return 200, self.status()
+        if route == ("GET", "/events"):
+            return 200, list(self.events)
+        if route == ("GET", "/metrics"):
+            return 200, metrics.REGISTRY.render()
+        if route == ("POST", "/start"):
+            options = request.json() or {}
+            try:
+                timeout = float(options.get("timeout", DEFAULT_START_TIMEOUT))
+            except (TypeError, ValueError):
+                return 400, {"ok": False, "message": "timeout must be a number"}
+            success, message = await self.start_tunnel(timeout)
+            return 200, {"ok": success, "message": message, "status": self.status()}
+        if route == ("POST", "/stop"):
+            success, message = await self.stop_tunnel()
+            return 200, {"ok": success, "message": message, "status": self.status()}
+        if route == ("POST", "/shutdown"):
+            self._shutdown.set()
+            return 200, {"ok": True, "message": "Daemon shutting down"}
+        return 404, {"ok": False, "message": f"Unknown endpoint: {request.method} {path}"}
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve control requests on one connection until it closes."""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    await _send(writer, 400, {"ok": False, "message": "Bad Request"})
+                    break
+                if request is None:
+                    break
+                status, body = await self._dispatch(request)
+                await _send(writer, status, body)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def start(self) -> None:
+        """Bind the control socket and start watching tunnel liveness."""
+        if self.socket_path:
+            await self._claim_socket()
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, self.socket_path
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, self.host, self.port
+            )
+            # Pick up the real port when bound to port 0 (tests)
+            self.port = self._server.sockets[0].getsockname()[1]
+        self.tunnel.liveness.start()
+
+    async def _claim_socket(self) -> None:
+        """Remove a stale socket file, refusing if a daemon still answers on it."""
+        path = Path(self.socket_path)
+        if not path.exists():
+            return
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_unix_connection(str(path)), 2.0)
+        except (OSError, asyncio.TimeoutError):
+            # Left behind by a daemon that died without cleaning up
+            path.unlink(missing_ok=True)
+            return
+        writer.close()
+        raise OSError(errno.EADDRINUSE, f"Another tunnel daemon is listening on {path}")
+
+    async def serve_forever(self) -> None:
+        """Serve until POST /shutdown (or cancellation), then clean up."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._shutdown.wait()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop the tunnel we own and stop listening."""
+        if self.supervising or self.tunnel.owns_process:
+            await self.stop_tunnel()
+        await self.tunnel.liveness.stop()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self.socket_path:
+            Path(self.socket_path).unlink(missing_ok=True)
+
+
+async def _send(writer: asyncio.StreamWriter, status: int, body: object) -> None:
+    """Send a complete response: text as-is, anything else as JSON."""
+    if isinstance(body, str):
+        payload, content_type = body.encode(), "text/plain; version=0.0.4"
+    else:
+        payload, content_type = json.dumps(body).encode(), "application/json"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + payload)
+    await writer.drain()
+
+
+class DaemonClient:
+    """Thin client for the daemon's control API."""
+
+    def __init__(
+        self,
+        port: int = 8319,
+        socket_path: Optional[str] = None,
+        base_path: Optional[Path] = None,
+        timeout: float = 5.0,
+    ):
+        """Initialize.
+
+        Args:
+            port: Daemon control port on localhost
+            socket_path: Talk to the daemon over this Unix socket instead
+            base_path: Config directory passed to a daemon started by spawn()
+            timeout: Seconds to wait for quick requests
+        """
+        self.port = port
+        self.socket_path = socket_path
+        self.base_path = base_path
+        self.timeout = timeout
+        # Last /status answer (None = no daemon) and when it came, kept fresh by watch()
+        self.last_status: Optional[dict] = None
+        self.status_at: Optional[float] = None
+        self._watch: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, config_manager: Optional[ConfigManager] = None) -> "DaemonClient":
+        """Client for the daemon configured in vibeproxy-config.json."""
+        config_manager = config_manager or ConfigManager()
+        config = config_manager.load()
+        return cls(
+            port=config.daemon_port,
+            socket_path=config.daemon_socket or None,
+            base_path=config_manager.base_path,
+        )
+
+    @property
+    def address(self) -> str:
+        """Where the daemon is expected to listen."""
+        return self.socket_path or f"127.0.0.1:{self.port}"
+
+    async def request(
+        self, method: str, path: str, body: Optional[dict] = None, timeout: Optional[float] = None
+    ) -> Optional[httpx.Response]:
+        """Send one request; None if the daemon is not reachable."""
+        if self.socket_path:
+            transport = httpx.AsyncHTTPTransport(uds=self.socket_path)
+            base_url = "http://vibeproxy-daemon"
+        else:
+            transport = None
+            base_url = f"http://127.0.0.1:{self.port}"
+        async with httpx.AsyncClient(
+            base_url=base_url, transport=transport, timeout=timeout or self.timeout
+        ) as client:
+            try:
+                return await client.request(method, path, json=body)
+            except httpx.TransportError:
+                return None
+
+    async def status(self) -> Optional[dict]:
+        """The daemon's status, or None if no daemon is running."""
+        response = await self.request("GET", "/status")
+        data = None
+        if response is not None:
+            try:
+                data = response.json()
+            except ValueError:
+                # Something else answers on this port: not our daemon
+                data = None
+        self.last_status = data if isinstance(data, dict) else None
+        self.status_at = time.monotonic()
+        return self.last_status
+
+    def cached_status(self, max_age: float = 15.0) -> Optional[dict]:
+        """Last known status (O(1), never connects); None if none is this recent."""
+        if self.status_at is None or time.monotonic() - self.status_at > max_age:
+            return None
+        return self.last_status
+
+    async def watch(self, interval: float = 5.0) -> None:
+        """Refresh the cached status every ``interval`` seconds."""
+        while True:
+            await self.status()
+            await asyncio.sleep(interval)
+
+    def start_watch(self, interval: float = 5.0) -> None:
+        """Keep cached_status() fresh in the background (needs a running loop)."""
+        if self._watch is None or self._watch.done():
+            self._watch = asyncio.get_running_loop().create_task(self.watch(interval))
+
+    async def stop_watch(self) -> None:
+        """Stop refreshing the cached status."""
+        if self._watch is not None:
+            self._watch.cancel()
+            await asyncio.gather(self._watch, return_exceptions=True)
+            self._watch = None
+
+    async def _command(
+        self, path: str, body: Optional[dict] = None, timeout: Optional[float] = None
+    ) -> tuple[bool, str]:
+        """POST a command and return (success, message)."""
+        response = await self.request("POST", path, body, timeout)
+        try:
+            data = response.json() if response is not None else None
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return False, f"Tunnel daemon not running ({self.address})"
+        return bool(data.get("ok")), data.get("message", "")
+
+    async def start_tunnel(
+        self, timeout: float = DEFAULT_START_TIMEOUT, spawn: bool = True
+    ) -> tuple[bool, str]:
+        """Ask the daemon to bring the tunnel up, starting the daemon if needed."""
+        if spawn and not await self.ensure_running():
+            return False, f"Could not start the tunnel daemon ({self.address})"
+        # The reply comes once the tunnel is up, so allow for the whole wait
+        return await self._command("/start", {"timeout": timeout}, timeout + self.timeout)
+
+    async def stop_tunnel(self) -> tuple[bool, str]:
+        """Ask the daemon to stop supervising and close the tunnel."""
+        return await self._command("/stop", timeout=self.timeout + 5.0)
+
+    async def shutdown(self) -> tuple[bool, str]:
+        """Ask the daemon to close the tunnel and exit."""
+        return await self._command("/shutdown")
+
+    async def metrics(self) -> Optional[str]:
+        """Prometheus text from the daemon, or None if it is not running."""
+        response = await self.request("GET", "/metrics")
+        return response.text if response is not None else None
+
+    def spawn(self) -> bool:
+        """Start a detached daemon process (no console window on Windows)."""
+        command = [sys.executable, "-m", "vibeproxy_manager.daemon", "run"]
+        if self.socket_path:
+            command += ["--socket", self.socket_path]
+        else:
+            command += ["--port", str(self.port)]
+        if self.base_path is not None:
+            command += ["--config-dir", str(self.base_path)]
+        log_dir = self.base_path or Path(__file__).parent.parent
+        if sys.platform == "win32":
+            options = {
+                "creationflags": subprocess.DETACHED_PROCESS
+                | subprocess.CREATE_NEW_PROCESS_GROUP
+            }
+        else:
+            options = {"start_new_session": True}
+        try:
+            with open(log_dir / "daemon.log", "ab") as log:
+                subprocess.Popen(
+                    command,
+                    cwd=str(Path(__file__).parent.parent),
+                    stdin=subprocess.DEVNULL,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    **options,
+                )
+        except OSError:
+            return False
+        return True
+
+    async def ensure_running(self, wait: float = 10.0) -> bool:
+        """Return True once a daemon answers, spawning one if none does."""
+        if await self.status() is not None:
+            return True
+        if not self.spawn():
+            return False
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.2)
+            if await self.status() is not None:
+                return True
+        return False
+
+
+def _print_status(status: dict) -> None:
+    """Print a daemon status in a few human-readable lines."""
+    state = "UP" if status["up"] else "DOWN"
+    print(f"Tunnel {state}: {status['message']} -> {status['mac']}")
+    supervising = "supervising" if status["supervising"] else "idle"
+    print(f"Daemon: pid {status['daemon_pid']}, {supervising}, up {status['uptime']:.0f}s")
+    if status["quality_detail"]:
+        print(f"Quality: {status['quality']} ({status['quality_detail']})")
+    if status["outages"]:
+        mttr = f"{status['mttr']:.1f}s" if status["mttr"] is not None else "n/a"
+        print(f"Outages: {status['outages']}, MTTR: {mttr}")
+    if status.get("last_network_change"):
+        change = status["last_network_change"]
+        print(f"Network ({status['network_watch']}): {change['reason']}")
+    if status["last_event"]:
+        print(f"Last event: {status['last_event']['kind']}: {status['last_event']['message']}")
+
+
+def main() -> None:
+    """Run the daemon (``run``) or talk to a running one."""
+    parser = argparse.ArgumentParser(description="VibeProxy headless tunnel daemon")
+    parser.add_argument(
+        "command",
+        choices=["run", "start", "stop", "status", "metrics", "shutdown"],
+        help="run = serve in the foreground; the others talk to a running daemon",
+    )
+    parser.add_argument("--config-dir", type=Path, help="Directory with vibeproxy-config.json")
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address for run")
+    parser.add_argument("--port", type=int, help="Control port (default: DaemonPort)")
+    parser.add_argument("--socket", help="Unix socket instead of a TCP port (POSIX)")
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_START_TIMEOUT, help="Seconds start waits"
+    )
+    parser.add_argument("--no-spawn", action="store_true", help="start: never launch a daemon")
+    parser.add_argument("--no-quality", action="store_true", help="run: skip quality probes")
+    parser.add_argument(
+        "--no-netwatch", action="store_true", help="run: ignore network changes"
+    )
+    parser.add_argument("--json", action="store_true", help="status: print raw JSON")
+    args = parser.parse_args()
+
+    config_manager = ConfigManager(args.config_dir)
+    config = config_manager.load()
+    port = config.daemon_port if args.port is None else args.port
+    socket_path = args.socket or config.daemon_socket or None
+
+    if args.command == "run":
+        daemon = TunnelDaemon(
+            config_manager,
+            host=args.host,
+            port=port,
+            socket_path=socket_path,
+            probe_quality=not args.no_quality,
+            watch_network=not args.no_netwatch,
+        )
+
+        async def serve() -> None:
+            await daemon.start()
+            where = daemon.socket_path or f"http://{daemon.host}:{daemon.port}"
+            print(f"Tunnel daemon listening on {where} (pid {os.getpid()})", flush=True)
+            await daemon.serve_forever()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        except OSError as error:
+            print(f"Cannot start tunnel daemon: {error}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    client = DaemonClient(port, socket_path, config_manager.base_path)
+    if args.command == "status":
+        status = asyncio.run(client.status())
+        if status is None:
+            print(f"Tunnel daemon not running ({client.address})")
+            sys.exit(1)
+        if args.json:
+            print(json.dumps(status, indent=2))
+        else:
+            _print_status(status)
+        sys.exit(0 if status["up"] else 1)
+    if args.command == "metrics":
+        text = asyncio.run(client.metrics())
+        if text is None:
+            print(f"Tunnel daemon not running ({client.address})", file=sys.stderr)
+            sys.exit(1)
+        print(text, end="")
+        return
+
+    if args.command == "start":
+        success, message = asyncio.run(client.start_tunnel(args.timeout, not args.no_spawn))
+    elif args.command == "stop":
+        success, message = asyncio.run(client.stop_tunnel())
+    else:
+        success, message = asyncio.run(client.shutdown())
+    print(message)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Last-known-good host index and neighbor-table seeding for Mac discovery.
+
+When the Mac changes IP, the likeliest places to find it are (1) whatever IP
+its MAC address now has in the OS neighbor/ARP table, and (2) addresses it
+has used before. The index remembers every host the tunnel has worked with,
+so discovery can probe a handful of candidates before sweeping a subnet.
+"""
+
+import json
+import platform
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+# Neighbor entries with these hardware addresses are incomplete/unusable
+_NULL_MACS = {"00:00:00:00:00:00", "ff:ff:ff:ff:ff:ff"}
+
+# "192.168.1.5 ... aa:bb:cc:dd:ee:ff" or Windows "192.168.1.5  aa-bb-cc-dd-ee-ff"
+_ARP_LINE = re.compile(
+    r"(?P<ip>\d{1,3}(?:\.\d{1,3}){3}).*?(?P<mac>(?:[0-9a-fA-F]{1,2}[:-]){5}[0-9a-fA-F]{1,2})"
+)
+
+
+def normalize_mac(mac: str) -> str:
+    """Lowercase, colon-separated, zero-padded MAC address."""
+    parts = re.split(r"[:-]", mac.strip().lower())
+    return ":".join(part.zfill(2) for part in parts)
+
+
+def _parse_proc_arp(text: str) -> dict[str, str]:
+    """Parse /proc/net/arp (Linux)."""
+    neighbors = {}
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        # IP, HW type, Flags, HW address, Mask, Device; flag 0x0 = incomplete
+        if len(fields) >= 4 and fields[2] != "0x0":
+            neighbors[fields[0]] = normalize_mac(fields[3])
+    return neighbors
+
+
+def _parse_arp_output(text: str) -> dict[str, str]:
+    """Parse `arp -a` output (macOS, Windows, BSD, net-tools)."""
+    neighbors = {}
+    for line in text.splitlines():
+        match = _ARP_LINE.search(line)
+        if match:
+            neighbors[match.group("ip")] = normalize_mac(match.group("mac"))
+    return neighbors
+
+
+def read_neighbors() -> dict[str, str]:
+    """IP -> MAC address map from the OS neighbor (ARP) table."""
+    neighbors: dict[str, str] = {}
+    proc_arp = Path("/proc/net/arp")
+    if proc_arp.exists():
+        try:
+            neighbors = _parse_proc_arp(proc_arp.read_text())
+        except OSError:
+            neighbors = {}
+    else:
+        kwargs = {}
+        if platform.system() == "Windows":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+        try:
+            result = subprocess.run(
+                ["arp", "-a"], capture_output=True, text=True, timeout=3, **kwargs
+            )
+            neighbors = _parse_arp_output(result.stdout)
+        except (OSError, subprocess.TimeoutExpired):
+            neighbors = {}
+    return {ip: mac for ip, mac in neighbors.items() if mac not in _NULL_MACS}
+
+
+class KnownHost(BaseModel):
+    """A host the tunnel has successfully used (or discovery confirmed)."""
+
+    ip: str
+    mac_address: str = ""
+    hostname: str = ""
+    last_seen: float = 0.0
+    ports: list[int] = []
+
+
+class HostIndex:
+    """Small persistent index of previously seen VibeProxy hosts."""
+
+    def __init__(self, path: Path, max_hosts: int = 32):
+        """Initialize, loading the index file if present."""
+        self.path = path
+        self.max_hosts = max_hosts
+        self.hosts: dict[str, KnownHost] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Read the index from disk (empty on missing/corrupt file)."""
+        self.hosts = {}
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for entry in data.get("hosts", []):
+                host = KnownHost(**entry)
+                self.hosts[host.ip] = host
+        except (json.JSONDecodeError, OSError, TypeError, ValueError):
+            self.hosts = {}
+
+    def save(self) -> None:
+        """Write the index to disk."""
+        data = {"hosts": [h.model_dump() for h in self.ranked()]}
+        self.path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    def ranked(self) -> list[KnownHost]:
+        """Known hosts, most recently seen first."""
+        return sorted(self.hosts.values(), key=lambda h: h.last_seen, reverse=True)
+
+    def is_known(self, ip: str, mac_address: str = "") -> bool:
+        """Whether ip (or, if given, the MAC address) belongs to a known host."""
+        if ip in self.hosts:
+            return True
+        mac_address = normalize_mac(mac_address) if mac_address else ""
+        return bool(mac_address) and any(
+            h.mac_address == mac_address for h in self.hosts.values()
+        )
+
+    def record(
+        self,
+        ip: str,
+        mac_address: str = "",
+        hostname: str = "",
+        ports: Optional[list[int]] = None,
+    ) -> KnownHost:
+        """Add or refresh a host and persist the index."""
+        mac_address = normalize_mac(mac_address) if mac_address else ""
+        if mac_address:
+            # The same machine at a new IP replaces its old entry
+            for old_ip, host in list(self.hosts.items()):
+                if host.mac_address == mac_address and old_ip != ip:
+                    hostname = hostname or host.hostname
+                    del self.hosts[old_ip]
+
+        host = self.hosts.get(ip) or KnownHost(ip=ip)
+        host.last_seen = time.time()
+        host.mac_address = mac_address or host.mac_address
+        host.hostname = hostname or host.hostname
+        if ports:
+            host.ports = sorted(set(ports))
+        self.hosts[ip] = host
+
+        for stale in self.ranked()[self.max_hosts:]:
+            del self.hosts[stale.ip]
+        self.save()
+        return host
+
+    def candidates(
+        self, neighbors: Optional[dict[str, str]] = None, exclude: tuple[str, ...] = ()
+    ) -> list[str]:
+        """IPs to probe first, likeliest first.
+
+        1. Neighbor-table IPs whose MAC belongs to a known host (moved Mac)
+        2. Known hosts' last IPs, most recent first
+        3. Remaining neighbor-table IPs (recently active on the LAN)
+        """
+        neighbors = neighbors if neighbors is not None else read_neighbors()
+        known_macs = {h.mac_address for h in self.ranked() if h.mac_address}
+
+        ordered: list[str] = []
+        for ip, mac in neighbors.items():
+            if mac in known_macs:
+                ordered.append(ip)
+        ordered.extend(h.ip for h in self.ranked())
+        ordered.extend(neighbors)
+
+        seen = set(exclude)
+        result = []
+        for ip in ordered:
+            if ip not in seen:
+                seen.add(ip)
+                result.append(ip)
+        return result
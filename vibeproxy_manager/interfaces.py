@@ -0,0 +1,310 @@
+"""Enumerate this machine's IPv4 interfaces with their real prefix lengths.
+
+The scanner used to find "its" address by connecting a UDP socket to
+8.8.8.8. On a network without a default route, that address does not exist.
+It also assumed every network was a /24. Here the interfaces are read from
+the operating system, so no route to the internet is needed:
+
+- Linux: one RTM_GETADDR netlink dump lists every address and its prefix.
+  ``/proc/net/route`` tells which interface carries the default route.
+- macOS/BSD: ``ifconfig`` and ``route -n get default``.
+- Windows: ``Get-NetIPAddress`` and ``Get-NetRoute``. The result is cached
+  until the host's address list changes, because PowerShell is slow to
+  start.
+
+If none of these works, the host name's addresses are returned with a
+guessed /24.
+"""
+
+import ipaddress
+import platform
+import re
+import socket
+import struct
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+PROC_NET_ROUTE = Path("/proc/net/route")
+
+# Interfaces of local containers and VMs: never where the Mac is
+VIRTUAL_PREFIXES = (
+    "docker",
+    "br-",
+    "veth",
+    "virbr",
+    "vboxnet",
+    "vmnet",
+    "lxcbr",
+    "lxdbr",
+    "cni",
+    "flannel",
+    "podman",
+)
+
+# Netlink constants (linux/netlink.h, linux/rtnetlink.h, linux/if_addr.h)
+_NLMSGHDR = struct.Struct("=IHHII")  # length, type, flags, sequence, port id
+_IFADDRMSG = struct.Struct("=BBBBI")  # family, prefix length, flags, scope, index
+_RTATTR = struct.Struct("=HH")  # length, type
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_RTM_NEWADDR = 20
+_RTM_GETADDR = 22
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_IFA_ADDRESS = 1
+_IFA_LOCAL = 2
+_IFA_LABEL = 3
+
+_RTF_UP = 0x1
+
+# "inet 192.168.1.5 netmask 0xffffff00" (BSD) / "inet addr:10.0.0.2  Mask:255.0.0.0" (old Linux)
+_INET_LINE = re.compile(r"\binet (?:addr:)?(\d+\.\d+\.\d+\.\d+)\s.*?\b(?:netmask|Mask)[ :](\S+)")
+
+# Windows results, keyed by the host name's addresses when they were read
+_windows_cache: dict[tuple[str, ...], list["LocalInterface"]] = {}
+
+
+class LocalInterface(BaseModel):
+    """One IPv4 address of this machine."""
+
+    name: str
+    address: str
+    prefix: int
+    default: bool = False  # Carries the default route
+
+    @property
+    def network(self) -> ipaddress.IPv4Network:
+        """The network the address belongs to."""
+        return ipaddress.ip_network(f"{self.address}/{self.prefix}", strict=False)
+
+    @property
+    def relevant(self) -> bool:
+        """Whether the Mac could be on this network (a LAN or VPN subnet)."""
+        ip = ipaddress.ip_address(self.address)
+        if ip.is_loopback or ip.is_link_local or self.prefix > 30:
+            return False
+        return not self.name.lower().startswith(VIRTUAL_PREFIXES)
+
+
+def _align(length: int) -> int:
+    """Netlink messages and attributes are 4-byte aligned."""
+    return (length + 3) & ~3
+
+
+def parse_address_dump(data: bytes) -> tuple[list[tuple[int, str, str, int]], bool]:
+    """IPv4 addresses in an RTM_GETADDR reply datagram.
+
+    Returns ([(interface index, label, address, prefix)], whether the dump ended).
+    """
+    found = []
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            return found, True
+        if msg_type in (_NLMSG_DONE, _NLMSG_ERROR):
+            return found, True
+        end = offset + length
+        body = offset + _NLMSGHDR.size
+        if msg_type == _RTM_NEWADDR and body + _IFADDRMSG.size <= end:
+            family, prefix, _, _, index = _IFADDRMSG.unpack_from(data, body)
+            attrs: dict[int, bytes] = {}
+            position = body + _IFADDRMSG.size
+            while position + _RTATTR.size <= end:
+                attr_length, attr_type = _RTATTR.unpack_from(data, position)
+                if attr_length < _RTATTR.size:
+                    break
+                attrs[attr_type] = data[position + _RTATTR.size : position + attr_length]
+                position += _align(attr_length)
+            # On point-to-point links IFA_ADDRESS is the peer; IFA_LOCAL is ours
+            raw = attrs.get(_IFA_LOCAL) or attrs.get(_IFA_ADDRESS)
+            if family == socket.AF_INET and raw is not None and len(raw) == 4:
+                label = attrs.get(_IFA_LABEL, b"").split(b"\0")[0].decode(errors="replace")
+                found.append((index, label, socket.inet_ntoa(raw), prefix))
+        offset += _align(length)
+    return found, False
+
+
+def parse_default_route(text: str) -> Optional[str]:
+    """Interface of the lowest-metric default route in /proc/net/route content."""
+    best: Optional[tuple[int, str]] = None
+    for line in text.splitlines()[1:]:
+        # Iface Destination Gateway Flags RefCnt Use Metric Mask MTU Window IRTT
+        fields = line.split()
+        if len(fields) < 8 or fields[1] != "00000000" or fields[7] != "00000000":
+            continue
+        if not int(fields[3], 16) & _RTF_UP:
+            continue
+        metric = int(fields[6])
+        if best is None or metric < best[0]:
+            best = (metric, fields[0])
+    return best[1] if best is not None else None
+
+
+def parse_ifconfig(text: str) -> list[tuple[str, str, int]]:
+    """(interface, address, prefix) for each ``inet`` line of ifconfig output.
+
+    Accepts the BSD form (``netmask 0xffffff00``) and the net-tools form
+    (``netmask 255.255.255.0``).
+    """
+    found = []
+    name = ""
+    for line in text.splitlines():
+        if line and not line[0].isspace():
+            name = line.split(":")[0].split()[0]
+            continue
+        match = _INET_LINE.search(line)
+        if not match:
+            continue
+        address, mask = match.groups()
+        try:
+            netmask = int(mask, 16) if mask.startswith("0x") else int(ipaddress.ip_address(mask))
+        except ValueError:
+            continue
+        found.append((name, address, bin(netmask).count("1")))
+    return found
+
+
+def parse_route_get(text: str) -> Optional[str]:
+    """Interface named in ``route -n get default`` output."""
+    match = re.search(r"^\s*interface:\s*(\S+)", text, re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def _run(args: list[str]) -> str:
+    """Command output ("" if it could not run)."""
+    try:
+        result = subprocess.run(args, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return result.stdout
+
+
+def _netlink_interfaces() -> Optional[list[LocalInterface]]:
+    """Addresses from an RTM_GETADDR dump (Linux); None if netlink is unavailable."""
+    if not hasattr(socket, "AF_NETLINK"):
+        return None
+    request = _NLMSGHDR.pack(
+        _NLMSGHDR.size + _IFADDRMSG.size, _RTM_GETADDR, _NLM_F_REQUEST | _NLM_F_DUMP, 1, 0
+    ) + _IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0)
+    entries = []
+    try:
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, 0) as sock:
+            sock.settimeout(1.0)
+            sock.bind((0, 0))
+            sock.send(request)
+            done = False
+            while not done:
+                found, done = parse_address_dump(sock.recv(65536))
+                entries += found
+    except OSError:
+        return None
+
+    try:
+        default = parse_default_route(PROC_NET_ROUTE.read_text())
+    except OSError:
+        default = None
+    interfaces = []
+    for index, label, address, prefix in entries:
+        if not label:
+            try:
+                label = socket.if_indextoname(index)
+            except OSError:
+                pass
+        # Alias labels ("eth0:1") share the device's routes
+        device = label.split(":")[0]
+        interfaces.append(
+            LocalInterface(
+                name=label, address=address, prefix=prefix, default=device == default
+            )
+        )
+    return interfaces
+
+
+def _ifconfig_interfaces() -> Optional[list[LocalInterface]]:
+    """Addresses from ifconfig (macOS/BSD); None if ifconfig is missing."""
+    output = _run(["ifconfig"])
+    if not output:
+        return None
+    default = parse_route_get(_run(["route", "-n", "get", "default"]))
+    return [
+        LocalInterface(name=name, address=address, prefix=prefix, default=name == default)
+        for name, address, prefix in parse_ifconfig(output)
+    ]
+
+
+def parse_windows_addresses(text: str) -> list[LocalInterface]:
+    """Interfaces from the PowerShell listing in _windows_interfaces()."""
+    default = None
+    rows = []
+    for line in text.splitlines():
+        head, _, rest = line.strip().partition("|")
+        if head == "default":
+            default = rest
+            continue
+        prefix, _, alias = rest.partition("|")
+        try:
+            ipaddress.IPv4Address(head)
+        except ValueError:
+            continue
+        if prefix.isdigit():
+            rows.append((alias, head, int(prefix)))
+    return [
+        LocalInterface(name=alias, address=address, prefix=prefix, default=alias == default)
+        for alias, address, prefix in rows
+    ]
+
+
+def _windows_interfaces() -> Optional[list[LocalInterface]]:
+    """Addresses from Get-NetIPAddress (Windows), cached while the address list is unchanged."""
+    key = tuple(sorted(_hostname_addresses()))
+    if key in _windows_cache:
+        return _windows_cache[key]
+    output = _run(
+        [
+            "powershell",
+            "-Command",
+            "Get-NetIPAddress -AddressFamily IPv4 -ErrorAction SilentlyContinue | "
+            'ForEach-Object { "$($_.IPAddress)|$($_.PrefixLength)|$($_.InterfaceAlias)" }; '
+            '"default|" + (Get-NetRoute -DestinationPrefix 0.0.0.0/0 -ErrorAction SilentlyContinue'
+            " | Sort-Object RouteMetric | Select-Object -First 1 -ExpandProperty InterfaceAlias)",
+        ]
+    )
+    if not output:
+        return None
+    _windows_cache.clear()
+    _windows_cache[key] = parse_windows_addresses(output)
+    return _windows_cache[key]
+
+
+def _hostname_addresses() -> list[str]:
+    """IPv4 addresses the host name resolves to."""
+    try:
+        infos = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)
+    except OSError:
+        return []
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+def local_interfaces() -> list[LocalInterface]:
+    """This machine's IPv4 addresses, the default-route interface first.
+
+    Never sends a packet and works without any route to the internet.
+    """
+    system = platform.system()
+    if system == "Windows":
+        interfaces = _windows_interfaces()
+    elif system == "Linux":
+        interfaces = _netlink_interfaces()
+    else:
+        interfaces = _ifconfig_interfaces()
+    if not interfaces:
+        # Last resort: the prefix is unknown, so guess the common /24
+        interfaces = [
+            LocalInterface(name="", address=address, prefix=24)
+            for address in _hostname_addresses()
+        ]
+    return sorted(interfaces, key=lambda interface: not interface.default)
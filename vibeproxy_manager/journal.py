@@ -0,0 +1,286 @@
+"""Opt-in traffic journal for the local relay.
+
+Each relayed request/response pair is written as one JSON line into gzip
+files that rotate by size. Secrets (auth headers, API keys, passwords) are
+redacted before anything touches disk. Writing happens on a background
+thread so the relay's event loop never waits on compression or disk I/O.
+The queue in front of that thread is bounded: if the disk cannot keep up,
+entries are dropped (and counted) rather than piling up in memory.
+"""
+
+import gzip
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DROPPED = metrics.REGISTRY.counter(
+    "vibeproxy_journal_dropped_total",
+    "Journal entries lost because the queue was full or the write failed.",
+    ("reason",),
+)
+
+JOURNAL_VERSION = 1
+REDACTED = "[REDACTED]"
+
+# Header names whose values are always secrets
+SECRET_HEADERS = {
+    "authorization",
+    "proxy-authorization",
+    "x-api-key",
+    "api-key",
+    "cookie",
+    "set-cookie",
+}
+
+# JSON keys whose values are secrets (matched case-insensitively)
+SECRET_KEY_PATTERN = re.compile(
+    r"(api[_-]?key|secret|password|passwd|authorization|access[_-]?token|refresh[_-]?token)",
+    re.IGNORECASE,
+)
+
+# Bearer-style key material that can appear inside free text
+SECRET_VALUE_PATTERN = re.compile(r"\b(sk-[A-Za-z0-9_\-]{16,}|Bearer\s+[A-Za-z0-9._\-]{16,})")
+
+# Response bodies larger than this are truncated in the journal
+MAX_JOURNAL_BODY = 1024 * 1024
+
+
+def redact_headers(headers: dict[str, str]) -> dict[str, str]:
+    """Return a copy of headers with secret values replaced."""
+    return {
+        name: (REDACTED if name.lower() in SECRET_HEADERS else value)
+        for name, value in headers.items()
+    }
+
+
+def redact_value(value: Any) -> Any:
+    """Recursively redact secret keys and key-like strings in JSON data."""
+    if isinstance(value, dict):
+        return {
+            key: (REDACTED if SECRET_KEY_PATTERN.search(str(key)) else redact_value(item))
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact_value(item) for item in value]
+    if isinstance(value, str):
+        return SECRET_VALUE_PATTERN.sub(REDACTED, value)
+    return value
+
+
+def redact_body(body: bytes) -> str:
+    """Decode a body for the journal, redacting JSON secrets when possible."""
+    text = body.decode("utf-8", errors="replace")
+    try:
+        return json.dumps(redact_value(json.loads(text)), ensure_ascii=False)
+    except ValueError:
+        return SECRET_VALUE_PATTERN.sub(REDACTED, text)
+
+
+class TrafficJournal:
+    """Rotating, gzip-compressed JSONL journal of relayed traffic."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = 50 * 1024 * 1024,
+        max_files: int = 10,
+        max_queue: int = 1000,
+        flush_interval: float = 1.0,
+    ):
+        """Initialize journal directory and rotation limits.
+
+        Args:
+            directory: Where journal files are written
+            max_bytes: Uncompressed bytes per file before rotating
+            max_files: Oldest files beyond this count are deleted
+            max_queue: Entries waiting for the writer before new ones are dropped
+            flush_interval: Seconds between flushes of the gzip stream (flushing
+                every line would cost most of the compression)
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._file: Optional[gzip.GzipFile] = None
+        self._written = 0
+        self._sequence = 0
+        self._dirty = False
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="traffic_journal", daemon=True
+        )
+        self._thread.start()
+
+    def record(
+        self,
+        *,
+        method: str,
+        path: str,
+        model: str,
+        client: str,
+        request_headers: dict[str, str],
+        request_body: bytes,
+        status: int,
+        response_headers: dict[str, str],
+        response_body: bytes,
+        started_at: float,
+        ttfb: Optional[float],
+        duration: float,
+    ) -> None:
+        """Queue one exchange for writing (never blocks; dropped if the queue is full)."""
+        if self._thread is None:
+            self.start()
+        entry = {
+            "method": method,
+            "path": path,
+            "model": model,
+            "client": client,
+            "request_headers": request_headers,
+            "request_body": request_body,
+            "status": status,
+            "response_headers": response_headers,
+            "response_body": response_body,
+            "ts": started_at,
+            "ttfb": ttfb,
+            "duration": duration,
+        }
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            JOURNAL_DROPPED.inc("queue_full")
+
+    def close(self) -> None:
+        """Flush queued entries and stop the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            # The stop marker must get through even if the queue is full
+            self._queue.put(None, timeout=10)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=10)
+        self._thread = None
+
+    def _writer_loop(self) -> None:
+        """Drain the queue, redacting and writing entries; flush when idle."""
+        try:
+            while True:
+                try:
+                    raw = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    self._flush()
+                    continue
+                if raw is None:
+                    break
+                try:
+                    self._write(self._build_entry(raw))
+                except Exception as e:
+                    # One bad entry or a full disk must not end the journal
+                    JOURNAL_DROPPED.inc("error")
+                    logger.warning("Traffic journal write failed: %s", e)
+                    if isinstance(e, OSError):
+                        self._close_file()
+        finally:
+            self._close_file()
+
+    def _flush(self) -> None:
+        """Push buffered lines to disk so readers see them."""
+        if self._file is None or not self._dirty:
+            return
+        try:
+            self._file.flush()
+            self._dirty = False
+        except OSError as e:
+            logger.warning("Traffic journal flush failed: %s", e)
+            self._close_file()
+
+    def _close_file(self) -> None:
+        """Close the current file (the next write opens a new one)."""
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+        self._dirty = False
+
+    def _build_entry(self, raw: dict) -> dict:
+        """Redact and serialise a queued exchange."""
+        response_body = raw["response_body"]
+        truncated = len(response_body) > MAX_JOURNAL_BODY
+        entry = dict(raw)
+        entry.update(
+            v=JOURNAL_VERSION,
+            request_headers=redact_headers(raw["request_headers"]),
+            request_body=redact_body(raw["request_body"]),
+            response_headers=redact_headers(raw["response_headers"]),
+            response_body=redact_body(response_body[:MAX_JOURNAL_BODY]),
+            response_truncated=truncated,
+        )
+        return entry
+
+    def _write(self, entry: dict) -> None:
+        """Append one line, rotating first if the current file is full."""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        if self._file is None or self._written + len(line) > self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+        self._written += len(line)
+        self._dirty = True
+
+    def _rotate(self) -> None:
+        """Close the current file, open a new one and prune old files."""
+        self._close_file()
+        # Recreate the directory if it was removed under us
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.directory / f"traffic-{stamp}-{self._sequence:03d}.jsonl.gz"
+        self._file = gzip.open(path, "ab")
+        self._written = 0
+
+        files = sorted(self.directory.glob("traffic-*.jsonl.gz"))
+        for old in files[: max(0, len(files) - self.max_files)]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def read_journal(path: Path) -> Iterator[dict]:
+    """Yield journal entries from a file or directory, oldest first."""
+    path = Path(path)
+    files = sorted(path.glob("traffic-*.jsonl.gz")) if path.is_dir() else [path]
+    entries = []
+    for file in files:
+        try:
+            with gzip.open(file, "rt", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue
+        except (OSError, EOFError):
+            # A file still being written (or cut off by a crash) ends early
+            continue
+    entries.sort(key=lambda entry: entry.get("ts", 0))
+    yield from entries
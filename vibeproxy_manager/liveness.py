@@ -0,0 +1,139 @@
+"""Cached tunnel liveness snapshot.
+
+Every status reader used to probe the tunnel itself, and each probe could
+cost a connect timeout or a ``tasklist`` spawn. Now TunnelManager records
+each state it observes (start, stop, process exit, probe) in one snapshot,
+and an optional watcher refreshes it with a cheap port check. Readers get
+the last known state in O(1) without triggering a probe.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from .tunnel import TunnelManager
+
+
+class LivenessSnapshot(BaseModel):
+    """Last known tunnel state."""
+
+    up: bool = False
+    port: int
+    source: str = "init"
+    checked_at: Optional[float] = None
+    changed_at: Optional[float] = None
+
+    @property
+    def known(self) -> bool:
+        """Whether the state has been observed at least once."""
+        return self.checked_at is not None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the state was last observed (inf if never)."""
+        if self.checked_at is None:
+            return float("inf")
+        return time.monotonic() - self.checked_at
+
+    @property
+    def message(self) -> str:
+        """Status message in the same form as TunnelManager.get_status()."""
+        if self.up:
+            return f"Connected (port {self.port})"
+        return f"Not connected (port {self.port})"
+
+
+class TunnelLiveness:
+    """Single source of truth for "is the tunnel up", kept fresh by events."""
+
+    def __init__(self, tunnel: "TunnelManager", interval: float = 2.0):
+        """Initialize for a tunnel.
+
+        Args:
+            tunnel: Tunnel whose state is tracked
+            interval: Seconds between watcher port checks
+        """
+        self.tunnel = tunnel
+        self.interval = interval
+        self.snapshot = LivenessSnapshot(port=tunnel.port)
+        self._listeners: list[Callable[[LivenessSnapshot], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_up(self) -> bool:
+        """Last known state (O(1), never probes)."""
+        return self.snapshot.up
+
+    def status(self) -> tuple[bool, str]:
+        """Last known (running, message) (O(1), never probes)."""
+        return self.snapshot.up, self.snapshot.message
+
+    def add_listener(self, listener: Callable[[LivenessSnapshot], None]) -> None:
+        """Call ``listener(snapshot)`` whenever up/down changes."""
+        self._listeners.append(listener)
+
+    def update(self, up: bool, source: str) -> None:
+        """Record an observed state (called by TunnelManager and the watcher)."""
+        now = time.monotonic()
+        changed = up != self.snapshot.up or not self.snapshot.known
+        # Replace rather than mutate so readers always see a consistent snapshot
+        self.snapshot = LivenessSnapshot(
+            up=up,
+            port=self.tunnel.port,
+            source=source,
+            checked_at=now,
+            changed_at=now if changed else self.snapshot.changed_at,
+        )
+        if changed:
+            for listener in list(self._listeners):
+                listener(self.snapshot)
+
+    async def get(self, max_age: Optional[float] = None) -> LivenessSnapshot:
+        """Return the snapshot, probing only if it was never taken or is too old.
+
+        Args:
+            max_age: Accept a snapshot up to this many seconds old
+                (None = any age; the watcher keeps it fresh)
+        """
+        stale = max_age is not None and self.snapshot.age > max_age
+        if not self.snapshot.known or stale:
+            await self.tunnel.ais_running()
+        return self.snapshot
+
+    async def _check(self) -> None:
+        """Cheap refresh: port connect plus process checks that need no spawn."""
+        tunnel = self.tunnel
+        alive = tunnel.process_alive()
+        up = alive is not False and await tunnel._aport_open(timeout=0.5)
+        self.update(up, "watch")
+
+    async def watch(self) -> None:
+        """Refresh the snapshot periodically, and at once when the ssh process exits."""
+        try:
+            while True:
+                await self._check()
+                if self.snapshot.up:
+                    # Exits are pushed by the tunnel's exit watch the moment they happen
+                    self.tunnel.watch_exit()
+                await asyncio.sleep(self.interval)
+        finally:
+            await self.tunnel.stop_exit_watch()
+
+    def start(self) -> None:
+        """Start the watcher in the background (needs a running loop)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.watch())
+
+    async def stop(self) -> None:
+        """Stop the watcher."""
+        if self._task is not None:
+            # Before Python 3.12, wait_for() can swallow a cancel that lands as
+            # its connect fails, so keep cancelling until the watcher is gone
+            while not self._task.done():
+                self._task.cancel()
+                await asyncio.wait({self._task}, timeout=0.1)
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
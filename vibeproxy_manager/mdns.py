@@ -0,0 +1,480 @@
+"""Minimal mDNS/DNS-SD browser and advertiser for finding the Mac.
+
+One multicast query asks for ``_vibeproxy._tcp`` and ``_ssh._tcp`` services
+(macOS advertises ``_ssh._tcp`` whenever Remote Login is on), and responders
+answer with PTR, SRV, TXT and A records in the same packet. That resolves the
+Mac in a single round trip instead of a subnet sweep, and it also works when
+the Mac is on another /24 that mDNS reaches.
+
+The query sets the unicast-response bit and is sent from an ephemeral port,
+so responders reply straight to us (RFC 6762 section 6.7); no multicast group
+membership is needed to browse. Run the advertiser beside VibeProxy on the Mac::
+
+    vibeproxy-advertise --port 8317 --user <mac user>
+
+(``dns-sd -R VibeProxy _vibeproxy._tcp local 8317`` does the same with
+macOS's own responder.)
+"""
+
+import argparse
+import asyncio
+import logging
+import socket
+import struct
+from typing import Iterable, Optional
+
+from pydantic import BaseModel
+
+from .interfaces import local_interfaces
+
+logger = logging.getLogger(__name__)
+
+MDNS_ADDR = "224.0.0.251"
+MDNS_PORT = 5353
+VIBEPROXY_SERVICE = "_vibeproxy._tcp.local."
+SSH_SERVICE = "_ssh._tcp.local."
+SERVICES_ENUM = "_services._dns-sd._udp.local."
+
+TYPE_A = 1
+TYPE_PTR = 12
+TYPE_TXT = 16
+TYPE_SRV = 33
+TYPE_ANY = 255
+
+CLASS_IN = 1
+UNICAST_RESPONSE = 0x8000  # QU bit in a question's class
+CACHE_FLUSH = 0x8000  # Cache-flush bit in a record's class
+FLAG_RESPONSE = 0x8400  # QR + AA
+
+
+class Record(BaseModel):
+    """One DNS resource record (only the fields for its type are set)."""
+
+    name: str
+    type: int
+    ttl: int = 120
+    target: str = ""  # PTR target / SRV host
+    port: int = 0  # SRV
+    address: str = ""  # A
+    properties: dict[str, str] = {}  # TXT
+
+
+class Service(BaseModel):
+    """A resolved DNS-SD service instance."""
+
+    name: str  # Instance name, e.g. "Daniel's MacBook Pro"
+    type: str  # e.g. "_vibeproxy._tcp.local."
+    host: str = ""
+    port: int = 0
+    addresses: list[str] = []
+    properties: dict[str, str] = {}
+
+
+def _fqdn(name: str) -> str:
+    """Fully qualified DNS name (trailing dot); case is kept for display."""
+    return name if name.endswith(".") else name + "."
+
+
+def _encode_name(name: str) -> bytes:
+    """Encode a DNS name as length-prefixed labels (no compression)."""
+    out = b""
+    for label in name.rstrip(".").split("."):
+        raw = label.encode("utf-8")
+        out += bytes([len(raw)]) + raw
+    return out + b"\0"
+
+
+def _read_name(data: bytes, offset: int) -> tuple[str, int]:
+    """Decode a (possibly compressed) name; return (name, offset after it)."""
+    labels = []
+    end = None
+    for _ in range(128):  # Bounds pointer loops in malformed packets
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            pointer = struct.unpack_from("!H", data, offset)[0] & 0x3FFF
+            if end is None:
+                end = offset + 2
+            offset = pointer
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset : offset + length].decode("utf-8", "replace"))
+        offset += length
+    return ".".join(labels) + ".", end if end is not None else offset
+
+
+def build_query(names: Iterable[str], qtype: int = TYPE_PTR, query_id: int = 0) -> bytes:
+    """DNS query for names, asking for unicast responses."""
+    names = list(names)
+    packet = struct.pack("!HHHHHH", query_id, 0, len(names), 0, 0, 0)
+    for name in names:
+        packet += _encode_name(name) + struct.pack("!HH", qtype, CLASS_IN | UNICAST_RESPONSE)
+    return packet
+
+
+def _encode_record(record: Record) -> bytes:
+    """Encode one resource record."""
+    if record.type == TYPE_PTR:
+        rdata = _encode_name(record.target)
+    elif record.type == TYPE_SRV:
+        rdata = struct.pack("!HHH", 0, 0, record.port) + _encode_name(record.target)
+    elif record.type == TYPE_A:
+        rdata = socket.inet_aton(record.address)
+    elif record.type == TYPE_TXT:
+        rdata = b""
+        for key, value in record.properties.items():
+            entry = f"{key}={value}".encode("utf-8")[:255]
+            rdata += bytes([len(entry)]) + entry
+        rdata = rdata or b"\0"
+    else:
+        raise ValueError(f"Unsupported record type {record.type}")
+    # Shared PTR records must not carry the cache-flush bit; unique ones do
+    rclass = CLASS_IN if record.type == TYPE_PTR else CLASS_IN | CACHE_FLUSH
+    header = struct.pack("!HHIH", record.type, rclass, record.ttl, len(rdata))
+    return _encode_name(record.name) + header + rdata
+
+
+def build_response(
+    answers: list[Record],
+    additional: list[Record] = (),
+    query_id: int = 0,
+    questions: bytes = b"",
+    question_count: int = 0,
+) -> bytes:
+    """DNS response packet (questions are echoed for legacy unicast replies)."""
+    packet = struct.pack(
+        "!HHHHHH", query_id, FLAG_RESPONSE, question_count, len(answers), 0, len(additional)
+    )
+    packet += questions
+    for record in list(answers) + list(additional):
+        packet += _encode_record(record)
+    return packet
+
+
+def parse_message(data: bytes) -> tuple[int, int, list[tuple[str, int, bool]], list[Record], int]:
+    """Parse a DNS message.
+
+    Returns (id, flags, questions, records, end of question section) where each
+    question is (name, qtype, wants_unicast) and records holds the answer,
+    authority and additional sections with supported types decoded.
+    """
+    query_id, flags, qdcount, ancount, nscount, arcount = struct.unpack_from("!HHHHHH", data)
+    offset = 12
+    questions = []
+    for _ in range(qdcount):
+        name, offset = _read_name(data, offset)
+        qtype, qclass = struct.unpack_from("!HH", data, offset)
+        offset += 4
+        questions.append((_fqdn(name).lower(), qtype, bool(qclass & UNICAST_RESPONSE)))
+    question_end = offset
+
+    records = []
+    for _ in range(ancount + nscount + arcount):
+        name, offset = _read_name(data, offset)
+        rtype, _, ttl, length = struct.unpack_from("!HHIH", data, offset)
+        offset += 10
+        rdata_offset, offset = offset, offset + length
+        record = Record(name=_fqdn(name), type=rtype, ttl=ttl)
+        if rtype == TYPE_PTR:
+            record.target = _fqdn(_read_name(data, rdata_offset)[0])
+        elif rtype == TYPE_SRV:
+            record.port = struct.unpack_from("!H", data, rdata_offset + 4)[0]
+            record.target = _fqdn(_read_name(data, rdata_offset + 6)[0])
+        elif rtype == TYPE_A and length == 4:
+            record.address = socket.inet_ntoa(data[rdata_offset:offset])
+        elif rtype == TYPE_TXT:
+            position = rdata_offset
+            while position < offset:
+                size = data[position]
+                entry = data[position + 1 : position + 1 + size].decode("utf-8", "replace")
+                position += 1 + size
+                if entry:
+                    key, _, value = entry.partition("=")
+                    record.properties[key] = value
+        else:
+            continue
+        records.append(record)
+    return query_id, flags, questions, records, question_end
+
+
+def _instance_label(instance: str, service_type: str) -> str:
+    """Human instance name from its full name ("Mac._ssh._tcp.local." -> "Mac")."""
+    suffix = "." + service_type.lower()
+    return instance[: -len(suffix)] if instance.lower().endswith(suffix) else instance
+
+
+def assemble(
+    records: list[Record], service_types: Iterable[str], sources: Optional[dict] = None
+) -> list[Service]:
+    """Resolve PTR -> SRV/TXT -> A records into services.
+
+    Args:
+        records: Records from any number of responses
+        service_types: Service types browsed for
+        sources: Instance name -> responder IP, used when no A record was sent
+    """
+    # DNS names compare case-insensitively
+    sources = {k.lower(): v for k, v in (sources or {}).items()}
+    srv = {r.name.lower(): r for r in records if r.type == TYPE_SRV}
+    txt = {r.name.lower(): r.properties for r in records if r.type == TYPE_TXT}
+    addresses: dict[str, list[str]] = {}
+    for r in records:
+        if r.type == TYPE_A and r.address not in addresses.setdefault(r.name.lower(), []):
+            addresses[r.name.lower()].append(r.address)
+
+    services = []
+    for service_type in service_types:
+        service_type = _fqdn(service_type).lower()
+        seen = set()
+        for ptr in records:
+            instance = ptr.target.lower()
+            if ptr.type != TYPE_PTR or ptr.name.lower() != service_type or instance in seen:
+                continue
+            seen.add(instance)
+            service = Service(name=_instance_label(ptr.target, service_type), type=service_type)
+            if instance in srv:
+                service.host = srv[instance].target
+                service.port = srv[instance].port
+                service.addresses = addresses.get(service.host.lower(), [])
+            if not service.addresses and instance in sources:
+                service.addresses = [sources[instance]]
+            service.properties = txt.get(instance, {})
+            services.append(service)
+    return services
+
+
+class _Collector(asyncio.DatagramProtocol):
+    """Gathers responses to a browse query."""
+
+    def __init__(self, service_types: list[str], done: asyncio.Event):
+        self.service_types = service_types
+        self.done = done
+        self.records: list[Record] = []
+        self.sources: dict[str, str] = {}
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            _, flags, _, records, _ = parse_message(data)
+        except (struct.error, IndexError, ValueError):
+            return
+        if not flags & 0x8000:
+            return  # A query, not a response
+        self.records.extend(records)
+        for record in records:
+            if record.type == TYPE_PTR:
+                self.sources.setdefault(record.target, addr[0])
+        if any(s.addresses for s in assemble(self.records, [VIBEPROXY_SERVICE], self.sources)):
+            self.done.set()
+
+
+async def browse(
+    service_types: Iterable[str] = (VIBEPROXY_SERVICE, SSH_SERVICE),
+    timeout: float = 1.0,
+    destination: tuple[str, int] = (MDNS_ADDR, MDNS_PORT),
+) -> list[Service]:
+    """Send one query for service_types and collect the answers.
+
+    Returns as soon as a VibeProxy service resolves to an address, otherwise
+    after ``timeout`` (responders delay multicast answers by 20-120 ms, so
+    the whole round trip normally takes well under a second).
+
+    Args:
+        service_types: DNS-SD service types to browse for
+        timeout: Seconds to wait for responses
+        destination: Where to send the query (mDNS group by default)
+
+    Returns resolved services, VibeProxy services first.
+    """
+    service_types = [_fqdn(t) for t in service_types]
+    loop = asyncio.get_running_loop()
+    done = asyncio.Event()
+    try:
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: _Collector(service_types, done), local_addr=("0.0.0.0", 0)
+        )
+    except OSError as e:
+        logger.debug("mDNS browse unavailable: %s", e)
+        return []
+    try:
+        sock = transport.get_extra_info("socket")
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 255)
+        transport.sendto(build_query(service_types), destination)
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    except OSError as e:
+        logger.debug("mDNS query failed: %s", e)
+    finally:
+        transport.close()
+    return assemble(protocol.records, service_types, protocol.sources)
+
+
+class Advertiser(asyncio.DatagramProtocol):
+    """Answers DNS-SD queries for one service instance."""
+
+    def __init__(
+        self,
+        instance: str,
+        port: int,
+        addresses: list[str],
+        service_type: str = VIBEPROXY_SERVICE,
+        host: Optional[str] = None,
+        properties: Optional[dict[str, str]] = None,
+        ttl: int = 120,
+    ):
+        """Initialize.
+
+        Args:
+            instance: Instance name shown to browsers (e.g. the computer name)
+            port: Service port
+            addresses: IPv4 addresses to announce for the host
+            service_type: DNS-SD service type
+            host: Host name (default: <hostname>.local.)
+            properties: TXT record key/values
+            ttl: Record TTL in seconds
+        """
+        self.service_type = _fqdn(service_type)
+        self.fullname = _fqdn(f"{instance}.{self.service_type}")
+        self.instance = instance
+        self.host = _fqdn(host or f"{socket.gethostname().split('.')[0]}.local")
+        self.port = port
+        self.addresses = addresses
+        self.properties = properties or {}
+        self.ttl = ttl
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def records(self) -> tuple[list[Record], list[Record]]:
+        """(PTR answer, SRV/TXT/A additional records) for this service."""
+        ptr = Record(name=self.service_type, type=TYPE_PTR, ttl=self.ttl, target=self.fullname)
+        additional = [
+            Record(
+                name=self.fullname, type=TYPE_SRV, ttl=self.ttl, target=self.host, port=self.port
+            ),
+            Record(name=self.fullname, type=TYPE_TXT, ttl=self.ttl, properties=self.properties),
+        ] + [
+            Record(name=self.host, type=TYPE_A, ttl=self.ttl, address=address)
+            for address in self.addresses
+        ]
+        return [ptr], additional
+
+    def answer(self, data: bytes) -> Optional[tuple[bytes, bool]]:
+        """Response to a query packet and whether it must go unicast (None to ignore)."""
+        query_id, flags, questions, _, question_end = parse_message(data)
+        if flags & 0x8000:
+            return None  # A response, not a query
+        ptr, additional = self.records()
+        answers: list[Record] = []
+        unicast = False
+        for name, qtype, wants_unicast in questions:
+            if name == SERVICES_ENUM and qtype in (TYPE_PTR, TYPE_ANY):
+                enum = Record(name=SERVICES_ENUM, type=TYPE_PTR, target=self.service_type)
+                answers.append(enum)
+            elif name == self.service_type.lower() and qtype in (TYPE_PTR, TYPE_ANY):
+                answers.extend(ptr)
+            elif name == self.fullname.lower() and qtype in (TYPE_SRV, TYPE_TXT, TYPE_ANY):
+                answers.extend(r for r in additional if r.name == self.fullname)
+            elif name == self.host.lower() and qtype in (TYPE_A, TYPE_ANY):
+                answers.extend(r for r in additional if r.type == TYPE_A)
+            else:
+                continue
+            unicast = unicast or wants_unicast
+        if not answers:
+            return None
+        additional = [r for r in additional if r not in answers]
+        questions_raw = data[12:question_end]
+        return build_response(answers, additional, query_id, questions_raw, len(questions)), unicast
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        try:
+            reply = self.answer(data)
+        except (struct.error, IndexError, ValueError):
+            return
+        if reply is None or self.transport is None:
+            return
+        packet, unicast = reply
+        if unicast or addr[1] != MDNS_PORT:
+            # Legacy/QU queries get a direct reply
+            self.transport.sendto(packet, addr)
+        else:
+            self.transport.sendto(packet, (MDNS_ADDR, MDNS_PORT))
+
+    def announce(self) -> None:
+        """Send an unsolicited announcement to the mDNS group."""
+        if self.transport is not None:
+            ptr, additional = self.records()
+            self.transport.sendto(build_response(ptr, additional), (MDNS_ADDR, MDNS_PORT))
+
+
+async def advertise(advertiser: Advertiser, bind: tuple[str, int] = ("0.0.0.0", MDNS_PORT)):
+    """Start answering queries; returns the datagram transport (close it to stop).
+
+    Binding the mDNS port joins the multicast group and shares the port with
+    the system responder (SO_REUSEADDR/SO_REUSEPORT).
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(bind)
+    if bind[1] == MDNS_PORT:
+        membership = socket.inet_aton(MDNS_ADDR) + socket.inet_aton("0.0.0.0")
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 255)
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: advertiser, sock=sock
+    )
+    if bind[1] == MDNS_PORT:
+        advertiser.announce()
+    return transport
+
+
+def _local_addresses() -> list[str]:
+    """LAN/VPN IPv4 addresses of this machine, the default-route one first."""
+    addresses = []
+    for interface in local_interfaces():
+        if interface.relevant and interface.address not in addresses:
+            addresses.append(interface.address)
+    return addresses
+
+
+def main() -> int:
+    """Advertise VibeProxy over mDNS (run this on the Mac)."""
+    parser = argparse.ArgumentParser(description="Advertise VibeProxy via mDNS/DNS-SD")
+    parser.add_argument("--port", type=int, default=8317, help="VibeProxy port (default: 8317)")
+    parser.add_argument("--name", default=socket.gethostname().split(".")[0], help="Instance name")
+    parser.add_argument("--user", default="", help="SSH user to publish in the TXT record")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log queries")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    addresses = _local_addresses()
+    properties = {"path": "/v1/models"}
+    if args.user:
+        properties["user"] = args.user
+    advertiser = Advertiser(args.name, args.port, addresses, properties=properties)
+
+    async def run() -> int:
+        transport = await advertise(advertiser)
+        print(
+            f"Advertising {advertiser.fullname} on port {args.port} "
+            f"({', '.join(addresses) or 'no addresses'})"
+        )
+        try:
+            await asyncio.Event().wait()
+        finally:
+            transport.close()
+        return 0
+
+    try:
+        return asyncio.run(run())
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
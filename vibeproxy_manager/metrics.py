@@ -0,0 +1,409 @@
+"""Lightweight Prometheus-format metrics for VibeProxy traffic.
+
+Metrics are plain in-process counters keyed by label tuples, so recording a
+sample is a dict lookup plus an add. Nothing is probed at scrape time;
+``render()`` only formats what has already been collected.
+
+The relay and the tunnel daemon are separate processes, each with its own
+registry. ``render(remote)`` merges another process's exposition into this
+one, so a single scrape covers both: counters and histograms are summed,
+and each gauge says whose value wins (``merge``).
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+
+# Latency buckets (seconds) sized for LLM traffic: fast cache hits up to long completions
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Format label pairs as {a="x",b="y"} (empty string when unlabelled)."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for a named metric with a fixed label set."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        """Initialize with metric name, help text and label names."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labelvalues: tuple) -> tuple[str, ...]:
+        """Validate and normalise label values."""
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {labelvalues}"
+            )
+        return tuple(str(v) for v in labelvalues)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yield (sample_name, formatted_labels, value) tuples."""
+        raise NotImplementedError
+
+    def _merge(self, local: float, remote: float) -> float:
+        """Combine a sample both processes report (counts add up)."""
+        return local + remote
+
+    def render(self, remote: Optional[list[tuple[str, float]]] = None) -> list[str]:
+        """Render HELP/TYPE header and all samples, merged with another process's."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        values = {f"{name}{labels}": value for name, labels, value in self.samples()}
+        for sample, value in remote or ():
+            values[sample] = self._merge(values[sample], value) if sample in values else value
+        for sample, value in values.items():
+            lines.append(f"{sample} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        """Initialize an empty counter."""
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        """Increment the counter for the given label values."""
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        """Return the current value for the given label values."""
+        return self._values.get(self._key(labelvalues), 0.0)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yield one sample per label combination."""
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Gauge(Counter):
+    """Value that can go up and down, or be computed lazily at render time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        merge: str = "sum",
+    ):
+        """Initialize an empty gauge.
+
+        ``merge`` decides a sample both processes report: "sum" (e.g. queue
+        depths), "local" (this process knows best) or "remote" (the other
+        process owns the state, e.g. the daemon owns the tunnel).
+        """
+        super().__init__(name, documentation, labelnames)
+        self.merge = merge
+        self._function: Optional[Callable[[], float]] = None
+
+    def _merge(self, local: float, remote: float) -> float:
+        """Combine a sample both processes report, as ``merge`` says."""
+        if self.merge == "local":
+            return local
+        if self.merge == "remote":
+            return remote
+        return local + remote
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        """Set the gauge for the given label values."""
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        """Decrement the gauge for the given label values."""
+        self.inc(*labelvalues, amount=-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute an unlabelled gauge from a cheap callback when rendering."""
+        self._function = function
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yield stored samples, or the callback value if one is set."""
+        if self._function is not None:
+            try:
+                yield self.name, "", float(self._function())
+            except Exception:
+                return
+            return
+        yield from super().samples()
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """Initialize with sorted bucket upper bounds."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label key: [bucket counts..., +Inf count, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Record one observation."""
+        key = self._key(labelvalues)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = row
+            row[index] += 1
+            row[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        """Return the number of observations for the given label values."""
+        row = self._values.get(self._key(labelvalues))
+        return int(sum(row[:-1])) if row else 0
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yield cumulative bucket, sum and count samples."""
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        names = self.labelnames + ("le",)
+        for key, row in items:
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += bucket_count
+                yield (
+                    f"{self.name}_bucket",
+                    _format_labels(names, key + (_format_value(bound),)),
+                    cumulative,
+                )
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum", labels, row[-1]
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in text exposition format."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """Register a metric, returning the existing one if already present."""
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """Create (or fetch) a counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        merge: str = "sum",
+    ) -> Gauge:
+        """Create (or fetch) a gauge."""
+        return self._register(Gauge(name, documentation, labelnames, merge))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create (or fetch) a histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Look up a metric by name."""
+        return self._metrics.get(name)
+
+    def render(self, remote: str = "") -> str:
+        """Render all metrics in Prometheus text exposition format.
+
+        Args:
+            remote: Exposition text of another process to merge in
+        """
+        families = parse_exposition(remote)
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            family = families.pop(metric.name, None)
+            lines.extend(metric.render(family[1] if family else None))
+        # Families only the other process has are passed through as they are
+        for header, samples in families.values():
+            lines.extend(header)
+            lines.extend(f"{sample} {_format_value(value)}" for sample, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+def parse_exposition(text: str) -> dict[str, tuple[list[str], list[tuple[str, float]]]]:
+    """Families in Prometheus text: {name: (HELP/TYPE lines, [(sample, value)])}.
+
+    A sample is the sample name plus its label block, e.g. ``x_bucket{le="1"}``.
+    Lines that do not parse are skipped.
+    """
+    families: dict[str, tuple[list[str], list[tuple[str, float]]]] = {}
+    current: Optional[tuple[list[str], list[tuple[str, float]]]] = None
+    for line in text.splitlines():
+        if line.startswith("# "):
+            parts = line.split(" ", 3)
+            if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                current = families.setdefault(parts[2], ([], []))
+                current[0].append(line)
+            continue
+        sample, _, value = line.rpartition(" ")
+        if current is None or not sample:
+            continue
+        try:
+            current[1].append((sample, float(value.replace("+Inf", "inf"))))
+        except ValueError:
+            continue
+    return families
+
+
+def percentile(values: Iterable[float], fraction: float) -> float:
+    """Nearest-rank percentile: the smallest value with ``fraction`` of samples at or below it.
+
+    Returns 0.0 for no values. Every report (replay, shadow, link quality)
+    uses this, so their p50/p95 figures are directly comparable.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(len(ordered) - 1, max(0, rank - 1))]
+
+
+# Process-wide registry shared by the proxy, API client and tunnel manager
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter(
+    "vibeproxy_requests_total",
+    "Requests relayed to VibeProxy.",
+    ("model", "client", "status"),
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    "vibeproxy_request_duration_seconds",
+    "End-to-end request latency through the relay.",
+    ("model", "client"),
+)
+TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    "vibeproxy_time_to_first_token_seconds",
+    "Time from request received to first response body bytes.",
+    ("model", "client"),
+)
+TOKENS = REGISTRY.counter(
+    "vibeproxy_tokens_total",
+    "Tokens reported by upstream usage blocks.",
+    ("model", "client", "direction"),
+)
+TRAFFIC_BYTES = REGISTRY.counter(
+    "vibeproxy_traffic_bytes_total",
+    "Bytes relayed per client and model (up = request body, down = tunnel response).",
+    ("model", "client", "direction"),
+)
+TUNNEL_UP = REGISTRY.gauge(
+    "vibeproxy_tunnel_up",
+    "Whether the SSH tunnel was last seen up (1) or down (0).",
+    merge="remote",  # The daemon owning the tunnel knows better than the relay
+)
+MODEL_CACHE_REQUESTS = REGISTRY.counter(
+    "vibeproxy_model_cache_requests_total",
+    "Model list lookups served from cache (hit) or upstream (miss).",
+    ("result",),
+)
+MODEL_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "vibeproxy_model_cache_hit_ratio",
+    "Fraction of model list lookups served from cache.",
+    merge="local",  # Computed from this process's counters
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "vibeproxy_queue_depth",
+    "Requests currently waiting or in flight, per queue.",
+    ("queue",),
+)
+TUNNEL_CONNECT_SECONDS = REGISTRY.histogram(
+    "vibeproxy_tunnel_connect_seconds",
+    "Time for start() to bring the forward up, by connection mode.",
+    ("mode",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RETRIES = REGISTRY.counter(
+    "vibeproxy_retries_total",
+    "Retried operations (tunnel connects, upstream requests).",
+    ("operation",),
+)
+
+UPSTREAM_WIRE_BYTES = REGISTRY.counter(
+    "vibeproxy_upstream_wire_bytes_total",
+    "Response bytes received over the tunnel, before decompression.",
+    ("model", "encoding"),
+)
+UPSTREAM_DECODED_BYTES = REGISTRY.counter(
+    "vibeproxy_upstream_decoded_bytes_total",
+    "Response bytes after decompression.",
+    ("model", "encoding"),
+)
+COMPRESSION_SAVED_BYTES = REGISTRY.counter(
+    "vibeproxy_compression_saved_bytes_total",
+    "Bytes kept off the tunnel by response compression.",
+    ("model",),
+)
+DECOMPRESSION_SECONDS = REGISTRY.counter(
+    "vibeproxy_decompression_seconds_total",
+    "CPU time spent decompressing upstream responses.",
+    ("model", "encoding"),
+)
+
+
+def _cache_hit_ratio() -> float:
+    """Compute model cache hit ratio from the hit/miss counter."""
+    hits = MODEL_CACHE_REQUESTS.get("hit")
+    total = hits + MODEL_CACHE_REQUESTS.get("miss")
+    return hits / total if total else 0.0
+
+
+MODEL_CACHE_HIT_RATIO.set_function(_cache_hit_ratio)
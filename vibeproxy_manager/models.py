@@ -59,6 +59,7 @@ class A0Config(BaseModel):
     name: str
     path: str
     model: str = ""
+    util_model: str = ""
     description: str = ""
 
 
@@ -0,0 +1,265 @@
+"""Network change notification.
+
+A Wi-Fi switch or a wake from sleep leaves ssh holding a TCP connection
+that no longer goes anywhere. ssh only notices after its keepalives time
+out, and the launcher only after its next poll. This watcher reports the
+change itself, so the tunnel can be re-validated at once.
+
+- Linux: a NETLINK_ROUTE socket subscribed to IPv4/IPv6 address and IPv4
+  route events. The kernel pushes a message the moment an address or route
+  is added or removed, with no polling.
+- Elsewhere (or if netlink is refused or fails): the local networks are
+  compared every ``interval`` seconds. Each check is one netlink dump on
+  Linux, but ``ifconfig`` plus ``route`` on macOS/BSD, and Windows reuses its
+  cached PowerShell listing until the host's addresses change. That is why
+  the interval is seconds rather than milliseconds.
+- Everywhere: a jump of the wall clock against the monotonic clock means
+  the machine was suspended, which is reported as a change too.
+
+Bursts (DHCP can add an address and several routes within a second) are
+folded into one change.
+"""
+
+import asyncio
+import errno
+import socket
+import struct
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from . import metrics, scanner
+
+NETWORK_CHANGES = metrics.REGISTRY.counter(
+    "vibeproxy_network_changes_total",
+    "Local network changes (address, route, resume from sleep) that were noticed.",
+    ("source",),
+)
+
+# Netlink message types (linux/rtnetlink.h) and their descriptions
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+_EVENTS = {
+    RTM_NEWADDR: "address added",
+    RTM_DELADDR: "address removed",
+    RTM_NEWROUTE: "route added",
+    RTM_DELROUTE: "route removed",
+}
+
+# Multicast groups: RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_IFADDR.
+# Link events are left out: some Wi-Fi drivers send one per scan.
+_GROUPS = 0x10 | 0x40 | 0x100
+_NETLINK_ROUTE = 0
+
+# struct nlmsghdr: length, type, flags, sequence, port id
+_NLMSGHDR = struct.Struct("=IHHII")
+# Byte offset of rtm_table in struct rtmsg (after the header)
+_RTM_TABLE = _NLMSGHDR.size + 4
+_RT_TABLE_LOCAL = 255
+
+# Wall clock ahead of the monotonic clock by this much = the machine slept
+SLEEP_GAP = 10.0
+
+
+class NetworkChange(BaseModel):
+    """A change to the local network."""
+
+    reason: str  # e.g. "address added, route removed" or "resumed after 300s asleep"
+    source: str  # "netlink", "poll" or "clock"
+    at: float = Field(default_factory=time.time)
+
+
+def parse_netlink(data: bytes) -> set[str]:
+    """Descriptions of the address/route events in a netlink datagram."""
+    events = set()
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            break
+        event = _EVENTS.get(msg_type)
+        # Local-table routes are the kernel's echo of an address change
+        local_route = (
+            msg_type in (RTM_NEWROUTE, RTM_DELROUTE)
+            and offset + _RTM_TABLE < len(data)
+            and data[offset + _RTM_TABLE] == _RT_TABLE_LOCAL
+        )
+        if event is not None and not local_route:
+            events.add(event)
+        offset += (length + 3) & ~3  # Messages are 4-byte aligned
+    return events
+
+
+def network_signature() -> tuple[str, ...]:
+    """The local networks, in a form that compares equal while nothing changed."""
+    return tuple(str(network) for network in scanner.local_networks())
+
+
+class NetworkWatcher:
+    """Report local network changes as they happen."""
+
+    def __init__(
+        self,
+        interval: float = 5.0,
+        debounce: float = 1.0,
+        on_change: Optional[Callable[[NetworkChange], None]] = None,
+        history: int = 20,
+        use_netlink: bool = True,
+    ):
+        """Initialize the watcher.
+
+        Args:
+            interval: Seconds between polls (and sleep checks)
+            debounce: Events this close together are reported as one change
+            on_change: Callback(change) for every change
+            history: Number of past changes kept
+            use_netlink: Listen for netlink events where available (False = poll)
+        """
+        self.interval = interval
+        self.debounce = debounce
+        self.on_change = on_change
+        self.use_netlink = use_netlink
+        self.changes: deque[NetworkChange] = deque(maxlen=history)
+        self.mode = "stopped"  # "netlink", "poll" or "stopped"
+        self._waiters: list[asyncio.Future] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def last_change(self) -> Optional[NetworkChange]:
+        """Most recent change, if any."""
+        return self.changes[-1] if self.changes else None
+
+    def _report(self, reason: str, source: str) -> None:
+        """Record a change and wake everyone waiting for one."""
+        change = NetworkChange(reason=reason, source=source)
+        self.changes.append(change)
+        NETWORK_CHANGES.inc(source)
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(change)
+        if self.on_change is not None:
+            self.on_change(change)
+
+    async def wait_for_change(self) -> NetworkChange:
+        """Wait for the next change."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            return await waiter
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _open_netlink(self) -> Optional[socket.socket]:
+        """Netlink socket subscribed to address/route events, or None if unavailable."""
+        if not self.use_netlink or not hasattr(socket, "AF_NETLINK"):
+            return None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, _NETLINK_ROUTE)
+        except OSError:
+            return None
+        try:
+            sock.bind((0, _GROUPS))
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            return None
+        return sock
+
+    @staticmethod
+    async def _receive(sock: socket.socket) -> set[str]:
+        """Events in the next netlink datagram.
+
+        ENOBUFS means the kernel dropped events because we read too slowly.
+        Something changed, so that counts as an event. Other errors propagate.
+        """
+        try:
+            return parse_netlink(await asyncio.get_running_loop().sock_recv(sock, 65536))
+        except OSError as error:
+            if error.errno != errno.ENOBUFS:
+                raise
+            return {"events lost (netlink overrun)"}
+
+    async def _listen(self, sock: socket.socket) -> None:
+        """Report netlink events, folding each burst into one change.
+
+        Returns if the socket fails, so the caller can fall back to polling.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                events = await self._receive(sock)
+            except OSError:
+                return
+            if not events:
+                continue
+            deadline = loop.time() + self.debounce
+            failed = False
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    events |= await asyncio.wait_for(self._receive(sock), remaining)
+                except asyncio.TimeoutError:
+                    break
+                except OSError:
+                    failed = True
+                    break
+            self._report(", ".join(sorted(events)), "netlink")
+            if failed:
+                return
+
+    async def _poll(self, compare: bool) -> None:
+        """Check for sleep (and, if ``compare``, for changed networks) every interval."""
+        signature = await asyncio.to_thread(network_signature) if compare else ()
+        wall, mono = time.time(), time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            now_wall, now_mono = time.time(), time.monotonic()
+            # The monotonic clock stands still while the machine is suspended
+            asleep = (now_wall - wall) - (now_mono - mono)
+            wall, mono = now_wall, now_mono
+            if asleep > SLEEP_GAP:
+                self._report(f"resumed after {asleep:.0f}s asleep", "clock")
+            if compare:
+                current = await asyncio.to_thread(network_signature)
+                if current != signature:
+                    before = ", ".join(signature) or "none"
+                    after = ", ".join(current) or "none"
+                    signature = current
+                    self._report(f"networks changed ({before} -> {after})", "poll")
+
+    async def run(self) -> None:
+        """Watch forever: netlink events where possible, polling otherwise."""
+        sock = self._open_netlink()
+        try:
+            if sock is not None:
+                self.mode = "netlink"
+                # Netlink says nothing about suspend, so keep the clock check running
+                clock = asyncio.ensure_future(self._poll(compare=False))
+                try:
+                    await self._listen(sock)
+                finally:
+                    clock.cancel()
+                    await asyncio.gather(clock, return_exceptions=True)
+                    sock.close()
+            # No netlink, or the socket failed: compare the networks instead
+            self.mode = "poll"
+            await self._poll(compare=True)
+        finally:
+            self.mode = "stopped"
+
+    def start(self) -> None:
+        """Start watching in the background (needs a running loop)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop watching."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
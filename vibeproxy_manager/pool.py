@@ -0,0 +1,281 @@
+"""Pool of parallel SSH tunnels behind a local TCP balancer.
+
+With a single tunnel every request shares one SSH TCP connection, so one
+large stream or a lossy moment on that connection stalls everything. The
+pool runs N independent tunnels (each on its own local port, each kept up
+by a TunnelSupervisor) and listens on the usual tunnel port, handing each
+new connection to the healthy member with the fewest active connections.
+Members are health-checked end to end with a small HTTP request through the
+tunnel, so a stalled connection is taken out of rotation.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from . import metrics
+from .config import ConfigManager
+from .supervisor import Backoff, TunnelSupervisor
+from .tunnel import TunnelManager
+
+logger = logging.getLogger(__name__)
+
+# Bytes copied per read when splicing client <-> member connections
+SPLICE_CHUNK = 64 * 1024
+
+# Request used to check a member end to end (tunnel + VibeProxy)
+HEALTH_REQUEST = b"GET /v1/models HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+
+POOL_CONNECTIONS = metrics.REGISTRY.counter(
+    "vibeproxy_pool_connections_total",
+    "Client connections handed to each pool member.",
+    ("member", "result"),
+)
+POOL_MEMBER_UP = metrics.REGISTRY.gauge(
+    "vibeproxy_pool_member_up",
+    "Whether a pool member passed its last health check.",
+    ("member",),
+)
+POOL_ACTIVE = metrics.REGISTRY.gauge(
+    "vibeproxy_pool_active_connections",
+    "Connections currently open through each pool member.",
+    ("member",),
+)
+
+
+class PoolMember:
+    """One tunnel in the pool plus its health and load counters."""
+
+    def __init__(self, tunnel: TunnelManager, supervisor: TunnelSupervisor):
+        """Initialize with a tunnel and the supervisor keeping it up."""
+        self.tunnel = tunnel
+        self.supervisor = supervisor
+        self.healthy = False
+        self.active = 0
+        self.total = 0
+        self.failures = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self.health_rtt: Optional[float] = None
+        self.last_error = ""
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def name(self) -> str:
+        """Label used in metrics and summaries."""
+        return str(self.tunnel.port)
+
+    def summary(self) -> dict:
+        """Counters as a plain dict."""
+        return {
+            "port": self.tunnel.port,
+            "healthy": self.healthy,
+            "active": self.active,
+            "total": self.total,
+            "failures": self.failures,
+            "bytes_up": self.bytes_up,
+            "bytes_down": self.bytes_down,
+            "health_rtt_ms": round(self.health_rtt * 1000, 1) if self.health_rtt else None,
+            "outages": len(self.supervisor.outages),
+            "last_error": self.last_error,
+        }
+
+
+class TunnelPool:
+    """N supervised tunnels to the same Mac behind one local port."""
+
+    def __init__(
+        self,
+        config_manager: Optional[ConfigManager] = None,
+        size: int = 2,
+        listen_port: Optional[int] = None,
+        base_port: Optional[int] = None,
+        health_interval: float = 5.0,
+        health_timeout: float = 3.0,
+        connect_timeout: float = 2.0,
+    ):
+        """Initialize the pool.
+
+        Args:
+            config_manager: Config source shared by all members
+            size: Number of parallel tunnels
+            listen_port: Port the balancer listens on (default: LocalPort)
+            base_port: First member port (default: LocalPort + 1000)
+            health_interval: Seconds between end-to-end health checks
+            health_timeout: Seconds a health check may take before the member is marked down
+            connect_timeout: Seconds to reach a member before trying the next one
+        """
+        self.config_manager = config_manager or ConfigManager()
+        config = self.config_manager.load()
+        self.listen_port = listen_port if listen_port is not None else config.local_port
+        base_port = base_port or config.local_port + 1000
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.connect_timeout = connect_timeout
+        self.members: list[PoolMember] = []
+        for index in range(max(1, size)):
+            tunnel = TunnelManager(self.config_manager, local_port=base_port + index)
+            supervisor = TunnelSupervisor(tunnel, backoff=Backoff(initial=0.5, maximum=30.0))
+            self.members.append(PoolMember(tunnel, supervisor))
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def port(self) -> int:
+        """Port the balancer is listening on."""
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[0].getsockname()[1]
+        return self.listen_port
+
+    async def start(self, ready_timeout: float = 15.0) -> tuple[bool, str]:
+        """Start all members and the balancer.
+
+        Returns once at least one member is healthy (or ``ready_timeout`` passes).
+
+        Returns (success, message) tuple.
+        """
+        loop = asyncio.get_running_loop()
+        for member in self.members:
+            member.task = loop.create_task(member.supervisor.run())
+
+        deadline = loop.time() + ready_timeout
+        while loop.time() < deadline:
+            await self.check_health()
+            if any(m.healthy for m in self.members):
+                break
+            await asyncio.sleep(0.2)
+        else:
+            await self.close()
+            return False, "No pool member became healthy"
+
+        try:
+            self._server = await asyncio.start_server(
+                self._handle_client, "127.0.0.1", self.listen_port
+            )
+        except OSError as e:
+            await self.close()
+            return False, f"Cannot listen on port {self.listen_port}: {e}"
+        self._health_task = loop.create_task(self._health_loop())
+        healthy = sum(1 for m in self.members if m.healthy)
+        return True, f"Pool listening on port {self.port} ({healthy}/{len(self.members)} tunnels healthy)"
+
+    async def _probe(self, member: PoolMember) -> None:
+        """End-to-end health check: an HTTP response must come back through the tunnel."""
+        started = time.perf_counter()
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection("127.0.0.1", member.tunnel.port), self.health_timeout
+            )
+            writer.write(HEALTH_REQUEST)
+            await writer.drain()
+            status = await asyncio.wait_for(reader.readline(), self.health_timeout)
+            healthy = status.startswith(b"HTTP/")
+            member.last_error = "" if healthy else "no HTTP response"
+        except (OSError, asyncio.TimeoutError) as e:
+            healthy = False
+            member.last_error = str(e) or type(e).__name__
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if healthy != member.healthy:
+            logger.warning("Pool member %s is %s", member.name, "up" if healthy else "down")
+        member.healthy = healthy
+        member.health_rtt = time.perf_counter() - started if healthy else None
+        POOL_MEMBER_UP.set(1 if healthy else 0, member.name)
+
+    async def check_health(self) -> None:
+        """Health-check every member concurrently."""
+        await asyncio.gather(*(self._probe(m) for m in self.members))
+
+    async def _health_loop(self) -> None:
+        """Re-check members periodically."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    def _candidates(self) -> list[PoolMember]:
+        """Members to try, least-loaded healthy ones first."""
+        healthy = [m for m in self.members if m.healthy]
+        unhealthy = [m for m in self.members if not m.healthy]
+        healthy.sort(key=lambda m: (m.active, m.total))
+        # Fall back to unhealthy members rather than refusing the connection
+        return healthy + unhealthy
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Hand one client connection to a pool member."""
+        for member in self._candidates():
+            try:
+                up_reader, up_writer = await asyncio.wait_for(
+                    asyncio.open_connection("127.0.0.1", member.tunnel.port), self.connect_timeout
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                member.failures += 1
+                member.healthy = False
+                member.last_error = str(e) or type(e).__name__
+                POOL_MEMBER_UP.set(0, member.name)
+                POOL_CONNECTIONS.inc(member.name, "error")
+                continue
+
+            member.active += 1
+            member.total += 1
+            POOL_CONNECTIONS.inc(member.name, "ok")
+            POOL_ACTIVE.set(member.active, member.name)
+            try:
+                await asyncio.gather(
+                    self._splice(reader, up_writer, member, "up"),
+                    self._splice(up_reader, writer, member, "down"),
+                )
+            finally:
+                member.active -= 1
+                POOL_ACTIVE.set(member.active, member.name)
+                up_writer.close()
+                writer.close()
+            return
+
+        writer.close()
+
+    @staticmethod
+    async def _splice(
+        source: asyncio.StreamReader, sink: asyncio.StreamWriter, member: PoolMember, direction: str
+    ) -> None:
+        """Copy one direction of a connection, counting bytes."""
+        try:
+            while data := await source.read(SPLICE_CHUNK):
+                if direction == "up":
+                    member.bytes_up += len(data)
+                else:
+                    member.bytes_down += len(data)
+                sink.write(data)
+                await sink.drain()
+            if sink.can_write_eof():
+                sink.write_eof()
+        except OSError:
+            pass
+
+    def summary(self) -> dict:
+        """Per-member health and load as a JSON-serialisable dict."""
+        return {
+            "listen_port": self.port,
+            "members": [m.summary() for m in self.members],
+        }
+
+    async def close(self) -> None:
+        """Stop the balancer, the supervisors and the member tunnels."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for member in self.members:
+            member.supervisor.stop()
+        await asyncio.gather(*(m.task for m in self.members if m.task), return_exceptions=True)
+        await asyncio.gather(
+            *(m.tunnel.astop() for m in self.members if m.tunnel.owns_process),
+            return_exceptions=True,
+        )
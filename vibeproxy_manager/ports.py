@@ -0,0 +1,170 @@
+"""Find and stop the processes that own a local TCP port.
+
+On Linux, owners are resolved straight from procfs. Listening sockets and
+their inodes come from ``/proc/net/tcp`` and ``/proc/net/tcp6``. Each inode is
+then matched against the ``socket:[inode]`` links under ``/proc/<pid>/fd``.
+The whole lookup takes a few milliseconds and starts no subprocesses. This
+lets kill-port and ``stop()`` target the exact process, where ``pkill -f``
+could also hit unrelated processes. On Windows the lookup uses
+``Get-NetTCPConnection``. Other platforms return None so callers can fall
+back to their old behaviour.
+"""
+
+import os
+import platform
+import signal
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+PROC = Path("/proc")
+
+# TCP state code for LISTEN in /proc/net/tcp
+_TCP_LISTEN = "0A"
+
+# Process names of SSH clients that may hold a tunnel forward
+SSH_PROCESS_NAMES = {"ssh", "ssh.exe", "sshpass", "plink", "plink.exe"}
+
+
+class PortOwner(BaseModel):
+    """A process holding a local port."""
+
+    pid: int
+    name: str = ""
+    cmdline: str = ""
+
+    @property
+    def is_ssh(self) -> bool:
+        """Whether the process is an SSH client (so likely a tunnel forward)."""
+        return self.name.lower() in SSH_PROCESS_NAMES
+
+    @property
+    def label(self) -> str:
+        """Short description for messages, e.g. "ssh (1234)"."""
+        return f"{self.name or '?'} ({self.pid})"
+
+
+def parse_listening_inodes(text: str, port: int) -> set[int]:
+    """Socket inodes listening on ``port`` in /proc/net/tcp or tcp6 content."""
+    inodes = set()
+    for line in text.splitlines()[1:]:
+        # sl local_address rem_address st tx:rx tr:when retrnsmt uid timeout inode
+        fields = line.split()
+        if len(fields) < 10 or fields[3] != _TCP_LISTEN:
+            continue
+        _, _, local_port = fields[1].rpartition(":")
+        if int(local_port, 16) == port and fields[9] != "0":
+            inodes.add(int(fields[9]))
+    return inodes
+
+
+def _read_text(path: Path) -> str:
+    """File content, or "" if the file vanished or is unreadable."""
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def _readlink(path: str) -> str:
+    """Link target, or "" if the descriptor closed meanwhile."""
+    try:
+        return os.readlink(path)
+    except OSError:
+        return ""
+
+
+def _procfs_owners(port: int, proc: Path) -> list[PortOwner]:
+    """Owners of a listening port from procfs (Linux)."""
+    inodes: set[int] = set()
+    for table in ("tcp", "tcp6"):
+        inodes |= parse_listening_inodes(_read_text(proc / "net" / table), port)
+    if not inodes:
+        return []
+
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    owners = []
+    with os.scandir(proc) as entries:
+        pids = [int(entry.name) for entry in entries if entry.name.isdigit()]
+    for pid in pids:
+        fd_dir = proc / str(pid) / "fd"
+        try:
+            with os.scandir(fd_dir) as fds:
+                # Other users' processes raise PermissionError: skip them
+                found = any(_readlink(fd.path) in targets for fd in fds)
+        except OSError:
+            continue
+        if found:
+            cmdline = _read_text(proc / str(pid) / "cmdline")
+            owners.append(
+                PortOwner(
+                    pid=pid,
+                    name=_read_text(proc / str(pid) / "comm").strip(),
+                    cmdline=cmdline.replace("\0", " ").strip(),
+                )
+            )
+    return owners
+
+
+def _windows_owners(port: int) -> Optional[list[PortOwner]]:
+    """Owners of a local port via Get-NetTCPConnection (Windows)."""
+    try:
+        result = subprocess.run(
+            [
+                "powershell",
+                "-Command",
+                f"Get-NetTCPConnection -LocalPort {port} -ErrorAction SilentlyContinue | "
+                "Select-Object -ExpandProperty OwningProcess -Unique | "
+                'ForEach-Object { "$_ $((Get-Process -Id $_ -ErrorAction SilentlyContinue).Name)" }',
+            ],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    owners = []
+    for line in result.stdout.splitlines():
+        pid, _, name = line.strip().partition(" ")
+        # PID 0 is the System Idle Process holding TIME_WAIT entries
+        if pid.isdigit() and int(pid) > 0:
+            owners.append(PortOwner(pid=int(pid), name=name.strip()))
+    return owners
+
+
+def port_owners(port: int, proc: Path = PROC) -> Optional[list[PortOwner]]:
+    """Processes listening on a local TCP port.
+
+    Returns None when the platform offers no way to tell (e.g. macOS), so
+    callers can tell "nobody" apart from "unknown".
+    """
+    if platform.system() == "Windows":
+        return _windows_owners(port)
+    if (proc / "net" / "tcp").exists():
+        return _procfs_owners(port, proc)
+    return None
+
+
+def terminate(owners: list[PortOwner], force: bool = False) -> list[PortOwner]:
+    """Stop the given processes (never this one); returns those signalled."""
+    stopped = []
+    for owner in owners:
+        if owner.pid == os.getpid():
+            continue
+        try:
+            if platform.system() == "Windows":
+                result = subprocess.run(
+                    ["taskkill", "/F", "/PID", str(owner.pid)],
+                    capture_output=True,
+                    timeout=5,
+                )
+                if result.returncode != 0:
+                    continue
+            else:
+                os.kill(owner.pid, signal.SIGKILL if force else signal.SIGTERM)
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        stopped.append(owner)
+    return stopped
@@ -0,0 +1,139 @@
+"""Exit notification for the tunnel's ssh/plink process.
+
+``TunnelManager`` used to find out that ssh had died only when something
+asked: through ``poll()``, ``os.kill(pid, 0)`` or a ``tasklist`` spawn. This
+module waits on the process itself, so the event loop wakes the moment the
+process exits.
+
+- Linux: ``pidfd_open()`` returns a descriptor that becomes readable when
+  the process exits. It works for any process (including a daemonized
+  ``ssh -f`` adopted from the port owner), with no thread and no polling.
+- Windows: ``WaitForSingleObject`` on a process handle runs in a worker
+  thread. It also returns the exit code.
+- Elsewhere: ``os.kill(pid, 0)`` is polled.
+
+Children started with asyncio are awaited directly, because asyncio's child
+watcher already reports them as they exit.
+"""
+
+import asyncio
+import os
+import platform
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+# Windows process access rights and wait constants
+_SYNCHRONIZE = 0x00100000
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_WAIT_TIMEOUT = 0x102
+
+
+class ProcessExit(BaseModel):
+    """A tunnel process that has exited."""
+
+    pid: int
+    returncode: Optional[int] = None  # None when the status could not be read
+    stderr_tail: str = ""
+    detected_by: str = "poll"  # "child", "pidfd", "handle" or "poll"
+    at: float = Field(default_factory=time.time)  # When the exit was noticed
+
+    @property
+    def message(self) -> str:
+        """Reason line for logs and events."""
+        status = f"code {self.returncode}" if self.returncode is not None else "unknown status"
+        return f"ssh exited with {status}: {self.stderr_tail or 'no error output'}"
+
+
+async def _wait_pidfd(pid: int) -> bool:
+    """Wait on a pidfd; False if pidfds are unavailable here."""
+    try:
+        fd = os.pidfd_open(pid)
+    except ProcessLookupError:
+        return True  # Already gone
+    except OSError:
+        return False
+    loop = asyncio.get_running_loop()
+    exited = loop.create_future()
+    try:
+        loop.add_reader(fd, lambda: exited.done() or exited.set_result(None))
+    except (NotImplementedError, ValueError):
+        os.close(fd)
+        return False
+    try:
+        await exited
+    finally:
+        loop.remove_reader(fd)
+        os.close(fd)
+    return True
+
+
+def _wait_handle(pid: int, cancelled: threading.Event) -> tuple[bool, Optional[int]]:
+    """Block on a Windows process handle; returns (waited, exit code)."""
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(
+        _SYNCHRONIZE | _PROCESS_QUERY_LIMITED_INFORMATION, False, pid
+    )
+    if not handle:
+        return False, None
+    try:
+        # Short waits so a cancelled watch does not pin the thread forever
+        while kernel32.WaitForSingleObject(handle, 500) == _WAIT_TIMEOUT:
+            if cancelled.is_set():
+                return True, None
+        code = ctypes.c_ulong()
+        if kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return True, code.value
+        return True, None
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a PID still exists (POSIX)."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, owned by someone else
+    return True
+
+
+async def wait_for_exit(
+    pid: int, process: Optional[subprocess.Popen] = None, poll_interval: float = 1.0
+) -> tuple[Optional[int], str]:
+    """Wait until a process exits; returns (exit code or None, how it was detected).
+
+    Args:
+        pid: Process to watch (need not be our child)
+        process: Popen object for the PID, if we started it (gives the exit code)
+        poll_interval: Seconds between checks when no notification mechanism exists
+    """
+    if platform.system() == "Windows":
+        cancelled = threading.Event()
+        try:
+            waited, returncode = await asyncio.to_thread(_wait_handle, pid, cancelled)
+        finally:
+            cancelled.set()
+        if waited:
+            if process is not None:
+                returncode = process.poll()
+            return returncode, "handle"
+    elif hasattr(os, "pidfd_open") and await _wait_pidfd(pid):
+        # Our own child is left unreaped until poll() collects its status
+        return (process.poll() if process is not None else None), "pidfd"
+
+    if process is not None:
+        while process.poll() is None:
+            await asyncio.sleep(poll_interval)
+        return process.returncode, "poll"
+    while _pid_alive(pid):
+        await asyncio.sleep(poll_interval)
+    return None, "poll"
+
@@ -0,0 +1,254 @@
+"""Continuous tunnel quality probing.
+
+An open port says nothing about whether the tunnel is usable. The prober
+sends a small HTTP request through the forward every few seconds to measure
+round-trip time and loss, and now and then reads a full response to
+estimate throughput. Samples go into a bounded time series, and the
+current state (healthy / degraded / down) is judged against thresholds so
+the UI and the supervisor react to real quality rather than to "port open".
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+
+from . import metrics
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+DOWN = "down"
+UNKNOWN = "unknown"
+
+TUNNEL_RTT = metrics.REGISTRY.histogram(
+    "vibeproxy_tunnel_rtt_seconds",
+    "Round-trip time of quality probes through the tunnel.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0),
+)
+TUNNEL_PROBES = metrics.REGISTRY.counter(
+    "vibeproxy_tunnel_probes_total",
+    "Quality probes sent through the tunnel, by result.",
+    ("result",),
+)
+TUNNEL_THROUGHPUT = metrics.REGISTRY.gauge(
+    "vibeproxy_tunnel_throughput_bytes_per_second",
+    "Most recent throughput measured through the tunnel.",
+)
+TUNNEL_QUALITY = metrics.REGISTRY.gauge(
+    "vibeproxy_tunnel_quality",
+    "Tunnel quality state (2 = healthy, 1 = degraded, 0 = down).",
+)
+
+_STATE_VALUES = {HEALTHY: 2, DEGRADED: 1, DOWN: 0}
+
+
+class QualityThresholds(BaseModel):
+    """Limits that turn probe samples into a quality state."""
+
+    degraded_rtt: float = 1.0
+    probe_timeout: float = 5.0
+    degraded_loss: float = 0.15
+    down_loss: float = 0.5
+    recent: int = 6
+
+
+class QualitySample(BaseModel):
+    """One probe result (rtt None = lost)."""
+
+    at: float
+    rtt: Optional[float] = None
+    throughput: Optional[float] = None
+    error: str = ""
+
+
+class TunnelProber:
+    """Measure RTT, loss and throughput through the tunnel in the background."""
+
+    def __init__(
+        self,
+        port: int,
+        host: str = "127.0.0.1",
+        interval: float = 5.0,
+        throughput_every: int = 12,
+        path: str = "/v1/models",
+        window: int = 720,
+        thresholds: Optional[QualityThresholds] = None,
+        on_change: Optional[Callable[[str, str], None]] = None,
+    ):
+        """Initialize the prober.
+
+        Args:
+            port: Local tunnel port to probe through
+            host: Local tunnel address
+            interval: Seconds between RTT probes
+            throughput_every: Read a full response every Nth probe (0 = never)
+            path: Endpoint requested through the tunnel
+            window: Number of samples kept (720 x 5s = 1 hour)
+            thresholds: Quality limits (defaults if None)
+            on_change: Callback(state, description) when the state changes
+        """
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self.throughput_every = throughput_every
+        self.path = path
+        self.thresholds = thresholds or QualityThresholds()
+        self.on_change = on_change
+        self.samples: deque[QualitySample] = deque(maxlen=window)
+        self.state = UNKNOWN
+        self._probes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._state_changed = asyncio.Event()
+
+    async def probe(self, measure_throughput: bool = False) -> QualitySample:
+        """Send one request through the tunnel and record the result."""
+        request = (
+            f"GET {self.path} HTTP/1.1\r\nHost: localhost\r\n"
+            "X-VibeProxy-Client: probe\r\nConnection: close\r\n\r\n"
+        ).encode()
+        sample = QualitySample(at=time.time())
+        streams: list[asyncio.StreamWriter] = []
+
+        async def exchange() -> None:
+            started = time.perf_counter()
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            streams.append(writer)
+            writer.write(request)
+            await writer.drain()
+            status = await reader.readline()
+            if not status.startswith(b"HTTP/"):
+                raise ConnectionError("no HTTP response")
+            first_byte = time.perf_counter()
+            sample.rtt = first_byte - started
+            if measure_throughput:
+                received = len(status)
+                while chunk := await reader.read(65536):
+                    received += len(chunk)
+                elapsed = time.perf_counter() - first_byte
+                if elapsed > 0:
+                    sample.throughput = received / elapsed
+
+        try:
+            await asyncio.wait_for(exchange(), self.thresholds.probe_timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            sample.rtt = None
+            sample.throughput = None
+            sample.error = str(e) or type(e).__name__
+        finally:
+            for writer in streams:
+                writer.close()
+
+        self.samples.append(sample)
+        TUNNEL_PROBES.inc("ok" if sample.rtt is not None else "lost")
+        if sample.rtt is not None:
+            TUNNEL_RTT.observe(sample.rtt)
+        if sample.throughput is not None:
+            TUNNEL_THROUGHPUT.set(sample.throughput)
+        self._update_state()
+        return sample
+
+    def _recent(self) -> list[QualitySample]:
+        """Samples the current state is judged on."""
+        return list(self.samples)[-self.thresholds.recent:]
+
+    @property
+    def loss_rate(self) -> float:
+        """Fraction of recent probes that got no response."""
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        return sum(1 for s in recent if s.rtt is None) / len(recent)
+
+    def rtt_percentile(self, fraction: float, recent_only: bool = True) -> Optional[float]:
+        """Nearest-rank RTT percentile over recent (or all) successful probes."""
+        samples = self._recent() if recent_only else self.samples
+        rtts = [s.rtt for s in samples if s.rtt is not None]
+        if not rtts:
+            return None
+        return metrics.percentile(rtts, fraction)
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Most recent throughput measurement (bytes/s)."""
+        for sample in reversed(self.samples):
+            if sample.throughput is not None:
+                return sample.throughput
+        return None
+
+    def evaluate(self) -> str:
+        """Judge the recent samples against the thresholds."""
+        recent = self._recent()
+        if not recent:
+            return UNKNOWN
+        loss = self.loss_rate
+        if loss >= self.thresholds.down_loss:
+            return DOWN
+        median = self.rtt_percentile(0.5)
+        if loss >= self.thresholds.degraded_loss or (
+            median is not None and median >= self.thresholds.degraded_rtt
+        ):
+            return DEGRADED
+        return HEALTHY
+
+    def describe(self) -> str:
+        """Short human-readable quality summary."""
+        median = self.rtt_percentile(0.5)
+        parts = [f"RTT {median * 1000:.0f} ms" if median is not None else "no replies"]
+        if self.loss_rate:
+            parts.append(f"{self.loss_rate:.0%} loss")
+        if self.throughput is not None:
+            parts.append(f"{self.throughput / 1024:.0f} KiB/s")
+        return ", ".join(parts)
+
+    def _update_state(self) -> None:
+        """Recompute the state and notify on change."""
+        state = self.evaluate()
+        TUNNEL_QUALITY.set(_STATE_VALUES.get(state, 0))
+        if state == self.state:
+            return
+        self.state = state
+        self._state_changed.set()
+        self._state_changed = asyncio.Event()
+        if self.on_change is not None:
+            self.on_change(state, self.describe())
+
+    async def wait_for_state(self, state: str) -> None:
+        """Wait until the state next changes to ``state``."""
+        while True:
+            changed = self._state_changed
+            await changed.wait()
+            if self.state == state:
+                return
+
+    def summary(self) -> dict:
+        """Current quality as a JSON-serialisable dict."""
+        return {
+            "state": self.state,
+            "rtt_p50_seconds": self.rtt_percentile(0.5),
+            "rtt_p95_seconds": self.rtt_percentile(0.95, recent_only=False),
+            "loss_rate": self.loss_rate,
+            "throughput_bytes_per_second": self.throughput,
+            "samples": len(self.samples),
+        }
+
+    async def run(self) -> None:
+        """Probe forever at the configured interval."""
+        while True:
+            self._probes += 1
+            measure = bool(self.throughput_every) and self._probes % self.throughput_every == 1
+            await self.probe(measure_throughput=measure)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start probing in the background (needs a running loop)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop background probing."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,59 @@
+"""Happy-eyeballs style racing of connection attempts (RFC 8305).
+
+Attempts start one after another, ``stagger`` seconds apart, or at once when
+the previous attempt fails. The first attempt to succeed wins and the rest are
+cancelled. The preferred candidate gets a head start, but a dead one costs
+only ``stagger`` instead of a full connect timeout.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# RFC 8305 recommends 250 ms between connection attempts
+DEFAULT_STAGGER = 0.25
+
+
+async def race(
+    candidates: Iterable[str],
+    attempt: Callable[[str], Awaitable[T]],
+    stagger: float = DEFAULT_STAGGER,
+) -> Optional[tuple[str, T]]:
+    """Run attempt(candidate) with staggered starts and return the first success.
+
+    An attempt succeeds by returning a truthy value; falsy results and
+    exceptions count as failures. Losing attempts are cancelled (and awaited,
+    so their cleanup has run) before this returns.
+
+    Args:
+        candidates: Candidates in order of preference
+        attempt: Coroutine function trying one candidate
+        stagger: Seconds before starting the next attempt
+
+    Returns (candidate, result) of the winner, or None if every attempt failed.
+    """
+    remaining = iter(candidates)
+    tasks: dict[asyncio.Future, str] = {}
+    try:
+        while True:
+            candidate = next(remaining, None)
+            if candidate is not None:
+                tasks[asyncio.ensure_future(attempt(candidate))] = candidate
+            running = [task for task in tasks if not task.done()]
+            if not running:
+                if candidate is None:
+                    return None
+                continue
+            done, _ = await asyncio.wait(
+                running,
+                timeout=stagger if candidate is not None else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if not task.cancelled() and task.exception() is None and task.result():
+                    return tasks[task], task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
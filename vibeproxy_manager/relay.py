@@ -0,0 +1,743 @@
+"""Local HTTP relay in front of the SSH tunnel.
+
+Consumers (A0, Droid, scripts) point at the relay port instead of the tunnel
+port. The relay forwards every request to VibeProxy through the tunnel,
+records traffic metrics on the way, and serves ``GET /metrics`` for scraping
+and ``GET /traffic?window=60`` for rolling per-client/per-model usage.
+
+The tunnel itself is owned by the daemon, a separate process, so ``/metrics``
+pulls the daemon's exposition and merges it in. One scrape then covers
+tunnel state and retries as well as traffic. ``GET /v1/models`` is answered
+from a short-lived cache, which is what the cache hit ratio measures.
+
+Usage:
+    python -m vibeproxy_manager.relay [--port 8318] [--upstream http://localhost:8317]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from . import metrics
+from .accounting import TrafficAccounting
+from .compression import DecodeError, StreamDecoder, accept_encoding_header
+from .config import ConfigManager
+from .journal import MAX_JOURNAL_BODY, TrafficJournal
+from .routing import ALIAS_REWRITES, AliasRouter
+from .shadow import ShadowMirror
+
+# Headers that describe a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+# User-Agent fragments mapped to a bounded set of client labels
+CLIENT_USER_AGENTS = {
+    "factory": "droid",
+    "droid": "droid",
+    "litellm": "a0",
+    "openai/python": "a0",
+    "python-httpx": "script",
+    "python-requests": "script",
+    "curl": "script",
+    "powershell": "script",
+}
+
+# Every value the client label can take. Anything else becomes "other", so a
+# caller cannot grow the metrics registry with made-up client names.
+CLIENT_LABELS = frozenset({"tui", "shadow", "probe", *CLIENT_USER_AGENTS.values()})
+
+# Upper bound on a non-streaming body we keep around to read token usage
+MAX_USAGE_BUFFER = 4 * 1024 * 1024
+
+# Seconds a GET /v1/models answer is reused (same TTL as the TUI's cache)
+MODEL_LIST_TTL = 30.0
+
+
+def classify_client(headers: dict[str, str]) -> str:
+    """Derive a low-cardinality client label from request headers.
+
+    An explicit ``X-VibeProxy-Client`` header wins if it names one of
+    CLIENT_LABELS (any other value is "other"); otherwise the User-Agent is
+    matched against known consumers.
+    """
+    explicit = headers.get("x-vibeproxy-client", "").strip().lower()
+    if explicit:
+        return explicit if explicit in CLIENT_LABELS else "other"
+
+    user_agent = headers.get("user-agent", "").lower()
+    for fragment, label in CLIENT_USER_AGENTS.items():
+        if fragment in user_agent:
+            return label
+    return "other"
+
+
+def extract_usage(data: dict) -> tuple[int, int]:
+    """Return (input_tokens, output_tokens) from an OpenAI or Anthropic payload."""
+    usage = data.get("usage")
+    if not isinstance(usage, dict):
+        message = data.get("message")
+        usage = message.get("usage") if isinstance(message, dict) else None
+    if not isinstance(usage, dict):
+        return 0, 0
+
+    tokens_in = usage.get("prompt_tokens", usage.get("input_tokens", 0)) or 0
+    tokens_out = usage.get("completion_tokens", usage.get("output_tokens", 0)) or 0
+    return int(tokens_in), int(tokens_out)
+
+
+class UsageScanner:
+    """Pick token usage out of a response body as it streams past.
+
+    SSE bodies are scanned line by line and only lines mentioning ``usage``
+    are parsed, so long streams cost next to nothing. JSON bodies are
+    buffered (up to ``MAX_USAGE_BUFFER``) and parsed once at the end.
+    """
+
+    def __init__(self, streaming: bool):
+        """Initialize for an SSE (streaming) or plain JSON body."""
+        self.streaming = streaming
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self._pending = b""
+        self._buffer: list[bytes] = []
+        self._buffered = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume one chunk of the decoded response body."""
+        if not self.streaming:
+            if self._buffered <= MAX_USAGE_BUFFER:
+                self._buffer.append(chunk)
+                self._buffered += len(chunk)
+            return
+
+        data = self._pending + chunk
+        lines = data.split(b"\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._scan_line(line)
+
+    def _scan_line(self, line: bytes) -> None:
+        """Parse a single SSE line if it carries usage."""
+        if not line.startswith(b"data:") or b'"usage"' not in line:
+            return
+        try:
+            payload = json.loads(line[5:].strip())
+        except ValueError:
+            return
+        if isinstance(payload, dict):
+            tokens_in, tokens_out = extract_usage(payload)
+            # Anthropic streams report input and output in separate events
+            self.tokens_in = max(self.tokens_in, tokens_in)
+            self.tokens_out = max(self.tokens_out, tokens_out)
+
+    def finish(self) -> tuple[int, int]:
+        """Flush remaining data and return (input_tokens, output_tokens)."""
+        if self.streaming:
+            if self._pending:
+                self._scan_line(self._pending.strip())
+                self._pending = b""
+        elif self._buffer and self._buffered <= MAX_USAGE_BUFFER:
+            try:
+                payload = json.loads(b"".join(self._buffer))
+            except ValueError:
+                payload = None
+            if isinstance(payload, dict):
+                self.tokens_in, self.tokens_out = extract_usage(payload)
+            self._buffer = []
+        return self.tokens_in, self.tokens_out
+
+
+class RelayRequest:
+    """A parsed inbound HTTP request."""
+
+    def __init__(
+        self,
+        method: str,
+        target: str,
+        version: str,
+        headers: list[tuple[str, str]],
+        body: bytes,
+    ):
+        """Initialize from the parsed request line, headers and body."""
+        self.method = method
+        self.target = target
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.header_map = {name.lower(): value for name, value in headers}
+        self.received_at = time.perf_counter()
+        self.received_wall = time.time()
+        self._json: Optional[dict] = None
+        self._json_parsed = False
+
+    @property
+    def keep_alive(self) -> bool:
+        """Whether the client expects the connection to stay open."""
+        connection = self.header_map.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Optional[dict]:
+        """Parse the body as a JSON object once (None if not JSON)."""
+        if not self._json_parsed:
+            self._json_parsed = True
+            if self.body and self.method in ("POST", "PUT", "PATCH"):
+                try:
+                    data = json.loads(self.body)
+                    self._json = data if isinstance(data, dict) else None
+                except ValueError:
+                    self._json = None
+        return self._json
+
+    @property
+    def model(self) -> str:
+        """Model named in the request body, or "none"."""
+        data = self.json()
+        model = data.get("model") if data else None
+        return str(model) if model else "none"
+
+    def set_model(self, model: str) -> None:
+        """Rewrite the model in the JSON body."""
+        data = self.json()
+        if data is None:
+            return
+        data["model"] = model
+        self.body = json.dumps(data).encode()
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[RelayRequest]:
+    """Read one HTTP/1.x request from the stream (None on clean EOF)."""
+    request_line = await reader.readline()
+    if not request_line or not request_line.strip():
+        return None
+
+    try:
+        method, target, version = request_line.decode("latin-1").strip().split(" ", 2)
+    except ValueError:
+        raise ValueError(f"Malformed request line: {request_line!r}")
+
+    headers: list[tuple[str, str]] = []
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers.append((name.strip(), value.strip()))
+
+    header_map = {name.lower(): value for name, value in headers}
+    body = b""
+    if "chunked" in header_map.get("transfer-encoding", "").lower():
+        parts = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip optional trailers up to the terminating blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            parts.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b"".join(parts)
+    elif header_map.get("content-length"):
+        body = await reader.readexactly(int(header_map["content-length"]))
+
+    return RelayRequest(method.upper(), target, version, headers, body)
+
+
+def _query_window(target: str) -> Optional[float]:
+    """The ``window`` query parameter (seconds) of a request target, if valid."""
+    query = parse_qs(urlsplit(target).query)
+    try:
+        window = float(query.get("window", [""])[0])
+    except ValueError:
+        return None
+    return window if window > 0 else None
+
+
+class RelayServer:
+    """Asyncio HTTP relay that forwards to VibeProxy and records metrics."""
+
+    def __init__(
+        self,
+        upstream_url: str = "http://localhost:8317",
+        host: str = "127.0.0.1",
+        port: int = 8318,
+        journal: Optional[TrafficJournal] = None,
+        compression: bool = True,
+        shadow: Optional[ShadowMirror] = None,
+        router: Optional[AliasRouter] = None,
+    ):
+        """Initialize with upstream base URL and local listen address.
+
+        Pass a ``TrafficJournal`` to record every exchange (opt-in). With
+        ``compression`` the relay negotiates compressed responses upstream
+        and decodes them on the fly before they reach the client. A
+        ``ShadowMirror`` duplicates sampled requests to a candidate model,
+        and an ``AliasRouter`` rewrites alias model IDs (``vp-default``) to
+        concrete models per request.
+        """
+        self.upstream_url = upstream_url.rstrip("/")
+        self.host = host
+        self.port = port
+        self.journal = journal
+        self.accept_encoding = accept_encoding_header() if compression else "identity"
+        self.shadow = shadow
+        self.router = router
+        # Rolling per-client/per-model traffic, served at GET /traffic
+        self.accounting = TrafficAccounting()
+        # Exposition of another process (the daemon) merged into GET /metrics
+        self.metrics_source: Optional[Callable[[], Awaitable[Optional[str]]]] = None
+        # Last GET /v1/models answer: (monotonic time, body, content type)
+        self._model_list: Optional[tuple[float, bytes, str]] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        """Bind the listening socket and create the upstream client."""
+        self._client = httpx.AsyncClient(
+            base_url=self.upstream_url,
+            # Completions can stream for minutes; only connects should fail fast
+            timeout=httpx.Timeout(300.0, connect=5.0),
+        )
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        # Pick up the real port when bound to port 0 (tests)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening and close the upstream client."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.journal is not None:
+            self.journal.close()
+        if self.shadow is not None:
+            await self.shadow.close()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve requests on one client connection until it closes."""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    await self._send_simple(writer, 400, b"Bad Request\n", "text/plain")
+                    break
+                if request is None:
+                    break
+
+                path = request.target.split("?")[0]
+                if request.method == "GET" and path == "/metrics":
+                    remote = await self.metrics_source() if self.metrics_source else None
+                    await self._send_simple(
+                        writer,
+                        200,
+                        metrics.REGISTRY.render(remote or "").encode(),
+                        "text/plain; version=0.0.4",
+                    )
+                elif request.method == "GET" and path == "/v1/models" and self._cached_models():
+                    metrics.MODEL_CACHE_REQUESTS.inc("hit")
+                    _, body, content_type = self._model_list
+                    await self._send_simple(writer, 200, body, content_type)
+                elif path == "/aliases" and self.router is not None:
+                    await self._handle_aliases(request, writer)
+                elif request.method == "GET" and path == "/traffic":
+                    summary = self.accounting.summary(_query_window(request.target))
+                    await self._send_simple(
+                        writer, 200, json.dumps(summary).encode(), "application/json"
+                    )
+                elif request.method == "GET" and path == "/shadow" and self.shadow:
+                    await self._send_simple(
+                        writer, 200, self.shadow.summary_json(), "application/json"
+                    )
+                else:
+                    await self._relay(request, writer)
+
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def _cached_models(self) -> bool:
+        """Whether a fresh GET /v1/models answer is cached."""
+        return (
+            self._model_list is not None
+            and time.monotonic() - self._model_list[0] < MODEL_LIST_TTL
+        )
+
+    async def _handle_aliases(self, request: RelayRequest, writer: asyncio.StreamWriter) -> None:
+        """GET lists aliases; POST {"alias": "model", ...} remaps them live."""
+        if request.method == "POST":
+            updates = request.json()
+            if not updates or not all(isinstance(v, str) and v for v in updates.values()):
+                await self._send_error(writer, 400, 'Expected {"alias": "model-id"}')
+                return
+            shadowed = sorted(set(updates) & await self._upstream_model_ids())
+            if shadowed:
+                await self._send_error(
+                    writer, 409, f"Alias would shadow an upstream model: {', '.join(shadowed)}"
+                )
+                return
+            for alias, model in updates.items():
+                self.router.set_alias(alias, model)
+        body = json.dumps(self.router.aliases, indent=2).encode()
+        await self._send_simple(writer, 200, body, "application/json")
+
+    async def _upstream_model_ids(self) -> set[str]:
+        """IDs the upstream serves, from the /v1/models cache or a fresh fetch.
+
+        Empty when the upstream cannot be reached, so remapping still works
+        while the tunnel is down.
+        """
+        if not self._cached_models():
+            try:
+                response = await self._client.get("/v1/models", timeout=5.0)
+            except httpx.HTTPError:
+                return set()
+            if response.status_code != 200:
+                return set()
+            self._model_list = (
+                time.monotonic(),
+                response.content,
+                response.headers.get("content-type", "application/json"),
+            )
+        try:
+            data = json.loads(self._model_list[1]).get("data", [])
+            return {item["id"] for item in data if isinstance(item, dict) and "id" in item}
+        except (ValueError, AttributeError, TypeError):
+            return set()
+
+    def _upstream_headers(self, request: RelayRequest) -> list[tuple[str, str]]:
+        """Build the header list forwarded upstream."""
+        headers = [
+            (name, value)
+            for name, value in request.headers
+            if name.lower() not in HOP_BY_HOP_HEADERS
+            and name.lower() not in ("host", "content-length", "accept-encoding")
+        ]
+        # Relay decodes bodies itself (for token accounting), so it picks the encoding
+        headers.append(("Accept-Encoding", self.accept_encoding))
+        return headers
+
+    async def _open_upstream(self, request: RelayRequest) -> httpx.Response:
+        """Send the request upstream, retrying once if the tunnel refuses the connect."""
+        upstream = self._client.build_request(
+            request.method,
+            request.target,
+            headers=self._upstream_headers(request),
+            content=request.body,
+        )
+        try:
+            return await self._client.send(upstream, stream=True)
+        except httpx.ConnectError:
+            # Nothing reached VibeProxy, so a single retry is always safe
+            metrics.RETRIES.inc("upstream_connect")
+            await asyncio.sleep(0.5)
+            return await self._client.send(upstream, stream=True)
+
+    async def _relay(self, request: RelayRequest, writer: asyncio.StreamWriter) -> None:
+        """Forward one request upstream and stream the response back."""
+        model = request.model
+        if self.router is not None and model != "none":
+            resolved = self.router.resolve(model)
+            if resolved != model:
+                ALIAS_REWRITES.inc(model)
+                request.set_model(resolved)
+                model = resolved
+        client = classify_client(request.header_map)
+        metrics.QUEUE_DEPTH.inc("relay")
+        status = "error"
+        first_byte_at: Optional[float] = None
+        scanner: Optional[UsageScanner] = None
+        decoder: Optional[StreamDecoder] = None
+        response_headers: dict[str, str] = {}
+        captured: Optional[list[bytes]] = [] if self.journal is not None else None
+        captured_size = 0
+        model_list: Optional[list[bytes]] = None
+        if request.method == "GET" and request.target.split("?")[0] == "/v1/models":
+            metrics.MODEL_CACHE_REQUESTS.inc("miss")
+            model_list = []
+        mirrored = self.shadow is not None and self.shadow.should_mirror(
+            request.method, request.target, model
+        )
+
+        try:
+            try:
+                response = await self._open_upstream(request)
+            except httpx.ConnectError as e:
+                metrics.TUNNEL_UP.set(0)
+                status = "502"
+                await self._send_error(writer, 502, f"Tunnel unavailable: {e}")
+                return
+            except httpx.TimeoutException:
+                status = "504"
+                await self._send_error(writer, 504, "Upstream timeout")
+                return
+            except httpx.HTTPError as e:
+                status = "502"
+                await self._send_error(writer, 502, f"Upstream error: {e}")
+                return
+
+            metrics.TUNNEL_UP.set(1)
+            status = str(response.status_code)
+            response_headers = dict(response.headers)
+            content_type = response.headers.get("content-type", "")
+            scanner = UsageScanner(streaming="text/event-stream" in content_type)
+            head_written = False
+
+            try:
+                try:
+                    decoder = StreamDecoder(response.headers.get("content-encoding"))
+                except ValueError as e:
+                    # e.g. br without the brotli package, or stacked encodings
+                    status = "502"
+                    await self._send_error(writer, 502, f"Cannot decode upstream response: {e}")
+                    return
+                if request.method == "HEAD" or response.status_code in (204, 304):
+                    await self._write_head(writer, response, chunked=False)
+                    await writer.drain()
+                    return
+                await self._write_head(writer, response)
+                head_written = True
+                async for raw in response.aiter_raw():
+                    chunk = decoder.decode(raw)
+                    if not chunk:
+                        continue
+                    if first_byte_at is None:
+                        first_byte_at = time.perf_counter()
+                    scanner.feed(chunk)
+                    if captured is not None and captured_size <= MAX_JOURNAL_BODY:
+                        captured.append(chunk)
+                        captured_size += len(chunk)
+                    if model_list is not None:
+                        model_list.append(chunk)
+                    writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    await writer.drain()
+                tail = decoder.flush()
+                if tail:
+                    scanner.feed(tail)
+                    writer.write(b"%x\r\n%s\r\n" % (len(tail), tail))
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+                if model_list is not None and response.status_code == 200:
+                    model_list.append(tail)
+                    self._model_list = (
+                        time.monotonic(),
+                        b"".join(model_list),
+                        content_type or "application/json",
+                    )
+            except (httpx.HTTPError, DecodeError) as e:
+                if head_written:
+                    # The status line is out: all we can do is cut the chunked body short
+                    status = "aborted"
+                    raise ConnectionError(f"Upstream stream failed: {e}") from e
+                status = "504" if isinstance(e, httpx.TimeoutException) else "502"
+                await self._send_error(writer, int(status), f"Upstream error: {e}")
+            finally:
+                await response.aclose()
+        finally:
+            metrics.QUEUE_DEPTH.dec("relay")
+            now = time.perf_counter()
+            metrics.REQUESTS.inc(model, client, status)
+            metrics.REQUEST_DURATION.observe(now - request.received_at, model, client)
+            if first_byte_at is not None:
+                metrics.TIME_TO_FIRST_TOKEN.observe(
+                    first_byte_at - request.received_at, model, client
+                )
+            bytes_up = len(request.body)
+            bytes_down = decoder.wire_bytes if decoder is not None else 0
+            self.accounting.record(client, model, bytes_up, bytes_down)
+            metrics.TRAFFIC_BYTES.inc(model, client, "up", amount=bytes_up)
+            metrics.TRAFFIC_BYTES.inc(model, client, "down", amount=bytes_down)
+            if scanner is not None:
+                tokens_in, tokens_out = scanner.finish()
+                if tokens_in:
+                    metrics.TOKENS.inc(model, client, "in", amount=tokens_in)
+                if tokens_out:
+                    metrics.TOKENS.inc(model, client, "out", amount=tokens_out)
+            if decoder is not None and decoder.wire_bytes:
+                encoding = decoder.encoding
+                metrics.UPSTREAM_WIRE_BYTES.inc(model, encoding, amount=decoder.wire_bytes)
+                metrics.UPSTREAM_DECODED_BYTES.inc(model, encoding, amount=decoder.decoded_bytes)
+                if decoder.compressed:
+                    metrics.COMPRESSION_SAVED_BYTES.inc(model, amount=decoder.saved_bytes)
+                    metrics.DECOMPRESSION_SECONDS.inc(
+                        model, encoding, amount=decoder.decode_seconds
+                    )
+            # Primary is fully delivered; the copy cannot delay it. Only primaries
+            # whose copy was actually sent are recorded, so both sides cover the
+            # same requests.
+            if mirrored and self.shadow.submit(request.json(), request.target, request.header_map):
+                self.shadow.record_primary(
+                    model,
+                    now - request.received_at,
+                    (first_byte_at - request.received_at) if first_byte_at else None,
+                    int(status) if status.isdigit() else 0,
+                    (tokens_in, tokens_out) if scanner is not None else (0, 0),
+                )
+            if captured is not None:
+                self.journal.record(
+                    method=request.method,
+                    path=request.target,
+                    model=model,
+                    client=client,
+                    request_headers=request.header_map,
+                    request_body=request.body,
+                    status=int(status) if status.isdigit() else 0,
+                    response_headers=response_headers,
+                    response_body=b"".join(captured),
+                    started_at=request.received_wall,
+                    ttfb=(first_byte_at - request.received_at) if first_byte_at else None,
+                    duration=now - request.received_at,
+                )
+
+    async def _write_head(
+        self, writer: asyncio.StreamWriter, response: httpx.Response, chunked: bool = True
+    ) -> None:
+        """Write status line and headers (chunked unless the response has no body)."""
+        lines = [f"HTTP/1.1 {response.status_code} {response.reason_phrase}"]
+        for name, value in response.headers.multi_items():
+            # Bodies are re-chunked and already decoded for the client
+            if name.lower() in HOP_BY_HOP_HEADERS or name.lower() in (
+                "content-length",
+                "content-encoding",
+            ):
+                continue
+            lines.append(f"{name}: {value}")
+        if chunked:
+            lines.append("Transfer-Encoding: chunked")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_simple(
+        self, writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str
+    ) -> None:
+        """Send a complete, non-streamed response."""
+        reason = {200: "OK", 400: "Bad Request", 502: "Bad Gateway", 504: "Gateway Timeout"}
+        head = (
+            f"HTTP/1.1 {status} {reason.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _send_error(self, writer: asyncio.StreamWriter, status: int, message: str) -> None:
+        """Send an OpenAI-style JSON error body."""
+        body = json.dumps({"error": {"message": message, "type": "relay_error"}}).encode()
+        await self._send_simple(writer, status, body, "application/json")
+
+
+def main() -> None:
+    """Run the relay until interrupted."""
+    config_manager = ConfigManager()
+    config = config_manager.load()
+    parser = argparse.ArgumentParser(description="VibeProxy local relay with /metrics")
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    parser.add_argument(
+        "--port", type=int, default=config.relay_port, help="Listen port (default: from config)"
+    )
+    parser.add_argument(
+        "--upstream",
+        default=f"http://localhost:{config.local_port}",
+        help="VibeProxy base URL, normally the tunnel port",
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="DIR",
+        default=config.journal_dir if config.journal_enabled else None,
+        help="Record traffic to rotated, gzip JSONL files in DIR (opt-in)",
+    )
+    parser.add_argument(
+        "--no-compression",
+        action="store_true",
+        default=not config.relay_compression,
+        help="Ask VibeProxy for uncompressed responses",
+    )
+    parser.add_argument(
+        "--shadow-model",
+        default=config.shadow_model,
+        help="Candidate model that receives mirrored copies of sampled requests",
+    )
+    parser.add_argument(
+        "--shadow-rate",
+        type=float,
+        default=config.shadow_sample_rate,
+        help="Fraction of requests to mirror (0-1)",
+    )
+    args = parser.parse_args()
+
+    journal = None
+    if args.journal:
+        journal_path = Path(args.journal)
+        if not journal_path.is_absolute():
+            journal_path = config_manager.base_path / journal_path
+        journal = TrafficJournal(journal_path)
+        print(f"Journaling traffic to {journal_path}")
+    server = RelayServer(
+        upstream_url=args.upstream,
+        host=args.host,
+        port=args.port,
+        journal=journal,
+        compression=not args.no_compression,
+    )
+    server.router = AliasRouter(config_manager)
+    if args.shadow_model and args.shadow_rate > 0:
+        server.shadow = ShadowMirror(
+            args.upstream,
+            args.shadow_model,
+            sample_rate=args.shadow_rate,
+            primary_model=config.shadow_primary_model,
+        )
+        print(f"Mirroring {args.shadow_rate:.0%} of requests to {args.shadow_model} (see /shadow)")
+    # Imported here: the daemon module imports this one
+    from .daemon import DaemonClient
+
+    daemon = DaemonClient(
+        config.daemon_port, config.daemon_socket or None, config_manager.base_path, timeout=1.0
+    )
+    server.metrics_source = daemon.metrics
+    print(f"Relaying http://{args.host}:{args.port} -> {args.upstream} (metrics at /metrics)")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Replay journaled traffic against an upstream and report latency deltas.
+
+Entries are re-issued in journal order, spaced by their original arrival
+offsets divided by ``speed`` (2.0 = twice as fast, 0 = no pacing). The
+``StandInServer`` answers from the journal itself with the recorded timing,
+giving a deterministic local upstream for comparing relay or tunnel changes.
+
+Usage:
+    python -m vibeproxy_manager.replay journal/ [--upstream URL] [--speed 2] [--stand-in]
+"""
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from pydantic import BaseModel
+
+from .config import ConfigManager
+from .journal import REDACTED, read_journal
+from .metrics import percentile
+from .relay import read_request
+
+# Request headers that must be regenerated rather than replayed
+SKIP_REPLAY_HEADERS = {"host", "content-length", "transfer-encoding", "connection", "accept-encoding"}
+
+
+class ReplayResult(BaseModel):
+    """Outcome of replaying one journaled request."""
+
+    path: str
+    model: str
+    status: int = 0
+    original_duration: float = 0.0
+    original_ttfb: Optional[float] = None
+    duration: float = 0.0
+    ttfb: Optional[float] = None
+    error: str = ""
+
+    @property
+    def delta(self) -> float:
+        """Replay duration minus original duration (positive = slower)."""
+        return self.duration - self.original_duration
+
+
+def _replay_headers(entry: dict) -> dict[str, str]:
+    """Headers to send for a journaled request (redacted values dropped)."""
+    return {
+        name: value
+        for name, value in entry.get("request_headers", {}).items()
+        if name.lower() not in SKIP_REPLAY_HEADERS and value != REDACTED
+    }
+
+
+async def _replay_one(client: httpx.AsyncClient, entry: dict) -> ReplayResult:
+    """Send one journaled request and time it."""
+    result = ReplayResult(
+        path=entry.get("path", "/"),
+        model=entry.get("model", "none"),
+        original_duration=entry.get("duration") or 0.0,
+        original_ttfb=entry.get("ttfb"),
+    )
+    body = entry.get("request_body", "")
+    started = time.perf_counter()
+    try:
+        async with client.stream(
+            entry.get("method", "GET"),
+            result.path,
+            headers=_replay_headers(entry),
+            content=body.encode("utf-8") if body else None,
+        ) as response:
+            result.status = response.status_code
+            async for chunk in response.aiter_raw():
+                if chunk and result.ttfb is None:
+                    result.ttfb = time.perf_counter() - started
+    except httpx.HTTPError as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.duration = time.perf_counter() - started
+    return result
+
+
+async def replay(
+    entries: list[dict], base_url: str, speed: float = 1.0, timeout: float = 300.0
+) -> list[ReplayResult]:
+    """Re-issue journaled requests against base_url with original (or scaled) pacing."""
+    entries = [e for e in entries if e.get("path", "").split("?")[0] != "/metrics"]
+    if not entries:
+        return []
+
+    first_ts = entries[0].get("ts", 0.0)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async with httpx.AsyncClient(
+        base_url=base_url.rstrip("/"), timeout=httpx.Timeout(timeout, connect=5.0)
+    ) as client:
+
+        async def scheduled(entry: dict) -> ReplayResult:
+            if speed > 0:
+                offset = (entry.get("ts", first_ts) - first_ts) / speed
+                delay = offset - (loop.time() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            return await _replay_one(client, entry)
+
+        return list(await asyncio.gather(*(scheduled(entry) for entry in entries)))
+
+
+def summarize(results: list[ReplayResult]) -> dict[str, dict]:
+    """Group results by model with original vs replay latency percentiles."""
+    groups: dict[str, list[ReplayResult]] = defaultdict(list)
+    for result in results:
+        groups[result.model].append(result)
+
+    summary = {}
+    for model, items in sorted(groups.items()):
+        ok = [r for r in items if not r.error]
+        original = [r.original_duration for r in ok]
+        replayed = [r.duration for r in ok]
+        summary[model] = {
+            "requests": len(items),
+            "errors": len(items) - len(ok),
+            "original_p50": percentile(original, 0.5),
+            "replay_p50": percentile(replayed, 0.5),
+            "original_p95": percentile(original, 0.95),
+            "replay_p95": percentile(replayed, 0.95),
+            "mean_delta": sum(r.delta for r in ok) / len(ok) if ok else 0.0,
+        }
+    return summary
+
+
+class StandInServer:
+    """Local upstream that answers from a journal with the recorded timing."""
+
+    def __init__(self, entries: list[dict], host: str = "127.0.0.1", port: int = 0):
+        """Index journal responses by exact request, then by method and path."""
+        self.host = host
+        self.port = port
+        self._exact: dict[tuple, deque] = defaultdict(deque)
+        self._by_path: dict[tuple, deque] = defaultdict(deque)
+        for entry in entries:
+            route = (entry.get("method", "GET"), entry.get("path", "/"))
+            self._exact[route + (entry.get("request_body", ""),)].append(entry)
+            self._by_path[route].append(entry)
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running stand-in."""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Bind the listening socket."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """Stop listening."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _match(self, method: str, path: str, body: str) -> Optional[dict]:
+        """Pop the next recorded response for this request (cycling when exhausted)."""
+        for queue_ in (self._exact.get((method, path, body)), self._by_path.get((method, path))):
+            if queue_:
+                entry = queue_.popleft()
+                queue_.append(entry)
+                return entry
+        return None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection."""
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                entry = self._match(
+                    request.method, request.target, request.body.decode("utf-8", errors="replace")
+                )
+                if entry is None:
+                    writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                    await writer.drain()
+                else:
+                    await self._respond(writer, entry)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, entry: dict) -> None:
+        """Write the recorded response, reproducing TTFB and total duration."""
+        ttfb = entry.get("ttfb") or 0.0
+        duration = entry.get("duration") or ttfb
+        await asyncio.sleep(ttfb)
+
+        body = entry.get("response_body", "").encode("utf-8")
+        content_type = entry.get("response_headers", {}).get("content-type", "application/json")
+        head = (
+            f"HTTP/1.1 {entry.get('status') or 200} Replayed\r\n"
+            f"Content-Type: {content_type}\r\n"
+            "Transfer-Encoding: chunked\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1"))
+        if body:
+            writer.write(b"%x\r\n%s\r\n" % (len(body), body))
+        await writer.drain()
+        await asyncio.sleep(max(0.0, duration - ttfb))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def print_summary(summary: dict[str, dict]) -> None:
+    """Print a per-model latency comparison table."""
+    print(f"{'Model':<36} {'Req':>5} {'Err':>4} {'p50 orig':>9} {'p50 now':>9} {'p95 orig':>9} {'p95 now':>9} {'Δ mean':>8}")
+    for model, row in summary.items():
+        print(
+            f"{model[:36]:<36} {row['requests']:>5} {row['errors']:>4} "
+            f"{row['original_p50']:>8.2f}s {row['replay_p50']:>8.2f}s "
+            f"{row['original_p95']:>8.2f}s {row['replay_p95']:>8.2f}s {row['mean_delta']:>+7.2f}s"
+        )
+
+
+async def _run(args: argparse.Namespace) -> int:
+    """Load the journal, optionally start a stand-in, replay and report."""
+    entries = list(read_journal(Path(args.journal)))
+    if args.limit:
+        entries = entries[: args.limit]
+    if not entries:
+        print("No journal entries found")
+        return 1
+
+    stand_in = None
+    upstream = args.upstream
+    if args.stand_in:
+        stand_in = StandInServer(entries)
+        await stand_in.start()
+        upstream = stand_in.url
+        print(f"Stand-in upstream serving {len(entries)} recorded responses at {upstream}")
+
+    try:
+        print(f"Replaying {len(entries)} requests against {upstream} (speed {args.speed}x)...")
+        results = await replay(entries, upstream, speed=args.speed)
+    finally:
+        if stand_in is not None:
+            await stand_in.close()
+
+    print()
+    print_summary(summarize(results))
+    return 0 if all(not r.error for r in results) else 1
+
+
+def main() -> None:
+    """CLI entry point."""
+    config = ConfigManager().load()
+    parser = argparse.ArgumentParser(description="Replay journaled VibeProxy traffic")
+    parser.add_argument("journal", help="Journal file or directory")
+    parser.add_argument(
+        "--upstream",
+        default=f"http://localhost:{config.local_port}",
+        help="Base URL to replay against (default: tunnel port)",
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Pacing multiplier; 0 sends everything at once"
+    )
+    parser.add_argument("--limit", type=int, default=0, help="Only replay the first N entries")
+    parser.add_argument(
+        "--stand-in", action="store_true", help="Replay against a local stand-in built from the journal"
+    )
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_run(args)))
+
+
+if __name__ == "__main__":
+    main()
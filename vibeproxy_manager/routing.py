@@ -0,0 +1,85 @@
+"""Model alias routing for the local relay.
+
+Presets point at stable alias IDs such as ``vp-default``; the relay rewrites
+them to a concrete model on every request. Switching models is then an
+in-memory remap instead of a settings rewrite plus container restart.
+"""
+
+import time
+from typing import Optional
+
+from . import metrics
+from .config import ConfigManager
+
+ALIAS_REWRITES = metrics.REGISTRY.counter(
+    "vibeproxy_alias_rewrites_total",
+    "Requests whose alias model ID was rewritten to a concrete model.",
+    ("alias",),
+)
+
+
+class AliasRouter:
+    """Resolve alias model IDs to concrete models."""
+
+    def __init__(
+        self,
+        config_manager: Optional[ConfigManager] = None,
+        aliases: Optional[dict[str, str]] = None,
+        reload_interval: float = 1.0,
+    ):
+        """Initialize from config (and watch it) or from a fixed mapping.
+
+        Args:
+            config_manager: Source of aliases; edits made by the TUI in another
+                process are picked up within ``reload_interval`` seconds
+            aliases: Fixed mapping used instead of config (tests, scripts)
+            reload_interval: Minimum seconds between config file checks
+        """
+        self.config_manager = config_manager
+        self.reload_interval = reload_interval
+        self._aliases: dict[str, str] = dict(aliases or {})
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        if config_manager is not None and aliases is None:
+            self._aliases = config_manager.get_model_aliases()
+            self._mtime = self._config_mtime()
+
+    @property
+    def aliases(self) -> dict[str, str]:
+        """Current alias mapping (copy)."""
+        self._maybe_reload()
+        return dict(self._aliases)
+
+    def resolve(self, model: str) -> str:
+        """Return the concrete model for an alias (or the model unchanged)."""
+        self._maybe_reload()
+        return self._aliases.get(model, model)
+
+    def set_alias(self, alias: str, model: str, persist: bool = True) -> None:
+        """Remap an alias; takes effect on the very next request."""
+        self._aliases[alias] = model
+        if persist and self.config_manager is not None:
+            self.config_manager.set_model_alias(alias, model)
+            # The save merged into the file on disk; adopt edits made elsewhere too
+            self._aliases = self.config_manager.get_model_aliases()
+            self._mtime = self._config_mtime()
+
+    def _config_mtime(self) -> Optional[float]:
+        """Modification time of the config file (None if missing)."""
+        try:
+            return self.config_manager.config_path.stat().st_mtime
+        except (AttributeError, OSError):
+            return None
+
+    def _maybe_reload(self) -> None:
+        """Re-read aliases if the config file changed (at most once per interval)."""
+        if self.config_manager is None:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        mtime = self._config_mtime()
+        if mtime != self._mtime:
+            self._mtime = mtime
+            self._aliases = dict(self.config_manager.reload().model_aliases)
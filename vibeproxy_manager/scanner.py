@@ -0,0 +1,281 @@
+"""Asyncio network scanner for finding the Mac.
+
+All hosts and ports are probed concurrently, with at most ``concurrency``
+connects in flight. A refused port answers in about one LAN round trip and
+an absent host costs one ``timeout``, so a /24 finishes in roughly the
+timeout instead of the 10-20 s the threaded serial sweep took. Every
+relevant local subnet is swept in the same pass, at its real prefix length.
+"""
+
+import asyncio
+import ipaddress
+from itertools import islice, zip_longest
+from typing import Callable, Iterable, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from .interfaces import LocalInterface, local_interfaces
+
+VIBEPROXY_PORT = 8317
+SSH_PORT = 22
+DEFAULT_PORTS = (VIBEPROXY_PORT, SSH_PORT)
+
+# Upper bound on hosts per scan (a /20); larger networks are truncated
+MAX_HOSTS = 4096
+# Networks wider than this are narrowed to the block around our own address
+MIN_SCAN_PREFIX = 20
+
+# SSH banners of systems that are certainly not the Mac (macOS sends plain OpenSSH)
+NON_MAC_BANNERS = ("ubuntu", "debian", "raspbian", "dropbear", "freebsd", "rosssh", "cisco")
+
+ProgressCallback = Callable[[int, int, Optional["ScanResult"]], None]
+
+
+class ScanResult(BaseModel):
+    """One responsive host."""
+
+    ip: str
+    ports: list[int]
+
+    @property
+    def label(self) -> str:
+        """Label in the form the TUI and launcher display."""
+        if VIBEPROXY_PORT in self.ports:
+            return f"VibeProxy Host ({VIBEPROXY_PORT})"
+        if SSH_PORT in self.ports:
+            return f"SSH Host ({SSH_PORT})"
+        return f"Open ports {', '.join(map(str, self.ports))}"
+
+
+def primary_interface(
+    interfaces: Optional[list[LocalInterface]] = None,
+) -> Optional[LocalInterface]:
+    """The default-route interface, else the first LAN-like one (None if offline)."""
+    if interfaces is None:
+        interfaces = local_interfaces()
+    relevant = [interface for interface in interfaces if interface.relevant]
+    return relevant[0] if relevant else None
+
+
+def primary_ip() -> Optional[str]:
+    """IP of the primary interface (read from the OS; no route to the internet needed)."""
+    interface = primary_interface()
+    return interface.address if interface is not None else None
+
+
+def local_networks(
+    interfaces: Optional[list[LocalInterface]] = None,
+) -> list[ipaddress.IPv4Network]:
+    """Networks of this machine's relevant interfaces, primary first.
+
+    Each network keeps its real prefix length. One wider than
+    ``MIN_SCAN_PREFIX`` (e.g. a /16) is narrowed to the /20 around our own
+    address, where the Mac most likely is.
+    """
+    if interfaces is None:
+        interfaces = local_interfaces()
+    networks = []
+    for interface in interfaces:
+        if not interface.relevant:
+            continue
+        network = interface.network
+        if network.prefixlen < MIN_SCAN_PREFIX:
+            network = ipaddress.ip_network(f"{interface.address}/{MIN_SCAN_PREFIX}", strict=False)
+        if network not in networks:
+            networks.append(network)
+    return networks
+
+
+def expand_hosts(networks: Iterable, limit: int = MAX_HOSTS) -> list[str]:
+    """Unique host addresses of the given networks/CIDR strings, in order.
+
+    If together they exceed ``limit``, the networks take turns, so one large
+    network cannot crowd the others out of the scan.
+    """
+    per_network = []
+    for network in networks:
+        net = ipaddress.ip_network(str(network), strict=False)
+        candidates = net.hosts() if net.num_addresses > 2 else iter(net)
+        per_network.append([str(host) for host in islice(candidates, limit)])
+
+    hosts: dict[str, None] = dict.fromkeys(host for block in per_network for host in block)
+    if len(hosts) <= limit:
+        return list(hosts)
+    hosts = {}
+    for row in zip_longest(*per_network):
+        for host in row:
+            if host is not None:
+                hosts.setdefault(host, None)
+                if len(hosts) >= limit:
+                    return list(hosts)
+    return list(hosts)
+
+
+async def probe_port(ip: str, port: int, timeout: float) -> bool:
+    """Whether a TCP connect to ip:port succeeds within timeout."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def scan(
+    networks: Optional[Iterable] = None,
+    ports: tuple[int, ...] = DEFAULT_PORTS,
+    timeout: float = 0.3,
+    concurrency: int = 256,
+    progress_callback: Optional[ProgressCallback] = None,
+    hosts: Optional[list[str]] = None,
+) -> list[ScanResult]:
+    """Probe every host/port concurrently.
+
+    Args:
+        networks: Networks or CIDR strings (default: local_networks())
+        ports: Ports to probe on each host
+        timeout: Connect timeout per probe
+        concurrency: Maximum connects in flight
+        progress_callback: Called as (hosts_done, hosts_total, result) after each
+            host; result is the ScanResult for responsive hosts, else None
+        hosts: Explicit host list (overrides networks)
+
+    Returns responsive hosts sorted by address.
+    """
+    if hosts is None:
+        hosts = expand_hosts(networks if networks is not None else local_networks())
+    window = asyncio.Semaphore(concurrency)
+    results: list[ScanResult] = []
+    done = 0
+
+    async def probe(ip: str, port: int) -> bool:
+        async with window:
+            return await probe_port(ip, port, timeout)
+
+    async def check_host(ip: str) -> None:
+        nonlocal done
+        open_ports = await asyncio.gather(*(probe(ip, port) for port in ports))
+        result = None
+        if any(open_ports):
+            result = ScanResult(ip=ip, ports=[p for p, ok in zip(ports, open_ports) if ok])
+            results.append(result)
+        done += 1
+        if progress_callback is not None:
+            progress_callback(done, len(hosts), result)
+
+    await asyncio.gather(*(check_host(ip) for ip in hosts))
+    return sorted(results, key=lambda r: ipaddress.ip_address(r.ip))
+
+
+class Fingerprint(BaseModel):
+    """What a responsive host turned out to be."""
+
+    ip: str
+    ports: list[int]
+    ssh_banner: str = ""
+    models: Optional[int] = None  # Model count from GET /v1/models; None if no answer
+    known: bool = False  # Previously used host (see hosts.HostIndex)
+    advertised: bool = False  # Announced a VibeProxy service over mDNS
+
+    @property
+    def score(self) -> int:
+        """Confidence that this is the Mac running VibeProxy (higher is better)."""
+        score = 0
+        if self.models is not None:
+            score += 60
+        elif VIBEPROXY_PORT in self.ports:
+            score += 10
+        if self.ssh_banner.startswith("SSH-"):
+            score += 15
+            if any(name in self.ssh_banner.lower() for name in NON_MAC_BANNERS):
+                score -= 40
+        if self.known:
+            score += 30
+        if self.advertised:
+            score += 50
+        return score
+
+    @property
+    def label(self) -> str:
+        """ScanResult label plus what the fingerprint found."""
+        label = ScanResult(ip=self.ip, ports=self.ports).label
+        if self.models is not None:
+            label += f", {self.models} models"
+        if self.ssh_banner:
+            label += f", {self.ssh_banner}"
+        return label
+
+
+async def read_ssh_banner(ip: str, port: int = SSH_PORT, timeout: float = 1.5) -> str:
+    """First line the SSH server sends ("" if none within timeout)."""
+
+    async def read() -> str:
+        reader, writer = await asyncio.open_connection(ip, port)
+        try:
+            line = await reader.readline()
+        finally:
+            writer.close()
+        return line.decode("ascii", "replace").strip()
+
+    try:
+        return await asyncio.wait_for(read(), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return ""
+
+
+async def count_models(
+    client: httpx.AsyncClient, ip: str, port: int = VIBEPROXY_PORT
+) -> Optional[int]:
+    """Number of models VibeProxy at ip:port lists (None if it is not VibeProxy)."""
+    try:
+        response = await client.get(f"http://{ip}:{port}/v1/models")
+        if response.status_code != 200:
+            return None
+        data = response.json().get("data")
+    except (httpx.HTTPError, ValueError, AttributeError):
+        return None
+    return len(data) if isinstance(data, list) else None
+
+
+async def fingerprint(
+    results: list[ScanResult],
+    known: Iterable[str] = (),
+    timeout: float = 1.5,
+    advertised: Iterable[str] = (),
+) -> list[Fingerprint]:
+    """Fingerprint all hosts at once, ranked by confidence (best first).
+
+    Each host gets an SSH banner read (port 22) and a ``GET /v1/models``
+    (port 8317) where those ports are open; every probe runs concurrently,
+    so ranking costs at most one ``timeout`` regardless of the host count.
+
+    Args:
+        results: Responsive hosts from scan()
+        known: IPs of previously used hosts (score bonus)
+        timeout: Per-probe timeout
+        advertised: IPs that announced VibeProxy over mDNS (score bonus)
+    """
+    known, advertised = set(known), set(advertised)
+    async with httpx.AsyncClient(timeout=timeout) as client:
+
+        async def probe(result: ScanResult) -> Fingerprint:
+            banner, models = await asyncio.gather(
+                read_ssh_banner(result.ip, SSH_PORT, timeout)
+                if SSH_PORT in result.ports
+                else asyncio.sleep(0, ""),
+                count_models(client, result.ip, VIBEPROXY_PORT)
+                if VIBEPROXY_PORT in result.ports
+                else asyncio.sleep(0, None),
+            )
+            return Fingerprint(
+                ip=result.ip,
+                ports=result.ports,
+                ssh_banner=banner,
+                models=models,
+                known=result.ip in known,
+                advertised=result.ip in advertised,
+            )
+
+        prints = await asyncio.gather(*(probe(r) for r in results))
+    return sorted(prints, key=lambda f: f.score, reverse=True)
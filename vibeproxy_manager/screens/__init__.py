@@ -6,6 +6,7 @@ from .chat import ChatScreen
 from .config_menu import ConfigMenuScreen
 from .droid_models import DroidModelsScreen
 from .status import StatusScreen
+from .traffic import TrafficScreen
 
 __all__ = [
     "MainMenuScreen",
@@ -14,4 +15,5 @@ __all__ = [
     "ConfigMenuScreen",
     "DroidModelsScreen",
     "StatusScreen",
+    "TrafficScreen",
 ]
@@ -308,6 +308,19 @@ class BrowseModelsScreen(Screen):
             self.notify("Select a model first", severity="warning")
             return
 
+        # A0 routed through aliases: remap in the relay, no restart needed
+        from ..models import A0Config
+        switched, msg = self.app.config_manager.switch_a0_model_via_aliases(
+            A0Config(name=model_id, path="", model=model_id)
+        )
+        if switched:
+            self.notify(
+                f"{msg}. Takes effect on A0's next request (no restart).",
+                title="✅ A0 Model Switched",
+                severity="information"
+            )
+            return
+
         # Create config if it doesn't exist
         path = self.app.config_manager.create_config_for_model(model_id)
         if not path:
@@ -320,7 +333,6 @@ class BrowseModelsScreen(Screen):
             self.notify(f"Backup saved: {backup_path.name}", severity="information")
 
         # Build an A0Config object and apply it
-        from ..models import A0Config
         a0_config = A0Config(
             name=path.stem,
             path=str(path),
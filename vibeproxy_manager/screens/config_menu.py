@@ -38,7 +38,12 @@ class ConfigMenuScreen(Screen):
         current = self.app.config_manager.get_current_a0_config()
         display = self.query_one("#current-config", Static)
 
-        if current and current.model:
+        aliases = self.app.config_manager.get_model_aliases()
+        if current and current.model in aliases:
+            display.update(
+                f"[green]Current:[/] {current.model} → {aliases[current.model]} [dim](alias)[/]"
+            )
+        elif current and current.model:
             display.update(f"[green]Current:[/] {current.model}")
         else:
             display.update("[yellow]Current: Not configured[/]")
@@ -56,6 +61,10 @@ class ConfigMenuScreen(Screen):
 
         current = self.app.config_manager.get_current_a0_config()
         current_model = current.model if current else ""
+        # Resolve alias so the preset A0 is effectively using gets the mark
+        current_model = self.app.config_manager.get_model_aliases().get(
+            current_model, current_model
+        )
 
         for config in configs:
             # Mark current config
@@ -85,6 +94,18 @@ class ConfigMenuScreen(Screen):
             self.notify("Config not found", severity="error")
             return
 
+        # A0 routed through aliases: remap in the relay, no restart needed
+        switched, msg = self.app.config_manager.switch_a0_model_via_aliases(selected)
+        if switched:
+            self.notify(
+                f"{msg}\nTakes effect on A0's next request (no restart).",
+                title="Model Switched",
+                severity="information",
+            )
+            self.update_current_display()
+            self.load_configs()
+            return
+
         # Apply the config
         success = self.app.config_manager.apply_a0_config(selected)
 
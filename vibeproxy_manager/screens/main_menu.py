@@ -24,6 +24,7 @@ class MainMenuScreen(Screen):
         Binding("7", "select_verify", "Verify", show=False),
         Binding("8", "select_droid", "Droid", show=False),
         Binding("9", "select_kill_port", "Kill Port", show=False),
+        Binding("t", "select_traffic", "Traffic", show=False),
         Binding("?", "select_help", "Help", show=False),
         Binding("q", "app.quit", "Quit"),
     ]
@@ -44,6 +45,7 @@ class MainMenuScreen(Screen):
                 Option("✅ Verify Setup", id="verify"),
                 Option("🤖 Manage Droid Models", id="droid"),
                 Option("🔪 Kill Port Process", id="kill_port"),
+                Option("📊 Traffic by Client/Model", id="traffic"),
                 Option("❓ Help", id="help"),
                 id="menu-options",
             )
@@ -78,14 +80,18 @@ class MainMenuScreen(Screen):
             self.action_select_droid()
         elif option_id == "kill_port":
             await self.action_select_kill_port()
+        elif option_id == "traffic":
+            self.action_select_traffic()
         elif option_id == "help":
             self.action_select_help()
 
     async def action_select_tunnel(self) -> None:
-        """Start SSH tunnel in a new terminal window with zombie state detection."""
+        """Start the SSH tunnel (via the background daemon) with zombie state detection."""
+        import asyncio
+
         tunnel = self.app.tunnel
 
-        if tunnel.is_running():
+        if (await tunnel.liveness.get(max_age=5.0)).up:
             # Tunnel appears to be running - perform health check to detect zombie states
             try:
                 success, msg = await self.app.api.test_connection()
@@ -108,17 +114,16 @@ class MainMenuScreen(Screen):
                         timeout=5,
                     )
 
-                    # Clear zombie state
-                    tunnel._tunnel_pid = None
-                    tunnel._tunnel_process = None
+                    # Clear zombie state (a daemon-owned tunnel is closed by the daemon)
+                    await self.app.daemon.stop_tunnel()
+                    # Kill whatever still holds the port, or the restart cannot bind it
+                    await asyncio.to_thread(tunnel.force_reset)
 
                     # Wait a moment for port to release
-                    import asyncio
-
                     await asyncio.sleep(1)
 
                     # Try starting fresh
-                    success, msg = tunnel.start_in_window()
+                    success, msg = await self._launch_tunnel()
                     if success:
                         self.notify(
                             "🔄 Tunnel restarted successfully!\n\n" + msg,
@@ -141,22 +146,20 @@ class MainMenuScreen(Screen):
                 )
         else:
             # Tunnel not running - start normally
-            success, msg = tunnel.start_in_window()
+            self.notify("Starting tunnel...", title="SSH Tunnel", timeout=3)
+            success, msg = await self._launch_tunnel()
             if success:
                 self.notify(
-                    "🚀 Tunnel launcher started!\n\n"
-                    "A new terminal window has opened with:\n"
+                    f"🚀 {msg}\n\n"
+                    "The tunnel keeps running in the background with:\n"
                     "  • Auto-reconnect on connection drop\n"
                     "  • Password auto-login (saved in config)\n"
-                    "  • Live connection status\n\n"
-                    "Keep that window open while using VibeProxy!",
+                    "  • Live status: vibeproxy-daemon status",
                     title="SSH Tunnel",
                     severity="information",
                     timeout=15,
                 )
                 # Refresh status bar after brief delay
-                import asyncio
-
                 async def delayed_refresh():
                     await asyncio.sleep(3)  # Wait for tunnel to establish
                     status_bar = self.query_one("#status-bar", StatusBar)
@@ -169,6 +172,15 @@ class MainMenuScreen(Screen):
                 cmd = tunnel.start_in_terminal()
                 self.notify(f"Try manually: {cmd}", title="Manual Command", timeout=10)
 
+    async def _launch_tunnel(self) -> tuple[bool, str]:
+        """Start the tunnel through the daemon, or in a window if it cannot run."""
+        import asyncio
+
+        daemon = self.app.daemon
+        if await daemon.ensure_running():
+            return await daemon.start_tunnel(spawn=False)
+        return await asyncio.to_thread(self.app.tunnel.start_in_window)
+
     def action_select_network(self) -> None:
         """Open network settings."""
         from .network_settings import NetworkSettingsScreen
@@ -224,42 +236,37 @@ class MainMenuScreen(Screen):
 
         self.app.push_screen(DroidModelsScreen())
 
-    def action_select_kill_port(self) -> None:
+    def action_select_traffic(self) -> None:
+        """Show rolling per-client/per-model tunnel traffic."""
+        from .traffic import TrafficScreen
+
+        self.app.push_screen(TrafficScreen())
+
+    async def action_select_kill_port(self) -> None:
         """Kill any process using the tunnel port with confirmation."""
+        import asyncio
+
+        from .. import ports
+
         tunnel = self.app.tunnel
         port = tunnel.port
 
         # First check what processes are using the port (show before killing)
-        import subprocess
-
-        try:
-            result = subprocess.run(
-                [
-                    "powershell",
-                    "-Command",
-                    f"Get-NetTCPConnection -LocalPort {port} -ErrorAction SilentlyContinue | "
-                    "ForEach-Object {{ (Get-Process -Id $_.OwningProcess).Name }} | "
-                    "Sort-Object -Unique",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=5,
+        owners = await asyncio.to_thread(ports.port_owners, port)
+        if owners:
+            procs = "\n".join(owner.label for owner in owners)
+            self.notify(
+                f"⚠️ Killing processes on port {port}:\n{procs}",
+                title="Kill Port",
+                severity="warning",
+                timeout=3,
             )
-            procs = result.stdout.strip()
-            if procs:
-                self.notify(
-                    f"⚠️ Killing processes on port {port}:\n{procs}",
-                    title="Kill Port",
-                    severity="warning",
-                    timeout=3,
-                )
-            else:
-                self.notify(f"No processes found on port {port}", title="Kill Port")
-                return
-        except Exception:
-            pass  # Continue with force_reset even if check fails
+        elif owners is not None:
+            self.notify(f"No processes found on port {port}", title="Kill Port")
+            return
+        # owners is None: lookup unsupported here - continue with force_reset
 
-        success, msg = tunnel.force_reset()
+        success, msg = await asyncio.to_thread(tunnel.force_reset)
 
         if success:
             self.notify(
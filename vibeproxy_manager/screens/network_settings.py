@@ -1,6 +1,5 @@
 """Network configuration and scanning screen."""
 
-import threading
 from textual.app import ComposeResult
 from textual.screen import Screen
 from textual.widgets import Static, Footer, Header, OptionList, Input, Button, Label
@@ -37,6 +36,7 @@ class NetworkSettingsScreen(Screen):
 
     def on_mount(self) -> None:
         """Load current settings."""
+        self._found = 0
         config = self.app.config_manager.load()
         self.query_one("#ip-input", Input).value = config.mac_ip
         self.query_one("#scan-results", OptionList).focus()
@@ -64,13 +64,27 @@ class NetworkSettingsScreen(Screen):
 
     def action_scan_network(self) -> None:
         """Start network scan in background."""
-        self.query_one("#scan-status", Static).update("🔄 Scanning network (this may take 10-20s)...")
-        self.run_worker(self.perform_scan, exclusive=True, thread=True)
+        self.query_one("#scan-status", Static).update("🔄 Scanning network...")
+        option_list = self.query_one("#scan-results", OptionList)
+        option_list.clear_options()
+        self._found = 0
+        self.run_worker(self.perform_scan, exclusive=True)
+
+    async def perform_scan(self) -> None:
+        """Worker coroutine: scan all hosts concurrently, streaming hits into the list."""
+        results = await self.app.tunnel.ascan_network(progress_callback=self.on_scan_progress)
+        self.update_scan_results(results)
 
-    def perform_scan(self) -> None:
-        """Worker function to scan network."""
-        results = self.app.tunnel.scan_network()
-        self.call_from_thread(self.update_scan_results, results)
+    def on_scan_progress(self, done: int, total: int, result) -> None:
+        """Show progress and add each responsive host as soon as it answers."""
+        if result is not None:
+            self._found += 1
+            self.query_one("#scan-results", OptionList).add_option(
+                Option(f"{result.ip} - {result.label}", id=result.ip)
+            )
+        self.query_one("#scan-status", Static).update(
+            f"🔄 Scanning network... {done}/{total} hosts, {self._found} found"
+        )
 
     def update_scan_results(self, results: list) -> None:
         """Update the list with scan results."""
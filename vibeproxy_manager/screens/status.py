@@ -42,12 +42,26 @@ class StatusScreen(Screen):
 
         # 1. SSH Tunnel
         log.write("[bold]1. SSH Tunnel[/]")
-        running, msg = self.app.tunnel.get_status()
-        if running:
+        snapshot = await self.app.tunnel.liveness.get(max_age=5.0)
+        tunnel_running, msg = snapshot.up, snapshot.message
+        if tunnel_running:
             log.write(f"   [green]✓[/] {msg}")
+            prober = getattr(self.app, "prober", None)
+            if prober is not None and prober.state != "unknown":
+                color = {"healthy": "green", "degraded": "yellow"}.get(prober.state, "red")
+                log.write(f"   [{color}]●[/] Quality: {prober.state} ({prober.describe()})")
         else:
             log.write(f"   [red]✗[/] {msg}")
             log.write(f"   [dim]Command: {self.app.tunnel.start_in_terminal()}[/]")
+        daemon_status = await self.app.daemon.status()
+        if daemon_status is None:
+            log.write(f"   [dim]Tunnel daemon: not running ({self.app.daemon.address})[/]")
+        else:
+            supervising = "supervising" if daemon_status["supervising"] else "idle"
+            log.write(
+                f"   [green]●[/] Tunnel daemon: pid {daemon_status['daemon_pid']}, {supervising}, "
+                f"{daemon_status['outages']} outage(s)"
+            )
         log.write("")
 
         # 2. VibeProxy API
@@ -103,7 +117,7 @@ class StatusScreen(Screen):
         log.write("[bold cyan]═══════════════════════════════════════[/]")
 
         issues = []
-        if not self.app.tunnel.is_running():
+        if not tunnel_running:
             issues.append("SSH tunnel not running")
         if not success:
             issues.append("API not reachable")
@@ -0,0 +1,148 @@
+"""Traffic screen: who and which model is using the tunnel."""
+
+import json
+import time
+from typing import Callable
+
+import httpx
+from rich.table import Table
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.containers import Container, Horizontal
+from textual.screen import Screen
+from textual.widgets import Button, Footer, Header, RichLog, Static
+
+# Windows the screen cycles through with "w", in seconds
+WINDOWS = (60, 300)
+
+
+def _format_bytes(count: int) -> str:
+    """Human-readable byte count."""
+    size = float(count)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def _usage_table(
+    title: str, column: str, rows: list[dict], window: float, key: Callable[[dict], str]
+) -> Table:
+    """Rich table of usage rows (already busiest first); key names each row."""
+    table = Table(title=title, title_justify="left", expand=True)
+    table.add_column(column)
+    table.add_column("Requests", justify="right")
+    table.add_column("Up", justify="right")
+    table.add_column("Down", justify="right")
+    table.add_column("Rate", justify="right")
+    for row in rows:
+        total = row["bytes_up"] + row["bytes_down"]
+        table.add_row(
+            key(row),
+            str(row["requests"]),
+            _format_bytes(row["bytes_up"]),
+            _format_bytes(row["bytes_down"]),
+            f"{_format_bytes(int(total / window))}/s",
+        )
+    return table
+
+
+class TrafficScreen(Screen):
+    """Rolling per-client and per-model traffic, read from the relay."""
+
+    BINDINGS = [
+        Binding("r", "refresh", "Refresh", show=True),
+        Binding("w", "cycle_window", "Window", show=True),
+        Binding("e", "export", "Export", show=True),
+        Binding("escape", "app.back", "Back"),
+        Binding("q", "app.quit", "Quit"),
+    ]
+
+    def __init__(self):
+        """Initialize with the shortest window."""
+        super().__init__()
+        self.window = WINDOWS[0]
+        self.summary: dict = {}
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets."""
+        yield Header()
+        with Container(id="traffic-container"):
+            yield Static("📊 Tunnel Traffic", id="traffic-title", classes="section-title")
+            yield RichLog(id="traffic-log", wrap=True, markup=True)
+            with Horizontal(id="traffic-buttons"):
+                yield Button("Refresh", id="btn-refresh", variant="primary")
+                yield Button("Export JSON", id="btn-export", variant="default")
+        yield Footer()
+
+    async def on_mount(self) -> None:
+        """Load now and keep refreshing while shown."""
+        await self.action_refresh()
+        self.set_interval(2.0, self.action_refresh)
+
+    @property
+    def relay_url(self) -> str:
+        """Base URL of the local relay."""
+        return f"http://127.0.0.1:{self.app.config_manager.load().relay_port}"
+
+    async def action_refresh(self) -> None:
+        """Fetch the rolling summary from the relay and redraw."""
+        log = self.query_one("#traffic-log", RichLog)
+        try:
+            async with httpx.AsyncClient(timeout=2.0) as client:
+                response = await client.get(
+                    f"{self.relay_url}/traffic", params={"window": self.window}
+                )
+                response.raise_for_status()
+                self.summary = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            log.clear()
+            log.write(f"[red]✗[/] Relay not reachable at {self.relay_url} ({e})")
+            log.write("[dim]Start it with: vibeproxy-relay (consumers must use the relay port)[/]")
+            return
+
+        log.clear()
+        window = self.summary.get("window_seconds", self.window)
+        log.write(f"[bold cyan]Last {window:.0f}s[/] [dim](w: change window, e: export)[/]")
+        if not self.summary.get("pairs"):
+            log.write("[dim]No traffic in this window[/]")
+            return
+        summary = self.summary
+        log.write(
+            _usage_table("By client", "Client", summary["by_client"], window, lambda r: r["client"])
+        )
+        log.write(
+            _usage_table("By model", "Model", summary["by_model"], window, lambda r: r["model"])
+        )
+        log.write(
+            _usage_table(
+                "Top pairs",
+                "Client / Model",
+                summary["pairs"][:10],
+                window,
+                lambda r: f"{r['client']} / {r['model']}",
+            )
+        )
+
+    async def action_cycle_window(self) -> None:
+        """Switch to the next window length."""
+        self.window = WINDOWS[(WINDOWS.index(self.window) + 1) % len(WINDOWS)]
+        await self.action_refresh()
+
+    def action_export(self) -> None:
+        """Write the current summary to traffic-<timestamp>.json."""
+        if not self.summary:
+            self.notify("Nothing to export yet", severity="warning")
+            return
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.app.config_manager.base_path / f"traffic-{stamp}.json"
+        path.write_text(json.dumps(self.summary, indent=2), encoding="utf-8")
+        self.notify(f"Saved {path.name}", title="Traffic Export")
+
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button presses."""
+        if event.button.id == "btn-refresh":
+            await self.action_refresh()
+        elif event.button.id == "btn-export":
+            self.action_export()
@@ -0,0 +1,241 @@
+"""Shadow traffic mirroring for evaluating a candidate model.
+
+A sample of live requests is re-sent to a candidate model once the primary
+response has been fully delivered, so the mirror never competes with the
+request the client is waiting on. Shadow responses are discarded; only
+their latency, token usage and errors are kept, next to the primary's for
+the same requests.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Optional
+
+import httpx
+
+from . import metrics
+from .compression import StreamDecoder, accept_encoding_header
+
+# Only requests to these endpoints carry a model worth comparing
+MIRRORED_PATHS = ("/v1/chat/completions", "/v1/completions", "/v1/messages")
+
+SHADOW_REQUESTS = metrics.REGISTRY.counter(
+    "vibeproxy_shadow_requests_total",
+    "Mirrored requests by role (primary/shadow), model and outcome.",
+    ("role", "model", "outcome"),
+)
+SHADOW_DURATION = metrics.REGISTRY.histogram(
+    "vibeproxy_shadow_duration_seconds",
+    "Latency of mirrored requests, primary and shadow side by side.",
+    ("role", "model"),
+)
+SHADOW_TOKENS = metrics.REGISTRY.counter(
+    "vibeproxy_shadow_tokens_total",
+    "Tokens used by mirrored requests, primary and shadow side by side.",
+    ("role", "model", "direction"),
+)
+
+
+class _RoleStats:
+    """Rolling latency/token/error stats for one side of the comparison."""
+
+    def __init__(self, window: int):
+        """Initialize with the number of recent latencies to keep."""
+        self.requests = 0
+        self.errors = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.durations: deque[float] = deque(maxlen=window)
+        self.ttfbs: deque[float] = deque(maxlen=window)
+
+    def add(self, duration: float, ttfb: Optional[float], ok: bool, tokens: tuple[int, int]) -> None:
+        """Record one completed request."""
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.durations.append(duration)
+        if ttfb is not None:
+            self.ttfbs.append(ttfb)
+        self.tokens_in += tokens[0]
+        self.tokens_out += tokens[1]
+
+    def summary(self) -> dict:
+        """Summarise as a plain dict."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "p50_seconds": metrics.percentile(self.durations, 0.5),
+            "p95_seconds": metrics.percentile(self.durations, 0.95),
+            "ttfb_p50_seconds": metrics.percentile(self.ttfbs, 0.5),
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+        }
+
+
+class ShadowMirror:
+    """Mirror a sample of relay traffic to a candidate model."""
+
+    def __init__(
+        self,
+        upstream_url: str,
+        candidate_model: str,
+        sample_rate: float = 0.1,
+        primary_model: str = "",
+        max_in_flight: int = 2,
+        window: int = 500,
+    ):
+        """Initialize the mirror.
+
+        Args:
+            upstream_url: VibeProxy base URL the shadow requests go to
+            candidate_model: Model that receives the mirrored copies
+            sample_rate: Fraction of eligible requests to mirror (0-1)
+            primary_model: Only mirror requests for this model ("" = any)
+            max_in_flight: Shadow requests allowed at once; extra samples are dropped
+            window: Number of recent latencies kept for percentiles
+        """
+        self.upstream_url = upstream_url.rstrip("/")
+        self.candidate_model = candidate_model
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.primary_model = primary_model
+        self.max_in_flight = max_in_flight
+        self.primary = _RoleStats(window)
+        self.shadow = _RoleStats(window)
+        self.dropped = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def should_mirror(self, method: str, path: str, model: str) -> bool:
+        """Decide (by sampling) whether a primary request gets a shadow copy."""
+        if method != "POST" or not path.split("?")[0].endswith(MIRRORED_PATHS):
+            return False
+        if model in ("none", self.candidate_model):
+            return False
+        if self.primary_model and model != self.primary_model:
+            return False
+        return random.random() < self.sample_rate
+
+    def record_primary(
+        self, model: str, duration: float, ttfb: Optional[float], status: int, tokens: tuple[int, int]
+    ) -> None:
+        """Record the primary side of a mirrored request."""
+        self._record("primary", model, duration, ttfb, 200 <= status < 400, tokens)
+
+    def submit(self, body: dict, path: str, headers: dict[str, str]) -> bool:
+        """Schedule a shadow copy of a primary request (False if dropped)."""
+        if len(self._tasks) >= self.max_in_flight:
+            # Never queue behind live traffic - a skipped sample costs nothing
+            self.dropped += 1
+            return False
+
+        shadow_body = dict(body)
+        shadow_body["model"] = self.candidate_model
+        task = asyncio.get_running_loop().create_task(
+            self._send(path, shadow_body, headers)
+        )
+        self._tasks.add(task)
+        metrics.QUEUE_DEPTH.set(len(self._tasks), "shadow")
+        task.add_done_callback(self._task_done)
+        return True
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        """Forget a finished shadow task."""
+        self._tasks.discard(task)
+        metrics.QUEUE_DEPTH.set(len(self._tasks), "shadow")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Separate connection pool so shadows never hold primary connections."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.upstream_url, timeout=httpx.Timeout(300.0, connect=5.0)
+            )
+        return self._client
+
+    async def _send(self, path: str, body: dict, headers: dict[str, str]) -> None:
+        """Send one shadow request and record its outcome."""
+        # Local import: relay imports this module
+        from .relay import UsageScanner
+
+        forward = {
+            name: value
+            for name, value in headers.items()
+            if name in ("authorization", "x-api-key", "anthropic-version", "user-agent")
+        }
+        forward["Accept-Encoding"] = accept_encoding_header()
+        forward["X-VibeProxy-Client"] = "shadow"
+
+        started = time.perf_counter()
+        ttfb: Optional[float] = None
+        ok = False
+        tokens = (0, 0)
+        try:
+            client = await self._get_client()
+            async with client.stream("POST", path, json=body, headers=forward) as response:
+                decoder = StreamDecoder(response.headers.get("content-encoding"))
+                scanner = UsageScanner(
+                    streaming="text/event-stream" in response.headers.get("content-type", "")
+                )
+                async for raw in response.aiter_raw():
+                    chunk = decoder.decode(raw)
+                    if chunk and ttfb is None:
+                        ttfb = time.perf_counter() - started
+                    scanner.feed(chunk)
+                scanner.feed(decoder.flush())
+                tokens = scanner.finish()
+                ok = 200 <= response.status_code < 400
+        except (httpx.HTTPError, ValueError):
+            ok = False
+        self._record("shadow", self.candidate_model, time.perf_counter() - started, ttfb, ok, tokens)
+
+    def _record(
+        self,
+        role: str,
+        model: str,
+        duration: float,
+        ttfb: Optional[float],
+        ok: bool,
+        tokens: tuple[int, int],
+    ) -> None:
+        """Update rolling stats and exported metrics for one side."""
+        stats = self.primary if role == "primary" else self.shadow
+        stats.add(duration, ttfb, ok, tokens)
+        SHADOW_REQUESTS.inc(role, model, "ok" if ok else "error")
+        SHADOW_DURATION.observe(duration, role, model)
+        if tokens[0]:
+            SHADOW_TOKENS.inc(role, model, "in", amount=tokens[0])
+        if tokens[1]:
+            SHADOW_TOKENS.inc(role, model, "out", amount=tokens[1])
+
+    def summary(self) -> dict:
+        """Primary vs candidate comparison as a JSON-serialisable dict."""
+        return {
+            "candidate_model": self.candidate_model,
+            "primary_model": self.primary_model or "any",
+            "sample_rate": self.sample_rate,
+            "dropped": self.dropped,
+            "in_flight": len(self._tasks),
+            "primary": self.primary.summary(),
+            "shadow": self.shadow.summary(),
+        }
+
+    async def drain(self) -> None:
+        """Wait for in-flight shadow requests to finish."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel outstanding shadows and close the connection pool."""
+        for task in list(self._tasks):
+            task.cancel()
+        await self.drain()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def summary_json(self) -> bytes:
+        """Summary encoded for the relay's /shadow endpoint."""
+        return json.dumps(self.summary(), indent=2).encode()
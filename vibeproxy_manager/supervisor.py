@@ -0,0 +1,353 @@
+"""Event-driven supervisor that keeps the SSH tunnel up.
+
+Instead of polling the port on a timer, the supervisor awaits the ssh child
+process itself, so a dropped tunnel is noticed the moment ssh exits.
+Reconnects back off exponentially with jitter, and every outage is timed so
+mean time to recovery (MTTR) can be reported. With a network watcher, a
+Wi-Fi switch or wake from sleep re-validates the tunnel straight away
+instead of waiting for ssh's keepalives to give up.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+
+from . import metrics
+from .netwatch import NetworkChange, NetworkWatcher
+from .quality import DOWN, TunnelProber
+from .tunnel import TunnelManager
+
+logger = logging.getLogger(__name__)
+
+OUTAGES = metrics.REGISTRY.counter(
+    "vibeproxy_tunnel_outages_total",
+    "Tunnel drops detected by the supervisor.",
+)
+RECOVERY_SECONDS = metrics.REGISTRY.histogram(
+    "vibeproxy_tunnel_recovery_seconds",
+    "Time from tunnel drop to tunnel back up.",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+CUTOVER_SECONDS = metrics.REGISTRY.histogram(
+    "vibeproxy_tunnel_cutover_seconds",
+    "Time from tunnel drop to switching to a newly discovered Mac IP.",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+
+
+class Outage(BaseModel):
+    """One tunnel outage."""
+
+    started: float
+    reason: str
+    recovered: Optional[float] = None
+    attempts: int = 0
+    new_ip: str = ""  # Address adopted from discovery during the outage
+    cut_over: Optional[float] = None  # Seconds into the outage the new IP was adopted
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds until recovery (None while still down)."""
+        if self.recovered is None:
+            return None
+        return self.recovered - self.started
+
+
+class Backoff:
+    """Exponential backoff with jitter."""
+
+    def __init__(
+        self,
+        initial: float = 1.0,
+        maximum: float = 60.0,
+        factor: float = 2.0,
+        jitter: float = 0.5,
+    ):
+        """Initialize the schedule.
+
+        Args:
+            initial: Delay before the first retry
+            maximum: Cap on the delay
+            factor: Growth per failed attempt
+            jitter: Fraction of each delay that is randomised (0 = none, 1 = full)
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = max(0.0, min(1.0, jitter))
+        self.attempt = 0
+
+    def next_delay(self) -> float:
+        """Delay before the next attempt (and advance the schedule)."""
+        delay = min(self.maximum, self.initial * self.factor**self.attempt)
+        self.attempt += 1
+        # Spread retries out so several clients don't reconnect in lockstep
+        return delay - random.uniform(0, delay * self.jitter)
+
+    def reset(self) -> None:
+        """Start again from the initial delay."""
+        self.attempt = 0
+
+
+class TunnelSupervisor:
+    """Keep a tunnel running, reacting to process exit instead of polling."""
+
+    def __init__(
+        self,
+        tunnel: TunnelManager,
+        backoff: Optional[Backoff] = None,
+        max_attempts: Optional[int] = None,
+        discover_after: int = 1,
+        poll_interval: float = 5.0,
+        on_event: Optional[Callable[[str, str], None]] = None,
+        history: int = 100,
+        prober: Optional[TunnelProber] = None,
+        network: Optional[NetworkWatcher] = None,
+    ):
+        """Initialize the supervisor.
+
+        Args:
+            tunnel: Tunnel to supervise
+            backoff: Retry schedule (default 1s doubling up to 60s, 50% jitter)
+            max_attempts: Give up after this many failed attempts in one outage
+                (None = retry forever)
+            discover_after: Failed attempts with IP_CHANGED before discovery starts
+                (it runs alongside further retries, not instead of them)
+            poll_interval: Port check interval for tunnels we did not start ourselves
+            on_event: Callback(kind, message) for "up", "down", "retry", "gave_up"
+                and "network" (a change the tunnel survived)
+            history: Number of past outages kept for MTTR
+            prober: Quality prober; a tunnel whose quality drops to "down" is
+                restarted even though ssh is still running
+            network: Network watcher; every change re-validates the tunnel at
+                once, and a tunnel that stopped answering is replaced while
+                discovery looks for the Mac at a new address
+        """
+        self.tunnel = tunnel
+        self.backoff = backoff or Backoff()
+        self.max_attempts = max_attempts
+        self.discover_after = discover_after
+        self.poll_interval = poll_interval
+        self.on_event = on_event
+        self.outages: deque[Outage] = deque(maxlen=history)
+        self.prober = prober
+        self.network = network
+        self._stopping = asyncio.Event()
+
+    @property
+    def mttr(self) -> Optional[float]:
+        """Mean time to recovery over recorded outages (None if none yet)."""
+        durations = [o.duration for o in self.outages if o.duration is not None]
+        if not durations:
+            return None
+        return sum(durations) / len(durations)
+
+    @property
+    def current_outage(self) -> Optional[Outage]:
+        """The outage in progress, if the tunnel is down."""
+        if self.outages and self.outages[-1].recovered is None:
+            return self.outages[-1]
+        return None
+
+    def _emit(self, kind: str, message: str) -> None:
+        """Log an event and forward it to the callback."""
+        log = logger.warning if kind in ("down", "retry", "gave_up") else logger.info
+        log("%s: %s", kind, message)
+        if self.on_event is not None:
+            self.on_event(kind, message)
+
+    async def _sleep(self, delay: float, *wake: Optional[asyncio.Future]) -> bool:
+        """Sleep unless stop() is called (or one of ``wake`` finishes) first.
+
+        Returns True if stopping.
+        """
+        stop_waiter = asyncio.ensure_future(self._stopping.wait())
+        waiters = {stop_waiter} | {future for future in wake if future is not None}
+        try:
+            await asyncio.wait(waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop_waiter.cancel()
+        return self._stopping.is_set()
+
+    async def _revalidate(self, attempts: int = 2) -> bool:
+        """Whether a request through the tunnel still gets an answer."""
+        prober = self.prober or TunnelProber(self.tunnel.port)
+        for _ in range(attempts):
+            if (await prober.probe()).rtt is not None:
+                return True
+        return False
+
+    async def _wait_for_drop(self) -> tuple[str, bool]:
+        """Block until the tunnel goes down.
+
+        Returns (reason, whether the Mac may have moved); the reason is "" if
+        stopping.
+        """
+        waiters = {
+            asyncio.ensure_future(self._stopping.wait()): "stop",
+            asyncio.ensure_future(self.tunnel.await_process_exit()): "exit",
+        }
+        if self.prober is not None:
+            waiters[asyncio.ensure_future(self.prober.wait_for_state(DOWN))] = "quality"
+        if self.network is not None:
+            waiters[asyncio.ensure_future(self.network.wait_for_change())] = "network"
+        try:
+            while True:
+                done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                finished = {waiters.pop(task): task for task in done}
+                if "stop" in finished:
+                    return "", False
+                if "quality" in finished:
+                    # ssh is alive but nothing gets through - replace it
+                    reason = f"tunnel quality down ({self.prober.describe()})"
+                    await self.tunnel.astop()
+                    return reason, False
+                if "network" in finished:
+                    change: NetworkChange = finished["network"].result()
+                    if not await self._revalidate():
+                        # ssh may hang on to a dead connection for minutes
+                        await self.tunnel.astop()
+                        return f"network changed ({change.reason}); tunnel stopped answering", True
+                    self._emit("network", f"Network changed ({change.reason}); tunnel still up")
+                    waiters[asyncio.ensure_future(self.network.wait_for_change())] = "network"
+                if "port" in finished:
+                    return f"port {self.tunnel.port} stopped responding", False
+                if "exit" not in finished:
+                    continue
+                process_exit = finished["exit"].result()
+                if process_exit is not None:
+                    return process_exit.message, False
+                # No process to watch (e.g. not Linux and started elsewhere) - watch the port
+                waiters[asyncio.ensure_future(self._poll_port())] = "port"
+        finally:
+            for task in waiters:
+                task.cancel()
+
+    async def _poll_port(self) -> None:
+        """Return once an externally started tunnel stops answering."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not await self.tunnel.ais_running():
+                return
+
+    def _adopt_discovery(self, outage: Outage, discovery: asyncio.Task) -> None:
+        """Switch to the IP a finished background discovery found, if it is new."""
+        if discovery.cancelled() or discovery.exception() is not None:
+            return
+        discovered = discovery.result()
+        if not discovered or discovered[0] == self.tunnel.mac_ip:
+            return
+        self.tunnel.auto_update_ip(discovered[0])
+        outage.new_ip = discovered[0]
+        outage.cut_over = time.monotonic() - outage.started
+        CUTOVER_SECONDS.observe(outage.cut_over)
+        self._emit(
+            "retry",
+            f"Mac found at new IP {discovered[0]} - cutting over"
+            f" {outage.cut_over:.1f}s into the outage",
+        )
+
+    async def _reconnect(self, outage: Outage, discover: bool = False) -> bool:
+        """Retry until the tunnel is back, stop() is called, or attempts run out.
+
+        When the Mac looks unreachable, discovery starts in the background and
+        the retries keep going. The new IP is adopted as soon as discovery
+        finds one, so the next attempt goes to it without waiting out the
+        backoff. ``discover`` starts discovery before the first attempt (the
+        network changed, so the Mac may have a new address). A network change
+        during the outage retries at once.
+        """
+        self.backoff.reset()
+        discovery: Optional[asyncio.Task] = None
+        unreachable = 0  # Failed attempts classified IP_CHANGED
+        if discover:
+            discovery = asyncio.ensure_future(self.tunnel.adiscover_mac())
+        network_change: Optional[asyncio.Future] = None
+        try:
+            while not self._stopping.is_set():
+                if self.network is not None and (network_change is None or network_change.done()):
+                    if network_change is not None:
+                        # A new network may reach the Mac right away
+                        self.backoff.reset()
+                    network_change = asyncio.ensure_future(self.network.wait_for_change())
+                if discovery is not None and discovery.done():
+                    self._adopt_discovery(outage, discovery)
+                    discovery = None
+                outage.attempts += 1
+                if outage.attempts > 1:
+                    metrics.RETRIES.inc("tunnel_connect")
+                if len(self.tunnel.candidate_hosts) > 1:
+                    # astart() runs its own ssh, so race plain SSH reachability
+                    winner = await self.tunnel.arace_hosts(authenticate=False)
+                    if winner:
+                        self._emit("retry", f"Connecting via {winner}")
+                success, message = await self.tunnel.astart()
+                if success:
+                    await asyncio.to_thread(self.tunnel.remember_host)
+                    return True
+                if self.tunnel.owns_process:
+                    # A half-started ssh (port never opened) must not linger
+                    await self.tunnel.astop()
+
+                error_type, user_message = self.tunnel.classify_ssh_error(message)
+                if error_type == "IP_CHANGED":
+                    unreachable += 1
+                if discovery is None and unreachable >= self.discover_after:
+                    # Speculative: scan while the next retries run
+                    discovery = asyncio.ensure_future(self.tunnel.adiscover_mac())
+
+                if self.max_attempts is not None and outage.attempts >= self.max_attempts:
+                    self._emit("gave_up", f"{user_message} (after {outage.attempts} attempts)")
+                    return False
+                delay = self.backoff.next_delay()
+                self._emit("retry", f"{user_message} - retrying in {delay:.1f}s")
+                # Discovery finishing or the network changing cuts the wait short
+                if await self._sleep(delay, discovery, network_change):
+                    break
+            return False
+        finally:
+            if discovery is not None and not discovery.done():
+                discovery.cancel()
+            if network_change is not None:
+                network_change.cancel()
+
+    async def run(self) -> bool:
+        """Supervise until stop() is called (True) or reconnection gives up (False)."""
+        self._stopping.clear()
+        if not await self.tunnel.ais_running():
+            outage = Outage(started=time.monotonic(), reason="not running")
+            if not await self._reconnect(outage):
+                return self._stopping.is_set()
+        self._emit("up", f"Tunnel up on port {self.tunnel.port}")
+
+        while not self._stopping.is_set():
+            reason, moved = await self._wait_for_drop()
+            if self._stopping.is_set():
+                break
+            outage = Outage(started=time.monotonic(), reason=reason)
+            self.outages.append(outage)
+            OUTAGES.inc()
+            self._emit("down", reason)
+
+            if not await self._reconnect(outage, discover=moved):
+                return self._stopping.is_set()
+            outage.recovered = time.monotonic()
+            RECOVERY_SECONDS.observe(outage.duration)
+            cut_over = ""
+            if outage.cut_over is not None:
+                cut_over = f" via new IP {outage.new_ip} (cut over at {outage.cut_over:.1f}s)"
+            self._emit(
+                "up",
+                f"Reconnected in {outage.duration:.1f}s after {outage.attempts} attempt(s)"
+                f"{cut_over} (MTTR {self.mttr:.1f}s)",
+            )
+        return True
+
+    def stop(self) -> None:
+        """Ask run() to return (the tunnel itself is left as-is)."""
+        self._stopping.set()
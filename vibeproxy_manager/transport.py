@@ -0,0 +1,376 @@
+"""In-process SSH transport for the VibeProxy port forward.
+
+An alternative to spawning ``ssh``/``plink``/``sshpass``: one authenticated
+asyncssh connection is held open and each local TCP connection gets its own
+forwarded (direct-tcpip) channel on it. Every channel's open latency and
+bytes are counted, and a lost connection is re-established in-process
+without spawning anything.
+
+Requires the optional ``asyncssh`` package
+(``pip install vibeproxy-manager[ssh]``).
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+from pydantic import BaseModel
+
+from . import metrics
+from .config import ConfigManager
+from .supervisor import Backoff
+
+try:
+    import asyncssh
+except ImportError:  # Optional dependency
+    asyncssh = None
+
+# Errors that end a channel (rather than indicating a bug)
+_CHANNEL_ERRORS = (OSError, asyncio.IncompleteReadError) + (
+    (asyncssh.Error,) if asyncssh is not None else ()
+)
+
+logger = logging.getLogger(__name__)
+
+# Chunk size for pumping data between a local socket and its SSH channel
+PUMP_CHUNK = 64 * 1024
+
+CHANNEL_BYTES = metrics.REGISTRY.counter(
+    "vibeproxy_ssh_channel_bytes_total",
+    "Bytes carried by forwarded SSH channels (up = to the Mac).",
+    ("direction",),
+)
+CHANNEL_OPEN_SECONDS = metrics.REGISTRY.histogram(
+    "vibeproxy_ssh_channel_open_seconds",
+    "Time to open a forwarded channel on the shared SSH connection.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+CHANNELS_OPEN = metrics.REGISTRY.gauge(
+    "vibeproxy_ssh_channels_open",
+    "Forwarded SSH channels currently open.",
+)
+TRANSPORT_CONNECTS = metrics.REGISTRY.counter(
+    "vibeproxy_ssh_transport_connects_total",
+    "SSH connection attempts made by the in-process transport.",
+    ("result",),
+)
+
+
+def is_available() -> bool:
+    """Whether the optional asyncssh dependency is installed."""
+    return asyncssh is not None
+
+
+class ChannelStats(BaseModel):
+    """Counters for one forwarded channel."""
+
+    id: int
+    peer: str
+    opened_at: float
+    open_seconds: float = 0.0
+    first_byte_seconds: Optional[float] = None
+    bytes_up: int = 0
+    bytes_down: int = 0
+    closed_at: Optional[float] = None
+    error: str = ""
+
+    @property
+    def duration(self) -> float:
+        """Seconds the channel has been (or was) open."""
+        return (self.closed_at or time.monotonic()) - self.opened_at
+
+
+class SSHTransport:
+    """Local port forward carried by a single in-process SSH connection."""
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str = "",
+        ssh_port: int = 22,
+        local_port: int = 8317,
+        remote_port: int = 8317,
+        local_host: str = "127.0.0.1",
+        remote_host: str = "localhost",
+        client_keys: Optional[list[str]] = None,
+        keepalive_interval: float = 15.0,
+        history: int = 200,
+    ):
+        """Initialize the transport.
+
+        Args:
+            host: Mac address to connect to
+            username: SSH user on the Mac
+            password: SSH password ("" = key-based auth)
+            ssh_port: SSH server port
+            local_port: Local port to listen on
+            remote_port: Port on the Mac that channels are forwarded to
+            local_host: Local bind address
+            remote_host: Host (as seen from the Mac) that channels connect to
+            client_keys: Private key paths (None = asyncssh defaults/agent)
+            keepalive_interval: Seconds between SSH keepalives (0 = off)
+            history: Number of closed channels kept for stats
+        """
+        if asyncssh is None:
+            raise RuntimeError("asyncssh not installed - pip install vibeproxy-manager[ssh]")
+        self.host = host
+        self.username = username
+        self.password = password
+        self.ssh_port = ssh_port
+        self.local_port = local_port
+        self.remote_port = remote_port
+        self.local_host = local_host
+        self.remote_host = remote_host
+        self.client_keys = client_keys
+        self.keepalive_interval = keepalive_interval
+        self.channels: dict[int, ChannelStats] = {}
+        self.closed_channels: deque[ChannelStats] = deque(maxlen=history)
+        self.connects = 0
+        self._ids = itertools.count(1)
+        self._conn = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connect_lock = asyncio.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @classmethod
+    def from_config(cls, config_manager: Optional[ConfigManager] = None, **kwargs) -> "SSHTransport":
+        """Build a transport from vibeproxy-config.json."""
+        config = (config_manager or ConfigManager()).load()
+        kwargs.setdefault("local_port", config.local_port)
+        kwargs.setdefault("remote_port", config.remote_port)
+        return cls(
+            host=config.mac_ip,
+            username=config.mac_user,
+            password=config.ssh_password,
+            **kwargs,
+        )
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether the SSH connection is currently up."""
+        return self._conn is not None and not self._conn.is_closed()
+
+    @property
+    def port(self) -> int:
+        """Local port the forward is listening on."""
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[0].getsockname()[1]
+        return self.local_port
+
+    async def connect(self) -> tuple[bool, str]:
+        """Open the shared SSH connection (no-op if already connected).
+
+        Returns (success, message) tuple.
+        """
+        async with self._connect_lock:
+            if self.is_connected:
+                return True, "Already connected"
+            options = {
+                "port": self.ssh_port,
+                "username": self.username,
+                # Matches the external ssh command (StrictHostKeyChecking=no)
+                "known_hosts": None,
+                "keepalive_interval": self.keepalive_interval,
+            }
+            if self.password:
+                options["password"] = self.password
+                options["client_keys"] = None
+            elif self.client_keys is not None:
+                options["client_keys"] = self.client_keys
+            try:
+                self._conn = await asyncssh.connect(self.host, **options)
+            except (OSError, asyncssh.Error) as e:
+                TRANSPORT_CONNECTS.inc("error")
+                return False, f"SSH connect failed: {e}"
+            self.connects += 1
+            TRANSPORT_CONNECTS.inc("ok")
+            metrics.TUNNEL_UP.set(1)
+            if self._watch_task is None or self._watch_task.done():
+                self._watch_task = asyncio.get_running_loop().create_task(self._watch())
+            return True, f"Connected to {self.username}@{self.host}"
+
+    async def _watch(self) -> None:
+        """Re-establish the connection in-process as soon as it drops."""
+        backoff = Backoff(initial=0.5, maximum=30.0)
+        while not self._closing:
+            if self.is_connected:
+                await self._conn.wait_closed()
+                if self._closing:
+                    return
+                metrics.TUNNEL_UP.set(0)
+                logger.warning("SSH connection to %s lost - reconnecting", self.host)
+                backoff.reset()
+            success, message = await self.connect()
+            if not success:
+                delay = backoff.next_delay()
+                logger.warning("%s - retrying in %.1fs", message, delay)
+                await asyncio.sleep(delay)
+
+    async def start(self) -> tuple[bool, str]:
+        """Connect and start listening on the local port.
+
+        Returns (success, message) tuple.
+        """
+        self._closing = False
+        success, message = await self.connect()
+        if not success:
+            return False, message
+        try:
+            self._server = await asyncio.start_server(
+                self._handle_client, self.local_host, self.local_port
+            )
+        except OSError as e:
+            # Don't leave a connected, self-reconnecting link behind a failed start
+            await self.close()
+            return False, f"Cannot listen on port {self.local_port}: {e}"
+        return True, f"Forwarding {self.local_host}:{self.port} -> {self.host}:{self.remote_port}"
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Forward one local connection over a new channel."""
+        peer = writer.get_extra_info("peername")
+        stats = ChannelStats(
+            id=next(self._ids),
+            peer=f"{peer[0]}:{peer[1]}" if peer else "?",
+            opened_at=time.monotonic(),
+        )
+        self.channels[stats.id] = stats
+        CHANNELS_OPEN.set(len(self.channels))
+        try:
+            if not self.is_connected:
+                success, message = await self.connect()
+                if not success:
+                    stats.error = message
+                    return
+            started = time.perf_counter()
+            try:
+                ch_reader, ch_writer = await self._conn.open_connection(
+                    self.remote_host, self.remote_port
+                )
+            except (OSError, asyncssh.Error) as e:
+                stats.error = f"Channel open failed: {e}"
+                return
+            stats.open_seconds = time.perf_counter() - started
+            CHANNEL_OPEN_SECONDS.observe(stats.open_seconds)
+
+            await asyncio.gather(
+                self._pump(reader, ch_writer, stats, "up"),
+                self._pump(ch_reader, writer, stats, "down"),
+            )
+        finally:
+            stats.closed_at = time.monotonic()
+            self.channels.pop(stats.id, None)
+            self.closed_channels.append(stats)
+            CHANNELS_OPEN.set(len(self.channels))
+            writer.close()
+
+    @staticmethod
+    async def _pump(source, sink, stats: ChannelStats, direction: str) -> None:
+        """Copy one direction of a channel, counting bytes."""
+        try:
+            while True:
+                data = await source.read(PUMP_CHUNK)
+                if not data:
+                    break
+                if direction == "up":
+                    stats.bytes_up += len(data)
+                else:
+                    if stats.first_byte_seconds is None:
+                        stats.first_byte_seconds = time.monotonic() - stats.opened_at
+                    stats.bytes_down += len(data)
+                CHANNEL_BYTES.inc(direction, amount=len(data))
+                sink.write(data)
+                await sink.drain()
+        except _CHANNEL_ERRORS as e:
+            stats.error = stats.error or str(e)
+        finally:
+            try:
+                sink.write_eof()
+            except _CHANNEL_ERRORS + (RuntimeError,):
+                pass
+
+    async def reconnect(self) -> tuple[bool, str]:
+        """Drop and re-open the SSH connection in-process.
+
+        Open channels are closed; new local connections use the new link.
+        """
+        if self._conn is not None:
+            self._conn.close()
+            await self._conn.wait_closed()
+        return await self.connect()
+
+    def summary(self) -> dict:
+        """Connection and per-channel counters as a JSON-serialisable dict."""
+        recent = list(self.closed_channels)
+        opens = sorted(c.open_seconds for c in recent if not c.error)
+        return {
+            "connected": self.is_connected,
+            "connects": self.connects,
+            "open_channels": [c.model_dump() for c in self.channels.values()],
+            "closed_channels": len(recent),
+            "channel_errors": sum(1 for c in recent if c.error),
+            "bytes_up": sum(c.bytes_up for c in recent),
+            "bytes_down": sum(c.bytes_down for c in recent),
+            "open_p50_seconds": opens[len(opens) // 2] if opens else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Stop listening and close the SSH connection."""
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+            self._watch_task = None
+        if self._conn is not None:
+            self._conn.close()
+            await self._conn.wait_closed()
+            self._conn = None
+        metrics.TUNNEL_UP.set(0)
+
+
+def main() -> int:
+    """Run the in-process SSH forward in the foreground."""
+    parser = argparse.ArgumentParser(
+        description="Forward the VibeProxy port over an in-process SSH connection"
+    )
+    parser.add_argument("--local-port", type=int, help="Local port (default: LocalPort)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log reconnects")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not is_available():
+        print("asyncssh not installed - pip install vibeproxy-manager[ssh]")
+        return 1
+
+    overrides = {"local_port": args.local_port} if args.local_port else {}
+
+    async def run() -> int:
+        transport = SSHTransport.from_config(**overrides)
+        success, message = await transport.start()
+        print(message)
+        if not success:
+            await transport.close()
+            return 1
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await transport.close()
+        return 0
+
+    try:
+        return asyncio.run(run())
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
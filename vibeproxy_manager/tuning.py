@@ -0,0 +1,146 @@
+"""SSH cipher/MAC/compression profiles and the benchmark that picks one.
+
+Which profile is fastest depends on the link. Compression helps on slow
+Wi-Fi or over a VPN, and it costs CPU and latency on a gigabit LAN. An AES-GCM
+cipher wins on CPUs with AES-NI, and ChaCha20 wins on those without it.
+``TunnelManager.atune_ssh()`` measures each profile with proxied
+``/v1/models`` requests through a scratch tunnel, and remembers the best one
+per local network in ``SSHProfiles``.
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Optional
+
+import httpx
+from pydantic import BaseModel
+
+from . import scanner
+
+DEFAULT_PROFILE = "default"
+
+
+class SSHProfile(BaseModel):
+    """A set of SSH transport options."""
+
+    name: str
+    ciphers: str = ""
+    macs: str = ""
+    compression: bool = False
+
+    def options(self) -> list[str]:
+        """OpenSSH command-line options for this profile."""
+        options = []
+        if self.ciphers:
+            options += ["-c", self.ciphers]
+        if self.macs:
+            options += ["-m", self.macs]
+        if self.compression:
+            options += ["-o", "Compression=yes"]
+        return options
+
+    def plink_options(self) -> list[str]:
+        """plink options (plink only takes compression on the command line)."""
+        return ["-C"] if self.compression else []
+
+
+def _profiles() -> dict[str, SSHProfile]:
+    """Candidate profiles, each with and without compression."""
+    bases = [
+        SSHProfile(name=DEFAULT_PROFILE),
+        SSHProfile(name="aes128-gcm", ciphers="aes128-gcm@openssh.com"),
+        SSHProfile(name="chacha20", ciphers="chacha20-poly1305@openssh.com"),
+        SSHProfile(name="aes128-ctr-umac", ciphers="aes128-ctr", macs="umac-64-etm@openssh.com"),
+    ]
+    profiles = {}
+    for base in bases:
+        profiles[base.name] = base
+        compressed = base.model_copy(update={"name": f"{base.name}+zlib", "compression": True})
+        profiles[compressed.name] = compressed
+    return profiles
+
+
+PROFILES = _profiles()
+
+
+class ProfileResult(BaseModel):
+    """Benchmark outcome for one profile."""
+
+    profile: str
+    latency: Optional[float] = None  # Median seconds per sequential request
+    throughput: Optional[float] = None  # Bytes/second during the concurrent burst
+    workload: Optional[float] = None  # Seconds to finish the concurrent burst
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the profile produced measurements."""
+        return self.workload is not None
+
+
+def network_key() -> str:
+    """Identifier of the network we are on (the primary interface's subnet)."""
+    interface = scanner.primary_interface()
+    if interface is None:
+        return "default"
+    return str(interface.network)
+
+
+def profile_for_network(saved: dict[str, str], key: Optional[str] = None) -> SSHProfile:
+    """Saved best profile for this network (default profile if none)."""
+    name = saved.get(key or network_key(), DEFAULT_PROFILE)
+    return PROFILES.get(name, PROFILES[DEFAULT_PROFILE])
+
+
+def best(results: list[ProfileResult]) -> Optional[ProfileResult]:
+    """Profile that finished the workload fastest (ties go to lower latency)."""
+    measured = [r for r in results if r.ok]
+    if not measured:
+        return None
+    return min(measured, key=lambda r: (r.workload, r.latency))
+
+
+async def measure(
+    port: int, requests: int = 20, concurrency: int = 4, path: str = "/v1/models"
+) -> ProfileResult:
+    """Measure latency and throughput of proxied requests through a tunnel port.
+
+    Args:
+        port: Local tunnel port
+        requests: Requests per phase (sequential latency, then concurrent burst)
+        concurrency: Requests in flight during the burst
+        path: VibeProxy endpoint to fetch
+    """
+    url = f"http://127.0.0.1:{port}{path}"
+    result = ProfileResult(profile="")
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        try:
+            # Warm-up: the first request also pays for opening the channel
+            (await client.get(url)).raise_for_status()
+
+            latencies = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                (await client.get(url)).raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+            window = asyncio.Semaphore(concurrency)
+
+            async def fetch() -> int:
+                async with window:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    return len(response.content)
+
+            started = time.perf_counter()
+            sizes = await asyncio.gather(*(fetch() for _ in range(requests)))
+            elapsed = time.perf_counter() - started
+        except httpx.HTTPError as e:
+            result.error = str(e) or type(e).__name__
+            return result
+
+    result.latency = statistics.median(latencies)
+    result.workload = elapsed
+    result.throughput = sum(sizes) / elapsed if elapsed > 0 else None
+    return result
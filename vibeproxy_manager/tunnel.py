@@ -1,16 +1,24 @@
 """SSH tunnel management for VibeProxy."""
 
+import asyncio
 import os
 import platform
 import shutil
 import socket
 import subprocess
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Callable, Optional, List, Tuple
 
+from . import hosts, mdns, metrics, ports, procwatch, race, scanner, tuning
 from .config import ConfigManager
+from .liveness import TunnelLiveness
+
+# How long an idle ControlMaster connection stays up after its last forward
+CONTROL_PERSIST = "10m"
 
 
 def find_ssh() -> Optional[str]:
@@ -117,8 +125,6 @@ def install_putty() -> tuple[bool, str]:
             print()
 
             # Wait a moment for installation to complete
-            import time
-
             time.sleep(2)
 
             # Verify plink is now available
@@ -140,20 +146,74 @@ def install_putty() -> tuple[bool, str]:
         return False, f"Installation error: {e}"
 
 
+async def _read_exited_stderr(stream, timeout: float = 1.0) -> str:
+    """What an exited child wrote to its stderr pipe, without blocking the loop.
+
+    A grandchild that inherited the pipe keeps it open, so reading to EOF
+    could wait forever. The pipe is drained in a daemon thread, and after
+    ``timeout`` whatever arrived so far is returned.
+    """
+    loop = asyncio.get_running_loop()
+    finished = asyncio.Event()
+    chunks: list[bytes] = []
+
+    def drain() -> None:
+        try:
+            while chunk := stream.read1(65536):
+                chunks.append(chunk)
+        except (OSError, ValueError):
+            pass
+        try:
+            loop.call_soon_threadsafe(finished.set)
+        except RuntimeError:
+            pass  # The loop is gone; nobody is waiting any more
+
+    threading.Thread(target=drain, name="stderr-drain", daemon=True).start()
+    try:
+        await asyncio.wait_for(finished.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    return b"".join(chunks).decode(errors="replace").strip()
+
+
 class TunnelManager:
     """Manages SSH tunnel to Mac for VibeProxy access."""
 
-    def __init__(self, config_manager: Optional[ConfigManager] = None):
-        """Initialize tunnel manager."""
+    def __init__(
+        self, config_manager: Optional[ConfigManager] = None, local_port: Optional[int] = None
+    ):
+        """Initialize tunnel manager.
+
+        Args:
+            config_manager: Config source (default: vibeproxy-config.json)
+            local_port: Local port override (e.g. for pool members); default LocalPort
+        """
         self.config_manager = config_manager or ConfigManager()
         self._config = self.config_manager.load()
+        self._local_port = local_port
         self._tunnel_pid: Optional[int] = None  # Track SSH process PID
         self._tunnel_process: Optional[subprocess.Popen] = None  # Track process object
+        # ssh a blocking start() is waiting on, killed by cancel_start()
+        self._starting: Optional[subprocess.Popen] = None
+        # Child started by astart() (asyncio process) and its recent stderr lines
+        self._async_process: Optional[asyncio.subprocess.Process] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._stderr_tail: deque[str] = deque(maxlen=20)
+        # Last known up/down state, updated on every observation below
+        self.liveness = TunnelLiveness(self)
+        # Cipher/compression profile forced by the SSH benchmark (None = saved best)
+        self.profile_override: Optional[tuning.SSHProfile] = None
+        # Hosts the tunnel has worked with, probed first during discovery
+        self.known_hosts = hosts.HostIndex(self.config_manager.base_path / "known-hosts.json")
+        # Most recent tunnel process exit, pushed to listeners as it happens
+        self.last_exit: Optional[procwatch.ProcessExit] = None
+        self._exit_listeners: list[Callable[[procwatch.ProcessExit], None]] = []
+        self._exit_watch: Optional[asyncio.Task] = None
 
     @property
     def port(self) -> int:
         """Get the local tunnel port."""
-        return self._config.local_port
+        return self._local_port or self._config.local_port
 
     @property
     def mac_user(self) -> str:
@@ -165,6 +225,18 @@ class TunnelManager:
         """Get Mac IP address."""
         return self._config.mac_ip
 
+    @property
+    def ssh_profile(self) -> tuning.SSHProfile:
+        """SSH transport options: the benchmark's best for this network, or default."""
+        if self.profile_override is not None:
+            return self.profile_override
+        return tuning.profile_for_network(self._config.ssh_profiles)
+
+    def _set_up(self, up: bool, source: str) -> None:
+        """Record an observed tunnel state (metrics + liveness snapshot)."""
+        metrics.TUNNEL_UP.set(1 if up else 0)
+        self.liveness.update(up, source)
+
     def is_running(self) -> bool:
         """Check if SSH tunnel is actually running.
 
@@ -178,7 +250,10 @@ class TunnelManager:
             process_alive = False
 
             # Check if process exists (Windows-compatible)
-            if self._tunnel_process is not None:
+            if self._async_process is not None:
+                # Started by astart() - returncode is set once it exits
+                process_alive = self._async_process.returncode is None
+            elif self._tunnel_process is not None:
                 # We have the process object - use poll()
                 process_alive = self._tunnel_process.poll() is None
             else:
@@ -205,6 +280,8 @@ class TunnelManager:
                 # Process is dead - clear tracking info
                 self._tunnel_pid = None
                 self._tunnel_process = None
+                self._async_process = None
+                self._set_up(False, "exit")
                 return False
 
         # Layer 2: Port check
@@ -216,6 +293,8 @@ class TunnelManager:
         except Exception:
             port_open = False
 
+        self._set_up(port_open, "probe")
+
         # Both checks must pass if we're tracking a PID
         if self._tunnel_pid is not None:
             # We have PID - require both PID and port
@@ -230,6 +309,305 @@ class TunnelManager:
             return True, f"Connected (port {self.port})"
         return False, f"Not connected (port {self.port})"
 
+    def _tunnel_command(self, ssh_exe: str, foreground: bool = False) -> Optional[list[str]]:
+        """Build the tunnel command for this platform and auth method.
+
+        Args:
+            ssh_exe: Path to the OpenSSH client
+            foreground: Keep ssh attached (no -f) so the process can be watched
+
+        Returns None when password auth on Windows needs plink but PuTTY is missing.
+        """
+        ssh_target = f"{self.mac_user}@{self.mac_ip}"
+        local_forward = f"{self.port}:localhost:{self._config.remote_port}"
+        password = self._config.ssh_password
+        profile = self.ssh_profile
+
+        if platform.system() == "Windows":
+            if password:
+                plink_exe = find_plink()
+                if not plink_exe:
+                    return None
+                # Use plink with password parameter (PuTTY syntax, not OpenSSH)
+                return [
+                    plink_exe,
+                    "-ssh",  # Use SSH protocol
+                    "-batch",  # Disable interactive prompts
+                    "-hostkey",
+                    "SHA256:5XgC3h/+waae885A5/IORHon1HPf3QLQXbF84V+mj0Y",  # Mac host key
+                    *profile.plink_options(),
+                    "-L",
+                    local_forward,  # Local port forwarding
+                    "-pw",
+                    password,  # Password authentication
+                    ssh_target,  # user@host
+                    "-N",  # No command, just forward ports
+                ]
+            # No password - use key-based auth with OpenSSH
+            return [
+                ssh_exe,
+                "-N",
+                "-o",
+                "StrictHostKeyChecking=no",
+                "-o",
+                "BatchMode=yes",
+                *profile.options(),
+                "-L",
+                local_forward,
+                ssh_target,
+            ]
+
+        # Unix: -f backgrounds ssh after auth; foreground mode keeps it as our child
+        mode = ["-N", "-o", "ExitOnForwardFailure=yes"] if foreground else ["-fN"]
+        if password:
+            # Use sshpass for password auth (Unix only)
+            return [
+                "sshpass",
+                "-p",
+                password,
+                ssh_exe,
+                *mode,
+                "-o",
+                "StrictHostKeyChecking=no",
+                "-o",
+                "UserKnownHostsFile=/dev/null",
+                *profile.options(),
+                "-L",
+                local_forward,
+                ssh_target,
+            ]
+        # Unix: use key-based auth
+        return [
+            ssh_exe,
+            *mode,
+            "-o",
+            "StrictHostKeyChecking=no",
+            "-o",
+            "BatchMode=yes",
+            *profile.options(),
+            "-L",
+            local_forward,
+            ssh_target,
+        ]
+
+    def _install_putty_for_password_auth(self) -> tuple[bool, str]:
+        """Install PuTTY when password auth on Windows needs plink.
+
+        Returns (success, message) tuple.
+        """
+        print("\n⚠️  Password authentication requires PuTTY")
+        success, message = install_putty()
+
+        if success:
+            if find_plink():
+                return True, message
+            return False, "PuTTY installed but plink not found"
+        # Installation failed - return error with instructions
+        return False, (
+            f"PuTTY installation failed: {message}\n\n"
+            "Alternatives:\n"
+            "  1. Install manually from https://www.putty.org/\n"
+            "  2. Set up SSH keys for password-less auth"
+        )
+
+    # ControlMaster multiplexing (Unix OpenSSH): one authenticated master
+    # connection stays up; forwards are added and removed over it with
+    # `ssh -O`, so a reconnect skips the TCP/SSH handshake and auth
+
+    @property
+    def uses_control_master(self) -> bool:
+        """Whether start() goes through an SSH ControlMaster connection."""
+        return self._config.ssh_control_master and platform.system() != "Windows"
+
+    @property
+    def control_path(self) -> Path:
+        """Socket of the master connection (kept short: sun_path is ~104 bytes)."""
+        return self._control_path(self.mac_ip)
+
+    def _control_path(self, host: str) -> Path:
+        """Master connection socket for a given host."""
+        return Path.home() / ".ssh" / f"vibeproxy-{self.mac_user}@{host}.sock"
+
+    def _control(
+        self, ssh_exe: str, operation: str, forward: bool = True, host: Optional[str] = None
+    ) -> subprocess.CompletedProcess:
+        """Run an `ssh -O` control command against the master connection (to host)."""
+        host = host or self.mac_ip
+        cmd = [ssh_exe, "-o", f"ControlPath={self._control_path(host)}", "-O", operation]
+        if forward:
+            cmd += ["-L", f"{self.port}:localhost:{self._config.remote_port}"]
+        cmd.append(f"{self.mac_user}@{host}")
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+
+    def master_running(self) -> bool:
+        """Check whether an authenticated master connection is up."""
+        ssh_exe = find_ssh()
+        if not ssh_exe or not self.control_path.exists():
+            return False
+        try:
+            return self._control(ssh_exe, "check", forward=False).returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+
+    def _master_command(self, ssh_exe: str, host: str) -> list[str]:
+        """Command that authenticates a master connection to host, then backgrounds."""
+        control_path = self._control_path(host)
+        control_path.parent.mkdir(mode=0o700, exist_ok=True)
+        cmd = [
+            ssh_exe,
+            "-fN",
+            "-o",
+            "ControlMaster=yes",
+            "-o",
+            f"ControlPersist={CONTROL_PERSIST}",
+            "-o",
+            f"ControlPath={control_path}",
+            "-o",
+            "StrictHostKeyChecking=no",
+            *self.ssh_profile.options(),
+        ]
+        password = self._config.ssh_password
+        if password:
+            cmd = ["sshpass", "-p", password, *cmd, "-o", "UserKnownHostsFile=/dev/null"]
+        else:
+            cmd += ["-o", "BatchMode=yes"]
+        cmd.append(f"{self.mac_user}@{host}")
+        return cmd
+
+    def _run_ssh(self, cmd: list[str], timeout: float = 10) -> subprocess.CompletedProcess:
+        """subprocess.run() for an ssh that backgrounds itself once connected.
+
+        The child is visible to cancel_start() while it runs.
+        """
+        process = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        self._starting = process
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        finally:
+            self._starting = None
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    def cancel_start(self) -> None:
+        """Abort a start() running in another thread; it then returns a failure."""
+        process = self._starting
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _start_master(self, ssh_exe: str) -> tuple[bool, str]:
+        """Start a background master connection with no forwards of its own."""
+        cmd = self._master_command(ssh_exe, self.mac_ip)
+        result = self._run_ssh(cmd)
+        if result.returncode != 0:
+            error = result.stderr.strip() or result.stdout.strip() or "Unknown error"
+            return False, f"SSH failed: {error}"
+        return True, "Master connection started"
+
+    def _start_multiplexed(self, ssh_exe: str) -> tuple[bool, str, str]:
+        """Add our forward to the master connection, starting the master if needed.
+
+        Returns (success, message, mode) where mode is "master_reuse" or "master_new".
+        """
+        mode = "master_reuse" if self.master_running() else "master_new"
+        if mode == "master_new":
+            success, message = self._start_master(ssh_exe)
+            if not success:
+                return False, message, mode
+
+        result = self._control(ssh_exe, "forward")
+        if result.returncode != 0:
+            error = result.stderr.strip() or "Unknown error"
+            return False, f"SSH failed: {error}", mode
+
+        # The master binds the port before `-O forward` returns; allow a moment anyway
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline:
+            if self.is_running():
+                suffix = " (reused SSH master)" if mode == "master_reuse" else ""
+                return True, f"Tunnel started on port {self.port}{suffix}", mode
+            time.sleep(0.05)
+        return False, "Forward added but port not listening", mode
+
+    def stop_master(self) -> tuple[bool, str]:
+        """Close the master connection (and every forward riding on it)."""
+        ssh_exe = find_ssh()
+        if not ssh_exe or not self.control_path.exists():
+            return True, "No master connection"
+        try:
+            result = self._control(ssh_exe, "exit", forward=False)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return False, str(e)
+        if result.returncode == 0:
+            return True, "Master connection closed"
+        return False, result.stderr.strip() or "Failed to close master connection"
+
+    def measure_reconnect(self, rounds: int = 3) -> dict[str, list[float]]:
+        """Time stop()+start() with the master kept vs. torn down each round.
+
+        Returns {"multiplexed": [...], "full": [...]} in seconds (failed rounds omitted).
+        """
+        timings: dict[str, list[float]] = {"multiplexed": [], "full": []}
+        if not self.uses_control_master:
+            return timings
+        for mode in ("multiplexed", "full"):
+            for _ in range(rounds):
+                self.stop()
+                if mode == "full":
+                    self.stop_master()
+                started = time.perf_counter()
+                success, _ = self.start()
+                if success:
+                    timings[mode].append(time.perf_counter() - started)
+        return timings
+
+    async def atune_ssh(
+        self,
+        profiles: Optional[list[tuning.SSHProfile]] = None,
+        requests: int = 20,
+        save: bool = True,
+    ) -> list[tuning.ProfileResult]:
+        """Benchmark SSH cipher/MAC/compression profiles against the Mac.
+
+        Each profile gets its own scratch tunnel on a free port (the live
+        tunnel is left alone), and proxied /v1/models requests measure its
+        latency and throughput. The fastest profile is saved for the current
+        network, and start() uses it from then on.
+
+        Args:
+            profiles: Profiles to try (default: all of tuning.PROFILES)
+            requests: Requests per measurement phase
+            save: Store the winner in SSHProfiles
+
+        Returns one result per profile, in the order tried.
+        """
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            bench_port = s.getsockname()[1]
+        bench = TunnelManager(self.config_manager, local_port=bench_port)
+
+        results = []
+        for profile in profiles or list(tuning.PROFILES.values()):
+            bench.profile_override = profile
+            success, message = await bench.astart()
+            if success:
+                result = await tuning.measure(bench_port, requests=requests)
+            else:
+                result = tuning.ProfileResult(profile="", error=message)
+            await bench.astop()
+            result.profile = profile.name
+            results.append(result)
+
+        winner = tuning.best(results)
+        if save and winner is not None:
+            self._config.ssh_profiles[tuning.network_key()] = winner.profile
+            self.config_manager.save(self._config)
+        return results
+
     def start(self) -> tuple[bool, str]:
         """Start SSH tunnel using sshpass or ssh-agent.
 
@@ -243,103 +621,32 @@ class TunnelManager:
         if not ssh_exe:
             return False, "SSH not found - install OpenSSH or Git for Windows"
 
-        # Build SSH command
-        ssh_target = f"{self.mac_user}@{self.mac_ip}"
-        local_forward = f"{self.port}:localhost:{self._config.remote_port}"
         is_windows = platform.system() == "Windows"
+        started = time.perf_counter()
 
-        # Check if sshpass is available for password auth
-        password = self._config.ssh_password
+        if self.uses_control_master:
+            try:
+                success, message, mode = self._start_multiplexed(ssh_exe)
+            except subprocess.TimeoutExpired:
+                return False, "SSH connection timeout"
+            except FileNotFoundError as e:
+                if "sshpass" in str(e):
+                    return False, "sshpass not found - install it or use key-based auth"
+                return False, f"Command not found: {e}"
+            if success:
+                metrics.TUNNEL_CONNECT_SECONDS.observe(time.perf_counter() - started, mode)
+            return success, message
 
         try:
-            if password and not is_windows:
-                # Use sshpass for password auth (Unix only)
-                cmd = [
-                    "sshpass",
-                    "-p",
-                    password,
-                    ssh_exe,
-                    "-fN",
-                    "-o",
-                    "StrictHostKeyChecking=no",
-                    "-o",
-                    "UserKnownHostsFile=/dev/null",
-                    "-L",
-                    local_forward,
-                    ssh_target,
-                ]
-                # Start tunnel in background
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-            elif is_windows:
-                # Windows: Try plink (PuTTY) first for password auth
-                plink_exe = find_plink()
-
-                if plink_exe and password:
-                    # Use plink with password parameter (PuTTY syntax, not OpenSSH)
-                    cmd = [
-                        plink_exe,
-                        "-ssh",  # Use SSH protocol
-                        "-batch",  # Disable interactive prompts
-                        "-hostkey",
-                        "SHA256:5XgC3h/+waae885A5/IORHon1HPf3QLQXbF84V+mj0Y",  # Mac host key
-                        "-L",
-                        local_forward,  # Local port forwarding
-                        "-pw",
-                        password,  # Password authentication
-                        ssh_target,  # user@host
-                        "-N",  # No command, just forward ports
-                    ]
-                elif password:
-                    # No plink, but have password - try to install PuTTY
-                    print("\n⚠️  Password authentication requires PuTTY")
-                    success, message = install_putty()
-
-                    if success:
-                        # Installation succeeded - retry with plink
-                        plink_exe = find_plink()
-                        if plink_exe:
-                            cmd = [
-                                plink_exe,
-                                "-ssh",
-                                "-batch",
-                                "-hostkey",
-                                "SHA256:5XgC3h/+waae885A5/IORHon1HPf3QLQXbF84V+mj0Y",
-                                "-L",
-                                local_forward,
-                                "-pw",
-                                password,
-                                ssh_target,
-                                "-N",
-                            ]
-                        else:
-                            return False, "PuTTY installed but plink not found"
-                    else:
-                        # Installation failed - return error with instructions
-                        return False, (
-                            f"PuTTY installation failed: {message}\n\n"
-                            "Alternatives:\n"
-                            "  1. Install manually from https://www.putty.org/\n"
-                            "  2. Set up SSH keys for password-less auth"
-                        )
-                else:
-                    # No password - use key-based auth with OpenSSH
-                    cmd = [
-                        ssh_exe,
-                        "-N",
-                        "-o",
-                        "StrictHostKeyChecking=no",
-                        "-o",
-                        "BatchMode=yes",
-                        "-L",
-                        local_forward,
-                        ssh_target,
-                    ]
-
+            cmd = self._tunnel_command(ssh_exe)
+            if cmd is None:
+                # No plink, but have password - try to install PuTTY
+                success, message = self._install_putty_for_password_auth()
+                if not success:
+                    return False, message
+                cmd = self._tunnel_command(ssh_exe)
+
+            if is_windows:
                 # Start as background process (no console window)
                 startupinfo = subprocess.STARTUPINFO()
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
@@ -358,9 +665,11 @@ class TunnelManager:
                 self._tunnel_pid = process.pid
 
                 # Wait briefly for connection
-                import time
-
-                time.sleep(2)
+                self._starting = process
+                try:
+                    time.sleep(2)
+                finally:
+                    self._starting = None
 
                 # Check if process died immediately
                 if process.poll() is not None:
@@ -369,48 +678,21 @@ class TunnelManager:
                     return False, f"SSH failed: {error}"
 
                 if self.is_running():
+                    metrics.TUNNEL_CONNECT_SECONDS.observe(time.perf_counter() - started, "direct")
                     return True, f"Tunnel started on port {self.port}"
                 return False, "SSH process started but port not listening"
-            else:
-                # Unix: use key-based auth with -f for background
-                cmd = [
-                    ssh_exe,
-                    "-fN",
-                    "-o",
-                    "StrictHostKeyChecking=no",
-                    "-o",
-                    "BatchMode=yes",
-                    "-L",
-                    local_forward,
-                    ssh_target,
-                ]
-                # Start tunnel in background
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-
-            # For non-Windows path (sshpass or Unix key-based)
-            if not is_windows:
-                if result.returncode == 0:
-                    # Verify it's actually running
-                    import time
-
-                    time.sleep(0.5)
-                    if self.is_running():
-                        return True, f"Tunnel started on port {self.port}"
-                    return False, "Tunnel process started but port not listening"
-                else:
-                    error = (
-                        result.stderr.strip()
-                        or result.stdout.strip()
-                        or "Unknown error"
-                    )
-                    return False, f"SSH failed: {error}"
 
-            return False, "Unexpected code path"
+            # Unix (sshpass or key-based): ssh -f returns once the tunnel is up
+            result = self._run_ssh(cmd)
+            if result.returncode == 0:
+                # Verify it's actually running
+                time.sleep(0.5)
+                if self.is_running():
+                    metrics.TUNNEL_CONNECT_SECONDS.observe(time.perf_counter() - started, "direct")
+                    return True, f"Tunnel started on port {self.port}"
+                return False, "Tunnel process started but port not listening"
+            error = result.stderr.strip() or result.stdout.strip() or "Unknown error"
+            return False, f"SSH failed: {error}"
 
         except subprocess.TimeoutExpired:
             return False, "SSH connection timeout"
@@ -426,30 +708,356 @@ class TunnelManager:
         if not self.is_running():
             return True, "Tunnel not running"
 
-        try:
-            # Find and kill SSH processes for our tunnel
-            # On Windows, use tasklist/taskkill; on Unix, use pkill
-            import platform
+        if self.uses_control_master and self.master_running():
+            # Drop only our forward; the master stays up for a fast reconnect
+            try:
+                self._control(find_ssh(), "cancel")
+            except (OSError, subprocess.TimeoutExpired) as e:
+                return False, str(e)
+            time.sleep(0.1)
+            if not self.is_running():
+                return True, "Tunnel stopped (SSH master kept for fast reconnect)"
 
-            if platform.system() == "Windows":
-                # Find SSH processes listening on our port
-                # This is tricky on Windows - just report that manual stop is needed
-                return False, "Manual stop required: kill SSH process or close terminal"
-            else:
-                # Unix-like: pkill matching our tunnel
-                cmd = ["pkill", "-f", f"ssh.*{self.port}:localhost"]
+        try:
+            # Stop exactly the SSH client listening on our port
+            stopped = self._stop_port_owners()
+            if stopped is None:
+                if platform.system() == "Windows":
+                    return False, "Manual stop required: kill SSH process or close terminal"
+                # No port-owner lookup here (macOS): pkill matching our tunnel
+                cmd = ["pkill", "-f", f"ssh.* {self.port}:localhost"]
                 subprocess.run(cmd, capture_output=True)
 
-                import time
-
-                time.sleep(0.5)
-                if not self.is_running():
-                    return True, "Tunnel stopped"
-                return False, "Failed to stop tunnel"
+            time.sleep(0.5)
+            if not self.is_running():
+                return True, "Tunnel stopped"
+            return False, "Failed to stop tunnel"
 
         except Exception as e:
             return False, str(e)
 
+    def _stop_port_owners(self) -> Optional[list[ports.PortOwner]]:
+        """Terminate the SSH clients listening on the tunnel port.
+
+        Returns the processes signalled, or None if this platform cannot
+        look up port owners.
+        """
+        owners = ports.port_owners(self.port)
+        if owners is None:
+            return None
+        return ports.terminate([owner for owner in owners if owner.is_ssh])
+
+    # Async API: non-blocking equivalents for the Textual event loop and
+    # asyncio-based launchers (wrap with asyncio.run() from plain scripts)
+
+    async def _aport_open(self, timeout: float = 1.0) -> bool:
+        """Check if the tunnel port accepts connections without blocking the loop."""
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection("localhost", self.port), timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def _aprocess_alive(self) -> bool:
+        """Check if the tracked tunnel process is still alive."""
+        if self._async_process is not None:
+            return self._async_process.returncode is None
+        if self._tunnel_process is not None:
+            return self._tunnel_process.poll() is None
+        if platform.system() == "Windows":
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    "tasklist",
+                    "/FI",
+                    f"PID eq {self._tunnel_pid}",
+                    "/NH",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    creationflags=subprocess.CREATE_NO_WINDOW,
+                )
+                stdout, _ = await asyncio.wait_for(proc.communicate(), 2)
+                return "No tasks" not in stdout.decode(errors="replace")
+            except (OSError, asyncio.TimeoutError):
+                return False
+        try:
+            os.kill(self._tunnel_pid, 0)
+            return True
+        except OSError:
+            return False
+
+    async def ais_running(self) -> bool:
+        """Async version of is_running() (same PID + port verification)."""
+        if self._tunnel_pid is not None and not await self._aprocess_alive():
+            # Process is dead - clear tracking info
+            self._tunnel_pid = None
+            self._tunnel_process = None
+            self._async_process = None
+            self._set_up(False, "exit")
+            return False
+
+        port_open = await self._aport_open()
+        self._set_up(port_open, "probe")
+        return port_open
+
+    async def aget_status(self) -> tuple[bool, str]:
+        """Async version of get_status()."""
+        if await self.ais_running():
+            return True, f"Connected (port {self.port})"
+        return False, f"Not connected (port {self.port})"
+
+    async def _drain_stderr(self, process: asyncio.subprocess.Process) -> None:
+        """Keep the last stderr lines of the tunnel process (and keep the pipe empty)."""
+        try:
+            while True:
+                line = await process.stderr.readline()
+                if not line:
+                    break
+                text = line.decode(errors="replace").strip()
+                if text:
+                    self._stderr_tail.append(text)
+        except (OSError, ValueError):
+            pass
+
+    async def astart(self, ready_timeout: float = 10.0) -> tuple[bool, str]:
+        """Start the tunnel as an asyncio child process.
+
+        Unlike start(), ssh stays attached (no -f) on every platform, so the
+        process can be awaited and its stderr read. Readiness is detected by
+        polling the port with non-blocking connects until ``ready_timeout``.
+
+        Returns (success, message) tuple.
+        """
+        if await self.ais_running():
+            return True, "Tunnel already running"
+
+        ssh_exe = find_ssh()
+        if not ssh_exe:
+            return False, "SSH not found - install OpenSSH or Git for Windows"
+
+        cmd = self._tunnel_command(ssh_exe, foreground=True)
+        if cmd is None:
+            success, message = await asyncio.to_thread(self._install_putty_for_password_auth)
+            if not success:
+                return False, message
+            cmd = self._tunnel_command(ssh_exe, foreground=True)
+
+        kwargs = {}
+        if platform.system() == "Windows":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                **kwargs,
+            )
+        except FileNotFoundError as e:
+            if "sshpass" in str(e) or cmd[0] == "sshpass":
+                return False, "sshpass not found - install it or use key-based auth"
+            return False, f"Command not found: {e}"
+        except OSError as e:
+            return False, str(e)
+
+        self._async_process = process
+        self._tunnel_process = None
+        self._tunnel_pid = process.pid
+        self._stderr_tail.clear()
+        self._stderr_task = asyncio.get_running_loop().create_task(self._drain_stderr(process))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ready_timeout
+        exit_waiter = asyncio.ensure_future(process.wait())
+        try:
+            while loop.time() < deadline:
+                if exit_waiter.done():
+                    await asyncio.wait({self._stderr_task}, timeout=0.5)
+                    error = " ".join(self._stderr_tail) or f"exit code {process.returncode}"
+                    self._async_process = None
+                    self._tunnel_pid = None
+                    return False, f"SSH failed: {error}"
+                if await self._aport_open(timeout=0.5):
+                    self._set_up(True, "start")
+                    return True, f"Tunnel started on port {self.port}"
+                # Wakes immediately if ssh exits, otherwise re-probes the port
+                await asyncio.wait({exit_waiter}, timeout=0.2)
+        finally:
+            if not exit_waiter.done():
+                exit_waiter.cancel()
+
+        return False, "SSH process started but port not listening"
+
+    async def await_exit(self) -> Optional[int]:
+        """Wait for the tunnel child started by astart() to exit.
+
+        Returns the exit code, or None if no asyncio child is being tracked
+        (e.g. the tunnel was started by another process).
+        """
+        if self._async_process is None:
+            return None
+        process_exit = await self.await_process_exit()
+        return process_exit.returncode
+
+    def add_exit_listener(self, listener: Callable[[procwatch.ProcessExit], None]) -> None:
+        """Call ``listener(exit)`` the moment the tunnel process exits."""
+        self._exit_listeners.append(listener)
+
+    def _record_exit(
+        self, pid: int, returncode: Optional[int], detected_by: str, stderr_tail: str = ""
+    ) -> procwatch.ProcessExit:
+        """Clear tracking for an exited process and notify listeners (once per exit)."""
+        process_exit = procwatch.ProcessExit(
+            pid=pid, returncode=returncode, stderr_tail=stderr_tail, detected_by=detected_by
+        )
+        if self._tunnel_pid != pid:
+            last = self.last_exit
+            if last is not None and last.pid == pid:
+                return last  # Another waiter already reported this exit
+            # Stopped on purpose (astop/force_reset): no event for listeners
+            return process_exit
+        self._tunnel_pid = None
+        self._tunnel_process = None
+        self._async_process = None
+        self.last_exit = process_exit
+        self._set_up(False, "exit")
+        for listener in list(self._exit_listeners):
+            listener(process_exit)
+        return process_exit
+
+    def adopt_port_owner(self) -> Optional[int]:
+        """Track the ssh process listening on the tunnel port if we have no PID.
+
+        Covers ``ssh -f`` (which daemonizes) and tunnels started by another
+        launcher. Only on Linux, where the lookup reads procfs in a few ms.
+        """
+        if self._tunnel_pid is not None:
+            return self._tunnel_pid
+        if platform.system() != "Linux":
+            return None
+        owners = [owner for owner in ports.port_owners(self.port) or [] if owner.is_ssh]
+        if len(owners) == 1:
+            self._tunnel_pid = owners[0].pid
+        return self._tunnel_pid
+
+    async def await_process_exit(self) -> Optional[procwatch.ProcessExit]:
+        """Wait for the tunnel process to exit, however it was started.
+
+        Returns None at once if no process can be tracked (then only the port
+        can be watched).
+        """
+        child = self._async_process
+        if child is not None:
+            returncode = await child.wait()
+            if self._stderr_task is not None:
+                await asyncio.wait({self._stderr_task}, timeout=0.5)
+            return self._record_exit(child.pid, returncode, "child", self.last_error)
+        pid = self._tunnel_pid or await asyncio.to_thread(self.adopt_port_owner)
+        if pid is None:
+            return None
+        process = self._tunnel_process if self._tunnel_pid == pid else None
+        returncode, detected_by = await procwatch.wait_for_exit(pid, process)
+        stderr_tail = ""
+        if process is not None and process.stderr is not None:
+            stderr_tail = await _read_exited_stderr(process.stderr)
+        return self._record_exit(pid, returncode, detected_by, stderr_tail)
+
+    def watch_exit(self) -> None:
+        """Keep a background exit watch on the tunnel process (needs a running loop).
+
+        Idempotent; call it whenever the tunnel may have a new process.
+        """
+        if self._exit_watch is not None and not self._exit_watch.done():
+            return
+        self._exit_watch = asyncio.get_running_loop().create_task(self.await_process_exit())
+
+    async def stop_exit_watch(self) -> None:
+        """Cancel the background exit watch."""
+        if self._exit_watch is not None:
+            self._exit_watch.cancel()
+            await asyncio.gather(self._exit_watch, return_exceptions=True)
+            self._exit_watch = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        """PID of the tracked ssh process, or None if none is tracked."""
+        return self._tunnel_pid
+
+    def process_alive(self) -> Optional[bool]:
+        """Whether the tracked ssh process is alive, checked without spawning anything.
+
+        None if no process is tracked, or if only a bare PID is known on
+        Windows, where checking it would need a ``tasklist`` spawn.
+        """
+        if self._async_process is not None:
+            return self._async_process.returncode is None
+        if self._tunnel_process is not None:
+            return self._tunnel_process.poll() is None
+        if self._tunnel_pid is not None and platform.system() != "Windows":
+            try:
+                os.kill(self._tunnel_pid, 0)
+            except OSError:
+                return False
+            return True
+        return None
+
+    @property
+    def owns_process(self) -> bool:
+        """Whether an asyncio tunnel child started by astart() is being tracked."""
+        return self._async_process is not None
+
+    @property
+    def last_error(self) -> str:
+        """Most recent stderr lines from the asyncio tunnel child."""
+        return " ".join(self._stderr_tail)
+
+    async def astop(self, timeout: float = 3.0) -> tuple[bool, str]:
+        """Async version of stop(); terminates our own child process directly."""
+        process = self._async_process
+        if process is not None and process.returncode is None:
+            # Untrack first so exit watchers see a deliberate stop, not a crash
+            self._async_process = None
+            self._tunnel_pid = None
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+            self._set_up(False, "stop")
+            return True, "Tunnel stopped"
+
+        if not await self.ais_running():
+            return True, "Tunnel not running"
+
+        stopped = await asyncio.to_thread(self._stop_port_owners)
+        if stopped is None:
+            if platform.system() == "Windows":
+                return False, "Manual stop required: kill SSH process or close terminal"
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    "pkill",
+                    "-f",
+                    f"ssh.* {self.port}:localhost",
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+                await proc.wait()
+            except OSError as e:
+                return False, str(e)
+
+        await asyncio.sleep(0.5)
+        if not await self.ais_running():
+            return True, "Tunnel stopped"
+        return False, "Failed to stop tunnel"
+
     def force_reset(self) -> tuple[bool, str]:
         """Force reset tunnel state (for zombie states).
 
@@ -461,32 +1069,20 @@ class TunnelManager:
         # Clear tracked state
         self._tunnel_pid = None
         self._tunnel_process = None
-
-        # Try to kill process on port (Windows-specific)
-        if platform.system() == "Windows":
-            try:
-                # Find process using port
-                result = subprocess.run(
-                    [
-                        "powershell",
-                        "-Command",
-                        f"(Get-NetTCPConnection -LocalPort {self.port} -ErrorAction SilentlyContinue).OwningProcess",
-                    ],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    pid = int(result.stdout.strip())
-                    # Kill the process
-                    subprocess.run(
-                        ["taskkill", "/F", "/PID", str(pid)], check=False, timeout=5
-                    )
-                    return True, f"Killed process {pid} on port {self.port}"
-            except subprocess.TimeoutExpired:
-                return True, "State reset (timeout finding process)"
-            except Exception as e:
-                return True, f"State reset (error: {e})"
+        self._async_process = None
+
+        # Kill whatever holds the port (procfs on Linux, Get-NetTCPConnection on Windows)
+        owners = ports.port_owners(self.port)
+        if owners:
+            stopped = ports.terminate(owners, force=True)
+            labels = ", ".join(owner.label for owner in stopped or owners)
+            if stopped:
+                self._set_up(False, "stop")
+                return True, f"Killed {labels} on port {self.port}"
+            return True, f"State reset (could not kill {labels})"
+        if self.uses_control_master and self.master_running():
+            success, message = self.stop_master()
+            return True, f"State reset ({message.lower()})"
 
         return True, "State reset (no process found to kill)"
 
@@ -559,51 +1155,46 @@ class TunnelManager:
         # Return False to indicate password needs to be entered via the PowerShell script
         return False
 
-    def scan_network(self, progress_callback=None) -> List[Tuple[str, str]]:
-        """Scan local network for devices with SSH (22) or VibeProxy (8317) open.
+    def _scan_networks(self) -> list[str]:
+        """Networks to scan: this machine's local subnets plus configured CIDRs.
+
+        Empty when no interface is up and nothing is configured; guessing a
+        subnet would only sweep addresses that cannot be the Mac.
+        """
+        networks = [str(n) for n in scanner.local_networks()]
+        for cidr in self._config.scan_networks:
+            if cidr not in networks:
+                networks.append(cidr)
+        return networks
+
+    async def ascan_network(
+        self, progress_callback=None, networks: Optional[list[str]] = None
+    ) -> List[Tuple[str, str]]:
+        """Scan for devices with SSH (22) or VibeProxy (8317) open, all hosts at once.
+
+        Args:
+            progress_callback: Called as (hosts_done, hosts_total, result) per host;
+                result is a ScanResult for responsive hosts, else None
+            networks: CIDRs to scan (default: local networks + ScanNetworks)
 
         Returns list of (ip, label) tuples.
         """
-        # Get local IP and subnet
-        try:
-            # Connect to a public IP to get the interface used for routing
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-        except Exception:
-            local_ip = "192.168.50.1"  # Fallback
+        if not networks:
+            # Interface enumeration may spawn a process (macOS, Windows)
+            networks = await asyncio.to_thread(self._scan_networks)
+        results = await scanner.scan(networks, progress_callback=progress_callback)
+        return [(r.ip, r.label) for r in results]
+
+    def scan_network(
+        self, progress_callback=None, networks: Optional[list[str]] = None
+    ) -> List[Tuple[str, str]]:
+        """Scan local network for devices with SSH (22) or VibeProxy (8317) open.
 
-        subnet = ".".join(local_ip.split(".")[:3])
-        found_devices = []
-        lock = threading.Lock()
+        Blocking wrapper around ascan_network() for scripts and worker threads.
 
-        def check_host(ip):
-            try:
-                # Check VibeProxy port first (most specific)
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(0.2)
-                    if s.connect_ex((ip, 8317)) == 0:
-                        with lock:
-                            found_devices.append((ip, "VibeProxy Host (8317)"))
-                        return
-
-                # Check SSH port
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(0.2)
-                    if s.connect_ex((ip, 22)) == 0:
-                        with lock:
-                            found_devices.append((ip, "SSH Host (22)"))
-            except:
-                pass
-
-        # Scan 1-254
-        ips = [f"{subnet}.{i}" for i in range(1, 255)]
-
-        with ThreadPoolExecutor(max_workers=50) as executor:
-            list(executor.map(check_host, ips))
-
-        return sorted(found_devices)
+        Returns list of (ip, label) tuples.
+        """
+        return asyncio.run(self.ascan_network(progress_callback, networks))
 
     def classify_ssh_error(self, error_message: str) -> tuple[str, str]:
         """Classify SSH connection error to determine root cause.
@@ -618,6 +1209,7 @@ class TunnelManager:
             phrase in error_lower
             for phrase in [
                 "connection timed out",
+                "connection timeout",  # start()'s own message when ssh hangs
                 "no route to host",
                 "host unreachable",
                 "network is unreachable",
@@ -649,45 +1241,143 @@ class TunnelManager:
 
         return "UNKNOWN", f"Connection failed: {error_message}"
 
-    def try_discover_mac(self) -> Optional[Tuple[str, str]]:
-        """Try to find Mac on network using SSH port scanning.
+    def _choose_mac(
+        self, ranked: list[scanner.Fingerprint], min_score: int
+    ) -> Optional[Tuple[str, str]]:
+        """Pick the clear leader of fingerprinted hosts, or None if ambiguous.
 
-        Returns (ip, label) if found, None otherwise.
+        Args:
+            ranked: Fingerprints, best first
+            min_score: Lowest confidence accepted for the leader
         """
-        print(f"🔍 Scanning network for Mac (looking for SSH on port 22)...")
-
-        devices = self.scan_network()
+        if not ranked or ranked[0].score < min_score:
+            return None
+        best = ranked[0]
+        if len(ranked) > 1 and ranked[1].score == best.score:
+            return None
+        print(f"✓ Found Mac at {best.ip} ({best.label}, confidence {best.score})")
+        return (best.ip, best.label)
+
+    async def _discover_from_mdns(
+        self, services: list[mdns.Service], trusted: set
+    ) -> Optional[Tuple[str, str]]:
+        """Pick the Mac among hosts that answered the mDNS browse."""
+        advertised = [
+            (address, service)
+            for service in services
+            if service.type == mdns.VIBEPROXY_SERVICE
+            for address in service.addresses
+        ]
+        if len({address for address, _ in advertised}) == 1:
+            address, service = advertised[0]
+            print(f"✓ Found Mac at {address} via mDNS ({service.name})")
+            return (address, f"VibeProxy via mDNS ({service.name})")
 
-        if not devices:
+        addresses = list(dict.fromkeys(a for s in services for a in s.addresses))
+        if not addresses:
             return None
+        print(f"📡 {len(addresses)} hosts answered mDNS, fingerprinting...")
+        results = await scanner.scan(hosts=addresses, timeout=1.0)
+        ranked = await scanner.fingerprint(
+            results, known=trusted, advertised=[a for a, _ in advertised]
+        )
+        # A host announcing SSH over mDNS with a plain OpenSSH banner is a Mac
+        return self._choose_mac(ranked, min_score=15)
 
-        # Filter to SSH-capable devices (exclude VibeProxy-only)
-        ssh_devices = [
-            (ip, label) for ip, label in devices if "SSH" in label or "8317" in label
-        ]
+    async def adiscover_mac(self, seed_limit: int = 8) -> Optional[Tuple[str, str]]:
+        """Find the Mac, probing likely hosts before sweeping the network.
 
-        if len(ssh_devices) == 1:
-            # Found exactly one SSH device - assume it's the Mac
-            ip, label = ssh_devices[0]
-            print(f"✓ Found potential Mac at {ip} ({label})")
-            return (ip, label)
-        elif len(ssh_devices) > 1:
-            # Multiple SSH devices - try to find the one with VibeProxy
-            vibeproxy_devices = [
-                (ip, label) for ip, label in ssh_devices if "8317" in label
-            ]
-            if len(vibeproxy_devices) == 1:
-                ip, label = vibeproxy_devices[0]
-                print(f"✓ Found Mac with VibeProxy at {ip}")
-                return (ip, label)
-
-            # Multiple candidates - show user
-            print(f"⚠ Found {len(ssh_devices)} devices with SSH:")
-            for ip, label in ssh_devices:
-                print(f"  - {ip}: {label}")
+        An mDNS browse runs first: a Mac advertising VibeProxy resolves in one
+        multicast round trip. Otherwise candidates come from the known-host
+        index and the OS neighbor (ARP) table, so a Mac that merely changed IP
+        is usually found in one round of a few probes. Only if none of them
+        answers is the full subnet swept.
+        Responsive hosts are fingerprinted in parallel (SSH banner, VibeProxy
+        model list) and the most confident match wins.
+
+        Args:
+            seed_limit: Number of candidates probed before falling back to a sweep
+
+        Returns (ip, label) if found, None otherwise.
+        """
+        browse = mdns.browse() if self._config.mdns_discovery else asyncio.sleep(0, [])
+        neighbors, services = await asyncio.gather(
+            asyncio.to_thread(hosts.read_neighbors), browse
+        )
+        candidates = self.known_hosts.candidates(neighbors)[:seed_limit]
+        trusted = {
+            ip for ip in candidates if self.known_hosts.is_known(ip, neighbors.get(ip, ""))
+        }
+
+        found = await self._discover_from_mdns(services, trusted)
+        if found:
+            return found
+
+        if candidates:
+            print(f"🔍 Probing {len(candidates)} likely hosts (known hosts + ARP table)...")
+            results = await scanner.scan(hosts=candidates, timeout=1.0)
+            # A seeded host must be a known host with SSH or answer as VibeProxy
+            ranked = await scanner.fingerprint(results, known=trusted)
+            found = self._choose_mac(ranked, min_score=45)
+            if found:
+                return found
+
+        networks = await asyncio.to_thread(self._scan_networks)
+        if not networks:
+            print("⚠ No local network to scan (no interface up, no ScanNetworks)")
             return None
+        print(f"🔍 Scanning {', '.join(networks)} for Mac (looking for SSH on port 22)...")
+        results = await scanner.scan(networks)
+        ranked = await scanner.fingerprint(results, known=trusted)
+        found = self._choose_mac(ranked, min_score=1)
+        if found is None and len(ranked) > 1:
+            # Multiple equally likely candidates - show user
+            print(f"⚠ Found {len(ranked)} devices, none clearly the Mac:")
+            for fp in ranked:
+                print(f"  - {fp.ip}: {fp.label} (confidence {fp.score})")
+        return found
+
+    def try_discover_mac(
+        self, cancel: Optional[threading.Event] = None
+    ) -> Optional[Tuple[str, str]]:
+        """Try to find Mac on network (blocking wrapper around adiscover_mac()).
 
-        return None
+        Args:
+            cancel: Give up (returning None) soon after this event is set
+
+        Returns (ip, label) if found, None otherwise.
+        """
+        if cancel is None:
+            return asyncio.run(self.adiscover_mac())
+        return asyncio.run(self._discover_until(cancel))
+
+    async def _discover_until(self, cancel: threading.Event) -> Optional[Tuple[str, str]]:
+        """adiscover_mac(), cancelled once ``cancel`` is set from another thread."""
+        discovery = asyncio.ensure_future(self.adiscover_mac())
+        while not discovery.done():
+            await asyncio.wait({discovery}, timeout=0.1)
+            if cancel.is_set() and not discovery.done():
+                discovery.cancel()
+                await asyncio.gather(discovery, return_exceptions=True)
+                return None
+        return discovery.result()
+
+    def remember_host(self) -> None:
+        """Record the current Mac as last-known-good (call after a successful connect)."""
+        mac_address = hosts.read_neighbors().get(self.mac_ip, "")
+        known = self.known_hosts.hosts.get(self.mac_ip)
+        hostname = known.hostname if known else ""
+        if not hostname:
+            try:
+                hostname = socket.gethostbyaddr(self.mac_ip)[0]
+            except OSError:
+                hostname = ""
+        try:
+            self.known_hosts.record(
+                self.mac_ip, mac_address=mac_address, hostname=hostname, ports=[22]
+            )
+        except OSError:
+            pass
 
     def auto_update_ip(self, new_ip: str) -> bool:
         """Update config with new Mac IP address.
@@ -703,78 +1393,219 @@ class TunnelManager:
             print(f"✗ Failed to update config: {e}")
             return False
 
-    def connect_with_retry(
-        self, max_attempts: int = 3, auto_discover: bool = True
-    ) -> tuple[bool, str]:
-        """Intelligent connection with auto-discovery and smart retry.
+    @property
+    def candidate_hosts(self) -> list[str]:
+        """Endpoints the Mac may be reachable at: MacIP first, then MacHosts."""
+        return list(dict.fromkeys([self.mac_ip, *self._config.mac_hosts]))
+
+    async def _attempt_host(self, host: str, ssh_exe: Optional[str], timeout: float) -> bool:
+        """One racing attempt: authenticate a master (ssh_exe given) or read the SSH banner."""
+        if ssh_exe is None:
+            banner = await scanner.read_ssh_banner(host, scanner.SSH_PORT, timeout)
+            return banner.startswith("SSH-")
+        process = await asyncio.create_subprocess_exec(
+            *self._master_command(ssh_exe, host),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            # ssh -f exits 0 once authenticated, leaving the master in the background
+            return await asyncio.wait_for(process.wait(), timeout) == 0
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    async def arace_hosts(
+        self,
+        authenticate: Optional[bool] = None,
+        stagger: float = race.DEFAULT_STAGGER,
+        timeout: float = 10.0,
+    ) -> Optional[str]:
+        """Race candidate_hosts with staggered starts and switch MacIP to the winner.
+
+        With a ControlMaster each attempt is a full SSH authentication, so the
+        winner's master is ready for start() to reuse; otherwise each attempt
+        is a TCP connect plus SSH banner read. The winner moves to the front
+        of MacHosts and becomes MacIP, so it gets the head start next time.
+
+        ControlMaster is opt-in, so by default this race only picks the host
+        that answers first. It does not set up the tunnel: the winner still pays
+        for a full, serial start() afterwards. Racing start() itself is not
+        possible because every attempt would bind the same local port.
 
         Args:
-            max_attempts: Maximum connection attempts before network scan
-            auto_discover: If True, scan network when host unreachable
+            authenticate: Race master connections (default: uses_control_master)
+            stagger: Seconds between attempt starts
+            timeout: Per-attempt timeout
 
-        Returns (success, message) tuple.
+        Returns the winning host, or None if no candidate answered.
         """
-        for attempt in range(1, max_attempts + 1):
-            print(
-                f"🔌 Attempt {attempt}/{max_attempts} - Connecting to {self.mac_user}@{self.mac_ip}..."
-            )
-
-            success, message = self.start()
+        candidates = self.candidate_hosts
+        if authenticate is None:
+            authenticate = self.uses_control_master
+        ssh_exe = find_ssh() if authenticate else None
+        if ssh_exe and await asyncio.to_thread(self.master_running):
+            return self.mac_ip
+
+        started = time.perf_counter()
+        result = await race.race(
+            candidates, lambda host: self._attempt_host(host, ssh_exe, timeout), stagger
+        )
+        if ssh_exe:
+            winner = result[0] if result else None
+            for host in candidates:
+                # A loser may have authenticated just before being cancelled
+                if host != winner and self._control_path(host).exists():
+                    await asyncio.to_thread(self._control, ssh_exe, "exit", False, host)
+        if result is None:
+            return None
 
-            if success:
-                return True, message
+        winner = result[0]
+        print(
+            f"🏁 {winner} answered first of {len(candidates)} candidates "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
+        if winner != self.mac_ip:
+            self._config.mac_hosts = list(
+                dict.fromkeys([winner, self.mac_ip, *self._config.mac_hosts])
+            )
+            self.auto_update_ip(winner)
+        return winner
 
-            # Classify the error
-            error_type, user_message = self.classify_ssh_error(message)
+    def race_hosts(self, authenticate: Optional[bool] = None) -> Optional[str]:
+        """Blocking wrapper around arace_hosts()."""
+        return asyncio.run(self.arace_hosts(authenticate))
 
-            print(f"❌ {user_message}")
+    def _adopt_discovery(
+        self, discovered: Optional[Tuple[str, str]], started: float
+    ) -> Optional[tuple[bool, str]]:
+        """Act on a finished discovery: cut over to a new IP, or give up.
 
-            # If IP changed/unreachable and auto-discover enabled
-            if error_type == "IP_CHANGED" and auto_discover and attempt >= 2:
-                print(f"\n💡 Mac not found at {self.mac_ip}. Scanning network...")
+        Returns the final (success, message), or None to keep retrying.
+        """
+        if not discovered:
+            print(f"\n❌ Could not find Mac on network")
+            print(f"   Please check:")
+            print(f"   1. Mac is powered on and awake")
+            print(f"   2. Mac is connected to same network")
+            print(f"   3. SSH (Remote Login) is enabled on Mac")
+            return False, "Connection failed after all attempts"
+        new_ip, _ = discovered
+        if new_ip == self.mac_ip:
+            print(f"⚠ Mac is at expected IP but not responding")
+            return False, "Connection failed after all attempts"
+
+        print(f"\n🎯 Mac found at NEW IP: {new_ip} (was {self.mac_ip})")
+        print(f"   Updating config automatically...")
+        if not self.auto_update_ip(new_ip):
+            return None
+        elapsed = time.monotonic() - started
+        print(f"\n🔄 Cut over after {elapsed:.1f}s, retrying connection...")
+        success, message = self.start()
+        if success:
+            self.remember_host()
+        return success, message
 
-                discovered = self.try_discover_mac()
+    def connect_with_retry(
+        self, max_attempts: int = 3, auto_discover: bool = True
+    ) -> tuple[bool, str]:
+        """Intelligent connection with auto-discovery and smart retry.
 
-                if discovered:
-                    new_ip, label = discovered
+        Args:
+            max_attempts: Maximum connection attempts
+            auto_discover: If True, scan the network (alongside the retries)
+                when the host is unreachable
 
-                    if new_ip != self.mac_ip:
-                        print(f"\n🎯 Mac found at NEW IP: {new_ip} (was {self.mac_ip})")
-                        print(f"   Updating config automatically...")
+        Returns (success, message) tuple.
+        """
+        started = time.monotonic()
+        # Attempts and discovery run in the pool so each can be waited on with
+        # the other; only this thread changes the config (race, cut-over)
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="connect")
+        cancel = threading.Event()
+        discovery: Optional[Future] = None
+        raced = False
+        try:
+            for attempt in range(1, max_attempts + 1):
+                if attempt > 1:
+                    metrics.RETRIES.inc("tunnel_connect")
+                # Race once per outage; racing rewrites MacIP, which discovery reads
+                if not raced and discovery is None and len(self.candidate_hosts) > 1:
+                    self.race_hosts()
+                    raced = True
+                print(
+                    f"🔌 Attempt {attempt}/{max_attempts} - Connecting to {self.mac_user}@{self.mac_ip}..."
+                )
 
-                        if self.auto_update_ip(new_ip):
-                            # Retry with new IP
-                            print(f"\n🔄 Retrying connection with new IP...")
-                            return self.start()
-                    else:
-                        print(f"⚠ Mac is at expected IP but not responding")
-                        break
+                target = self.mac_ip
+                connecting = executor.submit(self.start)
+                abandoned = False
+                if discovery is not None and not discovery.done():
+                    wait({connecting, discovery}, return_when=FIRST_COMPLETED)
+                    found = discovery.result() if discovery.done() else None
+                    if not connecting.done() and found and found[0] != target:
+                        # No point finishing a connect to the address the Mac left
+                        print(f"🎯 Mac found at {found[0]} - abandoning attempt on {target}")
+                        self.cancel_start()
+                        abandoned = True
+                success, message = connecting.result()
+
+                if success:
+                    self.remember_host()
+                    return True, message
+
+                if not abandoned:
+                    error_type, user_message = self.classify_ssh_error(message)
+                    print(f"❌ {user_message}")
                 else:
-                    print(f"\n❌ Could not find Mac on network")
-                    print(f"   Please check:")
-                    print(f"   1. Mac is powered on and awake")
-                    print(f"   2. Mac is connected to same network")
-                    print(f"   3. SSH (Remote Login) is enabled on Mac")
+                    error_type = "IP_CHANGED"
+
+                # If IP changed/unreachable and auto-discover enabled
+                if error_type == "IP_CHANGED" and auto_discover:
+                    if discovery is None:
+                        print(f"\n💡 No answer from {self.mac_ip}. Scanning network meanwhile...")
+                        discovery = executor.submit(self.try_discover_mac, cancel)
+                    # Wait out the retry delay, but no longer than discovery takes;
+                    # after the last attempt only discovery is left to wait for
+                    wait({discovery}, timeout=2 if attempt < max_attempts else None)
+                    if not discovery.done():
+                        print(f"⏳ Still scanning - retrying meanwhile...")
+                        continue
+
+                # A finished discovery decides, whatever this attempt failed with
+                if discovery is not None and discovery.done():
+                    outcome = self._adopt_discovery(discovery.result(), started)
+                    if outcome is not None:
+                        return outcome
+                    continue
+
+                # For other errors, provide specific guidance
+                if error_type == "SSH_DOWN":
+                    print(
+                        f"\n💡 To fix: Mac → System Settings → Sharing → Enable 'Remote Login'"
+                    )
+                    break
+                elif error_type == "AUTH_FAILED":
+                    print(f"\n💡 To fix: Check SSH password in config or set up SSH keys")
+                    break
+                elif error_type == "NETWORK_DOWN":
+                    print(f"\n💡 Check your network connection (WiFi/Ethernet)")
                     break
 
-            # For other errors, provide specific guidance
-            elif error_type == "SSH_DOWN":
-                print(
-                    f"\n💡 To fix: Mac → System Settings → Sharing → Enable 'Remote Login'"
-                )
-                break
-            elif error_type == "AUTH_FAILED":
-                print(f"\n💡 To fix: Check SSH password in config or set up SSH keys")
-                break
-            elif error_type == "NETWORK_DOWN":
-                print(f"\n💡 Check your network connection (WiFi/Ethernet)")
-                break
-
-            # Wait before retry
-            if attempt < max_attempts:
-                import time
-
-                print(f"⏳ Waiting 2 seconds before retry...")
-                time.sleep(2)
+                # Wait before retry (a running discovery may end the wait early)
+                if attempt < max_attempts:
+                    print(f"⏳ Waiting 2 seconds before retry...")
+                    if discovery is not None:
+                        wait({discovery}, timeout=2)
+                    else:
+                        time.sleep(2)
+        finally:
+            # Stop a discovery still scanning and wait for its thread to end
+            cancel.set()
+            executor.shutdown(wait=True, cancel_futures=True)
 
         return False, "Connection failed after all attempts"
@@ -77,14 +77,26 @@ class StatusBar(Static):
         # Tunnel status with health check caching
         if hasattr(app, "tunnel"):
             try:
-                # Quick PID+port check
-                running = await loop.run_in_executor(
-                    _status_executor, app.tunnel.is_running
-                )
-
-                # Periodic deep health check (every 10s)
+                # Cached liveness snapshot (kept fresh by the app's watcher)
+                running = (await app.tunnel.liveness.get()).up
+
+                # Measured quality from the background prober, once it has samples
+                prober = getattr(app, "prober", None)
+                quality = prober.state if prober is not None else "unknown"
+                detail = prober.describe() if prober is not None else ""
+
+                # A daemon that owns the tunnel knows its state first-hand
+                # (cached by the app's daemon watcher, so no round trip here)
+                daemon = getattr(app, "daemon", None)
+                daemon_status = daemon.cached_status() if daemon is not None else None
+                if daemon_status is not None and daemon_status["supervising"]:
+                    running = daemon_status["up"]
+                    quality = daemon_status["quality"]
+                    detail = daemon_status["quality_detail"]
+
+                # Periodic deep health check (every 10s), only until the prober has data
                 now = time.time()
-                if now - self._health_check_time > self._health_check_interval:
+                if quality == "unknown" and now - self._health_check_time > self._health_check_interval:
                     # Time for fresh health check
                     if running and hasattr(app, "api"):
                         try:
@@ -96,16 +108,21 @@ class StatusBar(Static):
                             self._last_health_check = (False, "Health check error")
                             self._health_check_time = now
 
-                # Display status based on PID check and cached health check
-                if running:
-                    if self._last_health_check and not self._last_health_check[0]:
-                        # Port open but health check failed (zombie state)
-                        self.tunnel_status = "⚠️ Port Open (API not responding)"
-                    else:
-                        # Healthy or no health check yet
-                        self.tunnel_status = f"✅ Connected (port {app.tunnel.port})"
-                else:
+                # Display status based on PID check and prober / cached health check
+                if not running:
                     self.tunnel_status = f"❌ Not connected (port {app.tunnel.port})"
+                elif quality == "healthy":
+                    self.tunnel_status = f"✅ Connected ({detail})"
+                elif quality == "degraded":
+                    self.tunnel_status = f"🐢 Slow ({detail})"
+                elif quality == "down" or (
+                    self._last_health_check and not self._last_health_check[0]
+                ):
+                    # Port open but probes/health check failing (zombie state)
+                    self.tunnel_status = "⚠️ Port Open (API not responding)"
+                else:
+                    # Healthy or no health check yet
+                    self.tunnel_status = f"✅ Connected (port {app.tunnel.port})"
             except Exception as e:
                 self.tunnel_status = f"⚠️ Error: {str(e)}"
         else: